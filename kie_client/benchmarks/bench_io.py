@@ -0,0 +1,131 @@
+"""Benchmark status-poll latency while downloads are running.
+
+Runs N concurrent downloads against a local in-memory transport while one
+coroutine polls a task's status, and reports the poll latency in three
+modes:
+
+- ``idle``: no downloads, the baseline;
+- ``inline``: downloads write each block on the event loop, as before the
+  I/O pool existed;
+- ``pool``: downloads write through the client's I/O thread pool
+  (``KieClient._run_io``), as ``download_file`` does.
+
+``--write-latency-ms`` adds a blocking sleep to every block write to stand
+in for a slow disk. Poll latency should stay near ``idle`` with the pool
+and grow with the number of downloads without it::
+
+    python -m benchmarks.bench_io
+    python -m benchmarks.bench_io --downloads 16 --size-mb 64 --write-latency-ms 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from kie_client import KieClient
+
+_CHUNK = 64 * 1024
+
+
+class _Body(httpx.AsyncByteStream):
+    """A download body served from memory in network-sized chunks."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    async def __aiter__(self):
+        chunk = bytes(_CHUNK)
+        sent = 0
+        while sent < self.size:
+            part = chunk[: min(_CHUNK, self.size - sent)]
+            sent += len(part)
+            await asyncio.sleep(0)  # hand the loop back, as a socket read would
+            yield part
+
+
+class _LocalKie(httpx.AsyncBaseTransport):
+    """Answers status polls at once and serves ``size``-byte downloads."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if "recordInfo" in request.url.path:
+            task_id = request.url.params.get("taskId", "t")
+            return httpx.Response(200, json={"code": 200, "data": {"taskId": task_id, "state": "generating"}})
+        return httpx.Response(200, headers={"content-length": str(self.size)}, stream=_Body(self.size))
+
+
+async def _poll_latencies(client: KieClient, stop: asyncio.Event, interval: float) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get_task_status("bench-task")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def _run(mode: str, downloads: int, size: int, write_latency: float, interval: float, tmp: Path) -> list[float]:
+    async with KieClient(api_key="bench", transport=_LocalKie(size), io_workers=4) as client:
+        def write_block(f, block: bytes) -> None:
+            f.write(block)
+            if write_latency:
+                time.sleep(write_latency)
+
+        async def download(n: int) -> None:
+            with open(tmp / f"{mode}_{n}.bin", "wb") as f:
+                if mode == "pool":
+                    await client.download_to(f"https://cdn.example/{n}.mp4", lambda block: client._run_io(write_block, f, block))
+                else:
+                    async def write(block: bytes) -> None:
+                        write_block(f, block)
+                    await client.download_to(f"https://cdn.example/{n}.mp4", write)
+
+        stop = asyncio.Event()
+        poller = asyncio.create_task(_poll_latencies(client, stop, interval))
+        if mode == "idle":
+            await asyncio.sleep(1.0)
+        else:
+            await asyncio.gather(*(download(n) for n in range(downloads)))
+        stop.set()
+        return await poller
+
+
+def _summary(latencies: list[float]) -> str:
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    return f"{len(ms):5d} polls  p50 {statistics.median(ms):7.2f} ms  p95 {p95:7.2f} ms  max {ms[-1]:7.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--downloads", type=int, default=8, help="Concurrent downloads")
+    parser.add_argument("--size-mb", type=float, default=32, help="Size of each download")
+    parser.add_argument("--write-latency-ms", type=float, default=2.0, help="Blocking delay added to each block write")
+    parser.add_argument("--poll-interval-ms", type=float, default=10.0, help="Pause between status polls")
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024 * 1024)
+    print(
+        f"{args.downloads} download(s) of {args.size_mb:g} MB, "
+        f"{args.write_latency_ms:g} ms per block write, poll every {args.poll_interval_ms:g} ms"
+    )
+    with tempfile.TemporaryDirectory(prefix="kie-bench-io-") as tmp:
+        for mode in ("idle", "inline", "pool"):
+            started = time.perf_counter()
+            latencies = asyncio.run(_run(
+                mode, args.downloads, size, args.write_latency_ms / 1000, args.poll_interval_ms / 1000, Path(tmp),
+            ))
+            print(f"{mode:>6}: {_summary(latencies)}  ({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
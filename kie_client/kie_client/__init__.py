@@ -1,12 +1,40 @@
 """KIE.ai API client — async HTTP client for video/image generation."""
 
-from kie_client.client import KieClient, KieApiError, DryRunInterrupt
-from kie_client.models import TaskStatus, Element
+from kie_client.client import (
+    KieClient, KieApiError, DryRunInterrupt, TaskTimeoutError, build_image_payload, build_multi_shot_payload,
+)
+from kie_client.batch import fan_out
+from kie_client.cassette import CassetteMiss, RecordingTransport, ReplayTransport
+from kie_client.grok import GrokClient, GrokApiError, build_grok_payload
+from kie_client.keys import ApiKey, KeyPool
+from kie_client.models import BatchResult, TaskStatus, Element
+from kie_client.polling import PollScheduler, schedule_key
+from kie_client.providers import Provider, ProviderCapacity, ProviderRouter
+from kie_client.status_cache import TaskStatusCache
 
 __all__ = [
     "KieClient",
     "KieApiError",
     "DryRunInterrupt",
+    "TaskTimeoutError",
+    "build_multi_shot_payload",
+    "build_image_payload",
+    "fan_out",
+    "BatchResult",
     "TaskStatus",
     "Element",
+    "PollScheduler",
+    "ApiKey",
+    "KeyPool",
+    "RecordingTransport",
+    "ReplayTransport",
+    "CassetteMiss",
+    "schedule_key",
+    "GrokClient",
+    "GrokApiError",
+    "build_grok_payload",
+    "Provider",
+    "ProviderCapacity",
+    "ProviderRouter",
+    "TaskStatusCache",
 ]
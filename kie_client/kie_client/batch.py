@@ -0,0 +1,60 @@
+"""Concurrent fan-out of client calls, yielding results as they finish.
+
+:func:`fan_out` is the primitive behind ``KieClient.submit_many``,
+``upload_many`` and ``download_many``. Each item's outcome, whether a value
+or an exception, is passed to an optional callback (for persisting status)
+and then yielded as a :class:`~kie_client.models.BatchResult`. A failed item
+never stops the others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+
+from kie_client.models import BatchResult
+
+T = TypeVar("T")
+
+ResultCallback = Callable[[BatchResult], Any]
+
+
+async def fan_out(
+    items: Iterable[T],
+    call: Callable[[T], Awaitable[Any]],
+    concurrency: int = 4,
+    on_result: ResultCallback | None = None,
+) -> AsyncIterator[BatchResult]:
+    """Run ``call`` on every item, at most ``concurrency`` at a time (0 = unlimited).
+
+    Items start in order. ``on_result`` may be a plain function or a
+    coroutine function; it runs before the result is yielded. Closing the
+    iterator early cancels the calls still running.
+    """
+    slots = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+
+    async def run(item: T) -> BatchResult:
+        try:
+            if slots is None:
+                value = await call(item)
+            else:
+                async with slots:
+                    value = await call(item)
+            result = BatchResult(item, value)
+        except Exception as exc:
+            result = BatchResult(item, error=exc)
+        if on_result is not None:
+            outcome = on_result(result)
+            if inspect.isawaitable(outcome):
+                await outcome
+        return result
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,271 @@
+"""Record/replay HTTP transports for KieClient.
+
+``RecordingTransport`` wraps the real transport and appends every request,
+response and its timing to a cassette (gzip-compressed JSON lines).
+``ReplayTransport`` serves a cassette back offline, so a run can be
+reproduced without network access or spending credits::
+
+    recorder = RecordingTransport("run.cassette.gz")
+    async with KieClient(api_key="...", transport=recorder) as client:
+        ...
+    await recorder.aclose()
+
+    async with KieClient(api_key="...", transport=ReplayTransport("run.cassette.gz", speed=10)) as client:
+        ...
+
+Requests are matched on method, URL and (for JSON and multipart bodies) a
+digest of the body, so concurrent uploads get back the URL of their own
+file. Repeated POSTs get their recorded responses in order. GETs (status
+polls) follow the recorded timeline, aligned at the first request and
+scaled by ``speed``: a task that was "generating" for five minutes while
+recording stays so for five minutes of replay (30 seconds at speed 10),
+however often it is polled. A cassette holding several runs replays
+against the timeline of the first.
+
+Response bodies larger than ``max_body_bytes`` (downloaded videos and
+images) are stored once each, named by their SHA-256, in a sidecar
+directory next to the cassette (``run.cassette.gz.media/``), and replayed
+byte for byte, so downloads pass ffprobe/PIL verification offline. Keep the
+sidecar with the cassette: a body whose sidecar file is missing is
+replayed as zero bytes of the recorded size and fails verification.
+
+API keys are never written: the Authorization header is not recorded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from kie_client.client import KieApiError
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+
+# Response headers worth keeping; the rest (cookies, tracing, encodings) are dropped.
+_KEEP_HEADERS = ("content-type", "retry-after")
+
+
+class CassetteMiss(KieApiError):
+    """Raised in replay when the cassette has no response for a request."""
+
+
+def _request_key(request: httpx.Request, body: bytes) -> str:
+    """Match key for a request: method, URL and the digest of a JSON or multipart body."""
+    key = f"{request.method} {request.url}"
+    content_type = request.headers.get("content-type", "")
+    if body and content_type.startswith("application/json"):
+        try:
+            canonical = json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False)
+        except ValueError:
+            canonical = body.decode("utf-8", "replace")
+        key += " " + hashlib.sha256(canonical.encode()).hexdigest()[:16]
+    elif body and content_type.startswith("multipart/form-data"):
+        # The boundary is random per request; the parts (uploaded file included) are not
+        boundary = content_type.partition("boundary=")[2].split(";")[0].strip().strip('"')
+        if boundary:
+            body = body.replace(boundary.encode(), b"")
+        key += " " + hashlib.sha256(body).hexdigest()[:16]
+    return key
+
+
+def media_dir_for(path: Path) -> Path:
+    """Sidecar directory holding a cassette's large response bodies."""
+    return path.with_name(path.name + ".media")
+
+
+def _store_media(directory: Path, digest: str, content: bytes) -> None:
+    target = directory / digest
+    if target.exists():
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    partial = directory / f"{digest}.{os.getpid()}.part"
+    partial.write_bytes(content)
+    os.replace(partial, target)
+
+
+def _now() -> float:
+    """Current time on the running loop's clock (virtual under a simulated loop)."""
+    return asyncio.get_running_loop().time()
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forward requests to a real transport and record them to a cassette.
+
+    Args:
+        path: Cassette file; new interactions are appended, so several runs
+            can share one cassette.
+        transport: Transport doing the real work (a fresh
+            ``httpx.AsyncHTTPTransport`` if None).
+        max_body_bytes: Larger response bodies (downloaded media) go to the
+            content-addressed sidecar directory instead of the cassette
+            (0 = keep every body inline).
+        media_dir: Sidecar directory (``<cassette>.media`` if None).
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        transport: httpx.AsyncBaseTransport | None = None,
+        max_body_bytes: int = 256 * 1024,
+        media_dir: str | Path | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.max_body_bytes = max_body_bytes
+        self.media_dir = Path(media_dir) if media_dir else media_dir_for(self.path)
+        self.recorded = 0
+        self._epoch: tuple[float, float] | None = None  # (wall time, loop time) of the first request
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(self.path, "at", encoding="utf-8")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        started = _now()
+        if self._epoch is None:
+            self._epoch = (time.time(), started)
+        sent_at = self._epoch[0] + started - self._epoch[1]
+        response = await self._transport.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        elapsed = _now() - started
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() in _KEEP_HEADERS}
+        entry: dict[str, Any] = {
+            "v": CASSETTE_VERSION,
+            "at": sent_at,
+            "elapsed": round(elapsed, 4),
+            "key": _request_key(request, body),
+            "status": response.status_code,
+            "headers": headers,
+        }
+        if headers.get("content-type", "").startswith("application/json"):
+            entry["json"] = content.decode("utf-8", "replace")
+        elif self.max_body_bytes and len(content) > self.max_body_bytes:
+            entry["size"] = len(content)
+            entry["sha256"] = hashlib.sha256(content).hexdigest()
+            await asyncio.to_thread(_store_media, self.media_dir, entry["sha256"], content)
+        else:
+            entry["b64"] = base64.b64encode(content).decode("ascii")
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()  # a crashed run still leaves a usable cassette
+        self.recorded += 1
+
+        # The body was decoded while reading, so drop the encoding headers
+        out_headers = [
+            (k, v) for k, v in response.headers.multi_items()
+            if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        return httpx.Response(
+            response.status_code, headers=out_headers, content=content, extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+            logger.info("Recorded %d interaction(s) to %s", self.recorded, self.path)
+        await self._transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serve responses from a cassette instead of the network.
+
+    Args:
+        path: Cassette written by ``RecordingTransport``.
+        speed: Time compression. 1 replays with the original latencies and
+            task progress; 10 runs ten times faster.
+        media_dir: Sidecar directory of large bodies (``<cassette>.media`` if None).
+
+    Raises:
+        FileNotFoundError: If the cassette does not exist.
+        ValueError: If ``speed`` is not positive.
+    """
+
+    def __init__(self, path: str | Path, speed: float = 1.0, media_dir: str | Path | None = None) -> None:
+        if speed <= 0:
+            raise ValueError(f"Replay speed must be positive, got {speed}")
+        self.path = Path(path)
+        self.media_dir = Path(media_dir) if media_dir else media_dir_for(self.path)
+        self.speed = speed
+        self.served = 0
+        self._entries: dict[str, list[dict]] = {}
+        self._cursor: dict[str, int] = {}  # key -> index of the response last served
+        self._origin: tuple[float, float] | None = None  # (replay time, recorded time) of the first request
+
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], []).append(entry)
+            except (EOFError, json.JSONDecodeError):
+                # The recording run was killed; every flushed line is still usable
+                logger.warning("Cassette %s is truncated; replaying what was recorded", self.path)
+        logger.info(
+            "Loaded cassette %s: %d interaction(s), %d distinct request(s)",
+            self.path, sum(len(v) for v in self._entries.values()), len(self._entries),
+        )
+
+    def _select(self, key: str, method: str) -> dict:
+        entries = self._entries.get(key)
+        if not entries:
+            raise CassetteMiss(f"No recorded response for {key}")
+        now = _now()
+        if self._origin is None:
+            # Align the replay with the recording at the first request
+            self._origin = (now, entries[0]["at"])
+        index = self._cursor.get(key)
+        if index is None:
+            index = 0
+        elif method != "GET":
+            # Each repeated POST consumes the next recorded response
+            index = min(index + 1, len(entries) - 1)
+        if method == "GET":
+            # Serve the latest response recorded by this point of the timeline
+            # (a millisecond of slack absorbs float rounding of the offsets)
+            target = self._origin[1] + (now - self._origin[0]) * self.speed + 1e-3
+            while index + 1 < len(entries) and entries[index + 1]["at"] <= target:
+                index += 1
+        self._cursor[key] = index
+        return entries[index]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        entry = self._select(_request_key(request, body), request.method)
+        if entry.get("elapsed"):
+            await asyncio.sleep(entry["elapsed"] / self.speed)
+        self.served += 1
+
+        if "json" in entry:
+            content = entry["json"].encode("utf-8")
+        elif "b64" in entry:
+            content = base64.b64decode(entry["b64"])
+        else:
+            content = await asyncio.to_thread(self._load_media, entry)
+        return httpx.Response(entry["status"], headers=entry.get("headers", {}), content=content)
+
+    def _load_media(self, entry: dict) -> bytes:
+        digest = entry.get("sha256")
+        try:
+            return (self.media_dir / digest).read_bytes() if digest else bytes(entry.get("size", 0))
+        except FileNotFoundError:
+            logger.warning(
+                "Cassette media %s is missing from %s; replaying %d zero bytes", digest, self.media_dir, entry["size"],
+            )
+            return bytes(entry.get("size", 0))
+
+    async def aclose(self) -> None:
+        logger.info("Replayed %d response(s) from %s", self.served, self.path)
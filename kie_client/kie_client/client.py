@@ -9,13 +9,21 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractAsyncContextManager
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, TypeVar
 
 import httpx
 from rich.console import Console
 
-from kie_client.models import Element, TaskStatus
+from kie_client import clock as loop_clock
+from kie_client.batch import ResultCallback, fan_out
+from kie_client.keys import ApiKey, KeyPool
+from kie_client.models import BatchResult, Element, TaskStatus
+from kie_client.polling import PollScheduler, schedule_key
+from kie_client.status_cache import TaskStatusCache
 
 logger = logging.getLogger(__name__)
 _console = Console()
@@ -24,20 +32,128 @@ _DEFAULT_TIMEOUT = 60.0
 _DOWNLOAD_TIMEOUT = 300.0
 _UPLOAD_BASE_URL = "https://kieai.redpandaai.co"
 
+T = TypeVar("T")
+
+# Downloads are buffered in memory and written in blocks of this many bytes,
+# sized to roughly _WRITE_TARGET_SECONDS of transfer at the observed rate.
+_WRITE_ALIGN = 64 * 1024
+_MIN_WRITE_SIZE = 64 * 1024
+_MAX_WRITE_SIZE = 8 * 1024 * 1024
+_WRITE_TARGET_SECONDS = 0.25
+
+
+def _adapt_write_size(bytes_per_second: float) -> int:
+    """Write block size for the given throughput, aligned to _WRITE_ALIGN."""
+    size = int(bytes_per_second * _WRITE_TARGET_SECONDS) // _WRITE_ALIGN * _WRITE_ALIGN
+    return max(_MIN_WRITE_SIZE, min(_MAX_WRITE_SIZE, size))
+
 
 class KieApiError(Exception):
-    """Raised when the KIE.ai API returns an error."""
+    """Raised when the KIE.ai API returns an error.
 
-    def __init__(self, message: str, status_code: int | None = None, body: Any = None):
+    ``sent`` is False when the request never left the client (the connection
+    could not be opened), so the API cannot have acted on it.
+    """
+
+    def __init__(self, message: str, status_code: int | None = None, body: Any = None, sent: bool = True):
         self.status_code = status_code
         self.body = body
+        self.sent = sent
         super().__init__(message)
 
 
+class TaskTimeoutError(KieApiError):
+    """Raised when a task is still running after the polling deadline."""
+
+
 class DryRunInterrupt(Exception):
     """Raised instead of making an HTTP call in dry-run mode."""
 
 
+class _LentTransport(httpx.AsyncBaseTransport):
+    """Hands a caller-owned transport to an httpx client without letting it close it."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+
+def build_multi_shot_payload(
+    shots: list[dict],
+    elements: list[Element] | None = None,
+    mode: str = "pro",
+    aspect_ratio: str = "16:9",
+    sound: bool = True,
+) -> dict[str, Any]:
+    """Build the ``createTask`` payload for a Kling 3.0 multi-shot video.
+
+    Args:
+        shots: List of {"prompt": str, "duration": int} dicts.
+        elements: Optional list of Element objects with reference images.
+        mode: Generation mode ("std" or "pro").
+        aspect_ratio: Output aspect ratio.
+        sound: Whether to generate sound.
+
+    Raises:
+        ValueError: If shots exceed limits (>6 shots or >15s total).
+    """
+    if len(shots) > 6:
+        raise ValueError(f"Multi-shot supports max 6 shots, got {len(shots)}")
+    total_duration = sum(s["duration"] for s in shots)
+    if total_duration > 15:
+        raise ValueError(f"Multi-shot supports max 15s total, got {total_duration}s")
+
+    kling_elements = []
+    image_urls = []
+    if elements:
+        for el in elements:
+            if el.image_urls:
+                kling_elements.append({
+                    "name": el.name,
+                    "description": el.description or el.name,
+                    "element_input_urls": el.image_urls,
+                })
+                if not image_urls:
+                    image_urls.append(el.image_urls[0])
+
+    multi_prompt = [
+        {"prompt": s["prompt"], "duration": s["duration"]}
+        for s in shots
+    ]
+
+    body: dict[str, Any] = {
+        "model": "kling-3.0/video",
+        "input": {
+            "sound": sound,
+            "duration": str(total_duration),
+            "aspect_ratio": aspect_ratio,
+            "mode": mode,
+            "multi_shots": True,
+            "multi_prompt": multi_prompt,
+        },
+    }
+
+    if kling_elements:
+        body["input"]["kling_elements"] = kling_elements
+        body["input"]["image_urls"] = image_urls
+    return body
+
+
+def build_image_payload(prompt: str, negative_prompt: str = "", aspect_ratio: str = "16:9") -> dict[str, Any]:
+    """Build the ``createTask`` payload for a Kling 3.0 image generation task."""
+    return {
+        "model": "kling-3.0/image",
+        "task_type": "image_generation",
+        "input": {
+            "prompt": prompt,
+            "negative_prompt": negative_prompt,
+            "aspect_ratio": aspect_ratio,
+        },
+    }
+
+
 class KieClient:
     """Async client for KIE.ai API.
 
@@ -56,10 +172,37 @@ class KieClient:
         base_url: str = "https://api.kie.ai",
         timeout: float = _DEFAULT_TIMEOUT,
         dry_run: bool = False,
+        poll_scheduler: PollScheduler | None = None,
+        io_workers: int = 4,
+        key_pool: KeyPool | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        clock: Callable[[], float] = loop_clock.wall,
+        batch_concurrency: int = 4,
+        status_cache: TaskStatusCache | None = None,
     ) -> None:
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self.dry_run = dry_run
+        self.poll_scheduler = poll_scheduler
+        self.key_pool = key_pool
+        # A custom transport (simulated backend, cassette recorder/replayer)
+        # serves API, upload and download traffic. The caller owns it and
+        # closes it; ``clock`` must follow the transport's timeline.
+        self._transport = transport
+        self.clock = clock
+        # Calls in flight at once per submit_many/upload_many/download_many
+        self.batch_concurrency = batch_concurrency
+        # Terminal statuses are served from here instead of the API
+        self.status_cache = status_cache
+        # task_id -> status request in flight, shared by concurrent callers
+        self._status_requests: dict[str, asyncio.Future] = {}
+        # task_id -> (schedule key, submission wall-clock time)
+        self._task_meta: dict[str, tuple[str, float | None]] = {}
+        # task_id -> pool key that created it (only with a key pool)
+        self._task_keys: dict[str, ApiKey] = {}
+        self._released_tasks: set[str] = set()
+        # File reads/writes run here so disk latency never blocks the event loop
+        self._io_pool = ThreadPoolExecutor(max_workers=max(1, io_workers), thread_name_prefix="kie-io")
         self._client = httpx.AsyncClient(
             base_url=self.base_url,
             headers={
@@ -67,6 +210,7 @@ class KieClient:
                 "Content-Type": "application/json",
             },
             timeout=httpx.Timeout(timeout, connect=10.0),
+            transport=self._lend_transport(),
         )
 
     async def __aenter__(self) -> KieClient:
@@ -77,12 +221,22 @@ class KieClient:
 
     async def close(self) -> None:
         await self._client.aclose()
+        self._io_pool.shutdown(wait=False)
+
+    def _lend_transport(self) -> httpx.AsyncBaseTransport | None:
+        return _LentTransport(self._transport) if self._transport is not None else None
+
+    async def _run_io(self, func: Any, *args: Any) -> Any:
+        """Run a blocking file operation on the I/O thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._io_pool, func, *args)
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
-    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    async def _request(self, method: str, url: str, api_key: str | None = None, **kwargs: Any) -> httpx.Response:
+        if api_key is not None:
+            kwargs["headers"] = {**kwargs.get("headers", {}), "Authorization": f"Bearer {api_key}"}
         if "json" in kwargs:
             _console.print(f"[cyan bold]── {method} {self.base_url}{url}[/cyan bold]")
             _console.print_json(json.dumps(kwargs["json"], ensure_ascii=False))
@@ -99,8 +253,12 @@ class KieClient:
                 status_code=exc.response.status_code,
                 body=exc.response.text,
             ) from exc
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as exc:
+            raise KieApiError(f"Could not connect: {exc}", sent=False) from exc
         except httpx.TimeoutException as exc:
             raise KieApiError(f"Request timeout: {exc}") from exc
+        except httpx.HTTPError as exc:
+            raise KieApiError(f"Request failed: {exc}") from exc
 
     def _parse_task_id(self, data: dict) -> str:
         if "data" in data and isinstance(data["data"], dict):
@@ -160,11 +318,69 @@ class KieClient:
             error=error,
         )
 
+    def track_task(
+        self, task_id: str, key: str, submitted_at: float | None = None, owner: str | None = None,
+    ) -> None:
+        """Remember the schedule key and submission time of a task.
+
+        Called automatically for tasks created by this client; call it for
+        tasks resumed from a previous run so polling can be scheduled.
+        ``submitted_at`` is None when the submission time is unknown: the
+        task is then polled right away. ``owner`` names the pool API key
+        that created a resumed task.
+        """
+        self._task_meta[task_id] = (key, submitted_at)
+        if self.key_pool is not None and task_id not in self._task_keys:
+            api_key = self.key_pool.get(owner)
+            if api_key is not None:
+                self._task_keys[task_id] = api_key
+                self.key_pool.adopt(api_key)
+
+    def task_owner(self, task_id: str) -> str | None:
+        """Name of the pool API key that owns ``task_id``, if a key pool is in use."""
+        api_key = self._task_keys.get(task_id)
+        return api_key.name if api_key else None
+
+    async def _create_task(self, body: dict[str, Any]) -> str:
+        """POST a ``createTask`` payload and return the task_id.
+
+        With a key pool, the least-loaded key is used; on HTTP 429 that key
+        is cooled down and the request moves to the next one.
+        """
+        if self.key_pool is None:
+            response = await self._request("POST", "/api/v1/jobs/createTask", json=body)
+            data = response.json()
+            self._check_response_code(data)
+            return self._parse_task_id(data)
+
+        for _ in range(len(self.key_pool.keys) + 1):
+            api_key = await self.key_pool.acquire()
+            try:
+                response = await self._request("POST", "/api/v1/jobs/createTask", api_key=api_key.key, json=body)
+                data = response.json()
+                self._check_response_code(data)
+                task_id = self._parse_task_id(data)
+            except KieApiError as exc:
+                self.key_pool.release(api_key, failed=True)
+                if exc.status_code == 429:
+                    self.key_pool.throttle(api_key)
+                    continue
+                raise
+            except BaseException:
+                self.key_pool.release(api_key, failed=True)
+                raise
+            self._task_keys[task_id] = api_key
+            logger.debug("Task %s created with API key %s", task_id, api_key.name)
+            return task_id
+        raise KieApiError("All API keys are throttled (HTTP 429)", status_code=429)
+
     def _check_response_code(self, data: dict) -> None:
         code = data.get("code")
         if code is not None and code != 200:
             error_msg = data.get("message", data.get("error", str(data)))
-            raise KieApiError(f"API error (code={code}): {error_msg}", body=data)
+            # KIE reports errors such as rate limits (429) in the body with HTTP 200
+            status_code = int(code) if str(code).isdigit() else None
+            raise KieApiError(f"API error (code={code}): {error_msg}", status_code=status_code, body=data)
 
     # ------------------------------------------------------------------
     # Public API — file operations
@@ -179,19 +395,20 @@ class KieClient:
         if not path.exists():
             raise KieApiError(f"File not found: {path}")
 
-        logger.info("Uploading %s (%.1f KB)", path, path.stat().st_size / 1024)
+        content = await self._run_io(path.read_bytes)
+        logger.info("Uploading %s (%.1f KB)", path, len(content) / 1024)
 
         try:
             async with httpx.AsyncClient(
-                timeout=httpx.Timeout(60.0, connect=10.0),
+                timeout=httpx.Timeout(60.0, connect=10.0), transport=self._lend_transport(),
             ) as ul_client:
-                with open(path, "rb") as f:
-                    response = await ul_client.post(
-                        f"{_UPLOAD_BASE_URL}/api/file-stream-upload",
-                        headers={"Authorization": f"Bearer {self.api_key}"},
-                        files={"file": (path.name, f)},
-                        data={"uploadPath": "elements"},
-                    )
+                api_key = self.key_pool.pick().key if self.key_pool else self.api_key
+                response = await ul_client.post(
+                    f"{_UPLOAD_BASE_URL}/api/file-stream-upload",
+                    headers={"Authorization": f"Bearer {api_key}"},
+                    files={"file": (path.name, content)},
+                    data={"uploadPath": "elements"},
+                )
                 response.raise_for_status()
         except httpx.HTTPError as exc:
             raise KieApiError(f"Upload failed for {path}: {exc}") from exc
@@ -209,33 +426,162 @@ class KieClient:
         return file_url
 
     async def download_file(self, url: str, output_path: str | Path) -> Path:
-        """Download a file from a URL to a local path."""
+        """Download a file from a URL to a local path.
+
+        The body is streamed to a ``.part`` file and moved into place only
+        once its size matches the Content-Length header, so an interrupted
+        or truncated transfer never leaves a file at ``output_path``.
+
+        Writes happen on the client's I/O thread pool in blocks sized to the
+        transfer rate, overlapping with the next network reads.
+        """
         output = Path(output_path)
         output.parent.mkdir(parents=True, exist_ok=True)
+        partial = output.with_name(output.name + ".part")
 
         logger.info("Downloading %s -> %s", url, output)
         try:
-            async with httpx.AsyncClient(timeout=_DOWNLOAD_TIMEOUT) as dl_client:
-                async with dl_client.stream("GET", url) as response:
-                    response.raise_for_status()
-                    with open(output, "wb") as f:
-                        async for chunk in response.aiter_bytes(chunk_size=8192):
-                            f.write(chunk)
-        except httpx.HTTPError as exc:
+            f = await self._run_io(open, partial, "wb")
+        except OSError as exc:
             raise KieApiError(f"Download failed for {url}: {exc}") from exc
+        try:
+            try:
+                await self._download(url, lambda block: self._run_io(f.write, block))
+            finally:
+                await self._run_io(f.close)
+        except KieApiError:
+            await self._run_io(partial.unlink, True)
+            raise
+        await self._run_io(partial.replace, output)
 
         logger.info("Downloaded: %s (%.1f KB)", output, output.stat().st_size / 1024)
         return output
 
+    async def download_to(self, url: str, write: Callable[[bytes], Awaitable[Any]]) -> int:
+        """Stream a file from a URL into ``write`` (e.g. a storage backend's writer).
+
+        Blocks are sized as for ``download_file``, with at most one ``write``
+        in flight. On error the caller discards whatever was written.
+
+        Returns:
+            Number of bytes written.
+
+        Raises:
+            KieApiError: If the transfer fails or is shorter than Content-Length.
+        """
+        logger.info("Downloading %s", url)
+        written = await self._download(url, write)
+        logger.info("Downloaded %s (%.1f KB)", url, written / 1024)
+        return written
+
+    async def _download(self, url: str, write: Callable[[bytes], Awaitable[Any]]) -> int:
+        try:
+            async with httpx.AsyncClient(timeout=_DOWNLOAD_TIMEOUT, transport=self._lend_transport()) as dl_client:
+                async with dl_client.stream("GET", url) as response:
+                    response.raise_for_status()
+                    expected = response.headers.get("content-length")
+                    encoded = response.headers.get("content-encoding", "identity") != "identity"
+                    written = await self._stream_to(response, write)
+        except (httpx.HTTPError, OSError) as exc:
+            raise KieApiError(f"Download failed for {url}: {exc}") from exc
+
+        if expected is not None and not encoded and written != int(expected):
+            raise KieApiError(f"Download truncated for {url}: got {written} of {expected} bytes")
+        return written
+
+    async def _stream_to(self, response: httpx.Response, write: Callable[[bytes], Awaitable[Any]]) -> int:
+        """Pass a streamed response body to ``write`` in blocks; return the byte count.
+
+        At most one block write is in flight at a time, so memory stays
+        bounded at two blocks per download.
+        """
+        pending: asyncio.Future | None = None
+        try:
+            write_size = _MIN_WRITE_SIZE
+            buffer = bytearray()
+            received = 0
+            started = time.monotonic()
+
+            async for chunk in response.aiter_bytes():
+                buffer += chunk
+                received += len(chunk)
+                if len(buffer) < write_size:
+                    continue
+                if pending is not None:
+                    await pending
+                block, buffer = buffer, bytearray()
+                pending = asyncio.ensure_future(write(block))
+                elapsed = time.monotonic() - started
+                if elapsed > 0:
+                    write_size = _adapt_write_size(received / elapsed)
+
+            if pending is not None:
+                await pending
+            if buffer:
+                await write(buffer)
+        finally:
+            if pending is not None and not pending.done():
+                await asyncio.wait([pending])  # never close under an in-flight write
+        return received
+
     # ------------------------------------------------------------------
     # Public API — task management
     # ------------------------------------------------------------------
 
     async def get_task_status(self, task_id: str) -> TaskStatus:
-        """Get the current status of a task."""
-        response = await self._request("GET", f"/api/v1/jobs/recordInfo?taskId={task_id}")
+        """Get the current status of a task.
+
+        Concurrent calls for the same task share one ``recordInfo`` request.
+        With a ``status_cache``, finished tasks are answered from disk and
+        never queried again.
+        """
+        cached = await self._cached_status(task_id)
+        if cached is not None:
+            return cached
+
+        request = self._status_requests.get(task_id)
+        if request is None:
+            request = asyncio.ensure_future(self._fetch_task_status(task_id))
+            self._status_requests[task_id] = request
+            request.add_done_callback(lambda done: self._status_request_done(task_id, done))
+        # One caller giving up must not cancel the request for the others
+        return await asyncio.shield(request)
+
+    async def _cached_status(self, task_id: str) -> TaskStatus | None:
+        if self.status_cache is None:
+            return None
+        cached = await self._run_io(self.status_cache.get, task_id)
+        if cached is not None:
+            self._release_task_key(task_id)
+        return cached
+
+    def _status_request_done(self, task_id: str, request: asyncio.Future) -> None:
+        if self._status_requests.get(task_id) is request:
+            del self._status_requests[task_id]
+        if not request.cancelled():
+            request.exception()  # retrieved here in case every caller was cancelled
+
+    async def _fetch_task_status(self, task_id: str) -> TaskStatus:
+        api_key = self._task_keys.get(task_id)
+        response = await self._request(
+            "GET", f"/api/v1/jobs/recordInfo?taskId={task_id}", api_key=api_key.key if api_key else None,
+        )
         data = response.json()
-        return self._parse_task_status(data)
+        status = self._parse_task_status(data)
+        if not status.task_id:
+            status.task_id = task_id
+        if status.is_done:
+            self._release_task_key(task_id)
+            if self.status_cache is not None:
+                await self._run_io(self.status_cache.put, status)
+        return status
+
+    def _release_task_key(self, task_id: str) -> None:
+        """Free the pool slot held by ``task_id`` (once, however often it is called)."""
+        api_key = self._task_keys.get(task_id)
+        if api_key is not None and task_id not in self._released_tasks:
+            self._released_tasks.add(task_id)
+            self.key_pool.release(api_key)
 
     async def wait_for_task(
         self,
@@ -243,7 +589,26 @@ class KieClient:
         poll_interval: float = 10.0,
         max_wait: float = 300.0,
     ) -> TaskStatus:
-        """Poll a task until it reaches a terminal state."""
+        """Poll a task until it reaches a terminal state.
+
+        Uses the client's ``poll_scheduler`` when one is configured, otherwise
+        polls every ``poll_interval`` seconds. A task that times out gives
+        its key pool slot back, since nothing will poll it again to notice
+        when it finishes. A task already in the ``status_cache`` returns at once.
+        """
+        cached = await self._cached_status(task_id)
+        if cached is not None:
+            return cached
+        try:
+            return await self._wait_for_task(task_id, poll_interval, max_wait)
+        except TaskTimeoutError:
+            self._release_task_key(task_id)
+            raise
+
+    async def _wait_for_task(self, task_id: str, poll_interval: float, max_wait: float) -> TaskStatus:
+        if self.poll_scheduler is not None:
+            return await self._wait_scheduled(task_id, max_wait)
+
         elapsed = 0.0
         status = None
         while elapsed < max_wait:
@@ -254,11 +619,51 @@ class KieClient:
             await asyncio.sleep(poll_interval)
             elapsed += poll_interval
 
-        raise KieApiError(
+        raise TaskTimeoutError(
             f"Task {task_id} did not complete within {max_wait}s. "
             f"Last status: {status.status if status else 'unknown'}"
         )
 
+    async def _wait_scheduled(self, task_id: str, max_wait: float) -> TaskStatus:
+        scheduler = self.poll_scheduler
+        assert scheduler is not None
+        key, submitted_at = self._task_meta.get(task_id, (None, None))
+
+        polls = 0
+        status = None
+        last_poll = 0.0
+        if submitted_at is None:
+            # Unknown age: the task may be long done, so check it at once and
+            # keep its duration, measured from now, out of the poll history
+            submitted_at = self.clock()
+            record = False
+            delay = 0.0
+        else:
+            record = True
+            delay = scheduler.first_delay(key, self.clock() - submitted_at, max_wait)
+        while polls < scheduler.max_polls:
+            await asyncio.sleep(delay)
+            elapsed = self.clock() - submitted_at
+            status = await self.get_task_status(task_id)
+            polls += 1
+            logger.debug(
+                "Task %s: status=%s (%.0fs elapsed, poll %d)", task_id, status.status, elapsed, polls,
+            )
+            if status.is_done:
+                if status.is_success and key and record:
+                    # Completion happened somewhere between the last two polls.
+                    scheduler.record(key, (last_poll + elapsed) / 2 if polls > 1 else elapsed)
+                return status
+            if elapsed >= max_wait:
+                break
+            last_poll = elapsed
+            delay = scheduler.next_delay(key, elapsed, max_wait)
+
+        raise TaskTimeoutError(
+            f"Task {task_id} did not complete within {max_wait}s / {polls} polls. "
+            f"Last status: {status.status if status else 'unknown'}"
+        )
+
     # ------------------------------------------------------------------
     # Public API — generation tasks
     # ------------------------------------------------------------------
@@ -315,11 +720,8 @@ class KieClient:
             body["input"]["image_urls"] = image_urls
 
         logger.info("Creating video task: prompt=%r, elements=%d", prompt[:80], len(kling_elements))
-        response = await self._request("POST", "/api/v1/jobs/createTask", json=body)
-        data = response.json()
-        self._check_response_code(data)
-
-        task_id = self._parse_task_id(data)
+        task_id = await self._create_task(body)
+        self.track_task(task_id, schedule_key("kling-3.0/video", mode, duration, 1), self.clock())
         logger.info("Video task created: %s", task_id)
         return task_id
 
@@ -346,56 +748,27 @@ class KieClient:
         Raises:
             ValueError: If shots exceed limits (>6 shots or >15s total).
         """
-        if len(shots) > 6:
-            raise ValueError(f"Multi-shot supports max 6 shots, got {len(shots)}")
-        total_duration = sum(s["duration"] for s in shots)
-        if total_duration > 15:
-            raise ValueError(f"Multi-shot supports max 15s total, got {total_duration}s")
-
-        kling_elements = []
-        image_urls = []
-        if elements:
-            for el in elements:
-                if el.image_urls:
-                    kling_elements.append({
-                        "name": el.name,
-                        "description": el.description or el.name,
-                        "element_input_urls": el.image_urls,
-                    })
-                    if not image_urls:
-                        image_urls.append(el.image_urls[0])
-
-        multi_prompt = [
-            {"prompt": s["prompt"], "duration": s["duration"]}
-            for s in shots
-        ]
-
-        body: dict[str, Any] = {
-            "model": "kling-3.0/video",
-            "input": {
-                "sound": sound,
-                "duration": str(total_duration),
-                "aspect_ratio": aspect_ratio,
-                "mode": mode,
-                "multi_shots": True,
-                "multi_prompt": multi_prompt,
-            },
-        }
+        body = build_multi_shot_payload(shots, elements, mode=mode, aspect_ratio=aspect_ratio, sound=sound)
+        return await self.submit_task(body)
 
-        if kling_elements:
-            body["input"]["kling_elements"] = kling_elements
-            body["input"]["image_urls"] = image_urls
+    async def submit_task(self, body: dict[str, Any]) -> str:
+        """Submit a prepared ``createTask`` payload and return the task_id.
 
+        Use with payloads from :func:`build_multi_shot_payload` (for
+        example, read back from a compiled plan).
+        """
+        inp = body.get("input", {})
+        shot_count = len(inp.get("multi_prompt") or []) or 1
+        total_duration = int(inp.get("duration", 0))
         logger.info(
-            "Creating multi-shot task: %d shots, %ds total, elements=%d",
-            len(shots), total_duration, len(kling_elements),
+            "Creating %s task: %d shots, %ds total, elements=%d",
+            body.get("model"), shot_count, total_duration, len(inp.get("kling_elements") or []),
         )
-        response = await self._request("POST", "/api/v1/jobs/createTask", json=body)
-        data = response.json()
-        self._check_response_code(data)
-
-        task_id = self._parse_task_id(data)
-        logger.info("Multi-shot task created: %s", task_id)
+        task_id = await self._create_task(body)
+        self.track_task(
+            task_id, schedule_key(body.get("model", ""), inp.get("mode", ""), total_duration, shot_count), self.clock(),
+        )
+        logger.info("Task created: %s", task_id)
         return task_id
 
     async def create_image_task(
@@ -414,22 +787,11 @@ class KieClient:
         Returns:
             The task_id string for polling.
         """
-        body: dict[str, Any] = {
-            "model": "kling-3.0/image",
-            "task_type": "image_generation",
-            "input": {
-                "prompt": prompt,
-                "negative_prompt": negative_prompt,
-                "aspect_ratio": aspect_ratio,
-            },
-        }
+        body = build_image_payload(prompt, negative_prompt, aspect_ratio)
 
         logger.info("Creating image task: prompt=%r", prompt[:80])
-        response = await self._request("POST", "/api/v1/jobs/createTask", json=body)
-        data = response.json()
-        self._check_response_code(data)
-
-        task_id = self._parse_task_id(data)
+        task_id = await self._create_task(body)
+        self.track_task(task_id, schedule_key("kling-3.0/image"), self.clock())
         logger.info("Image task created: %s", task_id)
         return task_id
 
@@ -469,10 +831,83 @@ class KieClient:
         }
 
         logger.info("Creating image-to-video task: prompt=%r", prompt[:80] if prompt else "(empty)")
-        response = await self._request("POST", "/api/v1/jobs/createTask", json=body)
-        data = response.json()
-        self._check_response_code(data)
-
-        task_id = self._parse_task_id(data)
+        task_id = await self._create_task(body)
+        self.track_task(task_id, schedule_key("kling-3.0/video", mode, duration, 1), self.clock())
         logger.info("Image-to-video task created: %s", task_id)
         return task_id
+
+    # ------------------------------------------------------------------
+    # Batches
+    # ------------------------------------------------------------------
+
+    def submit_many(
+        self,
+        requests: Iterable[T],
+        body: Callable[[T], dict[str, Any]] | None = None,
+        on_result: ResultCallback | None = None,
+        concurrency: int | None = None,
+    ) -> AsyncIterator[BatchResult]:
+        """Submit many ``createTask`` payloads, yielding results as each call finishes.
+
+        Args:
+            requests: Payloads, or arbitrary items if ``body`` is given.
+            body: Builds the payload for an item (defaults to the item itself).
+            on_result: Called with each :class:`BatchResult` (``value`` is the
+                task_id) before it is yielded, e.g. to persist status.
+            concurrency: Submissions in flight at once (defaults to
+                ``batch_concurrency``). The key pool's limits apply on top.
+
+        Failures, including :class:`DryRunInterrupt`, are returned as the
+        result's ``error`` rather than raised.
+        """
+        build = body or (lambda item: item)
+        return fan_out(
+            requests, lambda item: self.submit_task(build(item)),
+            self.batch_concurrency if concurrency is None else concurrency, on_result,
+        )
+
+    def upload_many(
+        self,
+        items: Iterable[T],
+        path: Callable[[T], str | Path] | None = None,
+        on_result: ResultCallback | None = None,
+        concurrency: int | None = None,
+    ) -> AsyncIterator[BatchResult]:
+        """Upload many files, yielding results (``value`` is the file URL) as each finishes.
+
+        ``path`` picks the file to upload for an item (defaults to the item
+        itself); otherwise as :meth:`submit_many`.
+        """
+        locate = path or (lambda item: item)
+        return fan_out(
+            items, lambda item: self.upload_file(locate(item)),
+            self.batch_concurrency if concurrency is None else concurrency, on_result,
+        )
+
+    def download_many(
+        self,
+        items: Iterable[T],
+        url: Callable[[T], str],
+        destination: Callable[[T], str | Path] | None = None,
+        open_write: Callable[[T], AbstractAsyncContextManager] | None = None,
+        on_result: ResultCallback | None = None,
+        concurrency: int | None = None,
+    ) -> AsyncIterator[BatchResult]:
+        """Download many files, yielding results as each finishes.
+
+        Each item is fetched from ``url(item)`` either to the local path
+        ``destination(item)`` (``value`` is the Path, see :meth:`download_file`)
+        or into the writer opened by ``open_write(item)``, such as a storage
+        backend's ``open_write`` (``value`` is the byte count). Otherwise as
+        :meth:`submit_many`.
+        """
+        if (destination is None) == (open_write is None):
+            raise ValueError("download_many needs exactly one of destination or open_write")
+
+        async def fetch(item: T) -> Any:
+            if destination is not None:
+                return await self.download_file(url(item), destination(item))
+            async with open_write(item) as out:
+                return await self.download_to(url(item), out.write)
+
+        return fan_out(items, fetch, self.batch_concurrency if concurrency is None else concurrency, on_result)
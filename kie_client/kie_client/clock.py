@@ -0,0 +1,25 @@
+"""Clocks that follow the running event loop.
+
+Under a virtual-time loop (the kling simulator, cassette replay) they
+report simulated time, so poll timing and key rate limits keep working
+unchanged; under a normal loop they are plain ``time.monotonic`` and
+``time.time``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+def monotonic() -> float:
+    """The running loop's clock (``time.monotonic`` outside a loop)."""
+    try:
+        return asyncio.get_running_loop().time()
+    except RuntimeError:
+        return time.monotonic()
+
+
+def wall() -> float:
+    """Wall-clock time as seen by the running loop."""
+    return time.time() + monotonic() - time.monotonic()
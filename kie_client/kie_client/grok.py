@@ -0,0 +1,289 @@
+"""Async client for the xAI Grok Imagine video API.
+
+Exposes the same task interface as :class:`~kie_client.client.KieClient`
+(see :class:`~kie_client.providers.Provider`), so the pipeline can send work
+to either backend. Requests are KIE ``createTask`` payloads translated by
+:func:`build_grok_payload`. Grok renders one continuous clip from a single
+prompt, so a multi-shot request becomes a timed shot list in the prompt.
+Grok has no reference elements, so requests that use them must go to KIE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import logging
+import mimetypes
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+from rich.console import Console
+
+from kie_client import clock as loop_clock
+from kie_client.client import DryRunInterrupt, KieApiError, TaskTimeoutError, _LentTransport
+from kie_client.models import TaskStatus
+
+logger = logging.getLogger(__name__)
+_console = Console()
+
+GROK_BASE_URL = "https://api.x.ai/v1"
+GROK_MODEL = "grok-imagine-video"
+GROK_MAX_DURATION = 15
+
+_DOWNLOAD_TIMEOUT = 300.0
+_MAX_SERVER_ERRORS = 5  # consecutive 5xx replies tolerated while polling
+
+
+class GrokApiError(KieApiError):
+    """Raised when the xAI API returns an error.
+
+    A KieApiError subclass, so callers handle failures of both providers alike.
+    """
+
+
+def build_grok_payload(
+    body: dict[str, Any],
+    model: str = GROK_MODEL,
+    resolution: str = "720p",
+    max_duration: int = GROK_MAX_DURATION,
+) -> dict[str, Any]:
+    """Translate a KIE ``createTask`` payload into a Grok generation request.
+
+    Raises:
+        ValueError: If the request uses reference elements or is too long for Grok.
+    """
+    inp = body.get("input", {})
+    if inp.get("kling_elements"):
+        raise ValueError("Grok has no reference elements; requests with kling_elements must go to KIE")
+
+    shots = inp.get("multi_prompt") or []
+    if len(shots) > 1:
+        lines, start = [], 0
+        for i, shot in enumerate(shots, 1):
+            lines.append(f"Shot {i} ({start}-{start + shot['duration']}s): {shot['prompt']}")
+            start += shot["duration"]
+        prompt = "\n".join(lines)
+    elif shots:
+        prompt = shots[0]["prompt"]
+    else:
+        prompt = inp.get("prompt", "")
+
+    duration = int(inp.get("duration") or sum(s["duration"] for s in shots) or 5)
+    if duration > max_duration:
+        raise ValueError(f"Grok renders at most {max_duration}s per request, got {duration}s")
+
+    payload: dict[str, Any] = {"model": model, "prompt": prompt, "duration": duration, "resolution": resolution}
+    if inp.get("aspect_ratio"):
+        payload["aspect_ratio"] = inp["aspect_ratio"]
+    image_urls = inp.get("image_urls") or []
+    if image_urls:
+        payload["image_url"] = image_urls[0]  # used as the first frame
+    return payload
+
+
+def _parse_status(task_id: str, data: dict) -> TaskStatus:
+    """Map a ``GET /videos/{id}`` reply onto TaskStatus.
+
+    The API reports a finished video by including ``video.url``; there is
+    not always a separate status field.
+    """
+    video = data.get("video")
+    url = video.get("url") if isinstance(video, dict) else None
+    raw_state = str(data.get("status") or "").lower()
+    err = data.get("error")
+    error = err.get("message") if isinstance(err, dict) else (err or None)
+
+    if url:
+        return TaskStatus(task_id=task_id, status="completed", output_url=url)
+    if error or raw_state in ("failed", "error", "expired"):
+        return TaskStatus(task_id=task_id, status="failed", error=str(error or raw_state))
+    return TaskStatus(task_id=task_id, status="pending" if raw_state in ("pending", "queued") else "processing")
+
+
+class GrokClient:
+    """Async client for xAI video generation.
+
+    Usage::
+
+        async with GrokClient(api_key="...") as client:
+            task_id = await client.submit_task(build_multi_shot_payload(shots))
+            result = await client.wait_for_task(task_id)
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = GROK_BASE_URL,
+        model: str = GROK_MODEL,
+        resolution: str = "720p",
+        max_duration: int = GROK_MAX_DURATION,
+        timeout: float = 60.0,
+        dry_run: bool = False,
+        transport: httpx.AsyncBaseTransport | None = None,
+        clock: Callable[[], float] = loop_clock.wall,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.resolution = resolution
+        self.max_duration = max_duration
+        self.dry_run = dry_run
+        self.clock = clock
+        # Caller-owned transport (cassette recorder/replayer), as for KieClient
+        self._transport = transport
+        self._submitted_at: dict[str, float | None] = {}
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            transport=self._lend_transport(),
+        )
+
+    async def __aenter__(self) -> GrokClient:
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    def _lend_transport(self) -> httpx.AsyncBaseTransport | None:
+        return _LentTransport(self._transport) if self._transport is not None else None
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        if "json" in kwargs:
+            _console.print(f"[cyan bold]── {method} {self.base_url}{url}[/cyan bold]")
+            _console.print_json(json.dumps(kwargs["json"], ensure_ascii=False))
+            _console.print()
+        if self.dry_run:
+            raise DryRunInterrupt()
+        try:
+            response = await self._client.request(method, url, **kwargs)
+            response.raise_for_status()
+            return response
+        except httpx.HTTPStatusError as exc:
+            raise GrokApiError(
+                f"HTTP {exc.response.status_code}: {exc.response.text}",
+                status_code=exc.response.status_code,
+                body=exc.response.text,
+            ) from exc
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as exc:
+            raise GrokApiError(f"Could not connect: {exc}", sent=False) from exc
+        except httpx.TimeoutException as exc:
+            raise GrokApiError(f"Request timeout: {exc}") from exc
+        except httpx.HTTPError as exc:
+            raise GrokApiError(f"Request failed: {exc}") from exc
+
+    # ------------------------------------------------------------------
+    # Tasks
+    # ------------------------------------------------------------------
+
+    async def submit_task(self, body: dict[str, Any]) -> str:
+        """Submit a KIE-style ``createTask`` payload and return the request id.
+
+        Raises:
+            ValueError: If the payload cannot be rendered by Grok.
+            GrokApiError: If the API rejects the request.
+        """
+        payload = build_grok_payload(body, self.model, self.resolution, self.max_duration)
+        logger.info("Creating %s task: %ds, %s", self.model, payload["duration"], self.resolution)
+        response = await self._request("POST", "/videos/generations", json=payload)
+        data = response.json()
+        task_id = data.get("request_id") or data.get("id")
+        if not task_id:
+            raise GrokApiError(f"No request_id in response: {data}", body=data)
+        self.track_task(task_id, submitted_at=self.clock())
+        logger.info("Task created: %s", task_id)
+        return task_id
+
+    def track_task(
+        self, task_id: str, key: str | None = None, submitted_at: float | None = None, owner: str | None = None,
+    ) -> None:
+        """Remember when a task was submitted, if known (``key`` and ``owner`` are KIE-only)."""
+        self._submitted_at[task_id] = submitted_at
+
+    def task_owner(self, task_id: str) -> str | None:
+        """Grok uses a single API key, so tasks have no pool owner."""
+        return None
+
+    async def get_task_status(self, task_id: str) -> TaskStatus:
+        """Get the current status of a task."""
+        response = await self._request("GET", f"/videos/{task_id}")
+        return _parse_status(task_id, response.json())
+
+    async def wait_for_task(
+        self,
+        task_id: str,
+        poll_interval: float = 10.0,
+        max_wait: float = 300.0,
+    ) -> TaskStatus:
+        """Poll a task every ``poll_interval`` seconds until it finishes.
+
+        Up to five consecutive server errors are retried, since the video
+        endpoint returns occasional 5xx replies while a render is running.
+        """
+        elapsed = 0.0
+        status = None
+        server_errors = 0
+        while elapsed < max_wait:
+            try:
+                status = await self.get_task_status(task_id)
+                server_errors = 0
+            except GrokApiError as exc:
+                if not exc.status_code or exc.status_code < 500 or server_errors >= _MAX_SERVER_ERRORS:
+                    raise
+                server_errors += 1
+                logger.warning("Task %s: HTTP %d while polling, retry %d", task_id, exc.status_code, server_errors)
+            else:
+                logger.debug("Task %s: status=%s (%.0fs elapsed)", task_id, status.status, elapsed)
+                if status.is_done:
+                    return status
+            await asyncio.sleep(poll_interval)
+            elapsed += poll_interval
+
+        raise TaskTimeoutError(
+            f"Task {task_id} did not complete within {max_wait}s. "
+            f"Last status: {status.status if status else 'unknown'}"
+        )
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    async def upload_file(self, file_path: str | Path) -> str:
+        """Return a local image as a ``data:`` URL.
+
+        xAI has no file upload endpoint; images are passed inline.
+        """
+        path = Path(file_path)
+        if not path.exists():
+            raise GrokApiError(f"File not found: {path}")
+        content = await asyncio.to_thread(path.read_bytes)
+        mime = mimetypes.guess_type(path.name)[0] or "image/png"
+        return f"data:{mime};base64,{base64.b64encode(content).decode()}"
+
+    async def download_to(self, url: str, write: Callable[[bytes], Awaitable[Any]]) -> int:
+        """Stream a rendered video into ``write``; return the byte count.
+
+        Raises:
+            GrokApiError: If the transfer fails or is shorter than Content-Length.
+        """
+        logger.info("Downloading %s", url)
+        written = 0
+        try:
+            async with httpx.AsyncClient(timeout=_DOWNLOAD_TIMEOUT, transport=self._lend_transport()) as dl_client:
+                async with dl_client.stream("GET", url) as response:
+                    response.raise_for_status()
+                    expected = response.headers.get("content-length")
+                    encoded = response.headers.get("content-encoding", "identity") != "identity"
+                    async for chunk in response.aiter_bytes(1024 * 1024):
+                        await write(chunk)
+                        written += len(chunk)
+        except (httpx.HTTPError, OSError) as exc:
+            raise GrokApiError(f"Download failed for {url}: {exc}") from exc
+        if expected is not None and not encoded and written != int(expected):
+            raise GrokApiError(f"Download truncated for {url}: got {written} of {expected} bytes")
+        logger.info("Downloaded %s (%.1f KB)", url, written / 1024)
+        return written
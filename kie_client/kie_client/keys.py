@@ -0,0 +1,159 @@
+"""Pool of KIE.ai API keys with load balancing.
+
+Each key has its own concurrency and rate limits. Task creation goes to the
+least-loaded eligible key (in-flight tasks divided by weight); keys that
+were throttled with HTTP 429 cool down before they are used again. The
+client remembers which key created each task so later status polls use
+the same credentials.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+from kie_client import clock as loop_clock
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ApiKey:
+    """One API key and its limits.
+
+    Attributes:
+        key: The secret API key.
+        name: Label used in status files and reports (never the key itself).
+        weight: Relative share of new tasks.
+        max_concurrent: Tasks in flight at once (0 = unlimited).
+        requests_per_minute: Task creations per minute (0 = unlimited).
+    """
+    key: str
+    name: str = ""
+    weight: float = 1.0
+    max_concurrent: int = 0
+    requests_per_minute: int = 0
+
+    # Runtime usage counters
+    in_flight: int = 0
+    submitted: int = 0
+    throttled: int = 0
+    cooldown_until: float = 0.0
+    _recent: deque = field(default_factory=deque, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.name:
+            self.name = "key-" + hashlib.sha256(self.key.encode()).hexdigest()[:8]
+
+    def _trim(self, now: float) -> None:
+        while self._recent and now - self._recent[0] >= 60:
+            self._recent.popleft()
+
+    def available_at(self, now: float) -> float:
+        """Earliest time this key can take a new task (``now`` if it can right away).
+
+        Returns ``inf`` while the key is at its concurrency limit, since that
+        only clears when a task finishes.
+        """
+        if self.max_concurrent and self.in_flight >= self.max_concurrent:
+            return float("inf")
+        at = max(now, self.cooldown_until)
+        if self.requests_per_minute:
+            self._trim(now)
+            if len(self._recent) >= self.requests_per_minute:
+                at = max(at, self._recent[0] + 60)
+        return at
+
+
+class KeyPool:
+    """Spreads task creation across several API keys.
+
+    Usage::
+
+        pool = KeyPool([ApiKey("k1", max_concurrent=5), ApiKey("k2", weight=2)])
+        async with KieClient(api_key="k1", key_pool=pool) as client:
+            ...
+        for row in pool.usage():
+            print(row)
+    """
+
+    def __init__(
+        self, keys: list[ApiKey], throttle_cooldown: float = 30.0, clock: Callable[[], float] = loop_clock.monotonic,
+    ) -> None:
+        if not keys:
+            raise ValueError("KeyPool needs at least one API key")
+        self.keys = keys
+        self.throttle_cooldown = throttle_cooldown
+        self.clock = clock
+        self._by_name = {k.name: k for k in keys}
+        self._changed = asyncio.Event()
+
+    def get(self, name: str | None) -> ApiKey | None:
+        return self._by_name.get(name) if name else None
+
+    @property
+    def capacity(self) -> int:
+        """Tasks the pool can hold in flight together (0 if any key is unlimited)."""
+        if any(not k.max_concurrent for k in self.keys):
+            return 0
+        return sum(k.max_concurrent for k in self.keys)
+
+    def pick(self) -> ApiKey:
+        """Least-loaded key for a request that does not create a task (e.g. uploads)."""
+        return min(self.keys, key=lambda k: (k.in_flight / k.weight, k.cooldown_until))
+
+    async def acquire(self) -> ApiKey:
+        """Wait for a key that may create a task now and reserve one slot on it."""
+        while True:
+            now = self.clock()
+            ready = [k for k in self.keys if k.available_at(now) <= now]
+            if ready:
+                key = min(ready, key=lambda k: ((k.in_flight + 1) / k.weight, k.submitted / k.weight))
+                key.in_flight += 1
+                key.submitted += 1
+                key._recent.append(now)
+                return key
+
+            soonest = min(k.available_at(now) for k in self.keys)
+            logger.info("All API keys are at their limits; waiting for a free slot")
+            self._changed.clear()
+            timeout = None if soonest == float("inf") else soonest - now
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, key: ApiKey, failed: bool = False) -> None:
+        """Free a task slot on ``key`` (task finished, or creation ``failed``)."""
+        key.in_flight = max(0, key.in_flight - 1)
+        if failed:
+            key.submitted -= 1
+        self._changed.set()
+
+    def adopt(self, key: ApiKey) -> None:
+        """Count a task created by an earlier run as in flight on ``key``."""
+        key.in_flight += 1
+
+    def throttle(self, key: ApiKey, retry_after: float | None = None) -> None:
+        """Take ``key`` out of rotation after an HTTP 429."""
+        key.throttled += 1
+        key.cooldown_until = self.clock() + (retry_after or self.throttle_cooldown)
+        logger.warning("API key %s throttled; cooling down for %.0fs", key.name, retry_after or self.throttle_cooldown)
+
+    def usage(self) -> list[dict]:
+        """Per-key usage for reporting."""
+        now = self.clock()
+        return [
+            {
+                "name": k.name,
+                "submitted": k.submitted,
+                "in_flight": k.in_flight,
+                "throttled": k.throttled,
+                "cooling_down": max(0.0, k.cooldown_until - now),
+            }
+            for k in self.keys
+        ]
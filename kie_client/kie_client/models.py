@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from typing import Any, NamedTuple
 
 
 @dataclass
@@ -22,6 +23,21 @@ class TaskStatus:
         return self.status == "completed" and self.output_url is not None
 
 
+class BatchResult(NamedTuple):
+    """Outcome of one item of a batch call: ``(item, value, error)``.
+
+    ``value`` is the task ID, file URL or download result; ``error`` is the
+    exception the call raised, if any.
+    """
+    item: Any
+    value: Any = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 @dataclass
 class Element:
     """A visual element with reference images for Kling generation."""
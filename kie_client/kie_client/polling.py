@@ -0,0 +1,139 @@
+"""Adaptive poll scheduling for KIE.ai tasks.
+
+Learns how long tasks take to complete, keyed by model, mode, total
+duration and shot count, and spaces status polls accordingly: sparse while
+a task is unlikely to be done, dense around its predicted completion
+window, and backing off again if it overruns.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest observation in the running mean/variance.
+_EWMA_ALPHA = 0.3
+
+
+def schedule_key(model: str, mode: str = "", duration: int = 0, shot_count: int = 1) -> str:
+    """Build the history key for a task shape."""
+    return f"{model}|{mode or '-'}|{duration}s|{shot_count}shot"
+
+
+class PollScheduler:
+    """Decides how long to sleep between status polls of a task.
+
+    Completion times are tracked per schedule key as an exponentially
+    weighted mean and variance, persisted to ``history_path`` so estimates
+    survive between runs. Keys without history fall back to a fixed
+    ``default_interval``.
+
+    Args:
+        history_path: JSON file for completion-time history (in-memory if None).
+        default_interval: Poll interval used when nothing is known yet.
+        min_interval: Shortest sleep, used inside the completion window.
+        max_interval: Longest sleep, used well before/after the window.
+        max_polls: Hard ceiling on status requests per task.
+    """
+
+    def __init__(
+        self,
+        history_path: str | Path | None = None,
+        default_interval: float = 10.0,
+        min_interval: float = 2.0,
+        max_interval: float = 30.0,
+        max_polls: int = 40,
+    ) -> None:
+        self.history_path = Path(history_path) if history_path else None
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.max_polls = max_polls
+        self._history: dict[str, dict] = self._load_history()
+
+    # ------------------------------------------------------------------
+    # History
+    # ------------------------------------------------------------------
+
+    def _load_history(self) -> dict[str, dict]:
+        if self.history_path and self.history_path.exists():
+            try:
+                with open(self.history_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as exc:
+                logger.warning("Ignoring unreadable poll history %s: %s", self.history_path, exc)
+        return {}
+
+    def _save_history(self) -> None:
+        if not self.history_path:
+            return
+        self.history_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.history_path, "w", encoding="utf-8") as f:
+            json.dump(self._history, f, indent=2, sort_keys=True)
+
+    def record(self, key: str, seconds: float) -> None:
+        """Record an observed completion time for ``key``."""
+        entry = self._history.get(key)
+        if entry is None:
+            entry = {"count": 1, "mean": seconds, "var": (seconds * 0.25) ** 2}
+        else:
+            delta = seconds - entry["mean"]
+            mean = entry["mean"] + _EWMA_ALPHA * delta
+            var = (1 - _EWMA_ALPHA) * (entry["var"] + _EWMA_ALPHA * delta * delta)
+            entry = {"count": entry["count"] + 1, "mean": mean, "var": var}
+        self._history[key] = entry
+        self._save_history()
+        logger.debug("Poll history %s: %.1fs (mean=%.1fs, n=%d)", key, seconds, entry["mean"], entry["count"])
+
+    def estimate(self, key: str) -> tuple[float, float] | None:
+        """Return (mean, stddev) completion time for ``key``, or None if unknown."""
+        entry = self._history.get(key)
+        if not entry:
+            return None
+        return entry["mean"], math.sqrt(max(entry["var"], 0.0))
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def first_delay(self, key: str | None, elapsed: float, max_wait: float) -> float:
+        """Return seconds to sleep before the first poll.
+
+        Unknown task shapes are polled immediately, as with a fixed interval.
+        """
+        if not key or self.estimate(key) is None:
+            return 0.0
+        return self.next_delay(key, elapsed, max_wait)
+
+    def next_delay(self, key: str | None, elapsed: float, max_wait: float) -> float:
+        """Return seconds to sleep before the next poll.
+
+        Args:
+            key: Schedule key of the task (None for unknown shapes).
+            elapsed: Seconds since the task was submitted.
+            max_wait: Overall deadline, in seconds since submission.
+        """
+        est = self.estimate(key) if key else None
+        if est is None:
+            delay = self.default_interval
+        else:
+            mean, std = est
+            std = max(std, self.min_interval)
+            window_lo = mean - 1.5 * std
+            window_hi = mean + 2.0 * std
+            if elapsed < window_lo:
+                # Unlikely to be done yet: jump towards the window, sparsely.
+                delay = window_lo - elapsed
+            elif elapsed <= window_hi:
+                delay = self.min_interval
+            else:
+                # Overrunning the estimate: back off gradually.
+                delay = (elapsed - window_hi) / 2
+            delay = min(self.max_interval, max(self.min_interval, delay))
+
+        remaining = max_wait - elapsed
+        return max(0.0, min(delay, remaining))
@@ -0,0 +1,155 @@
+"""Generation providers and latency-based routing between them.
+
+:class:`Provider` is the task interface the pipeline uses; ``KieClient``
+and ``GrokClient`` both implement it. :class:`ProviderRouter` picks the
+provider expected to finish a request soonest, from each provider's
+observed render latency (submission to completion, so queueing is
+included), its free capacity and any throttling cooldown.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Protocol, runtime_checkable
+
+from kie_client import clock as loop_clock
+from kie_client.models import TaskStatus
+
+
+@runtime_checkable
+class Provider(Protocol):
+    """What the pipeline needs from a generation backend.
+
+    Requests are KIE ``createTask`` payloads (see
+    :func:`~kie_client.client.build_multi_shot_payload`); other providers
+    translate them. Errors are raised as :class:`~kie_client.client.KieApiError`
+    or a subclass.
+    """
+
+    clock: Callable[[], float]
+
+    async def submit_task(self, body: dict[str, Any]) -> str: ...
+
+    async def get_task_status(self, task_id: str) -> TaskStatus: ...
+
+    async def wait_for_task(self, task_id: str, poll_interval: float = 10.0, max_wait: float = 300.0) -> TaskStatus: ...
+
+    async def download_to(self, url: str, write: Callable[[bytes], Awaitable[Any]]) -> int: ...
+
+    async def upload_file(self, file_path: str | Path) -> str: ...
+
+    def track_task(
+        self, task_id: str, key: str, submitted_at: float | None = None, owner: str | None = None,
+    ) -> None: ...
+
+    def task_owner(self, task_id: str) -> str | None: ...
+
+    async def close(self) -> None: ...
+
+
+@dataclass
+class ProviderCapacity:
+    """Routing state of one provider.
+
+    Attributes:
+        name: Provider name (``kie``, ``grok``).
+        max_concurrent: Tasks it may hold in flight (0 = unlimited).
+        max_duration: Longest request it accepts, in seconds.
+        supports_elements: Whether it accepts requests with reference elements.
+        seconds_per_video_second: Smoothed render latency per second of video.
+        in_flight: Tasks submitted and not yet finished.
+        cooldown_until: Clock time until which it is throttled.
+    """
+    name: str
+    max_concurrent: int = 0
+    max_duration: int = 15
+    supports_elements: bool = True
+    seconds_per_video_second: float = 20.0
+    in_flight: int = 0
+    cooldown_until: float = 0.0
+    submitted: int = 0
+    completed: int = 0
+
+    def accepts(self, duration: int, has_elements: bool) -> bool:
+        return duration <= self.max_duration and (self.supports_elements or not has_elements)
+
+
+class ProviderRouter:
+    """Sends each request to the provider expected to finish it soonest.
+
+    Args:
+        providers: Routing state per provider; list order breaks ties.
+        clock: Time source (must follow the providers' clocks).
+        smoothing: Weight of each new latency observation.
+        cooldown_seconds: How long a provider is avoided after throttling.
+    """
+
+    def __init__(
+        self,
+        providers: list[ProviderCapacity],
+        clock: Callable[[], float] = loop_clock.wall,
+        smoothing: float = 0.3,
+        cooldown_seconds: float = 60.0,
+    ) -> None:
+        self.providers = {p.name: p for p in providers}
+        self.clock = clock
+        self.smoothing = smoothing
+        self.cooldown_seconds = cooldown_seconds
+
+    def estimate(self, name: str, duration: int) -> float:
+        """Expected seconds until a ``duration``-second request submitted now finishes."""
+        p = self.providers[name]
+        render = p.seconds_per_video_second * duration
+        wait = max(0.0, p.cooldown_until - self.clock())
+        if p.max_concurrent and p.in_flight >= p.max_concurrent:
+            # A slot frees up about every render / max_concurrent seconds
+            wait += (p.in_flight - p.max_concurrent + 1) * render / p.max_concurrent
+        return wait + render
+
+    def choose(self, duration: int, has_elements: bool = False, allowed: list[str] | None = None) -> str:
+        """Name of the provider to send a request to.
+
+        Raises:
+            ValueError: If no allowed provider accepts the request.
+        """
+        names = [n for n in (allowed if allowed is not None else self.providers) if n in self.providers]
+        if not names:
+            raise ValueError(f"None of the allowed providers ({', '.join(allowed or [])}) is available")
+        candidates = [n for n in names if self.providers[n].accepts(duration, has_elements)]
+        if not candidates:
+            what = f"a {duration}s request" + (" with elements" if has_elements else "")
+            raise ValueError(f"No provider among {', '.join(names)} accepts {what}")
+        return min(candidates, key=lambda n: (self.estimate(n, duration), candidates.index(n)))
+
+    def submitted(self, name: str) -> None:
+        """Count a task submitted to (or resumed on) ``name``."""
+        p = self.providers[name]
+        p.in_flight += 1
+        p.submitted += 1
+
+    def finished(self, name: str, elapsed: float | None = None, duration: int = 0) -> None:
+        """Count a task as finished; a successful render's ``elapsed`` time updates the latency estimate."""
+        p = self.providers[name]
+        p.in_flight = max(0, p.in_flight - 1)
+        if elapsed is not None and duration > 0:
+            p.completed += 1
+            observed = elapsed / duration
+            p.seconds_per_video_second += self.smoothing * (observed - p.seconds_per_video_second)
+
+    def throttled(self, name: str) -> None:
+        """Avoid ``name`` for ``cooldown_seconds`` after it rejected a request with HTTP 429."""
+        self.providers[name].cooldown_until = self.clock() + self.cooldown_seconds
+
+    def usage(self) -> list[dict]:
+        """Per-provider counts and latency estimates, for reporting."""
+        return [
+            {
+                "name": p.name,
+                "submitted": p.submitted,
+                "completed": p.completed,
+                "in_flight": p.in_flight,
+                "seconds_per_video_second": round(p.seconds_per_video_second, 1),
+            }
+            for p in self.providers.values()
+        ]
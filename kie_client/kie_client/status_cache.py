@@ -0,0 +1,65 @@
+"""On-disk cache of terminal task statuses.
+
+A completed or failed task never changes, so its status is stored once
+and served from disk afterwards instead of asking the API again. Each task
+is one small JSON file written atomically, so several processes can share
+a cache directory.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from dataclasses import asdict
+from pathlib import Path
+
+from kie_client.models import TaskStatus
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+class TaskStatusCache:
+    """Terminal task statuses, one JSON file per task in ``directory``."""
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self._memory: dict[str, TaskStatus] = {}
+
+    def _path(self, task_id: str) -> Path:
+        return self.directory / f"{_UNSAFE.sub('_', task_id)}.json"
+
+    def get(self, task_id: str) -> TaskStatus | None:
+        """Cached status of ``task_id``, or None if it has not finished (or is unknown)."""
+        status = self._memory.get(task_id)
+        if status is not None:
+            return status
+        try:
+            data = json.loads(self._path(task_id).read_text(encoding="utf-8"))
+            status = TaskStatus(**data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as exc:
+            logger.warning("Ignoring unreadable cached status for %s: %s", task_id, exc)
+            return None
+        if status.task_id != task_id or not status.is_done:
+            return None
+        self._memory[task_id] = status
+        return status
+
+    def put(self, status: TaskStatus) -> None:
+        """Store a status if it is terminal; other statuses are ignored."""
+        if not status.is_done or not status.task_id:
+            return
+        self._memory[status.task_id] = status
+        path = self._path(status.task_id)
+        partial = path.with_name(f"{path.name}.{os.getpid()}.part")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            partial.write_text(json.dumps(asdict(status)), encoding="utf-8")
+            os.replace(partial, path)
+        except OSError as exc:
+            logger.warning("Could not cache status of %s: %s", status.task_id, exc)
@@ -0,0 +1,88 @@
+import asyncio
+import contextlib
+import json
+
+import httpx
+import pytest
+
+from kie_client import KieApiError, KieClient
+from kie_client.batch import fan_out
+
+
+class _CreateKie(httpx.AsyncBaseTransport):
+    """Creates tasks after a short delay, rejecting prompts that say "bad"."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.peak = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        prompt = json.loads(request.content)["input"]["prompt"]
+        if prompt == "bad":
+            return httpx.Response(200, json={"code": 422, "msg": "Invalid prompt", "data": None})
+        return httpx.Response(200, json={"code": 200, "data": {"taskId": f"task-{prompt}"}})
+
+
+def test_submit_many_reports_each_item_and_caps_concurrency():
+    prompts = ["a", "b", "bad", "c", "d", "e"]
+    recorded = []
+
+    async def run():
+        kie = _CreateKie()
+        async with KieClient(api_key="test", transport=kie, batch_concurrency=2) as client:
+            results = [r async for r in client.submit_many(
+                prompts, body=lambda p: {"model": "kling-3.0/video", "input": {"prompt": p}},
+                on_result=recorded.append,
+            )]
+        return kie, results
+
+    kie, results = asyncio.run(run())
+    assert kie.peak == 2
+    assert results == recorded  # the callback saw each result before it was yielded
+    by_item = {r.item: r for r in results}
+    assert by_item.keys() == set(prompts)
+    assert isinstance(by_item["bad"].error, KieApiError)
+    assert all(by_item[p].ok and by_item[p].value == f"task-{p}" for p in prompts if p != "bad")
+
+
+def test_results_arrive_in_completion_order():
+    async def call(delay):
+        await asyncio.sleep(delay)
+        return delay
+
+    async def run():
+        return [r.value async for r in fan_out([0.03, 0.01, 0.02], call, concurrency=0)]
+
+    assert asyncio.run(run()) == [0.01, 0.02, 0.03]
+
+
+def test_closing_early_cancels_running_calls():
+    cancelled = []
+
+    async def call(item):
+        try:
+            await asyncio.sleep(0 if item == 0 else 10)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+        return item
+
+    async def run():
+        async with contextlib.aclosing(fan_out(range(4), call, concurrency=0)) as results:
+            async for result in results:
+                return result
+
+    assert asyncio.run(run()).value == 0
+    assert sorted(cancelled) == [1, 2, 3]
+
+
+def test_download_many_needs_one_destination():
+    client = KieClient(api_key="test")
+    with pytest.raises(ValueError, match="exactly one"):
+        client.download_many([], url=str)
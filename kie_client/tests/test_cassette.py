@@ -0,0 +1,57 @@
+import asyncio
+import os
+
+import httpx
+
+from kie_client import KieClient, RecordingTransport, ReplayTransport
+from kie_client.cassette import media_dir_for
+
+
+def test_large_bodies_replay_from_sidecar(tmp_path):
+    video = os.urandom(300 * 1024)
+    live = httpx.MockTransport(lambda request: httpx.Response(200, headers={"content-type": "video/mp4"}, content=video))
+    cassette = tmp_path / "run.cassette.gz"
+
+    async def fetch(transport):
+        async with httpx.AsyncClient(transport=transport) as client:
+            return (await client.get("https://cdn.example/out.mp4")).content
+
+    async def record():
+        recorder = RecordingTransport(cassette, transport=live)
+        try:
+            return await fetch(recorder)
+        finally:
+            await recorder.aclose()
+
+    assert asyncio.run(record()) == video
+    assert len(list(media_dir_for(cassette).iterdir())) == 1
+    assert asyncio.run(fetch(ReplayTransport(cassette, speed=100))) == video
+
+
+def test_uploads_replay_by_file_content(tmp_path):
+    # Record two uploads in one order, replay them in the other: each file
+    # must get back its own URL, not the next one recorded
+    files = {name: tmp_path / f"{name}.png" for name in ("hero", "villain")}
+    for name, path in files.items():
+        path.write_bytes(name.encode() * 100)
+
+    def upload_api(request: httpx.Request) -> httpx.Response:
+        name = "hero" if b"hero" * 100 in request.read() else "villain"
+        return httpx.Response(200, json={"success": True, "data": {"fileUrl": f"https://files.example/{name}"}})
+
+    cassette = tmp_path / "run.cassette.gz"
+
+    async def upload(transport, order):
+        async with KieClient(api_key="test", transport=transport) as client:
+            return {name: await client.upload_file(files[name]) for name in order}
+
+    async def record():
+        recorder = RecordingTransport(cassette, transport=httpx.MockTransport(upload_api))
+        try:
+            return await upload(recorder, ["hero", "villain"])
+        finally:
+            await recorder.aclose()
+
+    expected = {"hero": "https://files.example/hero", "villain": "https://files.example/villain"}
+    assert asyncio.run(record()) == expected
+    assert asyncio.run(upload(ReplayTransport(cassette, speed=100), ["villain", "hero"])) == expected
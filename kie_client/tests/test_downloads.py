@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+import kie_client.client as client_module
+from kie_client import KieApiError, KieClient
+from kie_client.client import _MAX_WRITE_SIZE, _MIN_WRITE_SIZE, _WRITE_ALIGN, _adapt_write_size
+
+
+class _Body(httpx.AsyncByteStream):
+    def __init__(self, data: bytes, chunk: int = 64 * 1024) -> None:
+        self.data = data
+        self.chunk = chunk
+
+    async def __aiter__(self):
+        for i in range(0, len(self.data), self.chunk):
+            await asyncio.sleep(0)
+            yield self.data[i:i + self.chunk]
+
+
+def _cdn(data: bytes, length: int | None = None) -> httpx.MockTransport:
+    def handle(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-length": str(length or len(data))}, stream=_Body(data))
+
+    return httpx.MockTransport(handle)
+
+
+class _SlowFile:
+    """A file whose writes block like a slow disk, recording the thread they run on."""
+
+    def __init__(self, f, threads: list[str]) -> None:
+        self.f = f
+        self.threads = threads
+
+    def write(self, block: bytes) -> int:
+        self.threads.append(threading.current_thread().name)
+        time.sleep(0.02)
+        return self.f.write(block)
+
+    def close(self) -> None:
+        self.f.close()
+
+
+def test_download_writes_stay_off_the_event_loop(tmp_path, monkeypatch):
+    data = bytes(range(256)) * (4 * 1024 * 1024 // 256)
+    threads: list[str] = []
+    monkeypatch.setattr(client_module, "open", lambda *a: _SlowFile(open(*a), threads), raising=False)
+
+    async def run():
+        gaps = []
+
+        async def heartbeat():
+            last = time.monotonic()
+            while True:
+                await asyncio.sleep(0.005)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+
+        beat = asyncio.ensure_future(heartbeat())
+        async with KieClient(api_key="test", transport=_cdn(data)) as client:
+            await client.download_file("https://cdn.example/out.mp4", tmp_path / "out.mp4")
+        beat.cancel()
+        return gaps
+
+    gaps = asyncio.run(run())
+    assert (tmp_path / "out.mp4").read_bytes() == data
+    assert threads and all(name.startswith("kie-io") for name in threads)
+    assert max(gaps) < 0.02 * len(threads)  # the loop never waited out the blocked writes
+
+
+def test_truncated_download_leaves_nothing_behind(tmp_path):
+    async def run():
+        async with KieClient(api_key="test", transport=_cdn(bytes(1000), length=5000)) as client:
+            await client.download_file("https://cdn.example/out.mp4", tmp_path / "out.mp4")
+
+    with pytest.raises(KieApiError, match="truncated"):
+        asyncio.run(run())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_write_size_follows_throughput():
+    assert _adapt_write_size(0) == _MIN_WRITE_SIZE
+    assert _adapt_write_size(1e12) == _MAX_WRITE_SIZE
+    size = _adapt_write_size(10 * 1024 * 1024)  # 10 MB/s: a quarter second of data per write
+    assert _MIN_WRITE_SIZE < size < _MAX_WRITE_SIZE
+    assert size % _WRITE_ALIGN == 0
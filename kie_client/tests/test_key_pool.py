@@ -0,0 +1,52 @@
+import asyncio
+
+import httpx
+
+from kie_client import ApiKey, KeyPool, KieClient
+
+
+def _transport(throttled_key: str) -> tuple[httpx.MockTransport, list[str]]:
+    """A KIE stand-in that answers ``throttled_key`` with a body-level 429, as the real API does."""
+    seen: list[str] = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        key = request.headers["Authorization"].removeprefix("Bearer ")
+        seen.append(key)
+        if key == throttled_key:
+            return httpx.Response(200, json={"code": 429, "msg": "Rate limit exceeded"})
+        return httpx.Response(200, json={"code": 200, "data": {"taskId": f"task-{key}"}})
+
+    return httpx.MockTransport(handle), seen
+
+
+def test_body_429_throttles_key_and_moves_to_next():
+    async def run():
+        pool = KeyPool([ApiKey("k1", name="first", weight=2), ApiKey("k2", name="second")])
+        transport, seen = _transport("k1")
+        async with KieClient(api_key="k1", key_pool=pool, transport=transport) as client:
+            task_id = await client.submit_task({"model": "kling-3.0/video", "input": {}})
+        return pool, seen, task_id
+
+    pool, seen, task_id = asyncio.run(run())
+    assert seen == ["k1", "k2"]
+    assert task_id == "task-k2"
+    first, second = pool.keys
+    assert first.throttled == 1 and first.cooldown_until > 0
+    assert first.in_flight == 0 and first.submitted == 0
+    assert second.in_flight == 1
+
+
+def test_body_error_code_is_status_code():
+    async def run():
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"code": 402, "msg": "Insufficient credits"})
+        )
+        async with KieClient(api_key="k", transport=transport) as client:
+            try:
+                await client.submit_task({"model": "kling-3.0/video", "input": {}})
+            except Exception as exc:
+                return exc
+
+    exc = asyncio.run(run())
+    assert exc.status_code == 402
+    assert exc.body["code"] == 402
@@ -0,0 +1,50 @@
+import asyncio
+import json
+import time
+
+import httpx
+
+from kie_client import KieClient, PollScheduler, schedule_key
+
+_KEY = schedule_key("kling-3.0/video", "pro", 10, 2)
+
+
+def _done(request: httpx.Request) -> httpx.Response:
+    task_id = request.url.params["taskId"]
+    result = json.dumps({"resultUrls": [f"https://cdn.example/{task_id}.mp4"]})
+    return httpx.Response(200, json={"code": 200, "data": {"taskId": task_id, "state": "success", "resultJson": result}})
+
+
+def _scheduler() -> PollScheduler:
+    scheduler = PollScheduler()
+    scheduler.record(_KEY, 300.0)  # renders of this shape take about five minutes
+    return scheduler
+
+
+def test_resumed_task_without_submit_time_is_polled_at_once():
+    scheduler = _scheduler()
+
+    async def run():
+        async with KieClient(api_key="test", transport=httpx.MockTransport(_done), poll_scheduler=scheduler) as client:
+            client.track_task("resumed", _KEY, None)
+            return await asyncio.wait_for(client.wait_for_task("resumed"), timeout=5)
+
+    assert asyncio.run(run()).is_success
+    # Its duration is unknown, so it is not added to the poll history
+    assert scheduler._history[_KEY]["count"] == 1
+
+
+def test_task_with_submit_time_waits_for_its_completion_window():
+    scheduler = _scheduler()
+
+    async def run():
+        async with KieClient(api_key="test", transport=httpx.MockTransport(_done), poll_scheduler=scheduler) as client:
+            client.track_task("recent", _KEY, time.time())
+            await asyncio.wait_for(client.wait_for_task("recent"), timeout=0.5)
+
+    try:
+        asyncio.run(run())
+    except asyncio.TimeoutError:
+        pass
+    else:
+        raise AssertionError("a task submitted just now was polled before its expected completion")
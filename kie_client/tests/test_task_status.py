@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import httpx
+
+from kie_client import KieClient, TaskStatusCache
+
+
+class _SlowKie(httpx.AsyncBaseTransport):
+    """Answers recordInfo after ``release`` is set, counting the requests."""
+
+    def __init__(self, state: str = "success") -> None:
+        self.state = state
+        self.requests = 0
+        self.release = asyncio.Event()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await self.release.wait()
+        task_id = request.url.params["taskId"]
+        result = json.dumps({"resultUrls": [f"https://cdn.example/{task_id}.mp4"]})
+        return httpx.Response(
+            200, json={"code": 200, "data": {"taskId": task_id, "state": self.state, "resultJson": result}},
+        )
+
+
+def test_concurrent_polls_share_one_request():
+    async def run():
+        kie = _SlowKie("generating")
+        async with KieClient(api_key="test", transport=kie) as client:
+            polls = [asyncio.ensure_future(client.get_task_status("t1")) for _ in range(5)]
+            await asyncio.sleep(0.01)
+            kie.release.set()
+            statuses = await asyncio.gather(*polls)
+            # A later poll is a new request, not a stale shared answer
+            await client.get_task_status("t1")
+        return kie.requests, statuses
+
+    requests, statuses = asyncio.run(run())
+    assert requests == 2
+    assert {s.status for s in statuses} == {"processing"}
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_poll():
+    async def run():
+        kie = _SlowKie()
+        async with KieClient(api_key="test", transport=kie) as client:
+            impatient = asyncio.ensure_future(client.get_task_status("t1"))
+            patient = asyncio.ensure_future(client.get_task_status("t1"))
+            await asyncio.sleep(0.01)
+            impatient.cancel()
+            await asyncio.sleep(0.01)
+            kie.release.set()
+            status = await patient
+        return kie.requests, impatient.cancelled(), status
+
+    requests, cancelled, status = asyncio.run(run())
+    assert cancelled
+    assert requests == 1
+    assert status.is_success
+
+
+def test_finished_statuses_are_answered_from_the_disk_cache(tmp_path):
+    async def poll(kie):
+        async with KieClient(api_key="test", transport=kie, status_cache=TaskStatusCache(tmp_path)) as client:
+            kie.release.set()
+            return await client.get_task_status("t1")
+
+    first, second = _SlowKie(), _SlowKie()
+    done = asyncio.run(poll(first))
+    # A new client (a later run) reads the finished status from disk
+    cached = asyncio.run(poll(second))
+
+    assert first.requests == 1 and second.requests == 0
+    assert cached == done and cached.is_success
+    assert list(tmp_path.glob("*.json"))
+
+
+def test_unfinished_statuses_are_not_cached(tmp_path):
+    async def poll():
+        kie = _SlowKie("generating")
+        kie.release.set()
+        async with KieClient(api_key="test", transport=kie, status_cache=TaskStatusCache(tmp_path)) as client:
+            await client.get_task_status("t1")
+            await client.get_task_status("t1")
+        return kie.requests
+
+    assert asyncio.run(poll()) == 2
+    assert not list(tmp_path.glob("*.json"))
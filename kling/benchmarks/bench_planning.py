@@ -0,0 +1,182 @@
+"""Benchmark generate_shots planning and status I/O on large synthetic scenarios.
+
+Generates scenarios of increasing size (scenes of 1-6 shots, some longer
+than 15s so they are chunked into parts, a partly completed status file)
+and times the per-run planning work: compiling the plan, indexing status
+keys by scene and selecting the scenes still to run. Time per scene should
+stay flat as the scenario grows.
+
+With ``--simulate N`` it also runs ``generate-scene --simulate`` on an
+N-scene scenario and counts the status file writes and bytes. Status is
+committed in batches, so writes grow far slower than one per submission.
+
+Run from the kling directory::
+
+    python -m benchmarks.bench_planning
+    python -m benchmarks.bench_planning --sizes 1000,5000,20000 --simulate 500
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import click
+import yaml
+from rich.console import Console
+from rich.table import Table
+
+from pipeline.auth import load_config
+from pipeline.generate_shots import _index_scene_keys
+from pipeline.plan import compile_plan
+
+console = Console()
+
+_ELEMENTS = [f"Hero{i}" for i in range(12)]
+
+
+def _write_scenario(directory: Path, scenes: int, seed: int = 7) -> Path:
+    rng = random.Random(seed)
+    data = {
+        "style_prefix": "Synthetic benchmark scenario.",
+        "kling_elements": [{"name": name, "description": f"{name}, a test subject."} for name in _ELEMENTS],
+        "scenes": [],
+    }
+    for scene_id in range(1, scenes + 1):
+        elements = rng.sample(_ELEMENTS, rng.randint(0, 3))
+        shots = [
+            {"prompt": f"Shot {n} of scene {scene_id}. " + " ".join(f"@{e}" for e in elements), "duration": rng.randint(2, 5)}
+            for n in range(rng.randint(1, 6))
+        ]
+        data["scenes"].append({"id": scene_id, "kling_elements": elements, "multi_prompt": shots})
+    path = directory / f"bench_{scenes}.yaml"
+    path.write_text(yaml.safe_dump(data, sort_keys=False, allow_unicode=True), encoding="utf-8")
+    return path
+
+
+def _elements_status() -> dict:
+    return {
+        "elements": {
+            name: {
+                "completed": True,
+                "views": {
+                    f"view_{v}": {"status": "completed", "url": f"https://cdn.example/{name}/{v}.png", "uploaded_at": 0}
+                    for v in range(3)
+                },
+            }
+            for name in _ELEMENTS
+        }
+    }
+
+
+def _scene_status(plan, completed_fraction: float = 0.5, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    scenes = {}
+    for req in plan.requests:
+        if rng.random() < completed_fraction:
+            scenes[req.key] = {"status": "completed", "completed": True, "task_id": f"t-{req.key}"}
+    return {"scenes": scenes}
+
+
+def _time_planning(scenario_path: Path, config: dict, elements_status: dict) -> tuple[int, int, float, float]:
+    """(scenes, requests, compile seconds, index + selection seconds)."""
+    started = time.perf_counter()
+    plan = compile_plan(str(scenario_path), config, "final", elements_status)
+    compiled = time.perf_counter() - started
+
+    status = _scene_status(plan)
+    started = time.perf_counter()
+    keys_by_scene = _index_scene_keys(status["scenes"])
+    requests_by_scene: dict[str, list] = {}
+    for req in plan.requests:
+        requests_by_scene.setdefault(req.scene_id, []).append(req)
+    selected = []
+    for scene_id, scene_requests in requests_by_scene.items():
+        keys = keys_by_scene.get(scene_id, [])
+        if keys and all(status["scenes"].get(k, {}).get("completed", False) for k in keys):
+            continue
+        selected.extend(scene_requests)
+    selection = time.perf_counter() - started
+    return len(requests_by_scene), len(plan.requests), compiled, selection
+
+
+def _count_status_writes(scenario_path: Path, config: dict, scratch: Path) -> tuple[int, int, float]:
+    """Run a simulated generate-scene; return (status writes, bytes written, wall seconds)."""
+    import pipeline.generate_shots as generate_shots
+    import pipeline.status as status_module
+    from pipeline.simulate import simulate_shots
+
+    config = {**config, "output": {**config["output"], "base_dir": str(scratch / "output"),
+                                   "elements_dir": str(scratch / "output" / "elements")}}
+    scratch.mkdir(parents=True, exist_ok=True)
+    config_path = scratch / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config, sort_keys=False), encoding="utf-8")
+
+    writes = [0, 0]
+    original = status_module.save_status
+
+    def counting(path, data):
+        original(path, data)
+        if Path(path).name == "scene_status.json":  # simulate_shots renders in its own scratch dir
+            writes[0] += 1
+            writes[1] += Path(path).stat().st_size
+
+    status_module.save_status = generate_shots.save_status = counting
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulate_shots(str(scenario_path), str(config_path))
+    finally:
+        status_module.save_status = generate_shots.save_status = original
+    return writes[0], writes[1], time.perf_counter() - started
+
+
+@click.command()
+@click.option("--config", "-c", "config_path", default="config.yaml", help="Path to config.yaml")
+@click.option("--sizes", default="500,1000,2000,5000", help="Comma-separated scene counts to plan")
+@click.option("--simulate", "simulate_scenes", type=int, default=0, help="Also simulate a run of this many scenes")
+def main(config_path: str, sizes: str, simulate_scenes: int) -> None:
+    """Time planning on synthetic scenarios and check that it scales linearly."""
+    logging.disable(logging.WARNING)
+    config = load_config(config_path)
+    elements_status = _elements_status()
+    counts = sorted(int(s) for s in sizes.split(",") if s.strip())
+
+    with tempfile.TemporaryDirectory(prefix="kling-bench-") as tmp:
+        tmp_dir = Path(tmp)
+        table = Table(title="Planning time")
+        for column in ("Scenes", "Requests", "Compile", "Index + select", "Per scene"):
+            table.add_column(column, justify="right")
+        per_scene = []
+        for count in counts:
+            scenes, requests, compiled, selection = _time_planning(
+                _write_scenario(tmp_dir, count), config, elements_status,
+            )
+            per_scene.append((compiled + selection) / scenes)
+            table.add_row(
+                str(scenes), str(requests), f"{compiled * 1000:.0f} ms", f"{selection * 1000:.1f} ms",
+                f"{per_scene[-1] * 1e6:.0f} µs",
+            )
+        console.print(table)
+        growth = per_scene[-1] / per_scene[0]
+        verdict = "linear" if growth < 2 else "super-linear"
+        console.print(
+            f"Per-scene cost grew {growth:.2f}x from {counts[0]} to {counts[-1]} scenes ({verdict})"
+        )
+
+        if simulate_scenes:
+            scenario = _write_scenario(tmp_dir, simulate_scenes, seed=11)
+            writes, written, seconds = _count_status_writes(scenario, config, tmp_dir / "sim")
+            console.print(
+                f"Simulated {simulate_scenes} scenes in {seconds:.1f}s: {writes} status write(s), "
+                f"{written / 1024 ** 2:.1f} MB written"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import re
@@ -31,12 +32,17 @@ def assemble_video(
     scenario_path: str,
     config_path: str = "config.yaml",
     output_path: str | None = None,
+    tier: str = "final",
 ) -> Path:
     """Concatenate completed scene videos into one file.
 
+    With ``tier="draft"`` the draft renders are assembled into a rough cut
+    under the draft output directory.
+
     Returns the Path to the assembled video.
     """
     from pipeline.auth import load_config, resolve_output_paths
+    from pipeline.plan import load_plan
 
     # Check ffmpeg is available
     if shutil.which("ffmpeg") is None:
@@ -45,7 +51,7 @@ def assemble_video(
         )
 
     config = load_config(config_path)
-    paths = resolve_output_paths(config, scenario_path)
+    paths = resolve_output_paths(config, scenario_path, tier)
 
     status_file: Path = paths["status_file"]
     if not status_file.exists():
@@ -60,6 +66,13 @@ def assemble_video(
     if not scenes:
         raise ValueError("No scenes found in status. Nothing to assemble.")
 
+    # Assemble in plan order; keys the plan does not know sort after it
+    plan = load_plan(scenario_path, config=config, tier=tier)
+    plan_order = {r.key: i for i, r in enumerate(plan.requests)}
+    not_generated = [k for k in plan_order if k not in scenes]
+    if not_generated:
+        logger.warning("Planned scenes not generated yet: %s", ", ".join(not_generated))
+
     # Collect completed scenes with local files
     entries: list[tuple[str, str]] = []
     incomplete: list[str] = []
@@ -69,11 +82,16 @@ def assemble_video(
             incomplete.append(key)
             continue
         local = data.get("local_path")
-        if not local or not Path(local).resolve().exists():
+        if not local:
             missing.append(key)
             continue
         entries.append((key, local))
 
+    # Pull scene files this host does not have from the storage backend
+    available = asyncio.run(_fetch(config, [local for _, local in entries]))
+    missing += [key for (key, _), ok in zip(entries, available) if not ok]
+    entries = [entry for entry, ok in zip(entries, available) if ok]
+
     if incomplete:
         logger.warning("Skipping incomplete scenes: %s", ", ".join(incomplete))
     if missing:
@@ -85,8 +103,8 @@ def assemble_video(
     if not entries:
         raise ValueError("No completed scene videos found to assemble.")
 
-    # Sort numerically
-    entries.sort(key=lambda e: _sort_key(e[0]))
+    # Sort by plan position, then numerically
+    entries.sort(key=lambda e: (plan_order.get(e[0], len(plan_order)), _sort_key(e[0])))
 
     logger.info(
         "Assembling %d scene file(s) in order: %s",
@@ -98,6 +116,8 @@ def assemble_video(
     scenario_dir = status_file.parent
     dest = Path(output_path) if output_path else scenario_dir / "final.mp4"
     dest.parent.mkdir(parents=True, exist_ok=True)
+    # A previous cut may be hardlinked to a stored blob; never let ffmpeg rewrite it in place
+    dest.unlink(missing_ok=True)
 
     # Write ffmpeg concat list to a temp file
     with tempfile.NamedTemporaryFile(
@@ -128,5 +148,22 @@ def assemble_video(
     finally:
         Path(concat_list).unlink(missing_ok=True)
 
+    asyncio.run(_store(config, dest))
     logger.info("Assembled video saved to %s", dest)
     return dest
+
+
+async def _fetch(config: dict, paths: list[str]) -> list[bool]:
+    """Make scene files available locally; True for each one that is."""
+    from pipeline.storage import build_storage
+
+    async with build_storage(config) as storage:
+        return await asyncio.gather(*(storage.fetch(p) for p in paths))
+
+
+async def _store(config: dict, path: Path) -> None:
+    """Adopt the assembled video into the storage backend."""
+    from pipeline.storage import build_storage
+
+    async with build_storage(config) as storage:
+        await storage.put_file(path)
@@ -6,12 +6,34 @@ No JWT generation or token refresh needed.
 
 from __future__ import annotations
 
+import copy
+
 import yaml
 from pathlib import Path
 
 
 _CONFIG_PATH = Path(__file__).resolve().parent.parent / "config.yaml"
 
+# Parsed config files keyed by path, reused while the file is unchanged.
+# Matters for the serve daemon, which loads the config for every job.
+_config_cache: dict[Path, tuple[tuple[int, int], dict]] = {}
+
+
+def _read_config(path: Path) -> dict:
+    """Parse a config file, reusing the last parse if mtime and size match.
+
+    Returns a copy the caller may modify.
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Config file not found: {path}")
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _config_cache.get(path)
+    if cached is None or cached[0] != stamp:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = _config_cache[path] = (stamp, yaml.safe_load(f))
+    return copy.deepcopy(cached[1])
+
 
 def get_api_key(config_path: str | Path | None = None) -> str:
     """Return the API key from config.yaml.
@@ -26,14 +48,11 @@ def get_api_key(config_path: str | Path | None = None) -> str:
         FileNotFoundError: If config file does not exist.
         ValueError: If api_key is missing or still set to placeholder.
     """
-    path = Path(config_path) if config_path else _CONFIG_PATH
-    if not path.exists():
-        raise FileNotFoundError(f"Config file not found: {path}")
-
-    with open(path, "r", encoding="utf-8") as f:
-        config = yaml.safe_load(f)
-
-    api_key: str = config.get("api", {}).get("api_key", "")
+    config = _read_config(Path(config_path) if config_path else _CONFIG_PATH)
+    api = config.get("api", {})
+    api_key: str = api.get("api_key", "")
+    if (not api_key or api_key == "YOUR_KIE_API_KEY") and api.get("api_keys"):
+        api_key = api["api_keys"][0].get("key", "")
     if not api_key or api_key == "YOUR_KIE_API_KEY":
         raise ValueError(
             "API key not configured. Set 'api.api_key' in config.yaml "
@@ -64,37 +83,67 @@ def load_config(config_path: str | Path | None = None) -> dict:
     Returns:
         The parsed config dictionary.
     """
-    path = Path(config_path) if config_path else _CONFIG_PATH
-    if not path.exists():
-        raise FileNotFoundError(f"Config file not found: {path}")
+    return _read_config(Path(config_path) if config_path else _CONFIG_PATH)
 
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
 
+TIERS = ("final", "draft")
 
-def resolve_output_paths(config: dict, scenario_path: str | None = None) -> dict:
+
+def resolve_output_paths(config: dict, scenario_path: str | None = None, tier: str = "final") -> dict:
     """Resolve output paths, scoping shots per scenario while sharing elements.
 
     Elements are always shared across scenarios.
-    Shots and shot status are scoped to output/<scenario_stem>/.
+    Shots and shot status are scoped to output/<scenario_stem>/; the draft
+    tier gets its own output/<scenario_stem>/draft/ namespace.
 
-    Returns dict with keys: elements_dir, elements_status_file, shots_dir, status_file.
+    Returns dict with keys: base_dir, elements_dir, elements_status_file,
+    elements_cache_dir, blobs_dir, shots_dir, status_file, plan_file,
+    poll_history_file, task_status_dir, journal_file.
     """
+    if tier not in TIERS:
+        raise ValueError(f"Unknown tier '{tier}'. Choose from: {', '.join(TIERS)}")
+
     base_dir = Path(config["output"].get("base_dir", "output"))
     elements_dir = Path(config["output"]["elements_dir"])
     elements_status_file = base_dir / "elements_status.json"
+    elements_cache_dir = base_dir / "elements_cache"
+    poll_history_file = base_dir / "poll_history.json"
 
-    if scenario_path:
-        stem = Path(scenario_path).stem
-        shots_dir = base_dir / stem / "shots"
-        status_file = base_dir / stem / "scene_status.json"
-    else:
-        shots_dir = base_dir / "shots"
-        status_file = base_dir / "scene_status.json"
+    scene_dir = base_dir / Path(scenario_path).stem if scenario_path else base_dir
+    if tier == "draft":
+        scene_dir = scene_dir / "draft"
+    shots_dir = scene_dir / "shots"
+    status_file = scene_dir / "scene_status.json"
+    plan_file = scene_dir / "plan.json"
 
     return {
+        "base_dir": base_dir,
         "elements_dir": elements_dir,
         "elements_status_file": elements_status_file,
+        "elements_cache_dir": elements_cache_dir,
+        "blobs_dir": base_dir / "blobs",
         "shots_dir": shots_dir,
         "status_file": status_file,
+        "plan_file": plan_file,
+        "journal_file": scene_dir / "submissions.journal",
+        "poll_history_file": poll_history_file,
+        "task_status_dir": base_dir / "task_status",
     }
+
+
+def tier_settings(config: dict, tier: str = "final") -> dict:
+    """Return generation settings for a tier.
+
+    The final tier uses ``generation.mode`` with scenario durations; the
+    draft tier uses the ``draft`` section (cheaper mode, optionally shorter
+    shots).
+
+    Returns dict with keys: mode, max_shot_duration (0 = keep scenario durations).
+    """
+    if tier == "draft":
+        draft = config.get("draft", {})
+        return {
+            "mode": draft.get("mode", "std"),
+            "max_shot_duration": draft.get("max_shot_duration", 0),
+        }
+    return {"mode": config["generation"]["mode"], "max_shot_duration": 0}
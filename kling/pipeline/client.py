@@ -1,5 +1,78 @@
 """Re-export KIE client from shared kie_client package."""
 
-from kie_client import KieClient, KieApiError, DryRunInterrupt, TaskStatus, Element
+from __future__ import annotations
 
-__all__ = ["KieClient", "KieApiError", "DryRunInterrupt", "TaskStatus", "Element"]
+from pathlib import Path
+
+from kie_client import (
+    KieClient, KieApiError, DryRunInterrupt, TaskTimeoutError, TaskStatus, Element, PollScheduler, schedule_key,
+    build_multi_shot_payload, ApiKey, KeyPool, RecordingTransport, ReplayTransport, CassetteMiss,
+    GrokClient, GrokApiError, Provider, ProviderCapacity, ProviderRouter,
+    BatchResult, build_image_payload, fan_out, TaskStatusCache,
+)
+
+__all__ = [
+    "KieClient", "KieApiError", "DryRunInterrupt", "TaskTimeoutError", "TaskStatus", "Element",
+    "PollScheduler", "schedule_key", "build_multi_shot_payload", "build_poll_scheduler",
+    "ApiKey", "KeyPool", "build_key_pool", "RecordingTransport", "ReplayTransport", "CassetteMiss",
+    "GrokClient", "GrokApiError", "Provider", "ProviderCapacity", "ProviderRouter",
+    "BatchResult", "build_image_payload", "fan_out", "TaskStatusCache", "build_status_cache",
+]
+
+
+def build_poll_scheduler(config: dict, history_path: str | None = None) -> PollScheduler | None:
+    """Build the adaptive poll scheduler from the ``polling`` config section.
+
+    Returns None when ``polling.adaptive`` is off, so the client falls back
+    to fixed-interval polling.
+    """
+    polling = config.get("polling", {})
+    if not polling.get("adaptive", False):
+        return None
+    return PollScheduler(
+        history_path=history_path,
+        default_interval=polling.get("interval_seconds", 10),
+        min_interval=polling.get("min_interval_seconds", 2),
+        max_interval=polling.get("max_interval_seconds", 30),
+        max_polls=polling.get("max_polls_per_task", 40),
+    )
+
+
+def build_status_cache(config: dict, directory: str | Path | None = None) -> TaskStatusCache | None:
+    """Build the cache of finished task statuses.
+
+    Returns None when ``polling.cache_finished`` is off, so every status
+    check goes to the API.
+    """
+    if not config.get("polling", {}).get("cache_finished", True) or directory is None:
+        return None
+    return TaskStatusCache(directory)
+
+
+def build_key_pool(config: dict) -> KeyPool | None:
+    """Build the API key pool from ``api.api_keys``.
+
+    Returns None when no key list is configured, so the client uses the
+    single ``api.api_key``.
+
+    Raises:
+        ValueError: If an entry has no key.
+    """
+    api = config.get("api", {})
+    entries = api.get("api_keys") or []
+    if not entries:
+        return None
+    keys = []
+    for i, entry in enumerate(entries):
+        if isinstance(entry, str):
+            entry = {"key": entry}
+        if not entry.get("key"):
+            raise ValueError(f"api.api_keys[{i}] has no 'key'")
+        keys.append(ApiKey(
+            key=entry["key"],
+            name=entry.get("name", ""),
+            weight=float(entry.get("weight", 1.0)),
+            max_concurrent=entry.get("max_concurrent", 0),
+            requests_per_minute=entry.get("requests_per_minute", 0),
+        ))
+    return KeyPool(keys, throttle_cooldown=api.get("throttle_cooldown_seconds", 30))
@@ -1,67 +1,134 @@
 """Standalone downloader for completed pipeline outputs.
 
 Downloads any completed but not-yet-downloaded element images and shot
-videos from their CDN URLs to local files.
+videos from their CDN URLs to local files. Downloads run concurrently
+under a cap, every file is verified (size against Content-Length, then
+``ffprobe`` for videos and a decode check for images), corrupt files are
+re-fetched, and status updates are committed in batches.
+
+Files stream straight into the storage backend (see ``pipeline.storage``);
+with a shared backend, files another host already stored are pulled from
+it instead of the CDN.
 """
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
+import os
+import shutil
 from pathlib import Path
 
+import httpx
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 
 from pipeline.auth import get_api_key, load_config, resolve_output_paths
 from pipeline.client import KieClient
+from pipeline.plan import load_plan
+from pipeline.retention import enforce_budget
+from pipeline.status import StatusBatcher, load_status
+from pipeline.storage import StorageError, build_storage
 
 logger = logging.getLogger(__name__)
 console = Console()
 
 
-def _load_status(status_path: Path) -> dict:
-    """Load pipeline status from JSON file."""
-    if status_path.exists():
-        with open(status_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-
-def _save_status(status_path: Path, status: dict) -> None:
-    """Save pipeline status to JSON file."""
-    status_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(status_path, "w", encoding="utf-8") as f:
-        json.dump(status, f, indent=2, ensure_ascii=False)
+async def _verify_video(path: Path) -> str | None:
+    """Return an error message if ffprobe cannot read a video stream from ``path``."""
+    if shutil.which("ffprobe") is None:
+        return None
+    proc = await asyncio.create_subprocess_exec(
+        "ffprobe", "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "stream=codec_name:format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        str(path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0 or not stdout.strip():
+        return f"ffprobe failed: {stderr.decode(errors='replace').strip()[-200:] or 'no video stream'}"
+    return None
+
+
+def _verify_image_sync(path: Path) -> str | None:
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(path) as image:
+            image.load()
+    except Exception as exc:  # PIL raises a variety of errors for corrupt files
+        return f"image decode failed: {exc}"
+    return None
+
+
+async def verify_file(path: Path) -> str | None:
+    """Check that a downloaded file is complete; return an error message if not."""
+    if not path.exists() or path.stat().st_size == 0:
+        return "missing or empty"
+    if path.suffix.lower() == ".mp4":
+        return await _verify_video(path)
+    if path.suffix.lower() in (".png", ".jpg", ".jpeg", ".webp"):
+        return await asyncio.to_thread(_verify_image_sync, path)
+    return None
 
 
 async def download_all(
     scenario_path: str | None = None,
     config_path: str | None = None,
+    tier: str = "final",
+    transport: httpx.AsyncBaseTransport | None = None,
 ) -> None:
     """Download all completed but not-yet-downloaded files.
 
-    Scans status files for elements and shots that have a CDN URL
-    but no local file (or the local file is missing), and downloads them.
+    Scans status files for elements and shots that have a CDN URL but no
+    valid local file, and downloads them. Existing local files are verified
+    first, so truncated files from an interrupted run are re-fetched.
 
     Args:
         scenario_path: Path to scenario YAML (used to derive per-scenario output dir).
         config_path: Optional override for config.yaml path.
+        tier: ``final`` or ``draft`` scene outputs.
+        transport: Alternative HTTP transport for the client (cassette recorder/replayer).
     """
     config = load_config(config_path)
     api_key = get_api_key(config_path)
+    enforce_budget(config)
+    dl_config = config.get("download", {})
+    max_concurrent = dl_config.get("max_concurrent", 4)
+    max_attempts = dl_config.get("max_attempts", 3)
+    verify_workers = dl_config.get("verify_workers", 0) or os.cpu_count() or 1
 
-    paths = resolve_output_paths(config, scenario_path)
+    paths = resolve_output_paths(config, scenario_path, tier)
     elements_dir = paths["elements_dir"]
     elements_status_path = paths["elements_status_file"]
     shots_dir = paths["shots_dir"]
     shots_status_path = paths["status_file"]
 
-    elements_status = _load_status(elements_status_path)
-    shots_status = _load_status(shots_status_path)
-
-    downloads: list[tuple[str, str, Path, Path, dict]] = []
-    # (label, url, local_path, status_path, status_dict)
+    elements_status = load_status(elements_status_path)
+    shots_status = load_status(shots_status_path)
+    # Planned output paths for scene videos, when the scenario is known
+    planned_paths: dict[str, str] = {}
+    if scenario_path:
+        plan = load_plan(scenario_path, config=config, tier=tier, elements_status=elements_status)
+        planned_paths = {r.key: r.output_path for r in plan.requests}
+    batchers = {
+        elements_status_path: StatusBatcher(
+            elements_status_path, elements_status,
+            every=dl_config.get("commit_every", 10), interval=dl_config.get("commit_interval_seconds", 5.0),
+        ),
+        shots_status_path: StatusBatcher(
+            shots_status_path, shots_status,
+            every=dl_config.get("commit_every", 10), interval=dl_config.get("commit_interval_seconds", 5.0),
+        ),
+    }
+
+    candidates: list[tuple[str, str, Path, Path, dict, Path | None, dict]] = []
+    # (label, url, local_path, status_path, status_dict, existing_local_file, status_entry)
 
     # Check element images
     for elem_name, elem_data in elements_status.get("elements", {}).items():
@@ -69,13 +136,17 @@ async def download_all(
             url = view_data.get("url")
             if not url or view_data.get("status") != "completed":
                 continue
-
-            local = view_data.get("local_path")
-            if local and Path(local).exists():
+            if view_data.get("upload_path"):
+                # Uploaded from the user's own image: the URL serves the optimised
+                # variant, which must never overwrite the source at local_path
                 continue
 
+            local = view_data.get("local_path")
             local_path = elements_dir / elem_name / f"{view_key}.png"
-            downloads.append((f"element:{elem_name}/{view_key}", url, local_path, elements_status_path, elements_status))
+            candidates.append((
+                f"element:{elem_name}/{view_key}", url, local_path, elements_status_path, elements_status,
+                Path(local) if local else None, view_data,
+            ))
 
     # Check shot videos (legacy single-shot format)
     for shot_key, shot_data in shots_status.get("shots", {}).items():
@@ -84,11 +155,11 @@ async def download_all(
             continue
 
         local = shot_data.get("local_path")
-        if local and Path(local).exists():
-            continue
-
         local_path = shots_dir / f"{shot_key}.mp4"
-        downloads.append((f"shot:{shot_key}", url, local_path, shots_status_path, shots_status))
+        candidates.append((
+            f"shot:{shot_key}", url, local_path, shots_status_path, shots_status,
+            Path(local) if local else None, shot_data,
+        ))
 
     # Check scene videos (multi-shot format)
     for scene_key, scene_data in shots_status.get("scenes", {}).items():
@@ -97,57 +168,121 @@ async def download_all(
             continue
 
         local = scene_data.get("local_path")
-        if local and Path(local).exists():
-            continue
-
-        local_path = shots_dir / f"scene_{scene_key}.mp4"
-        downloads.append((f"scene:{scene_key}", url, local_path, shots_status_path, shots_status))
-
-    if not downloads:
-        console.print("[green]All files are already downloaded.[/green]")
-        return
-
-    console.print(f"\n[bold]Downloading {len(downloads)} files...[/bold]\n")
-
-    async with KieClient(api_key=api_key, base_url=config["api"]["base_url"]) as client:
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TaskProgressColumn(),
-            console=console,
-        ) as progress:
-            dl_task = progress.add_task("Downloading...", total=len(downloads))
+        local_path = Path(planned_paths.get(scene_key) or shots_dir / f"scene_{scene_key}.mp4")
+        candidates.append((
+            f"scene:{scene_key}", url, local_path, shots_status_path, shots_status,
+            Path(local) if local else None, scene_data,
+        ))
+
+    async with build_storage(config) as storage:
+        # Verify files that already exist locally, in parallel
+        verify_slots = asyncio.Semaphore(verify_workers)
+
+        async def needs_download(existing: Path | None, entry: dict, st_path: Path) -> str | None:
+            if existing is None:
+                return "missing"
+            try:
+                if not await storage.fetch(existing):
+                    return "missing"
+            except StorageError as exc:
+                console.print(f"  [yellow]{existing}: not fetched from {storage.backend} storage ({exc})[/yellow]")
+                return "missing"
+            if entry.get("verified") == _file_stamp(existing):
+                return None
+            async with verify_slots:
+                problem = await verify_file(existing)
+            if problem is None:
+                entry["verified"] = _file_stamp(existing)
+                batchers[st_path].mark()
+            return problem
+
+        problems = await asyncio.gather(*(needs_download(c[5], c[6], c[3]) for c in candidates))
+        downloads: list[tuple[str, str, Path, Path, dict]] = []
+        for (label, url, local_path, st_path, st_dict, existing, _), problem in zip(candidates, problems):
+            if problem is None:
+                continue
+            if problem != "missing":
+                console.print(f"  [yellow]{label}: corrupt local file {existing} ({problem}), re-fetching[/yellow]")
+                # Re-fetch to the same file the status already points at
+                local_path = existing
+            downloads.append((label, url, local_path, st_path, st_dict))
+
+        if not downloads:
+            for batcher in batchers.values():
+                batcher.flush()
+            console.print("[green]All files are already downloaded.[/green]")
+            return
+
+        console.print(f"\n[bold]Downloading {len(downloads)} files ({max_concurrent} at a time)...[/bold]\n")
+
+        slots = asyncio.Semaphore(max_concurrent)
+        failures = 0
+
+        async with KieClient(api_key=api_key, base_url=config["api"]["base_url"], transport=transport) as client:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                TaskProgressColumn(),
+                console=console,
+            ) as progress:
+                dl_task = progress.add_task("Downloading...", total=len(downloads))
+
+                async def fetch(label: str, url: str, local_path: Path, st_path: Path, st_dict: dict) -> None:
+                    nonlocal failures
+                    error: str | None = None
+                    for attempt in range(1, max_attempts + 1):
+                        try:
+                            async with slots:
+                                async with storage.open_write(local_path) as out:
+                                    await client.download_to(url, out.write)
+                            error = await verify_file(local_path)
+                        except Exception as exc:  # API, network, storage or disk: fail this file only
+                            error = str(exc) or type(exc).__name__
+                        if error is None:
+                            break
+                        console.print(f"  [yellow]{label}: attempt {attempt}/{max_attempts} failed — {error}[/yellow]")
+
+                    if error is None:
+                        console.print(f"  [green]Downloaded {label} -> {local_path}[/green]")
+                        _update_local_path(st_dict, label, str(local_path), _file_stamp(local_path))
+                        batchers[st_path].mark()
+                    else:
+                        failures += 1
+                        console.print(f"  [red]Failed to download {label}: {error}[/red]")
+                    progress.update(dl_task, advance=1)
 
-            for label, url, local_path, st_path, st_dict in downloads:
                 try:
-                    await client.download_file(url, local_path)
-                    console.print(f"  [green]Downloaded {label} -> {local_path}[/green]")
-
-                    # Update status with local path
-                    _update_local_path(st_dict, label, str(local_path))
-                    _save_status(st_path, st_dict)
+                    await asyncio.gather(*(fetch(*d) for d in downloads))
+                finally:
+                    for batcher in batchers.values():
+                        batcher.flush()
 
-                except Exception as exc:
-                    console.print(f"  [red]Failed to download {label}: {exc}[/red]")
+        if failures:
+            console.print(f"\n[bold yellow]Download finished with {failures} failure(s). Re-run to retry.[/bold yellow]")
+        else:
+            console.print(f"\n[bold green]Download complete.[/bold green]")
 
-                progress.update(dl_task, advance=1)
 
-    console.print(f"\n[bold green]Download complete.[/bold green]")
+def _file_stamp(path: Path) -> list[int]:
+    """Size and mtime of a file, recorded once it has been verified."""
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
 
 
-def _update_local_path(status: dict, label: str, local_path: str) -> None:
-    """Update the local_path in the status dict for a given label."""
+def _update_local_path(status: dict, label: str, local_path: str, verified: list[int] | None = None) -> None:
+    """Update the local_path (and verification stamp) in the status dict for a given label."""
+    entry: dict | None = None
     if label.startswith("element:"):
         parts = label[len("element:"):].split("/")
         if len(parts) == 2:
             elem_name, view_key = parts
-            status.setdefault("elements", {}).setdefault(elem_name, {}).setdefault("views", {}).setdefault(view_key, {})["local_path"] = local_path
+            entry = status.setdefault("elements", {}).setdefault(elem_name, {}).setdefault("views", {}).setdefault(view_key, {})
     elif label.startswith("shot:"):
-        shot_key = label[len("shot:"):]
-        if shot_key in status.get("shots", {}):
-            status["shots"][shot_key]["local_path"] = local_path
+        entry = status.get("shots", {}).get(label[len("shot:"):])
     elif label.startswith("scene:"):
-        scene_key = label[len("scene:"):]
-        if scene_key in status.get("scenes", {}):
-            status["scenes"][scene_key]["local_path"] = local_path
+        entry = status.get("scenes", {}).get(label[len("scene:"):])
+    if entry is not None:
+        entry["local_path"] = local_path
+        if verified is not None:
+            entry["verified"] = verified
@@ -7,18 +7,21 @@ are then used as kling_elements when generating video shots.
 
 from __future__ import annotations
 
-import asyncio
 import json
 import logging
 from pathlib import Path
 
+import httpx
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 
 from pipeline.auth import get_api_key, load_config, resolve_output_paths
-from pipeline.client import KieClient, KieApiError
+from pipeline.client import (
+    KieClient, KieApiError, build_image_payload, build_poll_scheduler, build_status_cache, fan_out,
+)
 from pipeline.models import Element
 from pipeline.scenario_parser import load_scenario
+from pipeline.storage import StorageError, build_storage
 
 logger = logging.getLogger(__name__)
 console = Console()
@@ -75,6 +78,7 @@ def _save_status(status_path: Path, status: dict) -> None:
 async def generate_elements(
     scenario_path: str,
     config_path: str | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
 ) -> None:
     """Generate reference images for all elements in the scenario.
 
@@ -88,11 +92,11 @@ async def generate_elements(
     Args:
         scenario_path: Path to the scenario YAML file.
         config_path: Optional override for config.yaml path.
+        transport: Alternative HTTP transport for the client (cassette recorder/replayer).
     """
     config = load_config(config_path)
     api_key = get_api_key(config_path)
 
-    scenario_raw = _load_scenario_raw(scenario_path)
     scenario = load_scenario(scenario_path)
 
     paths = resolve_output_paths(config, scenario_path)
@@ -108,12 +112,18 @@ async def generate_elements(
     if "elements" not in status:
         status["elements"] = {}
 
-    async with KieClient(api_key=api_key, base_url=config["api"]["base_url"]) as client:
+    poll_scheduler = build_poll_scheduler(config, paths["poll_history_file"])
+
+    async with KieClient(
+        api_key=api_key, base_url=config["api"]["base_url"], poll_scheduler=poll_scheduler, transport=transport,
+        batch_concurrency=config["api"].get("batch_concurrency", 4),
+        status_cache=build_status_cache(config, paths["task_status_dir"]),
+    ) as client, build_storage(config) as storage:
         total_images = 0
         tasks_to_submit: list[tuple[str, str, int]] = []  # (element_name, prompt, view_index)
 
         # Flatten grouped elements (characters/backgrounds) into a flat dict
-        raw_elements = scenario_raw.get("elements", {})
+        raw_elements = scenario.raw.get("elements", {})
         flat_elements: dict[str, dict] = {}
         for key, value in raw_elements.items():
             if isinstance(value, list):
@@ -157,81 +167,92 @@ async def generate_elements(
         ) as progress:
             submit_task = progress.add_task("Submitting image tasks...", total=total_images)
 
-            for elem_name, prompt, view_idx in tasks_to_submit:
-                try:
-                    task_id = await client.create_image_task(
-                        prompt=prompt,
-                        negative_prompt=negative_prompt,
-                        aspect_ratio=aspect_ratio,
-                    )
-                    submitted.append((elem_name, view_idx, task_id))
-
-                    # Track in status
-                    if elem_name not in status["elements"]:
-                        status["elements"][elem_name] = {"views": {}, "completed": False}
-                    view_key = f"view_{view_idx}"
-                    status["elements"][elem_name]["views"][view_key] = {
-                        "task_id": task_id,
-                        "status": "submitted",
-                        "url": None,
-                        "local_path": None,
-                        "prompt": prompt,
-                    }
-                    _save_status(status_path, status)
-
-                    progress.update(submit_task, advance=1)
-
-                    # Small delay to avoid hitting rate limits
-                    await asyncio.sleep(0.5)
-
-                except KieApiError as exc:
-                    console.print(f"[red]Failed to submit task for {elem_name} view {view_idx}: {exc}[/red]")
-
-            # Poll all submitted tasks
+            async for (elem_name, prompt, view_idx), task_id, error in client.submit_many(
+                tasks_to_submit,
+                body=lambda item: build_image_payload(item[1], negative_prompt, aspect_ratio),
+            ):
+                if isinstance(error, KieApiError):
+                    console.print(f"[red]Failed to submit task for {elem_name} view {view_idx}: {error}[/red]")
+                    continue
+                if error is not None:
+                    raise error
+                submitted.append((elem_name, view_idx, task_id))
+
+                # Track in status
+                if elem_name not in status["elements"]:
+                    status["elements"][elem_name] = {"views": {}, "completed": False}
+                view_key = f"view_{view_idx}"
+                status["elements"][elem_name]["views"][view_key] = {
+                    "task_id": task_id,
+                    "status": "submitted",
+                    "url": None,
+                    "local_path": None,
+                    "prompt": prompt,
+                }
+                _save_status(status_path, status)
+
+                progress.update(submit_task, advance=1)
+
+            # Poll all submitted tasks, then download the finished images
             progress.update(submit_task, description="Waiting for image generation...")
             poll_task = progress.add_task("Polling tasks...", total=len(submitted))
+            ready: list[tuple[str, int, str]] = []  # (element_name, view_index, output_url)
 
-            for elem_name, view_idx, task_id in submitted:
+            async for (elem_name, view_idx, task_id), result, error in fan_out(
+                submitted,
+                lambda item: client.wait_for_task(item[2], poll_interval=poll_interval, max_wait=max_wait),
+                concurrency=0,
+            ):
                 view_key = f"view_{view_idx}"
-                try:
-                    result = await client.wait_for_task(
-                        task_id,
-                        poll_interval=poll_interval,
-                        max_wait=max_wait,
-                    )
-
-                    if result.is_success and result.output_url:
-                        # Download the image locally
-                        elem_dir = elements_dir / elem_name
-                        file_name = f"{elem_name}{view_idx + 1}.png"
-                        local_path = elem_dir / file_name
-                        await client.download_file(result.output_url, local_path)
-
-                        # Store CDN URL for later use in video generation
-                        status["elements"][elem_name]["views"][view_key].update({
-                            "status": "completed",
-                            "url": result.output_url,
-                            "local_path": str(local_path),
-                        })
-                        console.print(f"  [green]{elem_name}/{view_key} completed[/green]")
-                    else:
-                        error_msg = result.error or "Unknown error"
-                        status["elements"][elem_name]["views"][view_key].update({
-                            "status": "failed",
-                            "error": error_msg,
-                        })
-                        console.print(f"  [red]{elem_name}/{view_key} failed: {error_msg}[/red]")
-
-                except KieApiError as exc:
+                if isinstance(error, KieApiError):
                     status["elements"][elem_name]["views"][view_key].update({
                         "status": "failed",
-                        "error": str(exc),
+                        "error": str(error),
                     })
-                    console.print(f"  [red]{elem_name}/{view_key} error: {exc}[/red]")
+                    console.print(f"  [red]{elem_name}/{view_key} error: {error}[/red]")
+                elif error is not None:
+                    raise error
+                elif result.is_success and result.output_url:
+                    ready.append((elem_name, view_idx, result.output_url))
+                else:
+                    error_msg = result.error or "Unknown error"
+                    status["elements"][elem_name]["views"][view_key].update({
+                        "status": "failed",
+                        "error": error_msg,
+                    })
+                    console.print(f"  [red]{elem_name}/{view_key} failed: {error_msg}[/red]")
 
                 _save_status(status_path, status)
                 progress.update(poll_task, advance=1)
 
+            def local_path(item: tuple[str, int, str]) -> Path:
+                elem_name, view_idx, _ = item
+                return elements_dir / elem_name / f"{elem_name}{view_idx + 1}.png"
+
+            async for item, _, error in client.download_many(
+                ready, url=lambda item: item[2], open_write=lambda item: storage.open_write(local_path(item)),
+            ):
+                elem_name, view_idx, output_url = item
+                view_key = f"view_{view_idx}"
+                if isinstance(error, (KieApiError, StorageError)):
+                    status["elements"][elem_name]["views"][view_key].update({
+                        "status": "failed",
+                        "error": str(error),
+                    })
+                    console.print(f"  [red]{elem_name}/{view_key} error: {error}[/red]")
+                elif error is not None:
+                    raise error
+                else:
+                    # Store CDN URL for later use in video generation
+                    status["elements"][elem_name]["views"][view_key].update({
+                        "status": "completed",
+                        "url": output_url,
+                        "local_path": str(local_path(item)),
+                        "uploaded_at": client.clock(),
+                    })
+                    console.print(f"  [green]{elem_name}/{view_key} completed[/green]")
+                _save_status(status_path, status)
+
         # Mark fully completed elements
         for elem_name in status["elements"]:
             views = status["elements"][elem_name].get("views", {})
@@ -250,9 +271,3 @@ async def generate_elements(
             f"{completed_count}/{len(scenario.elements)} elements fully generated.[/bold green]"
         )
 
-
-def _load_scenario_raw(path: str) -> dict:
-    """Load raw YAML data (not parsed into models) for reference_prompts access."""
-    import yaml
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
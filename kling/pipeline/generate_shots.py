@@ -3,144 +3,96 @@
 Generates videos for each scene defined in the scenario as a single
 multi-shot request per scene, leveraging Kling 3.0's visual continuity.
 Falls back to chunking if a scene exceeds 6 shots or 15s total.
+Requests and their payloads come from the compiled plan (see ``pipeline.plan``).
 """
 
 from __future__ import annotations
 
 import asyncio
-import json
+import contextlib
 import logging
-from dataclasses import dataclass, field
+import time
 from pathlib import Path
 
+import httpx
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 
-from pipeline.auth import get_api_key, load_config, resolve_output_paths
-from pipeline.client import KieClient, KieApiError, DryRunInterrupt
-from pipeline.models import Element
+from pipeline.auth import get_api_key, load_config, resolve_output_paths, tier_settings
+from pipeline.client import (
+    KieClient, KieApiError, DryRunInterrupt, KeyPool, TaskTimeoutError, build_key_pool, build_poll_scheduler,
+    build_status_cache, fan_out,
+)
+from pipeline.plan import PlannedRequest, load_plan
+from pipeline.refresh_elements import refresh_element_urls
+from pipeline.retention import enforce_budget
+from pipeline.retry import RetryBudget, RetryPolicy, estimate_credits
+from pipeline.routing import RoutingConstraints, build_router, open_providers
 from pipeline.scenario_parser import load_scenario
+from pipeline.scheduling import order_scene_tasks
+from pipeline.status import StatusBatcher, SubmissionJournal, load_status, save_status
+from pipeline.storage import StorageError, build_storage
 
 logger = logging.getLogger(__name__)
 console = Console()
 
-_MAX_SHOTS_PER_REQUEST = 6
-_MAX_DURATION_PER_REQUEST = 15
-
-
-def _load_status(status_path: Path) -> dict:
-    """Load pipeline status from JSON file."""
-    if status_path.exists():
-        with open(status_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-
-def _save_status(status_path: Path, status: dict) -> None:
-    """Save pipeline status to JSON file."""
-    status_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(status_path, "w", encoding="utf-8") as f:
-        json.dump(status, f, indent=2, ensure_ascii=False)
-
-
-def _collect_element_urls(
-    element_name: str,
-    status: dict,
-) -> list[str]:
-    """Collect CDN URLs for a given element from the status file."""
-    elem_status = status.get("elements", {}).get(element_name, {})
-    views = elem_status.get("views", {})
-    urls = []
-    for view_key in sorted(views.keys()):
-        view = views[view_key]
-        url = view.get("url")
-        if url and view.get("status") == "completed":
-            urls.append(url)
-    return urls
-
-
-def _build_shot_prompt(
-    shot_prompt: str,
-    style_prefix: str,
-    scene_background: str,
-    scene_lighting: str,
-) -> str:
-    """Build the full prompt for a shot by combining components."""
-    parts = []
-    if style_prefix:
-        parts.append(style_prefix)
-    continuity = []
-    if scene_background:
-        continuity.append(f"Setting: {scene_background}")
-    if scene_lighting:
-        continuity.append(f"Lighting: {scene_lighting}")
-    if continuity:
-        parts.append(". ".join(continuity))
-    parts.append(shot_prompt)
-    return ". ".join(parts)
-
-
-@dataclass
-class SceneTask:
-    """A scene to submit as a multi-shot request (or chunked into parts)."""
-    scene_id: str
-    part: int  # 0-based chunk index (0 if no chunking needed)
-    shots: list[dict] = field(default_factory=list)  # [{"prompt": str, "duration": int}]
-    elements: list[Element] = field(default_factory=list)
-
-
-def _chunk_scene_shots(
-    scene_id: str,
-    shots: list[dict],
-    elements: list[Element],
-) -> list[SceneTask]:
-    """Split scene shots into chunks that fit multi-shot limits."""
-    chunks: list[SceneTask] = []
-    current_shots: list[dict] = []
-    current_duration = 0
-    part = 0
-
-    for shot in shots:
-        dur = shot["duration"]
-        if current_shots and (
-            len(current_shots) >= _MAX_SHOTS_PER_REQUEST
-            or current_duration + dur > _MAX_DURATION_PER_REQUEST
-        ):
-            chunks.append(SceneTask(
-                scene_id=scene_id,
-                part=part,
-                shots=current_shots,
-                elements=list(elements),
-            ))
-            part += 1
-            current_shots = []
-            current_duration = 0
-        current_shots.append(shot)
-        current_duration += dur
-
-    if current_shots:
-        chunks.append(SceneTask(
-            scene_id=scene_id,
-            part=part,
-            shots=current_shots,
-            elements=list(elements),
-        ))
-
-    return chunks
-
-
-def _scene_status_key(scene_id: str, part: int, total_parts: int) -> str:
-    """Build the key used in status['scenes']."""
-    if total_parts <= 1:
-        return scene_id
-    return f"{scene_id}_part{part}"
-
-
-def _scene_filename(scene_id: str, part: int, total_parts: int) -> str:
-    """Build the output filename for a scene chunk."""
-    if total_parts <= 1:
-        return f"scene_{scene_id}.mp4"
-    return f"scene_{scene_id}_part{part}.mp4"
+
+def _reconcile_journal(journal: SubmissionJournal, status: dict, status_path: Path) -> None:
+    """Fold submissions an interrupted run journaled but never saved into status.
+
+    A journaled task ID is restored so the task is polled, not paid for
+    again. An intent without one means the run died mid-request; KIE has
+    no way to look a task up by its payload, so the scene is marked
+    ``unconfirmed`` and only resubmitted on request.
+    """
+    pending = journal.pending()
+    if not pending:
+        return
+    # Only the latest submission of a scene matters; earlier ones were retried
+    latest = {record["key"]: record for record in pending}
+    for skey, record in latest.items():
+        entry = status["scenes"].get(skey, {})
+        task_id = record["task_id"]
+        if task_id and entry.get("task_id") == task_id:
+            continue
+        attempts = entry.get("attempts", [])
+        if task_id:
+            status["scenes"][skey] = {
+                "task_id": task_id,
+                "status": "submitted",
+                "submitted_at": record["submitted_at"],
+                "completed": False,
+                "url": None,
+                "local_path": None,
+                "fingerprint": record["fingerprint"],
+                "provider": record["provider"],
+                "api_key": record.get("api_key"),
+                "attempts": attempts + [{"task_id": task_id, "status": "submitted", "at": record["submitted_at"]}],
+            }
+            console.print(f"  [cyan]Scene {skey}: recovered task {task_id} from the submission journal[/cyan]")
+        else:
+            error = f"an interrupted run may have created a task on {record['provider']} that was never recorded"
+            status["scenes"][skey] = {
+                **entry,
+                "status": "unconfirmed",
+                "completed": False,
+                "fingerprint": record["fingerprint"],
+                "provider": record["provider"],
+                "error": error,
+                "attempts": attempts + [{"status": "unconfirmed", "error": error, "at": record["at"]}],
+            }
+            console.print(f"  [yellow]Scene {skey}: {error}[/yellow]")
+    save_status(status_path, status)
+    journal.clear()
+
+
+def _index_scene_keys(scenes_status: dict) -> dict[str, list[str]]:
+    """Group status['scenes'] keys by scene ID (``3`` and ``3_partN`` -> ``3``)."""
+    index: dict[str, list[str]] = {}
+    for key in scenes_status:
+        base, sep, part = key.rpartition("_part")
+        index.setdefault(base if sep and part.isdigit() else key, []).append(key)
+    return index
 
 
 async def generate_shots(
@@ -148,50 +100,92 @@ async def generate_shots(
     config_path: str | None = None,
     scene_ids: list[int] | None = None,
     dry_run: bool = False,
+    wait: bool = False,
+    schedule: str | None = None,
+    deadline: float | None = None,
+    tier: str = "final",
+    transport: httpx.AsyncBaseTransport | None = None,
+    key_pool: KeyPool | None = None,
+    resubmit_unconfirmed: bool = False,
+    elements_lock: asyncio.Lock | None = None,
 ) -> None:
     """Generate videos for scenes using multi-shot API.
 
     Groups all shots in a scene into a single multi-shot request (or
     chunked parts if the scene exceeds 6 shots / 15s). One combined
-    video per scene/chunk.
+    video per scene/chunk. Requests go to KIE unless the scenario's
+    ``routing`` block allows other providers (see ``pipeline.routing``).
 
     Args:
         scenario_path: Path to the scenario YAML file.
         config_path: Optional override for config.yaml path.
         scene_ids: Optional list of scene IDs to generate (all if None).
+        dry_run: Print request payloads without calling the API.
+        wait: Poll submitted tasks until they finish instead of checking
+            their status once.
+        schedule: Submission order policy (defaults to ``scheduling.policy``).
+        deadline: Seconds from now, for the ``deadline`` policy.
+        tier: ``final`` or ``draft`` (cheaper mode, own status and output dir).
+        transport: Alternative HTTP transport for the client (simulated backend,
+            cassette recorder/replayer).
+        key_pool: Shared API key pool (defaults to one built from ``api.api_keys``).
+        resubmit_unconfirmed: Resubmit scenes whose submission an interrupted
+            run left unconfirmed (it may have been paid for already).
+        elements_lock: Held while element URLs are refreshed, so concurrent
+            jobs (the serve daemon) never rewrite elements_status.json at once.
     """
     config = load_config(config_path)
     api_key = get_api_key(config_path)
     scenario = load_scenario(scenario_path)
+    routing = RoutingConstraints.from_scenario(scenario)
 
-    paths = resolve_output_paths(config, scenario_path)
-    shots_dir = paths["shots_dir"]
+    paths = resolve_output_paths(config, scenario_path, tier)
     status_path = paths["status_file"]
-    elements_status_path = paths["elements_status_file"]
     poll_interval = config["polling"]["interval_seconds"]
     max_wait = config["polling"]["max_wait_seconds"]
-    mode = config["generation"]["mode"]
-    aspect_ratio = config["generation"]["aspect_ratio"]
-    style_prefix = scenario.global_config.get("style_prefix", "")
+    mode = tier_settings(config, tier)["mode"]
 
-    status = _load_status(status_path)
+    status = load_status(status_path)
     if "scenes" not in status:
         status["scenes"] = {}
+    # Every paid submission is journaled before it is sent (not in dry runs)
+    journal = None if dry_run else SubmissionJournal(paths["journal_file"])
+    if journal is not None:
+        _reconcile_journal(journal, status, status_path)
+    keys_by_scene = _index_scene_keys(status["scenes"])
+
+    # Re-upload element images whose URLs expire before the scenes using them are submitted
+    needed_elements: set[str] = set()
+    for scene in scenario.scenes:
+        existing_keys = keys_by_scene.get(str(scene.id), [])
+        if (scene_ids is not None and int(scene.id) not in scene_ids) or (
+            existing_keys and all(status["scenes"].get(k, {}).get("completed", False) for k in existing_keys)
+        ):
+            continue
+        needed_elements.update(scene.kling_elements)
+    async with elements_lock or contextlib.nullcontext():
+        unrefreshed = await refresh_element_urls(
+            scenario_path, config_path, element_names=needed_elements, dry_run=dry_run, transport=transport,
+            key_pool=key_pool,
+        )
+    if unrefreshed and not dry_run:
+        console.print(
+            f"[yellow]Warning: {len(unrefreshed)} element URL(s) could not be refreshed and may have expired.[/yellow]"
+        )
 
     # Read element URLs from shared elements status
-    elements_status = _load_status(elements_status_path)
-    elem_status = elements_status.get("elements", {})
-    if not elem_status:
+    elements_status = load_status(paths["elements_status_file"])
+    if not elements_status.get("elements"):
         console.print(
             "[yellow]Warning: No element images found in elements_status.json. "
             "Run 'generate-elements' first for best results.[/yellow]"
         )
 
-    # Build scene tasks
-    scene_tasks: list[SceneTask] = []
-    total_scenes = 0
-    available_scene_ids = {int(s.id) for s in scenario.scenes}
+    plan = load_plan(scenario_path, config=config, tier=tier, elements_status=elements_status)
+    for warning in plan.warnings:
+        console.print(f"  [yellow]Plan warning: {warning}[/yellow]")
 
+    available_scene_ids = {int(s.id) for s in scenario.scenes}
     if scene_ids is not None:
         unknown = [s for s in scene_ids if s not in available_scene_ids]
         if unknown:
@@ -201,74 +195,279 @@ async def generate_shots(
                 f"  [red]Scene(s) {label} not found in scenario. "
                 f"Available: {available}[/red]"
             )
+        scene_ids = set(scene_ids)
+    # Only the selected scenes need to be valid
+    plan.check(None if scene_ids is None else {str(s) for s in scene_ids})
 
-    for scene in scenario.scenes:
-        if scene_ids is not None and int(scene.id) not in scene_ids:
+    # Pick the planned requests still to run
+    requests: list[PlannedRequest] = []
+    total_scenes = 0
+    requests_by_scene: dict[str, list[PlannedRequest]] = {}
+    for req in plan.requests:
+        requests_by_scene.setdefault(req.scene_id, []).append(req)
+
+    for scene_id, scene_requests in requests_by_scene.items():
+        if scene_ids is not None and int(scene_id) not in scene_ids:
             continue
         total_scenes += 1
 
         # Check if ALL shots in this scene are already completed
         # For chunked scenes, check all parts
-        existing_keys = [k for k in status["scenes"] if k == scene.id or k.startswith(f"{scene.id}_part")]
+        existing_keys = keys_by_scene.get(scene_id, [])
         all_completed = existing_keys and all(
             status["scenes"].get(k, {}).get("completed", False)
             for k in existing_keys
         )
         if all_completed:
-            console.print(f"  [dim]Skipping scene {scene.id} (already completed)[/dim]")
+            console.print(f"  [dim]Skipping scene {scene_id} (already completed)[/dim]")
             continue
+        requests.extend(scene_requests)
 
-        # Build elements for this scene from kling_elements names
-        scene_elements_map: dict[str, Element] = {}
-        for elem_name in scene.kling_elements:
-            urls = _collect_element_urls(elem_name, elements_status)
-            elem_def = scenario.elements.get(elem_name)
-            scene_elements_map[elem_name] = Element(
-                name=elem_name,
-                description=elem_def.description if elem_def else elem_name,
-                image_urls=urls,
-            )
-
-        # Build per-shot data
-        shot_dicts: list[dict] = []
-        for shot in scene.shots:
-            full_prompt = _build_shot_prompt(
-                shot_prompt=shot.prompt,
-                style_prefix=style_prefix,
-                scene_background=scene.background,
-                scene_lighting=scene.lighting,
-            )
-
-            # Strip @ElementName for elements without images
-            for ename, elem in scene_elements_map.items():
-                if not elem.image_urls:
-                    full_prompt = full_prompt.replace(f"@{ename}", ename)
-
-            shot_dicts.append({
-                "prompt": full_prompt,
-                "duration": shot.duration,
-            })
-
-        # Only keep elements that have images
-        scene_elements = [e for e in scene_elements_map.values() if e.image_urls]
-
-        # Chunk if needed
-        chunks = _chunk_scene_shots(scene.id, shot_dicts, scene_elements)
-        scene_tasks.extend(chunks)
-
-    if not scene_tasks:
+    if not requests:
         console.print("[green]All scenes already generated.[/green]")
         return
 
     console.print(
         f"\n[bold]{'[DRY RUN] Would submit' if dry_run else 'Processing'} "
-        f"{len(scene_tasks)} scene task(s) "
-        f"for {total_scenes} scene(s)...[/bold]\n"
+        f"{len(requests)} {tier} scene task(s) ({mode}) "
+        f"for {total_scenes} scene(s), plan {plan.fingerprint}...[/bold]\n"
     )
 
-    async with KieClient(api_key=api_key, base_url=config["api"]["base_url"], dry_run=dry_run) as client:
-        # Phase 1: Submit multi-shot tasks
-        submitted: list[tuple[str, str, str]] = []  # (status_key, task_id, filename)
+    poll_scheduler = build_poll_scheduler(config, paths["poll_history_file"])
+    if not dry_run:
+        enforce_budget(config)
+
+    # Order submissions by the scheduling policy
+    scheduling = config.get("scheduling", {})
+    policy = schedule or scheduling.get("policy", "yaml")
+    max_concurrent = scheduling.get("max_concurrent_tasks", 0)
+    fallback_rate = scheduling.get("fallback_seconds_per_video_second", 20)
+    if key_pool is None:
+        key_pool = build_key_pool(config)
+    pool_limited = False
+    if key_pool is not None and key_pool.capacity and (not max_concurrent or key_pool.capacity < max_concurrent):
+        # Every key is capped, so never hold more tasks than the keys allow together
+        max_concurrent = key_pool.capacity
+        pool_limited = True
+    if max_concurrent and not wait and not dry_run:
+        console.print(f"[dim]Concurrency limit of {max_concurrent} task(s) in force; waiting for tasks to finish.[/dim]")
+        wait = True
+
+    def estimate_seconds(req: PlannedRequest) -> float:
+        est = poll_scheduler.estimate(req.schedule_key()) if poll_scheduler else None
+        return est[0] if est else req.total_duration * fallback_rate
+
+    requests = order_scene_tasks(
+        requests,
+        policy,
+        scene_of=lambda t: t.scene_id,
+        estimate=estimate_seconds,
+        priorities={s.id: s.priority for s in scenario.scenes},
+        concurrency=max_concurrent,
+        deadline=deadline,
+    )
+    if policy != "yaml":
+        order = list(dict.fromkeys(t.scene_id for t in requests))
+        console.print(f"[dim]Schedule '{policy}': {', '.join(order)}[/dim]")
+
+    retry_policy = RetryPolicy.from_config(config)
+    retry_budget = RetryBudget(retry_policy.max_retry_credits)
+    run_attempts: dict[str, int] = {}  # status_key -> attempts made in this run
+    # Status is committed in batches. A submission made between commits is
+    # already in the synced submission journal, so a crash loses no task ID
+    # (the next run recovers it); a lost check result only means re-checking.
+    status_batcher = StatusBatcher(status_path, status)
+
+    async with KieClient(
+        api_key=api_key,
+        base_url=config["api"]["base_url"],
+        dry_run=dry_run,
+        poll_scheduler=poll_scheduler,
+        key_pool=key_pool,
+        transport=transport,
+        batch_concurrency=config["api"].get("batch_concurrency", 4),
+        status_cache=build_status_cache(config, paths["task_status_dir"]),
+    ) as client, build_storage(config) as storage, open_providers(
+        config, routing, client, transport=transport, dry_run=dry_run,
+    ) as providers:
+        router = build_router(config, providers, key_pool.capacity if key_pool is not None else 0)
+        if pool_limited and len(providers) > 1:
+            # The key pool only caps KIE; other providers add their own slots
+            extra = [p.max_concurrent for n, p in router.providers.items() if n != "kie"]
+            max_concurrent = 0 if 0 in extra else max_concurrent + sum(extra)
+
+        async def submit(req: PlannedRequest) -> str | None:
+            """Route and submit one planned request, recording the attempt in status."""
+            skey = req.key
+            attempts = status["scenes"].get(skey, {}).get("attempts", [])
+            run_attempts[skey] = run_attempts.get(skey, 0) + 1
+            name = intent = None
+            try:
+                name = router.choose(req.total_duration, bool(req.elements), routing.candidates(req))
+                if journal is not None:
+                    intent = journal.intent(skey, req.fingerprint, name, client.clock())
+                task_id = await providers[name].submit_task(req.payload)
+            except (KieApiError, ValueError) as exc:
+                # Without a status code or body (a timeout, a dropped connection)
+                # the request may have reached the API and created a task
+                unconfirmed = isinstance(exc, KieApiError) and exc.status_code is None and exc.body is None
+                if intent is not None and not unconfirmed:
+                    # Rejected before or by the API, so no task was created
+                    journal.failed(intent)
+                if name is not None and getattr(exc, "status_code", None) == 429:
+                    router.throttled(name)
+                state = "unconfirmed" if unconfirmed else "submit_failed"
+                if unconfirmed:
+                    console.print(
+                        f"  [yellow]Scene {skey}: submission may have created a task on {name} ({exc}); "
+                        f"not resubmitting. Check for it, then re-run with --resubmit-unconfirmed[/yellow]"
+                    )
+                else:
+                    console.print(f"  [red]Failed to submit scene {skey}: {exc}[/red]")
+                status["scenes"][skey] = {
+                    "status": state,
+                    "completed": False,
+                    "error": str(exc),
+                    "attempts": attempts + [{
+                        "status": state,
+                        "error": str(exc),
+                        "status_code": getattr(exc, "status_code", None),
+                        "retryable": retry_policy.submission_is_transient(exc),
+                        "at": client.clock(),
+                    }],
+                }
+                status_batcher.mark()
+                return None
+
+            router.submitted(name)
+            submitted_at = client.clock()
+            if intent is not None:
+                journal.submitted(intent, task_id, providers[name].task_owner(task_id), submitted_at)
+            status["scenes"][skey] = {
+                "task_id": task_id,
+                "status": "submitted",
+                "submitted_at": submitted_at,
+                "completed": False,
+                "url": None,
+                "local_path": None,
+                "shot_count": req.shot_count,
+                "elements": req.elements,
+                "fingerprint": req.fingerprint,
+                "provider": name,
+                "api_key": providers[name].task_owner(task_id),
+                "attempts": attempts + [{"task_id": task_id, "status": "submitted", "at": submitted_at}],
+            }
+            status_batcher.mark()
+            via = f" via {name}" if len(providers) > 1 else ""
+            console.print(
+                f"  [blue]Submitted scene {skey} ({req.shot_count} shots){via} -> {task_id}[/blue]"
+            )
+            return task_id
+
+        async def check(req: PlannedRequest, task_id: str) -> str | None:
+            """Check one task; return the error message if generation failed."""
+            skey, local_path = req.key, Path(req.output_path)
+            failure: str | None = None
+            entry = status["scenes"][skey]
+            name = entry.get("provider", "kie")
+            provider = providers.get(name)
+            if provider is None:
+                console.print(f"  [yellow]Scene {skey}: task is on {name}, which is not configured; re-run with it[/yellow]")
+                return None
+            try:
+                if wait:
+                    result = await provider.wait_for_task(task_id, poll_interval=poll_interval, max_wait=max_wait)
+                else:
+                    result = await provider.get_task_status(task_id)
+                if result.is_done:
+                    elapsed = client.clock() - entry["submitted_at"] if entry.get("submitted_at") else None
+                    router.finished(name, elapsed if result.is_success else None, req.total_duration)
+
+                if result.is_success and result.output_url:
+                    console.print(f"  [cyan]Scene {skey}: ready, downloading...[/cyan]")
+                    async with storage.open_write(local_path) as out:
+                        await provider.download_to(result.output_url, out.write)
+
+                    entry.pop("error", None)  # from an earlier check that could not finish
+                    entry.update({
+                        "status": "completed",
+                        "completed": True,
+                        "url": result.output_url,
+                        "local_path": str(local_path),
+                    })
+                    console.print(f"  [green]Scene {skey}: saved -> {local_path}[/green]")
+                elif result.is_done:
+                    failure = result.error or "Unknown error"
+                    entry.update({
+                        "status": "failed",
+                        "completed": False,
+                        "error": failure,
+                    })
+                    console.print(f"  [red]Scene {skey}: failed — {failure}[/red]")
+                else:
+                    console.print(f"  [yellow]Scene {skey}: still {result.status}, re-run later to check[/yellow]")
+
+            except TaskTimeoutError:
+                console.print(f"  [yellow]Scene {skey}: still running after {max_wait}s, re-run later to check[/yellow]")
+
+            except (KieApiError, StorageError) as exc:
+                # Checking or saving failed, not the task: it stays submitted, so
+                # the next run checks it again instead of paying for a new one
+                entry["error"] = str(exc)
+                console.print(f"  [yellow]Scene {skey}: could not check the task ({exc}), re-run later to check[/yellow]")
+
+            if entry.get("attempts") and entry["status"] in ("completed", "failed"):
+                entry["attempts"][-1].update({"status": entry["status"], "error": entry.get("error")})
+            status_batcher.mark()
+            return failure
+
+        async def settle(req: PlannedRequest, task_id: str | None) -> None:
+            """Check a scene task, resubmitting transient failures per the retry policy."""
+            skey = req.key
+            while True:
+                if task_id is not None:
+                    error = await check(req, task_id)
+                    if error is None:
+                        return
+                    transient = retry_policy.is_transient(error)
+                else:
+                    # submit() recorded whether the API clearly rejected the request
+                    # in a way worth retrying; an unconfirmed one may have a task
+                    transient = (status["scenes"][skey].get("attempts") or [{}])[-1].get("retryable", False)
+
+                if not retry_policy.enabled or not transient:
+                    return
+                attempt = run_attempts.get(skey, 1)
+                if attempt >= retry_policy.max_attempts:
+                    console.print(f"  [red]Scene {skey}: giving up after {attempt} attempt(s)[/red]")
+                    return
+                if not retry_budget.try_spend(estimate_credits(config, mode, req.total_duration)):
+                    console.print(
+                        f"  [red]Scene {skey}: retry credit budget exhausted "
+                        f"({retry_budget.spent:.0f}/{retry_budget.max_credits:.0f}), not resubmitting[/red]"
+                    )
+                    return
+
+                delay = retry_policy.backoff(attempt)
+                console.print(
+                    f"  [yellow]Scene {skey}: resubmitting in {delay:.0f}s "
+                    f"(attempt {attempt + 1}/{retry_policy.max_attempts})[/yellow]"
+                )
+                await asyncio.sleep(delay)
+                task_id = await submit(req)
+
+        # Phase 1: Submit multi-shot tasks. With a concurrency limit each task
+        # holds a slot until it settles, so it is checked as soon as submitted.
+        pending: list[tuple[PlannedRequest, str | None]] = []  # (request, task_id)
+        to_submit: list[PlannedRequest] = []
+        slots = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+        running: list[asyncio.Task] = []
+
+        async def settle_in_slot(item: tuple[PlannedRequest, str | None]) -> None:
+            try:
+                await settle(*item)
+            finally:
+                slots.release()
 
         with Progress(
             SpinnerColumn(),
@@ -278,115 +477,114 @@ async def generate_shots(
             console=console,
         ) as progress:
             submit_bar = progress.add_task(
-                "Processing scenes...", total=len(scene_tasks)
+                "Processing scenes...", total=len(requests)
             )
 
-            for stask in scene_tasks:
-                # Figure out total parts for this scene
-                total_parts = sum(1 for t in scene_tasks if t.scene_id == stask.scene_id)
-                skey = _scene_status_key(stask.scene_id, stask.part, total_parts)
-                fname = _scene_filename(stask.scene_id, stask.part, total_parts)
+            for req in requests:
+                skey = req.key
+
+                if slots is not None:
+                    await slots.acquire()
 
                 # Resume: reuse existing task_id if previously submitted
                 existing = status["scenes"].get(skey, {})
                 existing_task_id = existing.get("task_id")
                 existing_status = existing.get("status")
                 if existing_task_id and existing_status in ("submitted", "processing"):
-                    submitted.append((skey, existing_task_id, fname))
+                    name = existing.get("provider", "kie")
+                    if name in providers:
+                        providers[name].track_task(
+                            existing_task_id, req.schedule_key(), existing.get("submitted_at"), owner=existing.get("api_key"),
+                        )
+                        router.submitted(name)
+                    run_attempts[skey] = 1
+                    task_id = existing_task_id
                     progress.update(submit_bar, advance=1)
                     console.print(
                         f"  [cyan]Scene {skey}: already submitted (task {existing_task_id}), will check status[/cyan]"
                     )
-                    continue
-
-                try:
-                    task_id = await client.create_multi_shot_task(
-                        shots=stask.shots,
-                        elements=stask.elements if stask.elements else None,
-                        mode=mode,
-                        aspect_ratio=aspect_ratio,
-                    )
-                    submitted.append((skey, task_id, fname))
-
-                    status["scenes"][skey] = {
-                        "task_id": task_id,
-                        "status": "submitted",
-                        "completed": False,
-                        "url": None,
-                        "local_path": None,
-                        "shot_count": len(stask.shots),
-                        "elements": [e.name for e in stask.elements],
-                    }
-                    _save_status(status_path, status)
-
+                elif existing_status == "unconfirmed" and not resubmit_unconfirmed:
+                    if slots is not None:
+                        slots.release()
                     progress.update(submit_bar, advance=1)
                     console.print(
-                        f"  [blue]Submitted scene {skey} ({len(stask.shots)} shots) -> {task_id}[/blue]"
+                        f"  [yellow]Scene {skey}: not resubmitting an unconfirmed submission; check for the task "
+                        f"on {existing.get('provider', 'kie')}, then re-run with --resubmit-unconfirmed[/yellow]"
                     )
-
-                    await asyncio.sleep(0.5)
-
-                except DryRunInterrupt:
-                    progress.update(submit_bar, advance=1)
                     continue
+                elif slots is None:
+                    to_submit.append(req)
+                    continue
+                else:
+                    try:
+                        task_id = await submit(req)
+                    except DryRunInterrupt:
+                        if slots is not None:
+                            slots.release()
+                        progress.update(submit_bar, advance=1)
+                        continue
+                    if task_id is not None:
+                        progress.update(submit_bar, advance=1)
+                        await asyncio.sleep(0.5)
+
+                item = (req, task_id)
+                if slots is not None:
+                    running.append(asyncio.create_task(settle_in_slot(item)))
+                else:
+                    pending.append(item)
 
-                except (KieApiError, ValueError) as exc:
-                    console.print(f"  [red]Failed to submit scene {skey}: {exc}[/red]")
-                    status["scenes"][skey] = {
-                        "status": "submit_failed",
-                        "completed": False,
-                        "error": str(exc),
-                    }
-                    _save_status(status_path, status)
+            # Without a concurrency limit, new tasks are submitted in parallel batches
+            try:
+                async with contextlib.aclosing(
+                    fan_out(to_submit, submit, concurrency=client.batch_concurrency)
+                ) as results:
+                    async for req, task_id, error in results:
+                        if isinstance(error, DryRunInterrupt):
+                            progress.update(submit_bar, advance=1)
+                            continue
+                        if error is not None:
+                            raise error
+                        if task_id is not None:
+                            progress.update(submit_bar, advance=1)
+                        pending.append((req, task_id))
+            finally:
+                # Commit what the other submissions recorded, even if one raised
+                status_batcher.flush()
 
             if dry_run:
                 console.print("[bold yellow]Dry run complete. No API calls were made.[/bold yellow]")
                 return
 
-        # Phase 2: Check status of all submitted tasks (no waiting)
+        # Phase 2: Check status of all submitted tasks (or wait for them with --wait)
         # Outside Progress block so logging doesn't interfere with the progress bar.
-        console.print(f"\n[bold]Checking status of {len(submitted)} task(s)...[/bold]\n")
-        for skey, task_id, fname in submitted:
-            try:
-                result = await client.get_task_status(task_id)
-
-                if result.is_success and result.output_url:
-                    console.print(f"  [cyan]Scene {skey}: ready, downloading...[/cyan]")
-                    local_path = shots_dir / fname
-                    await client.download_file(result.output_url, local_path)
-
-                    status["scenes"][skey].update({
-                        "status": "completed",
-                        "completed": True,
-                        "url": result.output_url,
-                        "local_path": str(local_path),
-                    })
-                    console.print(f"  [green]Scene {skey}: saved -> {local_path}[/green]")
-                elif result.is_done:
-                    error_msg = result.error or "Unknown error"
-                    status["scenes"][skey].update({
-                        "status": "failed",
-                        "completed": False,
-                        "error": error_msg,
-                    })
-                    console.print(f"  [red]Scene {skey}: failed — {error_msg}[/red]")
-                else:
-                    console.print(f"  [yellow]Scene {skey}: still {result.status}, re-run later to check[/yellow]")
+        verb = "Waiting for" if wait else "Checking status of"
+        console.print(f"\n[bold]{verb} {len(pending) + len(running)} task(s)...[/bold]\n")
 
-            except KieApiError as exc:
-                status["scenes"][skey].update({
-                    "status": "failed",
-                    "completed": False,
-                    "error": str(exc),
-                })
-                console.print(f"  [red]Scene {skey}: API error — {exc}[/red]")
+        try:
+            await asyncio.gather(*running, *(settle(*item) for item in pending))
+        finally:
+            status_batcher.flush()
 
-            _save_status(status_path, status)
+    if key_pool is not None:
+        for row in key_pool.usage():
+            console.print(
+                f"[dim]API key {row['name']}: {row['submitted']} submitted, "
+                f"{row['throttled']} throttled, {row['in_flight']} still in flight[/dim]"
+            )
+    if len(router.providers) > 1:
+        for row in router.usage():
+            console.print(
+                f"[dim]Provider {row['name']}: {row['submitted']} submitted, {row['completed']} completed, "
+                f"~{row['seconds_per_video_second']}s render per video second[/dim]"
+            )
 
     # Summary
     completed = sum(1 for s in status["scenes"].values() if s.get("completed"))
     total = len(status["scenes"])
-    failed = sum(1 for s in status["scenes"].values() if s.get("status") == "failed")
+    failed_keys = [
+        k for k, s in status["scenes"].items() if s.get("status") in ("failed", "submit_failed", "unconfirmed")
+    ]
+    failed = len(failed_keys)
     in_progress = total - completed - failed
 
     if completed == total:
@@ -400,3 +598,66 @@ async def generate_shots(
             f"{completed}/{total} completed, {in_progress} still processing, {failed} failed. "
             f"Re-run to check status.[/bold yellow]"
         )
+    for key in failed_keys:
+        entry = status["scenes"][key]
+        attempts = len(entry.get("attempts", [])) or 1
+        console.print(f"  [red]Scene {key}: {entry.get('status')} after {attempts} attempt(s) — {entry.get('error')}[/red]")
+
+
+async def promote_scenes(
+    scenario_path: str,
+    scene_ids: list[int],
+    config_path: str | None = None,
+    wait: bool = False,
+    transport: httpx.AsyncBaseTransport | None = None,
+    key_pool: KeyPool | None = None,
+    elements_lock: asyncio.Lock | None = None,
+) -> None:
+    """Re-render approved draft scenes in the final tier.
+
+    Marks the scenes as approved in the draft status and generates them
+    with the final-tier settings. Scenes without a completed draft are
+    skipped.
+
+    Args:
+        scenario_path: Path to the scenario YAML file.
+        scene_ids: Scene IDs approved for final rendering.
+        config_path: Optional override for config.yaml path.
+        wait: Poll submitted tasks until they finish.
+        transport: Alternative HTTP transport for the client (cassette recorder/replayer).
+        key_pool: Shared API key pool (defaults to one built from ``api.api_keys``).
+        elements_lock: Passed on to :func:`generate_shots`.
+    """
+    config = load_config(config_path)
+    draft_status_path = resolve_output_paths(config, scenario_path, "draft")["status_file"]
+    draft_status = load_status(draft_status_path)
+    draft_scenes = draft_status.get("scenes", {})
+    keys_by_scene = _index_scene_keys(draft_scenes)
+
+    approved: list[int] = []
+    for scene_id in scene_ids:
+        keys = keys_by_scene.get(str(scene_id), [])
+        if not keys or not all(draft_scenes[k].get("completed") for k in keys):
+            console.print(f"  [yellow]Scene {scene_id}: no completed draft, skipping[/yellow]")
+            continue
+        for k in keys:
+            draft_scenes[k]["approved"] = True
+            draft_scenes[k]["approved_at"] = time.time()
+        approved.append(scene_id)
+
+    if not approved:
+        console.print("[yellow]Nothing to promote.[/yellow]")
+        return
+
+    save_status(draft_status_path, draft_status)
+    console.print(f"[bold]Promoting scene(s) {', '.join(str(s) for s in approved)} to final...[/bold]")
+    await generate_shots(
+        scenario_path=scenario_path,
+        config_path=config_path,
+        scene_ids=approved,
+        wait=wait,
+        tier="final",
+        transport=transport,
+        key_pool=key_pool,
+        elements_lock=elements_lock,
+    )
@@ -31,12 +31,14 @@ class Scene:
         lighting: Lighting description injected into prompts.
         kling_elements: Names of elements needed for this scene.
         shots: Ordered list of shots in this scene.
+        priority: Submission priority for the ``priority`` schedule (higher first).
     """
     id: str
     background: str = ""
     lighting: str = ""
     kling_elements: list[str] = field(default_factory=list)
     shots: list[Shot] = field(default_factory=list)
+    priority: int = 0
 
 
 @dataclass
@@ -47,7 +49,9 @@ class Scenario:
         global_config: Global settings (style_prefix, negative_prompt).
         elements: Dict of element name -> Element (populated from status file).
         scenes: Ordered list of scenes.
+        raw: The parsed YAML document, for stages that read extra fields.
     """
     global_config: dict = field(default_factory=dict)
     elements: dict[str, Element] = field(default_factory=dict)
     scenes: list[Scene] = field(default_factory=list)
+    raw: dict = field(default_factory=dict, repr=False)
@@ -0,0 +1,200 @@
+"""Element reference image optimisation before upload.
+
+Crops reference images to their subject, downscales them to the size Kling
+works with, and re-encodes them as high-quality JPEG/WebP. Processed
+variants are cached by source hash + settings, so unchanged images are
+never reprocessed, and new ones are processed across a process pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Kling rejects element images smaller than this on either side.
+_MIN_SIDE = 300
+
+
+@dataclass(frozen=True)
+class OptimizeSettings:
+    """Settings loaded from the ``elements`` config section.
+
+    Attributes:
+        enabled: Whether images are optimised before upload.
+        max_side: Longest side of the output image, in pixels.
+        format: Output format, ``jpeg`` or ``webp``.
+        quality: Encoder quality (1-100).
+        crop_to_subject: Crop away uniform/transparent margins around the subject.
+        margin: Padding kept around the subject, as a fraction of its size.
+        workers: Process pool size (0 = CPU count).
+    """
+    enabled: bool = True
+    max_side: int = 1024
+    format: str = "jpeg"
+    quality: int = 90
+    crop_to_subject: bool = True
+    margin: float = 0.08
+    workers: int = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> OptimizeSettings:
+        raw = config.get("elements", {}) or {}
+        return cls(
+            enabled=raw.get("optimize", True),
+            max_side=raw.get("max_side", 1024),
+            format=raw.get("format", "jpeg").lower(),
+            quality=raw.get("quality", 90),
+            crop_to_subject=raw.get("crop_to_subject", True),
+            margin=raw.get("margin", 0.08),
+            workers=raw.get("workers", 0),
+        )
+
+    def fingerprint(self) -> str:
+        """Stable digest of the settings that affect the output bytes."""
+        data = {k: v for k, v in asdict(self).items() if k not in ("enabled", "workers")}
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _subject_bbox(image, margin: float) -> tuple[int, int, int, int] | None:
+    """Bounding box of the subject: opaque pixels, or pixels unlike the corner colour."""
+    from PIL import Image, ImageChops
+
+    if image.mode in ("RGBA", "LA"):
+        bbox = image.getchannel("A").point(lambda a: 255 if a > 16 else 0).getbbox()
+    else:
+        rgb = image.convert("RGB")
+        background = rgb.getpixel((0, 0))
+        diff = ImageChops.difference(rgb, Image.new("RGB", rgb.size, background))
+        bbox = diff.convert("L").point(lambda d: 255 if d > 24 else 0).getbbox()
+    if not bbox:
+        return None
+
+    left, top, right, bottom = bbox
+    pad_x = int((right - left) * margin)
+    pad_y = int((bottom - top) * margin)
+    width, height = image.size
+    left, top = max(0, left - pad_x), max(0, top - pad_y)
+    right, bottom = min(width, right + pad_x), min(height, bottom + pad_y)
+    if right - left < _MIN_SIDE or bottom - top < _MIN_SIDE:
+        return None
+    return left, top, right, bottom
+
+
+def optimize_image(source: str, dest: str, settings: OptimizeSettings) -> dict:
+    """Crop, downscale and re-encode one image (runs in a worker process).
+
+    Returns a dict with the source/output sizes and dimensions.
+    """
+    from PIL import Image
+
+    with Image.open(source) as image:
+        image.load()
+        original_size = image.size
+
+        if settings.crop_to_subject:
+            bbox = _subject_bbox(image, settings.margin)
+            if bbox and bbox != (0, 0, *image.size):
+                image = image.crop(bbox)
+
+        if image.mode in ("RGBA", "LA", "P"):
+            rgba = image.convert("RGBA")
+            flattened = Image.new("RGB", rgba.size, (255, 255, 255))
+            flattened.paste(rgba, mask=rgba.getchannel("A"))
+            image = flattened
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        longest, shortest = max(image.size), min(image.size)
+        # One scale for both sides keeps the aspect ratio; the short side stays >= _MIN_SIDE
+        scale = max(settings.max_side / longest, _MIN_SIDE / shortest)
+        if scale < 1:
+            new_size = (round(image.width * scale), round(image.height * scale))
+            image = image.resize(new_size, Image.LANCZOS)
+
+        tmp = f"{dest}.tmp"
+        if settings.format == "webp":
+            image.save(tmp, "WEBP", quality=settings.quality, method=6)
+        else:
+            image.save(tmp, "JPEG", quality=settings.quality, optimize=True, progressive=True, subsampling=0)
+        os.replace(tmp, dest)
+
+    return {
+        "source_bytes": os.path.getsize(source),
+        "output_bytes": os.path.getsize(dest),
+        "source_dims": list(original_size),
+        "output_dims": list(image.size),
+    }
+
+
+async def optimize_elements(
+    images: list[Path],
+    cache_dir: Path,
+    settings: OptimizeSettings,
+    executor: Executor | None = None,
+) -> dict[Path, Path]:
+    """Return {source image: optimised variant}, processing cache misses in parallel.
+
+    Falls back to the source images unchanged when optimisation is disabled
+    or Pillow is not installed. Misses run on ``executor`` when given (a
+    long-lived pool, e.g. the serve daemon's), otherwise on a process pool
+    started for this call.
+    """
+    if not settings.enabled or not images:
+        return {p: p for p in images}
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        logger.warning("Pillow is not installed; uploading element images unoptimised")
+        return {p: p for p in images}
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    ext = "webp" if settings.format == "webp" else "jpg"
+    suffix = settings.fingerprint()
+
+    result: dict[Path, Path] = {}
+    misses: list[tuple[Path, Path]] = []
+    for src in images:
+        dest = cache_dir / f"{_file_sha256(src)[:24]}_{suffix}.{ext}"
+        result[src] = dest
+        if not dest.exists():
+            misses.append((src, dest))
+
+    if misses:
+        loop = asyncio.get_running_loop()
+        own_pool = None
+        if executor is None:
+            workers = settings.workers or os.cpu_count() or 1
+            executor = own_pool = ProcessPoolExecutor(max_workers=min(workers, len(misses)))
+        try:
+            stats = await asyncio.gather(*(
+                loop.run_in_executor(executor, optimize_image, str(src), str(dest), settings)
+                for src, dest in misses
+            ))
+        finally:
+            if own_pool is not None:
+                own_pool.shutdown()
+        for (src, dest), info in zip(misses, stats):
+            logger.info(
+                "Optimised %s: %.0f KB %s -> %.0f KB %s",
+                src.name, info["source_bytes"] / 1024, info["source_dims"],
+                info["output_bytes"] / 1024, info["output_dims"],
+            )
+
+    logger.info("Element images: %d optimised, %d from cache", len(misses), len(images) - len(misses))
+    return result
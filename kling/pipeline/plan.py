@@ -0,0 +1,392 @@
+"""Compiled execution plans.
+
+A plan is built once from the scenario, the tier settings and the element
+URLs in elements_status.json. It lists every video request the scenario
+needs: the exact API payload and its fingerprint, the element views it
+depends on, the status key and output file, plus the limits it was
+validated against. Commands execute against the plan instead of
+rebuilding prompts and chunks themselves, and payload errors are reported
+at compile time rather than as ``submit_failed``. A scene with errors is
+kept out of the plan's requests and blocks only the commands that select
+it.
+
+A plan file is never modified in place. When any input changes, the new
+plan is written next to it as ``plan-<sources digest>.json``; only the
+``compile`` command rewrites ``plan.json``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from pipeline.auth import load_config, resolve_output_paths, tier_settings
+from pipeline.client import build_multi_shot_payload, schedule_key
+from pipeline.models import Element
+from pipeline.scenario_parser import load_scenario
+from pipeline.status import load_status, save_status
+
+logger = logging.getLogger(__name__)
+
+PLAN_VERSION = 2
+
+# Limits enforced by the multi-shot API (see docs/kling3-guide.md).
+LIMITS = {
+    "max_shots_per_request": 6,
+    "max_duration_per_request": 15,
+    "min_shot_duration": 1,
+    "max_shot_duration": 12,
+    "max_prompt_chars": 500,
+    "min_element_images": 2,
+    "max_element_images": 4,
+}
+
+
+def _digest(data: object) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:16]
+
+
+def _index_element_views(status: dict) -> dict[str, list[tuple[str, str]]]:
+    """Map each element name to (view key, CDN URL) of its completed views."""
+    index: dict[str, list[tuple[str, str]]] = {}
+    for element_name, elem_status in status.get("elements", {}).items():
+        views = elem_status.get("views", {})
+        completed = []
+        for view_key in sorted(views.keys()):
+            view = views[view_key]
+            url = view.get("url")
+            if url and view.get("status") == "completed":
+                completed.append((view_key, url))
+        index[element_name] = completed
+    return index
+
+
+def _build_shot_prompt(
+    shot_prompt: str,
+    style_prefix: str,
+    scene_background: str,
+    scene_lighting: str,
+) -> str:
+    """Build the full prompt for a shot by combining components."""
+    parts = []
+    if style_prefix:
+        parts.append(style_prefix)
+    continuity = []
+    if scene_background:
+        continuity.append(f"Setting: {scene_background}")
+    if scene_lighting:
+        continuity.append(f"Lighting: {scene_lighting}")
+    if continuity:
+        parts.append(". ".join(continuity))
+    parts.append(shot_prompt)
+    return ". ".join(parts)
+
+
+def _chunk_shots(shots: list[dict]) -> list[list[dict]]:
+    """Split scene shots into chunks that fit multi-shot limits."""
+    chunks: list[list[dict]] = []
+    current: list[dict] = []
+    current_duration = 0
+
+    for shot in shots:
+        dur = shot["duration"]
+        if current and (
+            len(current) >= LIMITS["max_shots_per_request"]
+            or current_duration + dur > LIMITS["max_duration_per_request"]
+        ):
+            chunks.append(current)
+            current = []
+            current_duration = 0
+        current.append(shot)
+        current_duration += dur
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def scene_status_key(scene_id: str, part: int, total_parts: int) -> str:
+    """Build the key used in status['scenes']."""
+    if total_parts <= 1:
+        return scene_id
+    return f"{scene_id}_part{part}"
+
+
+def scene_filename(scene_id: str, part: int, total_parts: int) -> str:
+    """Build the output filename for a scene chunk."""
+    if total_parts <= 1:
+        return f"scene_{scene_id}.mp4"
+    return f"scene_{scene_id}_part{part}.mp4"
+
+
+@dataclass
+class PlannedRequest:
+    """One multi-shot request (a scene, or one chunk of a long scene)."""
+    key: str  # status['scenes'] key
+    scene_id: str
+    part: int  # 0-based chunk index (0 if no chunking needed)
+    total_parts: int
+    output_path: str
+    payload: dict
+    fingerprint: str
+    depends_on: list[str] = field(default_factory=list)  # "Element/view_key"
+    elements: list[str] = field(default_factory=list)
+    shot_count: int = 0
+    total_duration: int = 0
+
+    def schedule_key(self) -> str:
+        """Poll-history key for this request's task shape."""
+        return schedule_key(self.payload["model"], self.payload["input"]["mode"], self.total_duration, self.shot_count)
+
+
+@dataclass
+class Plan:
+    """An immutable, compiled list of requests for one scenario and tier."""
+    scenario: str
+    tier: str
+    mode: str
+    sources: dict  # fingerprints of the inputs the plan was compiled from
+    limits: dict
+    requests: list[PlannedRequest]
+    warnings: list[str] = field(default_factory=list)
+    errors: dict[str, list[str]] = field(default_factory=dict)  # scene ID -> why it could not be planned
+    fingerprint: str = ""
+    compiled_at: float = 0.0
+    version: int = PLAN_VERSION
+
+    def for_scenes(self, scene_ids: set[str] | None) -> list[PlannedRequest]:
+        """Requests for the given scene IDs (all if None), in scenario order."""
+        if scene_ids is None:
+            return list(self.requests)
+        return [r for r in self.requests if r.scene_id in scene_ids]
+
+    def by_key(self) -> dict[str, PlannedRequest]:
+        return {r.key: r for r in self.requests}
+
+    def check(self, scene_ids: set[str] | None = None) -> None:
+        """Raise ValueError if any of the given scenes (all if None) could not be planned."""
+        problems = [
+            problem for scene_id, scene_errors in self.errors.items()
+            if scene_ids is None or scene_id in scene_ids
+            for problem in scene_errors
+        ]
+        if problems:
+            raise ValueError(f"Plan has {len(problems)} invalid request(s):\n  " + "\n  ".join(problems))
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Plan:
+        data = dict(data)
+        data["requests"] = [PlannedRequest(**r) for r in data.get("requests", [])]
+        return cls(**data)
+
+
+def plan_sources(config: dict, scenario_path: str, tier: str, elements_status: dict) -> dict:
+    """Fingerprint every input that affects the compiled requests."""
+    settings = tier_settings(config, tier)
+    return {
+        "scenario_sha256": hashlib.sha256(Path(scenario_path).read_bytes()).hexdigest(),
+        "settings": _digest({
+            **settings,
+            "aspect_ratio": config["generation"]["aspect_ratio"],
+            "sound": config["generation"].get("sound", True),
+        }),
+        "elements": _digest(_index_element_views(elements_status)),
+    }
+
+
+def compile_plan(scenario_path: str, config: dict, tier: str = "final", elements_status: dict | None = None) -> Plan:
+    """Compile the execution plan for a scenario.
+
+    Args:
+        scenario_path: Path to the scenario YAML file.
+        config: Loaded config dict.
+        tier: ``final`` or ``draft``.
+        elements_status: Parsed elements_status.json (loaded if None).
+
+    Scenes with a request that breaks an API limit get no requests; their
+    problems are listed in ``Plan.errors`` (see ``Plan.check``).
+    """
+    scenario = load_scenario(scenario_path)
+    paths = resolve_output_paths(config, scenario_path, tier)
+    if elements_status is None:
+        elements_status = load_status(paths["elements_status_file"])
+
+    settings = tier_settings(config, tier)
+    mode = settings["mode"]
+    max_shot_duration = settings["max_shot_duration"]
+    aspect_ratio = config["generation"]["aspect_ratio"]
+    sound = config["generation"].get("sound", True)
+    style_prefix = scenario.global_config.get("style_prefix", "")
+    element_views = _index_element_views(elements_status)
+
+    requests: list[PlannedRequest] = []
+    errors: dict[str, list[str]] = {}
+    warnings: list[str] = []
+
+    for scene in scenario.scenes:
+        scene_errors: list[str] = []
+        # Build elements for this scene from kling_elements names
+        scene_elements: list[Element] = []
+        depends_on: list[str] = []
+        missing: list[str] = []
+        for elem_name in scene.kling_elements:
+            views = element_views.get(elem_name, [])
+            if not views:
+                missing.append(elem_name)
+                continue
+            elem_def = scenario.elements.get(elem_name)
+            scene_elements.append(Element(
+                name=elem_name,
+                description=elem_def.description if elem_def else elem_name,
+                image_urls=[url for _, url in views],
+            ))
+            depends_on.extend(f"{elem_name}/{view_key}" for view_key, _ in views)
+            if not LIMITS["min_element_images"] <= len(views) <= LIMITS["max_element_images"]:
+                warnings.append(
+                    f"scene {scene.id}: element {elem_name} has {len(views)} image(s), "
+                    f"expected {LIMITS['min_element_images']}-{LIMITS['max_element_images']}"
+                )
+
+        # Build per-shot data
+        shot_dicts: list[dict] = []
+        for i, shot in enumerate(scene.shots):
+            full_prompt = _build_shot_prompt(
+                shot_prompt=shot.prompt,
+                style_prefix=style_prefix,
+                scene_background=scene.background,
+                scene_lighting=scene.lighting,
+            )
+            # Strip @ElementName for elements without images
+            for ename in missing:
+                full_prompt = full_prompt.replace(f"@{ename}", ename)
+            if len(full_prompt) > LIMITS["max_prompt_chars"]:
+                warnings.append(
+                    f"scene {scene.id} shot {i + 1}: prompt is {len(full_prompt)} chars "
+                    f"(limit {LIMITS['max_prompt_chars']})"
+                )
+
+            duration = shot.duration
+            if max_shot_duration:
+                duration = min(duration, max_shot_duration)
+            if not LIMITS["min_shot_duration"] <= duration <= LIMITS["max_shot_duration"]:
+                scene_errors.append(f"scene {scene.id} shot {i + 1}: duration {duration}s is out of range")
+            shot_dicts.append({"prompt": full_prompt, "duration": duration})
+
+        if not shot_dicts:
+            scene_errors.append(f"scene {scene.id}: no shots")
+
+        chunks = _chunk_shots(shot_dicts)
+        scene_requests: list[PlannedRequest] = []
+        for part, shots in enumerate(chunks):
+            key = scene_status_key(scene.id, part, len(chunks))
+            try:
+                payload = build_multi_shot_payload(
+                    shots, scene_elements, mode=mode, aspect_ratio=aspect_ratio, sound=sound,
+                )
+            except ValueError as exc:
+                scene_errors.append(f"scene {key}: {exc}")
+                continue
+            scene_requests.append(PlannedRequest(
+                key=key,
+                scene_id=scene.id,
+                part=part,
+                total_parts=len(chunks),
+                output_path=str(paths["shots_dir"] / scene_filename(scene.id, part, len(chunks))),
+                payload=payload,
+                fingerprint=_digest(payload),
+                depends_on=list(depends_on),
+                elements=[e.name for e in scene_elements],
+                shot_count=len(shots),
+                total_duration=sum(s["duration"] for s in shots),
+            ))
+
+        # A scene is planned whole or not at all: a missing part would shift the cut
+        if scene_errors:
+            errors[scene.id] = scene_errors
+        else:
+            requests.extend(scene_requests)
+
+    return Plan(
+        scenario=str(scenario_path),
+        tier=tier,
+        mode=mode,
+        sources=plan_sources(config, scenario_path, tier, elements_status),
+        limits=dict(LIMITS),
+        requests=requests,
+        warnings=warnings,
+        errors=errors,
+        fingerprint=_digest([r.fingerprint for r in requests]),
+        compiled_at=time.time(),
+    )
+
+
+def write_plan(plan: Plan, plan_path: Path) -> None:
+    """Write a plan file atomically."""
+    save_status(plan_path, plan.to_dict())
+
+
+def read_plan(plan_path: Path) -> Plan | None:
+    """Read a plan file; None if it is missing or from another plan version."""
+    data = load_status(plan_path)
+    if not data or data.get("version") != PLAN_VERSION:
+        return None
+    return Plan.from_dict(data)
+
+
+def versioned_plan_file(plan_file: Path, sources: dict) -> Path:
+    """Where the plan compiled from ``sources`` goes when ``plan_file`` holds another."""
+    return plan_file.with_name(f"{plan_file.stem}-{_digest(sources)}{plan_file.suffix}")
+
+
+def find_plan(plan_file: Path, sources: dict) -> Plan | None:
+    """The plan on disk compiled from ``sources``, or None if there is none yet."""
+    for path in (plan_file, versioned_plan_file(plan_file, sources)):
+        plan = read_plan(path)
+        if plan is not None and plan.sources == sources:
+            return plan
+    return None
+
+
+def load_plan(
+    scenario_path: str,
+    config_path: str | None = None,
+    tier: str = "final",
+    config: dict | None = None,
+    elements_status: dict | None = None,
+) -> Plan:
+    """Return the plan for the current inputs, compiling it if there is none yet.
+
+    A plan compiled because the inputs changed is written to a versioned
+    file next to ``plan.json``, which is left as it was.
+
+    Args:
+        scenario_path: Path to the scenario YAML file.
+        config_path: Optional override for config.yaml path.
+        tier: ``final`` or ``draft``.
+        config: Already-loaded config (loaded from ``config_path`` if None).
+        elements_status: Already-loaded elements status (read if None).
+    """
+    config = config if config is not None else load_config(config_path)
+    paths = resolve_output_paths(config, scenario_path, tier)
+    if elements_status is None:
+        elements_status = load_status(paths["elements_status_file"])
+
+    sources = plan_sources(config, scenario_path, tier, elements_status)
+    plan = find_plan(paths["plan_file"], sources)
+    if plan is not None:
+        return plan
+
+    plan = compile_plan(scenario_path, config, tier, elements_status)
+    plan_file = paths["plan_file"]
+    if plan_file.exists():
+        plan_file = versioned_plan_file(plan_file, sources)
+    write_plan(plan, plan_file)
+    logger.info("Compiled plan %s (%d requests) -> %s", plan.fingerprint, len(plan.requests), plan_file)
+    return plan
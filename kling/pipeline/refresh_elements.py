@@ -0,0 +1,177 @@
+"""Refresh element URLs before they expire.
+
+KIE file URLs expire a few days after upload, and a task submitted with an
+expired element URL fails or renders without its references (and is still
+charged). Every element view records when its URL was issued
+(``uploaded_at``); before scenes are submitted, views whose URL expires
+within the safety margin are re-uploaded concurrently from their local
+files and the new URLs are written back to elements_status.json.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+from rich.console import Console
+
+from pipeline.auth import get_api_key, load_config, resolve_output_paths
+from pipeline.client import KieClient, KieApiError, KeyPool, build_key_pool
+from pipeline.scenario_parser import load_scenario
+from pipeline.status import load_status, save_status
+
+logger = logging.getLogger(__name__)
+console = Console()
+
+
+@dataclass(frozen=True)
+class RefreshSettings:
+    """URL lifetime settings from the ``elements`` config section.
+
+    Attributes:
+        ttl_hours: How long an uploaded file URL stays valid.
+        margin_hours: URLs expiring within this window are refreshed.
+        concurrency: Parallel re-uploads.
+    """
+    ttl_hours: float = 72.0
+    margin_hours: float = 12.0
+    concurrency: int = 4
+
+    @classmethod
+    def from_config(cls, config: dict) -> RefreshSettings:
+        raw = config.get("elements", {}) or {}
+        return cls(
+            ttl_hours=raw.get("url_ttl_hours", 72.0),
+            margin_hours=raw.get("refresh_margin_hours", 12.0),
+            concurrency=raw.get("refresh_concurrency", 4),
+        )
+
+
+def expires_at(view: dict, settings: RefreshSettings) -> float | None:
+    """When a view's URL expires (None if its upload time was never recorded)."""
+    uploaded_at = view.get("uploaded_at")
+    if uploaded_at is None:
+        return None
+    return uploaded_at + settings.ttl_hours * 3600
+
+
+def stale_views(
+    elements_status: dict,
+    element_names: set[str] | None,
+    settings: RefreshSettings,
+    now: float | None = None,
+    force: bool = False,
+) -> list[tuple[str, str, dict]]:
+    """Completed views whose URL is expired or expires within the margin.
+
+    Views without ``uploaded_at`` (recorded before upload times were kept)
+    count as stale, since their age is unknown.
+
+    Returns:
+        (element name, view key, view dict) for each stale view.
+    """
+    now = time.time() if now is None else now
+    deadline = now + settings.margin_hours * 3600
+    stale = []
+    for name, elem in elements_status.get("elements", {}).items():
+        if element_names is not None and name not in element_names:
+            continue
+        for view_key, view in sorted(elem.get("views", {}).items()):
+            if view.get("status") != "completed" or not view.get("url"):
+                continue
+            expiry = expires_at(view, settings)
+            if force or expiry is None or expiry <= deadline:
+                stale.append((name, view_key, view))
+    return stale
+
+
+async def refresh_views(
+    client: KieClient, stale: list[tuple[str, str, dict]], concurrency: int = 4,
+) -> list[str]:
+    """Re-upload stale views concurrently, updating each view dict in place.
+
+    The optimised upload variant is used when it still exists, otherwise
+    the original local image.
+
+    Returns:
+        Labels (``Element/view_key``) of views that could not be refreshed.
+    """
+    failed: list[str] = []
+    uploads: list[tuple[str, dict, Path]] = []  # (label, view, source)
+    for name, view_key, view in stale:
+        label = f"{name}/{view_key}"
+        source = next(
+            (Path(p) for p in (view.get("upload_path"), view.get("local_path")) if p and Path(p).is_file()),
+            None,
+        )
+        if source is None:
+            failed.append(label)
+            console.print(f"  [red]{label}: no local file to re-upload; run upload-elements again[/red]")
+        else:
+            uploads.append((label, view, source))
+
+    async for (label, view, _), url, error in client.upload_many(
+        uploads, path=lambda item: item[2], concurrency=max(1, concurrency),
+    ):
+        if isinstance(error, KieApiError):
+            failed.append(label)
+            console.print(f"  [red]{label}: re-upload failed: {error}[/red]")
+        elif error is not None:
+            raise error
+        else:
+            view.update(url=url, uploaded_at=client.clock())
+            console.print(f"  [green]{label} refreshed -> {url}[/green]")
+    return failed
+
+
+async def refresh_element_urls(
+    scenario_path: str,
+    config_path: str | None = None,
+    element_names: set[str] | None = None,
+    force: bool = False,
+    dry_run: bool = False,
+    transport: httpx.AsyncBaseTransport | None = None,
+    key_pool: KeyPool | None = None,
+) -> list[str]:
+    """Re-upload element images whose URLs are about to expire.
+
+    Args:
+        scenario_path: Path to the scenario YAML file.
+        config_path: Optional override for config.yaml path.
+        element_names: Only check these elements (all of the scenario's if None).
+        force: Re-upload every view regardless of age.
+        dry_run: Only report what would be refreshed.
+        transport: Alternative HTTP transport for the client (cassette recorder/replayer).
+        key_pool: Shared API key pool (defaults to one built from ``api.api_keys``).
+
+    Returns:
+        Labels of views that are stale and could not be refreshed.
+    """
+    config = load_config(config_path)
+    settings = RefreshSettings.from_config(config)
+    paths = resolve_output_paths(config, scenario_path)
+    status_path = paths["elements_status_file"]
+    if element_names is None:
+        element_names = set(load_scenario(scenario_path).elements)
+
+    status = load_status(status_path)
+    stale = stale_views(status, element_names, settings, force=force)
+    if not stale:
+        return []
+
+    console.print(f"[bold]Refreshing {len(stale)} element URL(s) that expire within {settings.margin_hours:g}h...[/bold]")
+    if dry_run:
+        for name, view_key, _ in stale:
+            console.print(f"  [yellow]{name}/{view_key}: URL would be re-uploaded[/yellow]")
+        return [f"{name}/{view_key}" for name, view_key, _ in stale]
+
+    async with KieClient(
+        api_key=get_api_key(config_path), base_url=config["api"]["base_url"],
+        key_pool=key_pool or build_key_pool(config), transport=transport,
+    ) as client:
+        failed = await refresh_views(client, stale, settings.concurrency)
+    save_status(status_path, status)
+    return failed
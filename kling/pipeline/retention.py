@@ -0,0 +1,294 @@
+"""Disk budget and garbage collection for the output tree.
+
+An artifact is one file on disk: a friendly path and the blob it is
+hardlinked to (see ``pipeline.storage``) count once and are kept or evicted
+together. Artifacts are protected while anything still references them:
+
+- element views in elements_status.json (``local_path``, ``upload_path``),
+- scene and shot videos in every scenario's scene_status.json (both tiers),
+- planned outputs in every plan file (``plan.json`` and its versioned
+  successors), and assembled ``final.mp4`` cuts,
+- everything under ``output.elements_dir`` (source images).
+
+Unreferenced artifacts (old scene versions, superseded element variants,
+orphaned blobs) are evicted least-recently-used first while the tree is
+over ``retention.budget_gb`` or the disk has less than
+``retention.min_free_gb`` free. Files touched within ``min_age_hours`` are
+never evicted, so a running job's fresh outputs are safe. Leftovers of
+interrupted writes (``*.part``, staged links, blob temp files) are always
+removed once they are older than ``partial_grace_hours``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from pipeline.auth import resolve_output_paths
+from pipeline.status import load_status
+
+logger = logging.getLogger(__name__)
+console = Console()
+
+_GB = 1024 ** 3
+
+# Files the collector manages; status files, plans and configs are never touched
+_ARTIFACT_SUFFIXES = {".mp4", ".mov", ".png", ".jpg", ".jpeg", ".webp", ".mp3", ".wav"}
+
+
+@dataclass(frozen=True)
+class RetentionSettings:
+    """Settings from the ``retention`` config section.
+
+    Attributes:
+        budget_gb: Size limit for the output tree (0 = no limit).
+        min_free_gb: Free space to keep on the output disk (0 = no limit).
+        min_age_hours: Never evict files touched more recently than this.
+        partial_grace_hours: Age after which interrupted-write leftovers are removed.
+    """
+    budget_gb: float = 0.0
+    min_free_gb: float = 0.0
+    min_age_hours: float = 24.0
+    partial_grace_hours: float = 1.0
+
+    @classmethod
+    def from_config(cls, config: dict) -> RetentionSettings:
+        raw = config.get("retention", {}) or {}
+        return cls(
+            budget_gb=raw.get("budget_gb", 0.0),
+            min_free_gb=raw.get("min_free_gb", 0.0),
+            min_age_hours=raw.get("min_age_hours", 24.0),
+            partial_grace_hours=raw.get("partial_grace_hours", 1.0),
+        )
+
+    @property
+    def enforced(self) -> bool:
+        return bool(self.budget_gb or self.min_free_gb)
+
+
+@dataclass
+class Artifact:
+    """One file on disk and every path that links to it."""
+    paths: list[Path]
+    size: int
+    last_used: float
+    referenced: bool = False
+
+
+@dataclass
+class GcReport:
+    """What a collection found and removed (or would remove, in a dry run)."""
+    usage: int
+    free: int
+    referenced: int
+    evicted: list[Artifact] = field(default_factory=list)
+    junk: list[Path] = field(default_factory=list)
+    freed: int = 0
+    dry_run: bool = False
+
+
+def _abs(path: str | Path) -> Path:
+    return Path(os.path.abspath(path))
+
+
+def referenced_paths(config: dict) -> set[Path]:
+    """Absolute paths that status files and plans still point at."""
+    paths = resolve_output_paths(config)
+    base_dir = paths["base_dir"]
+    refs: set[Path] = set()
+
+    def add(path: str | Path | None) -> None:
+        if path:
+            refs.add(_abs(path))
+
+    elements_status = load_status(paths["elements_status_file"])
+    for elem in elements_status.get("elements", {}).values():
+        for view in elem.get("views", {}).values():
+            add(view.get("local_path"))
+            add(view.get("upload_path"))
+
+    # Per-scenario status (final and draft tier) and the scenario-less layout
+    for pattern in ("scene_status.json", "*/scene_status.json", "*/draft/scene_status.json"):
+        for status_file in base_dir.glob(pattern):
+            status = load_status(status_file)
+            for section in ("scenes", "shots"):
+                for entry in status.get(section, {}).values():
+                    add(entry.get("local_path"))
+            add(status_file.with_name("final.mp4"))
+
+    for pattern in ("plan*.json", "*/plan*.json", "*/draft/plan*.json"):
+        for plan_file in base_dir.glob(pattern):
+            try:
+                plan = json.loads(plan_file.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                logger.warning("Unreadable plan %s; its outputs are not protected", plan_file)
+                continue
+            for request in plan.get("requests", []):
+                add(request.get("output_path"))
+    return refs
+
+
+def scan(
+    config: dict, settings: RetentionSettings, now: float | None = None,
+) -> tuple[list[Artifact], list[Path], int]:
+    """Walk the output tree.
+
+    Returns:
+        (artifacts, stale interrupted-write leftovers, bytes used by the tree)
+    """
+    now = time.time() if now is None else now
+    paths = resolve_output_paths(config)
+    base_dir, elements_dir = _abs(paths["base_dir"]), _abs(paths["elements_dir"])
+    blobs_dir = _abs(paths["blobs_dir"])
+    refs = referenced_paths(config)
+
+    by_inode: dict[tuple[int, int], Artifact] = {}
+    seen: set[tuple[int, int]] = set()
+    junk: list[Path] = []
+    usage = 0
+    roots = [base_dir] + ([elements_dir] if not elements_dir.is_relative_to(base_dir) else [])
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            directory = Path(dirpath)
+            for name in filenames:
+                path = directory / name
+                try:
+                    st = path.lstat()
+                except FileNotFoundError:
+                    continue
+                inode = (st.st_dev, st.st_ino)
+                if inode not in seen:
+                    seen.add(inode)
+                    usage += st.st_size
+
+                leftover = name.endswith((".part", ".link")) or directory == blobs_dir / "tmp"
+                if leftover:
+                    if now - st.st_mtime > settings.partial_grace_hours * 3600:
+                        junk.append(path)
+                    continue
+                if path.suffix.lower() not in _ARTIFACT_SUFFIXES and not path.is_relative_to(blobs_dir / "sha256"):
+                    continue
+
+                artifact = by_inode.get(inode)
+                if artifact is None:
+                    artifact = by_inode[inode] = Artifact([], st.st_size, max(st.st_atime, st.st_mtime))
+                artifact.paths.append(path)
+                if path in refs or path.is_relative_to(elements_dir):
+                    artifact.referenced = True
+    return list(by_inode.values()), junk, usage
+
+
+def collect_garbage(
+    config: dict,
+    settings: RetentionSettings | None = None,
+    dry_run: bool = False,
+    evict_all: bool = False,
+    now: float | None = None,
+) -> GcReport:
+    """Remove stale leftovers, then evict LRU unreferenced artifacts while over budget.
+
+    Args:
+        config: Parsed config.yaml.
+        settings: Override for the ``retention`` config section.
+        dry_run: Report what would be removed without deleting anything.
+        evict_all: Evict every unreferenced artifact older than ``min_age_hours``,
+            whatever the budget.
+        now: Current time (for tests and reports).
+    """
+    settings = settings or RetentionSettings.from_config(config)
+    now = time.time() if now is None else now
+    artifacts, junk, usage = scan(config, settings, now)
+    base_dir = resolve_output_paths(config)["base_dir"]
+    free = shutil.disk_usage(base_dir).free if base_dir.exists() else 0
+    report = GcReport(
+        usage=usage, free=free, referenced=sum(a.size for a in artifacts if a.referenced), dry_run=dry_run,
+    )
+
+    for path in junk:
+        try:
+            size = path.stat().st_size
+            if not dry_run:
+                path.unlink()
+        except FileNotFoundError:
+            continue
+        report.junk.append(path)
+        report.freed += size
+
+    def over_budget() -> bool:
+        if evict_all:
+            return True
+        if settings.budget_gb and usage - report.freed > settings.budget_gb * _GB:
+            return True
+        return bool(settings.min_free_gb and free + report.freed < settings.min_free_gb * _GB)
+
+    cutoff = now - settings.min_age_hours * 3600
+    candidates = sorted(
+        (a for a in artifacts if not a.referenced and a.last_used < cutoff), key=lambda a: a.last_used,
+    )
+    for artifact in candidates:
+        if not over_budget():
+            break
+        if not dry_run:
+            for path in artifact.paths:
+                path.unlink(missing_ok=True)
+        report.evicted.append(artifact)
+        report.freed += artifact.size
+        logger.debug("%s %s (%.1f MB)", "Would evict" if dry_run else "Evicted",
+                    artifact.paths[0], artifact.size / 1024 ** 2)
+    if not evict_all and over_budget():
+        logger.warning("Still over the disk budget after evicting every unreferenced artifact")
+    return report
+
+
+def enforce_budget(config: dict) -> GcReport | None:
+    """Collect garbage before a run that writes media, if a budget is configured."""
+    settings = RetentionSettings.from_config(config)
+    if not settings.enforced:
+        return None
+    report = collect_garbage(config, settings)
+    if report.freed:
+        console.print(
+            f"[dim]Disk budget: freed {report.freed / 1024 ** 2:.1f} MB "
+            f"({len(report.evicted)} artifact(s), {len(report.junk)} leftover(s))[/dim]"
+        )
+    return report
+
+
+def print_report(report: GcReport, budget: RetentionSettings, root: Path) -> None:
+    """Print a collection report as a table."""
+    verb = "Would free" if report.dry_run else "Freed"
+    if report.evicted:
+        table = Table(title="Evicted" if not report.dry_run else "Would evict", show_lines=False)
+        table.add_column("Artifact", style="cyan")
+        table.add_column("Size", justify="right")
+        table.add_column("Last used", justify="right")
+        for artifact in report.evicted:
+            label = next((p for p in artifact.paths if "sha256" not in p.parts), artifact.paths[0])
+            try:
+                label = label.relative_to(_abs(root))
+            except ValueError:
+                pass
+            table.add_row(
+                str(label) + (f" (+{len(artifact.paths) - 1} link)" if len(artifact.paths) > 1 else ""),
+                f"{artifact.size / 1024 ** 2:.1f} MB",
+                time.strftime("%Y-%m-%d %H:%M", time.localtime(artifact.last_used)),
+            )
+        console.print(table)
+
+    budget_label = f"{budget.budget_gb:g} GB" if budget.budget_gb else "no limit"
+    console.print(
+        f"Output tree: {report.usage / _GB:.2f} GB (budget {budget_label}), "
+        f"{report.referenced / _GB:.2f} GB referenced, {report.free / _GB:.1f} GB free on disk"
+    )
+    console.print(
+        f"[bold]{verb} {report.freed / 1024 ** 2:.1f} MB: {len(report.evicted)} unreferenced artifact(s), "
+        f"{len(report.junk)} interrupted-write leftover(s).[/bold]"
+    )
@@ -0,0 +1,103 @@
+"""Automatic resubmission policy for failed scene tasks.
+
+Decides whether a failed submission or generation is worth retrying,
+how long to back off, and whether the per-run credit budget allows it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from pipeline.client import KieApiError
+
+# Failures that will not go away by resubmitting the same payload.
+_DEFAULT_NON_RETRYABLE = [
+    "content policy",
+    "sensitive",
+    "insufficient credits",
+    "invalid",
+]
+
+
+@dataclass
+class RetryPolicy:
+    """Retry settings loaded from the ``retry`` config section.
+
+    Attributes:
+        enabled: Whether failed scenes are resubmitted automatically.
+        max_attempts: Attempts per scene task within one run, including the first.
+        backoff_seconds: Delay before the first resubmission.
+        backoff_factor: Multiplier applied to the delay for each further attempt.
+        max_retry_credits: Credits that resubmissions may spend per run (0 = no cap).
+        non_retryable: Lower-case error substrings that are never retried.
+    """
+    enabled: bool = False
+    max_attempts: int = 3
+    backoff_seconds: float = 30.0
+    backoff_factor: float = 2.0
+    max_retry_credits: float = 0.0
+    non_retryable: list[str] = field(default_factory=lambda: list(_DEFAULT_NON_RETRYABLE))
+
+    @classmethod
+    def from_config(cls, config: dict) -> RetryPolicy:
+        raw = config.get("retry", {}) or {}
+        return cls(
+            enabled=raw.get("enabled", False),
+            max_attempts=raw.get("max_attempts", 3),
+            backoff_seconds=raw.get("backoff_seconds", 30.0),
+            backoff_factor=raw.get("backoff_factor", 2.0),
+            max_retry_credits=raw.get("max_retry_credits", 0.0),
+            non_retryable=[p.lower() for p in raw.get("non_retryable", _DEFAULT_NON_RETRYABLE)],
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before resubmitting after ``attempt`` attempts have failed."""
+        return self.backoff_seconds * self.backoff_factor ** max(attempt - 1, 0)
+
+    def is_transient(self, error: str | None, status_code: int | None = None) -> bool:
+        """Return True if a failure looks like it may succeed on resubmission.
+
+        HTTP 4xx responses are permanent except 408 and 429; errors matching
+        one of the ``non_retryable`` substrings are permanent too.
+        """
+        if status_code is not None and 400 <= status_code < 500 and status_code not in (408, 429):
+            return False
+        text = (error or "").lower()
+        return not any(pattern in text for pattern in self.non_retryable)
+
+    def submission_is_transient(self, exc: BaseException) -> bool:
+        """Return True if a failed submission may succeed if sent again.
+
+        Only API errors qualify: HTTP 5xx, 408 or 429 (in the status line or
+        the response body), or a connection that failed before the request
+        was sent. Invalid payloads, routing errors and other 4xx responses
+        are permanent, and so is any failure after which a task may exist.
+        """
+        if not isinstance(exc, KieApiError):
+            return False
+        if exc.status_code is None:
+            return not exc.sent
+        if exc.status_code < 500 and exc.status_code not in (408, 429):
+            return False
+        return self.is_transient(str(exc), exc.status_code)
+
+
+class RetryBudget:
+    """Tracks credits spent on resubmissions during a single run."""
+
+    def __init__(self, max_credits: float = 0.0) -> None:
+        self.max_credits = max_credits
+        self.spent = 0.0
+
+    def try_spend(self, credits: float) -> bool:
+        """Reserve ``credits`` for a resubmission; False if it would exceed the cap."""
+        if self.max_credits and self.spent + credits > self.max_credits:
+            return False
+        self.spent += credits
+        return True
+
+
+def estimate_credits(config: dict, mode: str, total_duration: int) -> float:
+    """Estimate the credit cost of one video task from ``generation.credits_per_second``."""
+    rates = config.get("generation", {}).get("credits_per_second", {}) or {}
+    return float(rates.get(mode, 0.0)) * total_duration
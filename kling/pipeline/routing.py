@@ -0,0 +1,133 @@
+"""Routing scene requests across generation providers.
+
+By default every request goes to KIE. A scenario can opt into other
+providers with a ``routing`` block::
+
+    routing:
+      providers: [kie, grok]   # allowed providers, in order of preference
+      pin:                     # optional: scenes that must use one provider
+        3: kie
+
+Each request then goes to the allowed provider expected to finish it
+soonest (see :class:`~kie_client.providers.ProviderRouter`). Requests with
+reference elements always go to KIE, since Grok has none. Grok is
+configured in the ``providers.grok`` config section.
+"""
+
+from __future__ import annotations
+
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+import httpx
+from rich.console import Console
+
+from pipeline.client import GrokClient, KieClient, Provider, ProviderCapacity, ProviderRouter
+from pipeline.models import Scenario
+from pipeline.plan import PlannedRequest
+
+console = Console()
+
+PROVIDERS = ("kie", "grok")
+
+
+@dataclass(frozen=True)
+class RoutingConstraints:
+    """Per-scenario routing rules from the scenario's ``routing`` block."""
+    providers: list[str] = field(default_factory=lambda: ["kie"])
+    pin: dict[str, str] = field(default_factory=dict)  # scene ID -> provider
+
+    @classmethod
+    def from_scenario(cls, scenario: Scenario) -> RoutingConstraints:
+        """Read the ``routing`` block of a scenario.
+
+        Raises:
+            ValueError: If it names an unknown provider or pins a scene to a
+                provider it does not allow.
+        """
+        raw = scenario.raw.get("routing") or {}
+        if not isinstance(raw, dict):
+            raise ValueError("Scenario 'routing' must be a mapping")
+        providers = [str(p) for p in raw.get("providers") or ["kie"]]
+        pin = {str(k): str(v) for k, v in (raw.get("pin") or {}).items()}
+        unknown = sorted(set(providers) - set(PROVIDERS))
+        if unknown:
+            raise ValueError(f"Unknown provider(s) in routing: {', '.join(unknown)} (known: {', '.join(PROVIDERS)})")
+        for scene_id, name in pin.items():
+            if name not in providers:
+                raise ValueError(f"Scene {scene_id} is pinned to '{name}', which routing.providers does not allow")
+        return cls(providers=providers, pin=pin)
+
+    def candidates(self, req: PlannedRequest) -> list[str]:
+        """Providers a request may go to, in order of preference."""
+        pinned = self.pin.get(req.scene_id)
+        return [pinned] if pinned else list(self.providers)
+
+
+@asynccontextmanager
+async def open_providers(
+    config: dict,
+    constraints: RoutingConstraints,
+    kie_client: KieClient,
+    transport: httpx.AsyncBaseTransport | None = None,
+    dry_run: bool = False,
+) -> AsyncIterator[dict[str, Provider]]:
+    """Open a client for every allowed provider; ``kie_client`` is used for KIE.
+
+    An allowed provider with no configuration is skipped with a warning.
+    """
+    providers: dict[str, Provider] = {"kie": kie_client}
+    grok: GrokClient | None = None
+    if "grok" in constraints.providers:
+        settings = config.get("providers", {}).get("grok") or {}
+        api_key = settings.get("api_key") or os.environ.get("XAI_API_KEY")
+        if not settings.get("enabled", True):
+            console.print("[yellow]Warning: routing allows grok, but providers.grok is disabled; using KIE only.[/yellow]")
+        elif api_key:
+            grok = GrokClient(
+                api_key=api_key,
+                base_url=settings.get("base_url", "https://api.x.ai/v1"),
+                model=settings.get("model", "grok-imagine-video"),
+                resolution=settings.get("resolution", "720p"),
+                max_duration=settings.get("max_duration", 15),
+                dry_run=dry_run,
+                transport=transport,
+                clock=kie_client.clock,
+            )
+            providers["grok"] = grok
+        else:
+            console.print(
+                "[yellow]Warning: routing allows grok, but providers.grok.api_key (or XAI_API_KEY) "
+                "is not set; using KIE only.[/yellow]"
+            )
+    try:
+        yield providers
+    finally:
+        if grok is not None:
+            await grok.close()
+
+
+def build_router(config: dict, providers: dict[str, Provider], kie_capacity: int = 0) -> ProviderRouter:
+    """Routing state for the open providers, seeded from config.
+
+    ``kie_capacity`` is the task limit of the KIE key pool (0 = unlimited).
+    """
+    fallback_rate = config.get("scheduling", {}).get("fallback_seconds_per_video_second", 20)
+    settings = config.get("providers", {}) or {}
+    capacities = []
+    for name in providers:
+        raw = settings.get(name) or {}
+        capacities.append(ProviderCapacity(
+            name=name,
+            max_concurrent=raw.get("max_concurrent", kie_capacity if name == "kie" else 0),
+            max_duration=raw.get("max_duration", 15),
+            supports_elements=name == "kie",
+            seconds_per_video_second=raw.get("seconds_per_video_second", fallback_rate),
+        ))
+    return ProviderRouter(
+        capacities,
+        clock=providers["kie"].clock,
+        cooldown_seconds=config.get("api", {}).get("throttle_cooldown_seconds", 30),
+    )
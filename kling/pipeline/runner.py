@@ -2,11 +2,19 @@
 
 Usage:
     python -m pipeline.runner generate-elements --scenario scenario/scenario.yaml
+    python -m pipeline.runner compile --scenario scenario/scenario.yaml
     python -m pipeline.runner generate-scene --scenario scenario/scenario.yaml 1
     python -m pipeline.runner generate-scene --scenario scenario/scenario.yaml 1 3 5
+    python -m pipeline.runner generate-scene --scenario scenario/scenario.yaml --schedule deadline --deadline 18:30 1 2 3
+    python -m pipeline.runner generate-scene --scenario scenario/scenario.yaml --tier draft 1 2 3
+    python -m pipeline.runner generate-scene --scenario scenario/scenario.yaml --simulate 1 2 3
+    python -m pipeline.runner promote --scenario scenario/scenario.yaml 2
     python -m pipeline.runner download
     python -m pipeline.runner status
     python -m pipeline.runner run-all --scenario scenario/scenario.yaml
+    python -m pipeline.runner --record run.cassette.gz generate-scene --scenario scenario/scenario.yaml --wait 1
+    python -m pipeline.runner --replay run.cassette.gz --replay-speed 0 generate-scene --scenario scenario/scenario.yaml --wait 1
+    python -m pipeline.runner serve --socket /tmp/kling.sock
 """
 
 from __future__ import annotations
@@ -14,13 +22,18 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import re
 import sys
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import click
 from rich.console import Console
 from rich.table import Table
 
+from pipeline.auth import TIERS
+from pipeline.scheduling import POLICIES
+
 console = Console()
 
 # Default paths
@@ -41,11 +54,33 @@ def _setup_logging(verbose: bool) -> None:
         logging.getLogger("httpcore").setLevel(logging.WARNING)
 
 
-def _load_status(config_path: str, scenario_path: str | None = None) -> dict:
+def _parse_deadline(value: str | None) -> float | None:
+    """Parse a --deadline value into seconds from now.
+
+    Accepts a relative duration ("90m", "2h", "45s") or a wall-clock time
+    ("18:30", the next occurrence of that time).
+    """
+    if value is None:
+        return None
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)([smh])", value.strip())
+    if m:
+        return float(m.group(1)) * {"s": 1, "m": 60, "h": 3600}[m.group(2)]
+    try:
+        at = datetime.strptime(value.strip(), "%H:%M")
+    except ValueError:
+        raise click.BadParameter(f"Expected e.g. '90m', '2h' or 'HH:MM', got '{value}'", param_hint="--deadline")
+    now = datetime.now()
+    target = now.replace(hour=at.hour, minute=at.minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+def _load_status(config_path: str, scenario_path: str | None = None, tier: str = "final") -> dict:
     """Load status from the paths specified in config, merging elements + shots."""
     from pipeline.auth import load_config, resolve_output_paths
     config = load_config(config_path)
-    paths = resolve_output_paths(config, scenario_path)
+    paths = resolve_output_paths(config, scenario_path, tier)
 
     result = {}
     # Load shared elements status
@@ -66,17 +101,80 @@ def _load_status(config_path: str, scenario_path: str | None = None) -> dict:
     return result
 
 
+def _run(ctx: click.Context, func, **kwargs):
+    """Run a pipeline coroutine, through the cassette set by --record/--replay.
+
+    ``--replay-speed 0`` replays on a virtual clock: original timing, but
+    no real waiting, so the run is fast and deterministic.
+    """
+    record, replay, speed = ctx.obj.get("record"), ctx.obj.get("replay"), ctx.obj.get("replay_speed", 1.0)
+    if not record and not replay:
+        return asyncio.run(func(**kwargs))
+
+    from pipeline.client import RecordingTransport, ReplayTransport
+
+    transport = RecordingTransport(record) if record else ReplayTransport(replay, speed=speed or 1.0)
+
+    async def run_with_transport():
+        try:
+            return await func(**kwargs, transport=transport)
+        finally:
+            await transport.aclose()
+
+    if replay and not speed:
+        from pipeline.simulate import VirtualTimeLoop
+
+        loop = VirtualTimeLoop()
+        try:
+            return loop.run_until_complete(run_with_transport())
+        finally:
+            loop.close()
+    return asyncio.run(run_with_transport())
+
+
 @click.group()
 @click.option("--config", "-c", default=_DEFAULT_CONFIG, help="Path to config.yaml")
 @click.option("--verbose", "-v", is_flag=True, help="Enable debug logging")
+@click.option("--record", default=None, help="Record all KIE traffic to this cassette file (media goes to <file>.media/)")
+@click.option("--replay", default=None, help="Serve KIE traffic from this cassette instead of the network")
+@click.option("--replay-speed", type=float, default=1.0, help="Replay time compression (1 = original timing, 0 = instant)")
 @click.pass_context
-def cli(ctx: click.Context, config: str, verbose: bool) -> None:
+def cli(
+    ctx: click.Context, config: str, verbose: bool, record: str | None, replay: str | None, replay_speed: float,
+) -> None:
     """KIE.ai Kling 3.0 Video Generation Pipeline."""
+    if record and replay:
+        raise click.UsageError("--record and --replay cannot be combined")
+    if replay_speed < 0:
+        raise click.BadParameter("must be 0 or more", param_hint="--replay-speed")
     ctx.ensure_object(dict)
-    ctx.obj["config"] = config
+    ctx.obj.update(config=config, record=record, replay=replay, replay_speed=replay_speed)
     _setup_logging(verbose)
 
 
+@cli.command("generate-elements")
+@click.option("--scenario", "-s", required=True, help="Path to scenario YAML file")
+@click.pass_context
+def cmd_generate_elements(ctx: click.Context, scenario: str) -> None:
+    """Generate reference images for the scenario's elements."""
+    from pipeline.generate_elements import generate_elements
+
+    config_path = ctx.obj["config"]
+    console.print("[bold]Starting element generation...[/bold]")
+
+    try:
+        _run(ctx, generate_elements, scenario_path=scenario, config_path=config_path)
+    except FileNotFoundError as exc:
+        console.print(f"[red]Error: {exc}[/red]")
+        sys.exit(1)
+    except ValueError as exc:
+        console.print(f"[red]Configuration error: {exc}[/red]")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Interrupted. Progress has been saved to elements_status.json.[/yellow]")
+        sys.exit(130)
+
+
 @cli.command("upload-elements")
 @click.option("--scenario", "-s", required=True, help="Path to scenario YAML file")
 @click.pass_context
@@ -88,7 +186,7 @@ def cmd_upload_elements(ctx: click.Context, scenario: str) -> None:
     console.print("[bold]Starting element upload...[/bold]")
 
     try:
-        asyncio.run(upload_elements(scenario_path=scenario, config_path=config_path))
+        _run(ctx, upload_elements, scenario_path=scenario, config_path=config_path)
     except FileNotFoundError as exc:
         console.print(f"[red]Error: {exc}[/red]")
         sys.exit(1)
@@ -100,21 +198,163 @@ def cmd_upload_elements(ctx: click.Context, scenario: str) -> None:
         sys.exit(130)
 
 
+@cli.command("refresh-elements")
+@click.option("--scenario", "-s", required=True, help="Path to scenario YAML file")
+@click.option("--force", is_flag=True, help="Re-upload every view, not only those about to expire")
+@click.option("--dry-run", is_flag=True, help="List the URLs that would be refreshed")
+@click.pass_context
+def cmd_refresh_elements(ctx: click.Context, scenario: str, force: bool, dry_run: bool) -> None:
+    """Re-upload element images whose URLs expire soon. Usage: refresh-elements -s scenario.yaml"""
+    from pipeline.refresh_elements import refresh_element_urls
+
+    config_path = ctx.obj["config"]
+
+    try:
+        failed = _run(
+            ctx, refresh_element_urls, scenario_path=scenario, config_path=config_path, force=force, dry_run=dry_run,
+        )
+    except FileNotFoundError as exc:
+        console.print(f"[red]Error: {exc}[/red]")
+        sys.exit(1)
+    except ValueError as exc:
+        console.print(f"[red]Configuration error: {exc}[/red]")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Interrupted. Refreshed URLs have not been saved.[/yellow]")
+        sys.exit(130)
+
+    if dry_run:
+        return
+    if failed:
+        console.print(f"[red]{len(failed)} element URL(s) could not be refreshed.[/red]")
+        sys.exit(1)
+    console.print("[green]Element URLs are fresh.[/green]")
+
+
+@cli.command("compile")
+@click.option("--scenario", "-s", required=True, help="Path to scenario YAML file")
+@click.option("--tier", type=click.Choice(TIERS), default="final", help="Final renders or cheap drafts")
+@click.option("--output", "-o", default=None, help="Plan file path (default: output/<scenario>/plan.json)")
+@click.pass_context
+def cmd_compile(ctx: click.Context, scenario: str, tier: str, output: str | None) -> None:
+    """Compile the scenario into an execution plan, offline. Usage: compile -s scenario.yaml"""
+    from pipeline.auth import load_config, resolve_output_paths
+    from pipeline.plan import compile_plan, write_plan
+
+    config_path = ctx.obj["config"]
+
+    try:
+        config = load_config(config_path)
+        plan = compile_plan(scenario, config, tier)
+        plan.check()
+    except FileNotFoundError as exc:
+        console.print(f"[red]Error: {exc}[/red]")
+        sys.exit(1)
+    except ValueError as exc:
+        console.print(f"[red]Plan error: {exc}[/red]")
+        sys.exit(1)
+
+    table = Table(title=f"Plan {plan.fingerprint} ({tier}, {plan.mode})", show_lines=False)
+    table.add_column("Request", style="cyan")
+    table.add_column("Shots", justify="center")
+    table.add_column("Duration", justify="right")
+    table.add_column("Elements")
+    table.add_column("Fingerprint")
+    for req in plan.requests:
+        table.add_row(
+            req.key, str(req.shot_count), f"{req.total_duration}s", ", ".join(req.elements) or "-", req.fingerprint,
+        )
+    console.print(table)
+    for warning in plan.warnings:
+        console.print(f"  [yellow]Warning: {warning}[/yellow]")
+
+    dest = Path(output) if output else resolve_output_paths(config, scenario, tier)["plan_file"]
+    write_plan(plan, dest)
+    console.print(f"[bold green]{len(plan.requests)} request(s) planned -> {dest}[/bold green]")
+
+
 @cli.command("generate-scene")
 @click.option("--scenario", "-s", required=True, help="Path to scenario YAML file")
 @click.option("--dry-run", is_flag=True, help="Log what would be generated without calling API")
+@click.option("--simulate", is_flag=True, help="Project timeline, concurrency and credits against a simulated backend")
+@click.option("--wait", is_flag=True, help="Poll submitted scenes until they finish")
+@click.option("--schedule", type=click.Choice(POLICIES), default=None, help="Submission order (default: scheduling.policy)")
+@click.option("--deadline", default=None, help="Target finish time for --schedule deadline ('90m', '2h', 'HH:MM')")
+@click.option("--tier", type=click.Choice(TIERS), default="final", help="Final renders or cheap drafts")
+@click.option(
+    "--resubmit-unconfirmed", is_flag=True,
+    help="Resubmit scenes an interrupted run may already have submitted (possible double charge)",
+)
 @click.argument("scenes", type=int, nargs=-1, required=True)
 @click.pass_context
-def cmd_generate_scene(ctx: click.Context, scenario: str, dry_run: bool, scenes: tuple[int, ...]) -> None:
+def cmd_generate_scene(
+    ctx: click.Context,
+    scenario: str,
+    dry_run: bool,
+    simulate: bool,
+    wait: bool,
+    schedule: str | None,
+    deadline: str | None,
+    tier: str,
+    resubmit_unconfirmed: bool,
+    scenes: tuple[int, ...],
+) -> None:
     """Generate videos for one or more scenes. Usage: generate-scene -s scenario.yaml 1 3 5"""
     from pipeline.generate_shots import generate_shots
+    from pipeline.simulate import simulate_shots
 
     config_path = ctx.obj["config"]
     label = ", ".join(str(s) for s in scenes)
-    console.print(f"[bold]Starting generation for scene(s) {label}...[/bold]")
+    console.print(f"[bold]Starting {tier} {'simulation' if simulate else 'generation'} for scene(s) {label}...[/bold]")
 
     try:
-        asyncio.run(generate_shots(scenario_path=scenario, config_path=config_path, scene_ids=list(scenes), dry_run=dry_run))
+        if simulate:
+            simulate_shots(
+                scenario_path=scenario,
+                config_path=config_path,
+                scene_ids=list(scenes),
+                schedule=schedule,
+                deadline=_parse_deadline(deadline),
+                tier=tier,
+            )
+            return
+        _run(
+            ctx,
+            generate_shots,
+            scenario_path=scenario,
+            config_path=config_path,
+            scene_ids=list(scenes),
+            dry_run=dry_run,
+            wait=wait,
+            schedule=schedule,
+            deadline=_parse_deadline(deadline),
+            tier=tier,
+            resubmit_unconfirmed=resubmit_unconfirmed,
+        )
+    except FileNotFoundError as exc:
+        console.print(f"[red]Error: {exc}[/red]")
+        sys.exit(1)
+    except ValueError as exc:
+        console.print(f"[red]Configuration error: {exc}[/red]")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Interrupted. Progress has been saved to scene_status.json.[/yellow]")
+        sys.exit(130)
+
+
+@cli.command("promote")
+@click.option("--scenario", "-s", required=True, help="Path to scenario YAML file")
+@click.option("--wait", is_flag=True, help="Poll submitted scenes until they finish")
+@click.argument("scenes", type=int, nargs=-1, required=True)
+@click.pass_context
+def cmd_promote(ctx: click.Context, scenario: str, wait: bool, scenes: tuple[int, ...]) -> None:
+    """Re-render approved draft scenes in final quality. Usage: promote -s scenario.yaml 2 4"""
+    from pipeline.generate_shots import promote_scenes
+
+    config_path = ctx.obj["config"]
+
+    try:
+        _run(ctx, promote_scenes, scenario_path=scenario, scene_ids=list(scenes), config_path=config_path, wait=wait)
     except FileNotFoundError as exc:
         console.print(f"[red]Error: {exc}[/red]")
         sys.exit(1)
@@ -128,8 +368,9 @@ def cmd_generate_scene(ctx: click.Context, scenario: str, dry_run: bool, scenes:
 
 @cli.command("download")
 @click.option("--scenario", "-s", default=None, help="Path to scenario YAML file")
+@click.option("--tier", type=click.Choice(TIERS), default="final", help="Final renders or cheap drafts")
 @click.pass_context
-def cmd_download(ctx: click.Context, scenario: str | None) -> None:
+def cmd_download(ctx: click.Context, scenario: str | None, tier: str) -> None:
     """Download all completed but not-yet-downloaded files."""
     from pipeline.downloader import download_all
 
@@ -137,7 +378,7 @@ def cmd_download(ctx: click.Context, scenario: str | None) -> None:
     console.print("[bold]Starting download of completed files...[/bold]")
 
     try:
-        asyncio.run(download_all(scenario_path=scenario, config_path=config_path))
+        _run(ctx, download_all, scenario_path=scenario, config_path=config_path, tier=tier)
     except FileNotFoundError as exc:
         console.print(f"[red]Error: {exc}[/red]")
         sys.exit(1)
@@ -151,13 +392,14 @@ def cmd_download(ctx: click.Context, scenario: str | None) -> None:
 
 @cli.command("status")
 @click.option("--scenario", "-s", default=None, help="Path to scenario YAML file")
+@click.option("--tier", type=click.Choice(TIERS), default="final", help="Final renders or cheap drafts")
 @click.pass_context
-def cmd_status(ctx: click.Context, scenario: str | None) -> None:
+def cmd_status(ctx: click.Context, scenario: str | None, tier: str) -> None:
     """Show current pipeline status."""
     config_path = ctx.obj["config"]
 
     try:
-        status = _load_status(config_path, scenario)
+        status = _load_status(config_path, scenario, tier)
     except FileNotFoundError as exc:
         console.print(f"[red]Error: {exc}[/red]")
         sys.exit(1)
@@ -274,12 +516,28 @@ def cmd_status(ctx: click.Context, scenario: str | None) -> None:
     if total_scenes:
         console.print(f"  Scenes (multi-shot): {done_scenes}/{total_scenes} completed")
 
+    if scenario:
+        from pipeline.auth import load_config, resolve_output_paths
+        from pipeline.plan import find_plan, plan_sources
+        from pipeline.status import load_status
+
+        config = load_config(config_path)
+        paths = resolve_output_paths(config, scenario, tier)
+        sources = plan_sources(config, scenario, tier, load_status(paths["elements_status_file"]))
+        plan = find_plan(paths["plan_file"], sources)
+        if plan is not None:
+            unsubmitted = sum(1 for r in plan.requests if r.key not in scenes)
+            console.print(
+                f"  Plan {plan.fingerprint}: {len(plan.requests)} request(s), {unsubmitted} not yet submitted"
+            )
+
 
 @cli.command("assemble")
 @click.option("--scenario", "-s", required=True, help="Path to scenario YAML file")
 @click.option("--output", "-o", default=None, help="Output file path (default: output/<scenario>/final.mp4)")
+@click.option("--tier", type=click.Choice(TIERS), default="final", help="Final renders or cheap drafts")
 @click.pass_context
-def cmd_assemble(ctx: click.Context, scenario: str, output: str | None) -> None:
+def cmd_assemble(ctx: click.Context, scenario: str, output: str | None, tier: str) -> None:
     """Concatenate downloaded scene videos into a single final video."""
     from pipeline.assembler import assemble_video
 
@@ -291,6 +549,7 @@ def cmd_assemble(ctx: click.Context, scenario: str, output: str | None) -> None:
             scenario_path=scenario,
             config_path=config_path,
             output_path=output,
+            tier=tier,
         )
         console.print(f"[bold green]Done:[/bold green] {dest}")
     except FileNotFoundError as exc:
@@ -301,36 +560,123 @@ def cmd_assemble(ctx: click.Context, scenario: str, output: str | None) -> None:
         sys.exit(1)
 
 
+@cli.command("gc")
+@click.option("--dry-run", is_flag=True, help="Report what would be removed without deleting anything")
+@click.option("--budget", type=float, default=None, help="Size limit in GB for this run (overrides retention.budget_gb)")
+@click.option("--all", "evict_all", is_flag=True, help="Evict every unreferenced artifact, whatever the budget")
+@click.pass_context
+def cmd_gc(ctx: click.Context, dry_run: bool, budget: float | None, evict_all: bool) -> None:
+    """Remove unreferenced outputs, least recently used first, down to the disk budget."""
+    import dataclasses
+
+    from pipeline.auth import load_config, resolve_output_paths
+    from pipeline.retention import RetentionSettings, collect_garbage, print_report
+
+    config_path = ctx.obj["config"]
+    try:
+        config = load_config(config_path)
+    except FileNotFoundError as exc:
+        console.print(f"[red]Error: {exc}[/red]")
+        sys.exit(1)
+
+    settings = RetentionSettings.from_config(config)
+    if budget is not None:
+        settings = dataclasses.replace(settings, budget_gb=budget)
+    if not settings.enforced and not evict_all:
+        console.print("[dim]No disk budget configured (retention.budget_gb / min_free_gb); removing leftovers only.[/dim]")
+    report = collect_garbage(config, settings, dry_run=dry_run, evict_all=evict_all)
+    print_report(report, settings, resolve_output_paths(config)["base_dir"])
+
+
+@cli.command("serve")
+@click.option("--host", default=None, help="Address to listen on (default: serve.host)")
+@click.option("--port", type=int, default=None, help="TCP port to listen on (default: serve.port)")
+@click.option("--socket", "socket_path", default=None, help="Listen on this Unix socket instead of TCP")
+@click.pass_context
+def cmd_serve(ctx: click.Context, host: str | None, port: int | None, socket_path: str | None) -> None:
+    """Run as a daemon that accepts jobs over a local HTTP/JSON API (see pipeline/serve.py)."""
+    from pipeline.serve import serve
+
+    if ctx.obj.get("record") or ctx.obj.get("replay"):
+        console.print("[red]Error: --record/--replay are not supported with serve.[/red]")
+        sys.exit(1)
+    try:
+        asyncio.run(serve(ctx.obj["config"], host=host, port=port, socket_path=socket_path))
+    except FileNotFoundError as exc:
+        console.print(f"[red]Error: {exc}[/red]")
+        sys.exit(1)
+    except OSError as exc:
+        console.print(f"[red]Cannot listen: {exc}[/red]")
+        sys.exit(1)
+
+
 @cli.command("run-all")
 @click.option("--scenario", "-s", required=True, help="Path to scenario YAML file")
 @click.option("--dry-run", is_flag=True, help="Log what would be generated without calling API (video only)")
+@click.option("--simulate", is_flag=True, help="Simulate scene generation only; no uploads, downloads or network")
+@click.option("--wait", is_flag=True, help="Poll submitted scenes until they finish")
+@click.option("--schedule", type=click.Choice(POLICIES), default=None, help="Submission order (default: scheduling.policy)")
+@click.option("--deadline", default=None, help="Target finish time for --schedule deadline ('90m', '2h', 'HH:MM')")
+@click.option("--tier", type=click.Choice(TIERS), default="final", help="Final renders or cheap drafts")
 @click.pass_context
-def cmd_run_all(ctx: click.Context, scenario: str, dry_run: bool) -> None:
+def cmd_run_all(
+    ctx: click.Context,
+    scenario: str,
+    dry_run: bool,
+    simulate: bool,
+    wait: bool,
+    schedule: str | None,
+    deadline: str | None,
+    tier: str,
+) -> None:
     """Run the full pipeline: upload elements -> shots -> download."""
     from pipeline.upload_elements import upload_elements
     from pipeline.generate_shots import generate_shots
     from pipeline.downloader import download_all
+    from pipeline.simulate import simulate_shots
 
     config_path = ctx.obj["config"]
 
     try:
-        # Step 1: Upload element images
-        console.rule("[bold blue]Step 1: Upload Element Images[/bold blue]")
-        if dry_run:
-            console.print("[dim]Skipped in dry-run mode[/dim]")
-        else:
-            asyncio.run(upload_elements(scenario_path=scenario, config_path=config_path))
-
-        # Step 2: Generate scenes
-        console.rule("[bold blue]Step 2: Generate Scenes[/bold blue]")
-        asyncio.run(generate_shots(scenario_path=scenario, config_path=config_path, dry_run=dry_run))
-
-        # Step 3: Download any remaining files
-        console.rule("[bold blue]Step 3: Download Remaining Files[/bold blue]")
-        if dry_run:
-            console.print("[dim]Skipped in dry-run mode[/dim]")
-        else:
-            asyncio.run(download_all(scenario_path=scenario, config_path=config_path))
+        if simulate:
+            console.rule("[bold blue]Simulating Scene Generation[/bold blue]")
+            simulate_shots(
+                scenario_path=scenario,
+                config_path=config_path,
+                schedule=schedule,
+                deadline=_parse_deadline(deadline),
+                tier=tier,
+            )
+            return
+
+        async def pipeline(transport=None):
+            # One coroutine for all steps, so --record/--replay use a single
+            # cassette and timeline for the whole run
+            console.rule("[bold blue]Step 1: Upload Element Images[/bold blue]")
+            if dry_run:
+                console.print("[dim]Skipped in dry-run mode[/dim]")
+            else:
+                await upload_elements(scenario_path=scenario, config_path=config_path, transport=transport)
+
+            console.rule("[bold blue]Step 2: Generate Scenes[/bold blue]")
+            await generate_shots(
+                scenario_path=scenario,
+                config_path=config_path,
+                dry_run=dry_run,
+                wait=wait,
+                schedule=schedule,
+                deadline=_parse_deadline(deadline),
+                tier=tier,
+                transport=transport,
+            )
+
+            console.rule("[bold blue]Step 3: Download Remaining Files[/bold blue]")
+            if dry_run:
+                console.print("[dim]Skipped in dry-run mode[/dim]")
+            else:
+                await download_all(scenario_path=scenario, config_path=config_path, tier=tier, transport=transport)
+
+        _run(ctx, pipeline)
 
         console.rule("[bold green]Pipeline Complete[/bold green]")
 
@@ -2,18 +2,44 @@
 
 Loads a scenario.yaml file and constructs the Scenario model
 with all elements, scenes, and shots.
+
+Parsing uses the libyaml C loader when PyYAML was built with it, and the
+whole file is validated in one pass so every problem is reported up
+front. Parsed YAML documents are cached (in memory, and on disk as JSON)
+keyed by path, mtime and size, so unchanged files are not parsed again;
+the Scenario is rebuilt from the cached document on every load.
 """
 
 from __future__ import annotations
 
+import copy
+import hashlib
+import json
+import logging
+import os
 from pathlib import Path
 
 import yaml
 
 from pipeline.models import Element, Scene, Scenario, Shot
 
+logger = logging.getLogger(__name__)
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Bump when parsing or the models change, so stale cache entries are ignored.
+_CACHE_VERSION = 2
+_CACHE_DIR = Path(os.environ.get("KLING_CACHE_DIR", Path.home() / ".cache" / "kling")) / "scenarios"
+
+# Shot duration limits accepted by the API (seconds).
+_MIN_SHOT_DURATION = 1
+_MAX_SHOT_DURATION = 12
+
+# resolved path -> (cache key, parsed YAML document)
+_memory_cache: dict[str, tuple[tuple, dict]] = {}
+
 
-def load_scenario(path: str | Path) -> Scenario:
+def load_scenario(path: str | Path, use_cache: bool = True) -> Scenario:
     """Load a scenario from a YAML file.
 
     Expected YAML structure (mirrors KIE.ai API payload)::
@@ -23,6 +49,7 @@ def load_scenario(path: str | Path) -> Scenario:
 
         scenes:
           - id: 1
+            priority: 0            # optional, for --schedule priority
             background: "Sunny park"
             lighting: "Bright daylight"
             kling_elements: ["Topa", "Valley"]
@@ -34,74 +61,193 @@ def load_scenario(path: str | Path) -> Scenario:
 
     Args:
         path: Path to the scenario YAML file.
+        use_cache: Reuse a previously parsed copy if the file is unchanged.
 
     Returns:
-        A fully constructed Scenario object.
+        A fully constructed Scenario object (a fresh copy on every call).
 
     Raises:
         FileNotFoundError: If the file does not exist.
-        ValueError: If required fields are missing.
+        ValueError: If the file fails validation; the message lists every problem.
     """
     path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"Scenario file not found: {path}")
 
-    with open(path, "r", encoding="utf-8") as f:
-        raw = yaml.safe_load(f)
+    resolved = str(path.resolve())
+    st = path.stat()
+    key = (_CACHE_VERSION, resolved, st.st_mtime_ns, st.st_size)
+    cache_file = _CACHE_DIR / f"{hashlib.sha256(resolved.encode()).hexdigest()[:24]}.json"
+
+    if use_cache:
+        raw = _read_cache(resolved, key, cache_file)
+        if raw is not None:
+            return _build_scenario(copy.deepcopy(raw))
 
+    with open(path, "r", encoding="utf-8") as f:
+        raw = yaml.load(f, Loader=_Loader)
+    scenario = _build_scenario(raw)
+
+    if use_cache:
+        # Validated above, so a cached document always builds
+        _memory_cache[resolved] = (key, copy.deepcopy(raw))
+        _write_cache(cache_file, key, raw)
+    return scenario
+
+
+def _read_cache(resolved: str, key: tuple, cache_file: Path) -> dict | None:
+    """Return the parsed YAML document for ``key`` from memory or disk, if present."""
+    hit = _memory_cache.get(resolved)
+    if hit and hit[0] == key:
+        return hit[1]
+    try:
+        cached = json.loads(cache_file.read_text(encoding="utf-8"))
+        cached_key, raw = tuple(cached["key"]), cached["raw"]
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+    if cached_key != key or not isinstance(raw, dict):
+        return None
+    _memory_cache[resolved] = (key, raw)
+    return raw
+
+
+def _write_cache(cache_file: Path, key: tuple, raw: dict) -> None:
+    try:
+        text = json.dumps({"key": list(key), "raw": raw}, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return  # YAML values JSON cannot hold (dates, ...); the memory cache still applies
+    if json.loads(text)["raw"] != raw:
+        return  # JSON would change the document (non-string mapping keys)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_name(cache_file.name + ".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, cache_file)
+    except OSError as exc:
+        logger.debug("Could not write scenario cache %s: %s", cache_file, exc)
+
+
+def _check_type(errors: list[str], where: str, value: object, expected: type, label: str) -> bool:
+    """Record an error unless ``value`` is an instance of ``expected``."""
+    if isinstance(value, expected) and not isinstance(value, bool):
+        return True
+    errors.append(f"{where}: expected {label}, got {type(value).__name__}")
+    return False
+
+
+def _check_int(errors: list[str], where: str, value: object, default: int) -> int:
+    """Return ``value`` as an int (numeric strings allowed), recording an error if it is not one."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value)
+    errors.append(f"{where}: expected an integer, got {value!r}")
+    return default
+
+
+def _build_scenario(raw: object) -> Scenario:
+    """Validate parsed YAML and build the Scenario model in a single pass."""
     if not isinstance(raw, dict):
         raise ValueError(f"Scenario file must be a YAML mapping, got {type(raw).__name__}")
 
+    errors: list[str] = []
+
     # -- Global config (top-level fields) --
     global_config = {
-        "style_prefix": raw.get("style_prefix", ""),
+        "style_prefix": raw.get("style_prefix", "") or "",
+        "negative_prompt": raw.get("negative_prompt", "") or "",
     }
+    for name, value in global_config.items():
+        _check_type(errors, name, value, str, "a string")
 
     # -- Elements (kling_elements at top level) --
     elements: dict[str, Element] = {}
-    for elem_data in raw.get("kling_elements", []):
-        if isinstance(elem_data, dict):
-            name = elem_data.get("name", "")
-            elements[name] = Element(
-                name=name,
-                description=elem_data.get("description", name),
-            )
-        elif isinstance(elem_data, str):
-            elements[elem_data] = Element(name=elem_data, description=elem_data)
+    raw_elements = raw.get("kling_elements", []) or []
+    if _check_type(errors, "kling_elements", raw_elements, list, "a list"):
+        for i, elem_data in enumerate(raw_elements):
+            where = f"kling_elements[{i}]"
+            if isinstance(elem_data, dict):
+                name = elem_data.get("name", "")
+                if not name or not isinstance(name, str):
+                    errors.append(f"{where}: 'name' is required")
+                    continue
+                elements[name] = Element(
+                    name=name,
+                    description=elem_data.get("description", name),
+                )
+            elif isinstance(elem_data, str):
+                elements[elem_data] = Element(name=elem_data, description=elem_data)
+            else:
+                errors.append(f"{where}: expected a mapping or a name, got {type(elem_data).__name__}")
 
     # -- Scenes --
     scenes: list[Scene] = []
-    for scene_data in raw.get("scenes", []):
+    seen_ids: set[str] = set()
+    raw_scenes = raw.get("scenes", []) or []
+    if not _check_type(errors, "scenes", raw_scenes, list, "a list"):
+        raw_scenes = []
+    for i, scene_data in enumerate(raw_scenes):
+        where = f"scenes[{i}]"
         if not isinstance(scene_data, dict):
-            raise ValueError(f"Each scene must be a mapping, got {type(scene_data).__name__}")
+            errors.append(f"{where}: each scene must be a mapping, got {type(scene_data).__name__}")
+            continue
 
-        scene_id = str(scene_data.get("id", ""))
+        raw_id = scene_data.get("id")
+        scene_id = "" if raw_id is None else str(raw_id)
         if not scene_id:
-            raise ValueError("Each scene must have an 'id' field")
+            errors.append(f"{where}: each scene must have an 'id' field")
+        elif scene_id in seen_ids:
+            errors.append(f"{where}: duplicate scene id '{scene_id}'")
+        seen_ids.add(scene_id)
+        where = f"scenes[{i}] (id {scene_id})" if scene_id else where
+
+        for name in ("background", "lighting"):
+            _check_type(errors, f"{where}.{name}", scene_data.get(name) or "", str, "a string")
+        priority = _check_int(errors, f"{where}.priority", scene_data.get("priority", 0), 0)
+        kling_elements = scene_data.get("kling_elements", []) or []
+        if not _check_type(errors, f"{where}.kling_elements", kling_elements, list, "a list of names"):
+            kling_elements = []
 
         shots: list[Shot] = []
-        for shot_data in scene_data.get("multi_prompt", []):
+        raw_shots = scene_data.get("multi_prompt", []) or []
+        if not _check_type(errors, f"{where}.multi_prompt", raw_shots, list, "a list"):
+            raw_shots = []
+        for j, shot_data in enumerate(raw_shots):
+            shot_where = f"{where}.multi_prompt[{j}]"
             if not isinstance(shot_data, dict):
-                raise ValueError(f"Each shot must be a mapping in scene '{scene_id}'")
-
-            shot = Shot(
+                errors.append(f"{shot_where}: each shot must be a mapping")
+                continue
+            prompt = shot_data.get("prompt", "")
+            _check_type(errors, f"{shot_where}.prompt", prompt, str, "a string")
+            duration = _check_int(errors, f"{shot_where}.duration", shot_data.get("duration", 5), 5)
+            if not _MIN_SHOT_DURATION <= duration <= _MAX_SHOT_DURATION:
+                errors.append(
+                    f"{shot_where}.duration: must be {_MIN_SHOT_DURATION}-{_MAX_SHOT_DURATION} seconds, got {duration}"
+                )
+
+            shots.append(Shot(
                 scene_id=scene_id,
-                prompt=shot_data.get("prompt", ""),
-                duration=int(shot_data.get("duration", 5)),
-            )
-            shots.append(shot)
+                prompt=prompt,
+                duration=duration,
+            ))
 
-        scene = Scene(
+        scenes.append(Scene(
             id=scene_id,
-            background=scene_data.get("background", ""),
-            lighting=scene_data.get("lighting", ""),
-            kling_elements=scene_data.get("kling_elements", []),
+            background=scene_data.get("background") or "",
+            lighting=scene_data.get("lighting") or "",
+            kling_elements=kling_elements,
             shots=shots,
-        )
-        scenes.append(scene)
+            priority=priority,
+        ))
+
+    if errors:
+        shown = "\n  ".join(errors[:50])
+        more = f"\n  ... and {len(errors) - 50} more" if len(errors) > 50 else ""
+        raise ValueError(f"Invalid scenario ({len(errors)} problem(s)):\n  {shown}{more}")
 
     return Scenario(
         global_config=global_config,
         elements=elements,
         scenes=scenes,
+        raw=raw,
     )
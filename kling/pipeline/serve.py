@@ -0,0 +1,662 @@
+"""Long-running job server: ``python -m pipeline.runner serve``.
+
+One warm process runs jobs that would otherwise each be a CLI invocation.
+Between jobs it keeps a shared HTTP connection pool for KIE traffic, one
+API key pool (so per-key limits hold across concurrent jobs), a process
+pool for element image optimisation, and the parsed config and scenario
+caches. Jobs are submitted over a small HTTP/JSON API on a local TCP port
+or a Unix socket::
+
+    POST   /jobs                {"kind": "generate", "scenario": "scenario/dino.yaml", "scenes": [1, 2]}
+    GET    /jobs                every job the server remembers
+    GET    /jobs/<id>           one job: state, parameters, result or error
+    GET    /jobs/<id>/events    progress as NDJSON from ?since=<seq>, streamed until the job ends
+    DELETE /jobs/<id>           cancel a queued or running job
+    GET    /health
+
+Job kinds and their parameters mirror the CLI commands (see ``_PARAMS``);
+``deadline`` is given in seconds from submission. At most
+``serve.max_jobs`` jobs run at once and at most ``serve.limits.<kind>`` of
+each kind; jobs on the same scenario run one at a time, since they share
+its status files. elements_status.json is shared by every scenario, so
+the jobs that rewrite it (element generation, upload, refresh, download,
+and the URL refresh before a generate or promote submits) also take one
+server-wide lock. Everything a job prints or logs becomes an event on its
+stream. Cancelled assemble and gc jobs stop being tracked at once, but the
+ffmpeg run or collection already under way finishes in the background.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import dataclasses
+import io
+import json
+import logging
+import os
+import signal
+import stat
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+from rich.console import Console
+
+from pipeline.assembler import assemble_video
+from pipeline.auth import TIERS, load_config, resolve_output_paths
+from pipeline.client import KeyPool, build_key_pool
+from pipeline.downloader import download_all
+from pipeline.generate_elements import generate_elements
+from pipeline.generate_shots import generate_shots, promote_scenes
+from pipeline.refresh_elements import refresh_element_urls
+from pipeline.retention import RetentionSettings, collect_garbage, print_report
+from pipeline.scheduling import POLICIES
+from pipeline.status import load_status
+from pipeline.upload_elements import upload_elements
+
+logger = logging.getLogger(__name__)
+console = Console()
+
+_MAX_BODY = 1024 * 1024
+_FINISHED = ("succeeded", "failed", "cancelled")
+# Jobs that write the shared elements_status.json from start to finish;
+# generate and promote only hold the lock for their URL refresh
+_ELEMENT_WRITERS = ("generate-elements", "upload-elements", "refresh-elements", "download")
+
+# The job whose handler is running in this task (or worker thread); console
+# output and log records are routed to its event stream.
+_current_job: contextvars.ContextVar[Job | None] = contextvars.ContextVar("current_job", default=None)
+
+
+class JobError(ValueError):
+    """A job request the server cannot accept (unknown kind, bad parameters)."""
+
+
+@dataclass(frozen=True)
+class ServeSettings:
+    """Settings from the ``serve`` config section.
+
+    Attributes:
+        host: Address to listen on.
+        port: TCP port to listen on.
+        socket: Unix socket path; used instead of host/port when set.
+        max_jobs: Jobs running at once, across all kinds.
+        limits: Jobs of one kind running at once (kinds not listed: 1).
+        max_connections: Size of the shared HTTP connection pool.
+        image_workers: Process pool size for element optimisation (0 = CPU count).
+        history: Finished jobs kept for ``GET /jobs``.
+    """
+    host: str = "127.0.0.1"
+    port: int = 8765
+    socket: str = ""
+    max_jobs: int = 4
+    limits: dict[str, int] = field(default_factory=dict)
+    max_connections: int = 32
+    image_workers: int = 0
+    history: int = 200
+
+    @classmethod
+    def from_config(cls, config: dict) -> ServeSettings:
+        raw = config.get("serve", {}) or {}
+        return cls(
+            host=raw.get("host", "127.0.0.1"),
+            port=raw.get("port", 8765),
+            socket=raw.get("socket", "") or "",
+            max_jobs=max(1, raw.get("max_jobs", 4)),
+            limits=dict(raw.get("limits", {}) or {}),
+            max_connections=raw.get("max_connections", 32),
+            image_workers=raw.get("image_workers", 0),
+            history=raw.get("history", 200),
+        )
+
+
+@dataclass
+class Job:
+    """A submitted job and its event history.
+
+    Events are appended from the event loop and, for jobs that run in a
+    worker thread, from that thread; followers are woken on the loop.
+    """
+    id: str
+    kind: str
+    params: dict
+    state: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: Any = None
+    error: str | None = None
+    events: list[dict] = field(default_factory=list)
+    task: asyncio.Task | None = field(default=None, repr=False)
+    _loop: asyncio.AbstractEventLoop = field(default_factory=asyncio.get_running_loop, repr=False)
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _partial: str = field(default="", repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.state in _FINISHED
+
+    def emit(self, kind: str, **data: Any) -> None:
+        """Append an event; a ``state`` event also moves the job to that state."""
+        with self._lock:
+            if kind == "state":
+                self.state = data["state"]
+            self.events.append({"seq": len(self.events), "time": round(time.time(), 3), "type": kind, **data})
+        self._loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def write(self, text: str) -> None:
+        """Console output: each complete, non-blank line becomes an ``output`` event."""
+        with self._lock:
+            lines = (self._partial + text).split("\n")
+            self._partial = lines.pop()
+        for line in lines:
+            if line.strip():
+                self.emit("output", text=line.rstrip())
+
+    def finish(self, state: str, error: str | None = None) -> None:
+        self.write("\n")
+        self.finished_at = time.time()
+        self.error = error
+        self.emit("state", state=state, result=self.result, error=error)
+
+    async def follow(self, since: int = 0):
+        """Yield events from ``since`` on, then live ones until the job ends."""
+        while True:
+            changed = self._changed
+            with self._lock:
+                batch = self.events[since:]
+                done = self.done and since + len(batch) >= len(self.events)
+            for event in batch:
+                yield event
+            since += len(batch)
+            if done:
+                return
+            await changed.wait()
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "state": self.state,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+            "events": len(self.events),
+        }
+
+
+class _OutputRouter(io.TextIOBase):
+    """File for the pipeline's rich consoles: output goes to the job printing it."""
+
+    def __init__(self, fallback: io.TextIOBase) -> None:
+        self._fallback = fallback
+
+    def write(self, text: str) -> int:
+        job = _current_job.get()
+        if job is None:
+            return self._fallback.write(text)
+        job.write(text)
+        return len(text)
+
+    def flush(self) -> None:
+        if _current_job.get() is None:
+            self._fallback.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+
+class _JobLogHandler(logging.Handler):
+    """Copies log records emitted while a job runs onto its event stream."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        job = _current_job.get()
+        if job is not None:
+            job.emit("log", level=record.levelname, logger=record.name, message=record.getMessage())
+
+
+def _route_consoles(router: _OutputRouter) -> None:
+    """Point every pipeline and KIE client console at the router."""
+    for name, module in list(sys.modules.items()):
+        if not name.startswith(("pipeline.", "kie_client.")):
+            continue
+        for attr in ("console", "_console"):
+            target = getattr(module, attr, None)
+            if isinstance(target, Console):
+                target.file = router
+                target.soft_wrap = True  # one event per printed line, not per 80 columns
+
+
+# --- Job kinds ---------------------------------------------------------------
+
+_REQUIRED = object()
+_NUMBER = (int, float)
+
+# kind -> {parameter: (accepted type, default or _REQUIRED)}
+_PARAMS: dict[str, dict[str, tuple[type | tuple[type, ...], Any]]] = {
+    "generate": {
+        "scenario": (str, _REQUIRED), "scenes": (list, None), "tier": (str, "final"), "wait": (bool, False),
+        "dry_run": (bool, False), "schedule": (str, None), "deadline": (_NUMBER, None),
+        "resubmit_unconfirmed": (bool, False),
+    },
+    "promote": {"scenario": (str, _REQUIRED), "scenes": (list, _REQUIRED), "wait": (bool, False)},
+    "generate-elements": {"scenario": (str, _REQUIRED)},
+    "upload-elements": {"scenario": (str, _REQUIRED)},
+    "refresh-elements": {"scenario": (str, _REQUIRED), "force": (bool, False), "dry_run": (bool, False)},
+    "download": {"scenario": (str, None), "tier": (str, "final")},
+    "assemble": {"scenario": (str, _REQUIRED), "output": (str, None), "tier": (str, "final")},
+    "gc": {"dry_run": (bool, False), "budget": (_NUMBER, None), "all": (bool, False)},
+}
+
+
+def validate_params(kind: object, params: dict) -> dict:
+    """Check a job request against ``_PARAMS`` and fill in defaults.
+
+    Raises:
+        JobError: On an unknown kind, unknown or missing parameters, or bad values.
+    """
+    spec = _PARAMS.get(kind) if isinstance(kind, str) else None
+    if spec is None:
+        raise JobError(f"Unknown job kind {kind!r}; expected one of: {', '.join(_PARAMS)}")
+    unknown = sorted(set(params) - set(spec))
+    if unknown:
+        raise JobError(f"Unknown parameter(s) for '{kind}': {', '.join(unknown)}")
+
+    result = {}
+    for name, (expected, default) in spec.items():
+        value = params.get(name)
+        if value is None:
+            if default is _REQUIRED:
+                raise JobError(f"'{kind}' requires '{name}'")
+            result[name] = default
+            continue
+        if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            raise JobError(f"Parameter '{name}' has the wrong type ({type(value).__name__})")
+        result[name] = value
+
+    if "tier" in result and result["tier"] not in TIERS:
+        raise JobError(f"Unknown tier '{result['tier']}'; expected one of: {', '.join(TIERS)}")
+    if result.get("schedule") and result["schedule"] not in POLICIES:
+        raise JobError(f"Unknown schedule '{result['schedule']}'; expected one of: {', '.join(POLICIES)}")
+    if result.get("scenes") is not None and not all(
+        isinstance(s, int) and not isinstance(s, bool) for s in result["scenes"]
+    ):
+        raise JobError("'scenes' must be a list of scene IDs")
+    return result
+
+
+def _scene_summary(config_path: str, scenario_path: str, tier: str) -> dict:
+    config = load_config(config_path)
+    scenes = load_status(resolve_output_paths(config, scenario_path, tier)["status_file"]).get("scenes", {})
+    return {
+        "completed": sum(1 for s in scenes.values() if s.get("completed")),
+        "failed": sum(1 for s in scenes.values() if s.get("status") in ("failed", "submit_failed")),
+        "total": len(scenes),
+    }
+
+
+async def _run_generate(server: JobServer, p: dict) -> dict:
+    await generate_shots(
+        scenario_path=p["scenario"],
+        config_path=server.config_path,
+        scene_ids=p["scenes"],
+        dry_run=p["dry_run"],
+        wait=p["wait"],
+        schedule=p["schedule"],
+        deadline=p["deadline"],
+        tier=p["tier"],
+        transport=server.transport,
+        key_pool=server.key_pool,
+        resubmit_unconfirmed=p["resubmit_unconfirmed"],
+        elements_lock=server.elements_lock,
+    )
+    return _scene_summary(server.config_path, p["scenario"], p["tier"])
+
+
+async def _run_promote(server: JobServer, p: dict) -> dict:
+    await promote_scenes(
+        scenario_path=p["scenario"],
+        scene_ids=p["scenes"],
+        config_path=server.config_path,
+        wait=p["wait"],
+        transport=server.transport,
+        key_pool=server.key_pool,
+        elements_lock=server.elements_lock,
+    )
+    return _scene_summary(server.config_path, p["scenario"], "final")
+
+
+async def _run_generate_elements(server: JobServer, p: dict) -> None:
+    await generate_elements(scenario_path=p["scenario"], config_path=server.config_path, transport=server.transport)
+
+
+async def _run_upload_elements(server: JobServer, p: dict) -> None:
+    await upload_elements(
+        scenario_path=p["scenario"],
+        config_path=server.config_path,
+        transport=server.transport,
+        key_pool=server.key_pool,
+        executor=server.executor,
+    )
+
+
+async def _run_refresh_elements(server: JobServer, p: dict) -> dict:
+    failed = await refresh_element_urls(
+        p["scenario"], server.config_path, force=p["force"], dry_run=p["dry_run"],
+        transport=server.transport, key_pool=server.key_pool,
+    )
+    return {"unrefreshed": failed}
+
+
+async def _run_download(server: JobServer, p: dict) -> None:
+    await download_all(
+        scenario_path=p["scenario"], config_path=server.config_path, tier=p["tier"], transport=server.transport,
+    )
+
+
+async def _run_assemble(server: JobServer, p: dict) -> dict:
+    dest = await asyncio.to_thread(
+        assemble_video,
+        scenario_path=p["scenario"],
+        config_path=server.config_path,
+        output_path=p["output"],
+        tier=p["tier"],
+    )
+    return {"output": str(dest)}
+
+
+async def _run_gc(server: JobServer, p: dict) -> dict:
+    config = load_config(server.config_path)
+    settings = RetentionSettings.from_config(config)
+    if p["budget"] is not None:
+        settings = dataclasses.replace(settings, budget_gb=p["budget"])
+    report = await asyncio.to_thread(collect_garbage, config, settings, p["dry_run"], p["all"])
+    print_report(report, settings, resolve_output_paths(config)["base_dir"])
+    return {"freed": report.freed, "evicted": len(report.evicted), "leftovers": len(report.junk)}
+
+
+_HANDLERS: dict[str, Callable[[JobServer, dict], Awaitable[Any]]] = {
+    "generate": _run_generate,
+    "promote": _run_promote,
+    "generate-elements": _run_generate_elements,
+    "upload-elements": _run_upload_elements,
+    "refresh-elements": _run_refresh_elements,
+    "download": _run_download,
+    "assemble": _run_assemble,
+    "gc": _run_gc,
+}
+
+
+# --- Server ------------------------------------------------------------------
+
+class JobServer:
+    """Job registry, scheduler and HTTP front end, with the warm shared state."""
+
+    def __init__(self, config_path: str, settings: ServeSettings) -> None:
+        self.config_path = config_path
+        self.settings = settings
+        self.jobs: dict[str, Job] = {}
+        self.started_at = time.time()
+        self.transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=settings.max_connections, max_keepalive_connections=settings.max_connections,
+            ),
+        )
+        self.key_pool: KeyPool | None = build_key_pool(load_config(config_path))
+        self.executor = ProcessPoolExecutor(max_workers=settings.image_workers or os.cpu_count() or 1)
+        self._slots = asyncio.Semaphore(settings.max_jobs)
+        self._kind_slots = {kind: asyncio.Semaphore(max(1, settings.limits.get(kind, 1))) for kind in _PARAMS}
+        self._scenario_locks: dict[str, asyncio.Lock] = {}
+        self.elements_lock = asyncio.Lock()  # guards the shared elements_status.json
+
+    def submit(self, kind: object, params: dict) -> Job:
+        """Validate and queue a job.
+
+        Raises:
+            JobError: If the request is invalid.
+        """
+        params = validate_params(kind, params)
+        job = Job(id=uuid.uuid4().hex[:12], kind=kind, params=params)
+        self.jobs[job.id] = job
+        job.emit("state", state="queued")
+        job.task = asyncio.create_task(self._run(job))
+        logger.info("Job %s queued: %s %s", job.id, kind, json.dumps(params))
+        return job
+
+    def cancel(self, job: Job) -> None:
+        if not job.done and job.task is not None:
+            job.task.cancel()
+
+    async def _run(self, job: Job) -> None:
+        _current_job.set(job)
+        handler = _HANDLERS[job.kind]
+        scenario = job.params.get("scenario")
+        try:
+            async with contextlib.AsyncExitStack() as stack:
+                # Scenario first, so a job blocked on its scenario holds no global slot
+                if scenario:
+                    lock = self._scenario_locks.setdefault(str(Path(scenario).resolve()), asyncio.Lock())
+                    await stack.enter_async_context(lock)
+                await stack.enter_async_context(self._kind_slots[job.kind])
+                await stack.enter_async_context(self._slots)
+                # After the slots: a generate holds its slot while it waits for
+                # this lock, so a holder must never wait for a slot
+                if job.kind in _ELEMENT_WRITERS:
+                    await stack.enter_async_context(self.elements_lock)
+                job.started_at = time.time()
+                job.emit("state", state="running")
+                job.result = await handler(self, job.params)
+            job.finish("succeeded")
+        except asyncio.CancelledError:
+            job.finish("cancelled")
+        except Exception as exc:
+            logger.debug("Job %s failed", job.id, exc_info=True)
+            job.finish("failed", error=f"{type(exc).__name__}: {exc}")
+        _current_job.set(None)
+        logger.info("Job %s %s", job.id, job.state)
+        self._prune()
+
+    def _prune(self) -> None:
+        finished = [j for j in self.jobs.values() if j.done]
+        for job in finished[:max(0, len(finished) - self.settings.history)]:
+            del self.jobs[job.id]
+
+    def health(self) -> dict:
+        states = [j.state for j in self.jobs.values()]
+        return {
+            "status": "ok",
+            "uptime": round(time.time() - self.started_at, 1),
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            "max_jobs": self.settings.max_jobs,
+            "api_keys": self.key_pool.usage() if self.key_pool is not None else [],
+        }
+
+    async def aclose(self) -> None:
+        """Cancel unfinished jobs, then release the shared pools."""
+        tasks = [j.task for j in self.jobs.values() if j.task is not None and not j.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.transport.aclose()
+        self.executor.shutdown(cancel_futures=True)
+
+    # --- HTTP ---
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one request per connection."""
+        try:
+            try:
+                method, path, query, body = await _read_request(reader)
+            except (ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                await _send_json(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request"})
+                return
+            await self._dispatch(writer, method, path, query, body)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _dispatch(
+        self, writer: asyncio.StreamWriter, method: str, path: str, query: dict[str, list[str]], body: bytes,
+    ) -> None:
+        parts = [p for p in path.split("/") if p]
+        if parts == ["health"] and method == "GET":
+            await _send_json(writer, HTTPStatus.OK, self.health())
+            return
+
+        if parts == ["jobs"]:
+            if method == "GET":
+                await _send_json(writer, HTTPStatus.OK, {"jobs": [j.summary() for j in self.jobs.values()]})
+            elif method == "POST":
+                try:
+                    request = json.loads(body or b"{}")
+                    if not isinstance(request, dict):
+                        raise JobError("Expected a JSON object")
+                    job = self.submit(request.pop("kind", None), request)
+                except ValueError as exc:
+                    await _send_json(writer, HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+                    return
+                await _send_json(writer, HTTPStatus.ACCEPTED, job.summary())
+            else:
+                await _send_json(writer, HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} not allowed"})
+            return
+
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                await _send_json(writer, HTTPStatus.NOT_FOUND, {"error": f"No job '{parts[1]}'"})
+            elif len(parts) == 2 and method == "GET":
+                await _send_json(writer, HTTPStatus.OK, job.summary())
+            elif len(parts) == 2 and method == "DELETE":
+                self.cancel(job)
+                await _send_json(writer, HTTPStatus.ACCEPTED, job.summary())
+            elif parts[2:] == ["events"] and method == "GET":
+                try:
+                    since = int(query.get("since", ["0"])[0])
+                except ValueError:
+                    await _send_json(writer, HTTPStatus.BAD_REQUEST, {"error": "'since' must be an integer"})
+                    return
+                await _stream_events(writer, job, since)
+            else:
+                await _send_json(writer, HTTPStatus.NOT_FOUND, {"error": f"No route {method} {path}"})
+            return
+
+        await _send_json(writer, HTTPStatus.NOT_FOUND, {"error": f"No route {method} {path}"})
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, dict[str, list[str]], bytes]:
+    """Read one HTTP/1.1 request: (method, path, query, body)."""
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    method, target, _ = request_line.split(" ", 2)
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0") or 0)
+    if length > _MAX_BODY:
+        raise ValueError("Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    url = urlsplit(target)
+    return method.upper(), url.path, parse_qs(url.query), body
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: HTTPStatus, payload: object) -> None:
+    body = json.dumps(payload, default=str).encode() + b"\n"
+    writer.write(
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+
+
+async def _stream_events(writer: asyncio.StreamWriter, job: Job, since: int) -> None:
+    """Send a job's events as chunked NDJSON until the job ends."""
+    writer.write(
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+        b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n"
+    )
+    async for event in job.follow(since):
+        data = json.dumps(event, default=str).encode() + b"\n"
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def serve(
+    config_path: str,
+    host: str | None = None,
+    port: int | None = None,
+    socket_path: str | None = None,
+) -> None:
+    """Run the job server until SIGINT/SIGTERM.
+
+    Args:
+        config_path: config.yaml every job runs with (re-read when it changes).
+        host: Address to listen on (default ``serve.host``).
+        port: TCP port (default ``serve.port``).
+        socket_path: Listen on this Unix socket instead (default ``serve.socket``).
+    """
+    settings = ServeSettings.from_config(load_config(config_path))
+    host = host or settings.host
+    port = port or settings.port
+    socket_path = socket_path or settings.socket or None
+
+    server = JobServer(config_path, settings)
+    _route_consoles(_OutputRouter(sys.stdout))
+    log_handler = _JobLogHandler()
+    logging.getLogger().addHandler(log_handler)
+
+    if socket_path:
+        sock = Path(socket_path)
+        if sock.exists() and stat.S_ISSOCK(sock.stat().st_mode):
+            sock.unlink()  # left behind by a previous server
+        listener = await asyncio.start_unix_server(server.handle, path=socket_path)
+        where = f"unix:{socket_path}"
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        where = f"http://{host}:{port}"
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    console.print(
+        f"[bold]Serving pipeline jobs on {where}[/bold] "
+        f"(max {settings.max_jobs} at once; Ctrl+C to stop)"
+    )
+    try:
+        async with listener:
+            await stop.wait()
+    finally:
+        console.print("[yellow]Shutting down; cancelling unfinished jobs...[/yellow]")
+        await server.aclose()
+        logging.getLogger().removeHandler(log_handler)
+        if socket_path:
+            Path(socket_path).unlink(missing_ok=True)
@@ -0,0 +1,420 @@
+"""Capacity-planning simulation of scene generation.
+
+Runs the real ``generate_shots`` scheduler (plan, ordering policy,
+concurrency limits, key pool, polling, retries) against an in-process
+simulated KIE.ai backend, on an event loop whose clock is virtual: when
+nothing is runnable the clock jumps straight to the next timer, so hours
+of queueing and rendering simulate in seconds without network access.
+
+Queue time, render time, failure rate, backend concurrency and the
+per-key rate limit come from the ``simulation`` config section. The run
+works in a scratch copy of the output directory (shared element URLs and
+poll history are copied in), so real status files are never touched.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import logging
+import random
+import selectors
+import shutil
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import httpx
+import yaml
+from rich.console import Console
+from rich.table import Table
+
+from pipeline.auth import load_config, resolve_output_paths
+from pipeline.retry import estimate_credits
+from pipeline.status import save_status
+
+logger = logging.getLogger(__name__)
+console = Console()
+
+_CDN_HOST = "sim.kie.invalid"
+_FAKE_VIDEO = b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 1000
+_SIM_MAX_WAIT = 30 * 24 * 3600  # virtual seconds
+
+
+@dataclass
+class SimulationSettings:
+    """Backend model loaded from the ``simulation`` config section.
+
+    Attributes:
+        seed: Random seed, so runs are repeatable.
+        queue_mean: Mean seconds a task waits before rendering starts.
+        queue_std: Standard deviation of the queue time.
+        render_rate: Render seconds per second of video, by mode.
+        jitter: Relative spread of render time (0.2 = +/-20%).
+        failure_rate: Fraction of tasks that fail at the end of rendering.
+        backend_concurrency: Tasks the backend renders at once (0 = unlimited).
+        rate_limit_per_minute: Task creations per API key per minute (0 = unlimited).
+    """
+    seed: int = 0
+    queue_mean: float = 30.0
+    queue_std: float = 15.0
+    render_rate: dict = field(default_factory=lambda: {"std": 12.0, "pro": 20.0})
+    jitter: float = 0.2
+    failure_rate: float = 0.05
+    backend_concurrency: int = 0
+    rate_limit_per_minute: int = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> SimulationSettings:
+        raw = config.get("simulation", {}) or {}
+        queue = raw.get("queue_seconds", {}) or {}
+        defaults = cls()
+        return cls(
+            seed=raw.get("seed", defaults.seed),
+            queue_mean=queue.get("mean", defaults.queue_mean),
+            queue_std=queue.get("std", defaults.queue_std),
+            render_rate={**defaults.render_rate, **(raw.get("render_seconds_per_video_second") or {})},
+            jitter=raw.get("jitter", defaults.jitter),
+            failure_rate=raw.get("failure_rate", defaults.failure_rate),
+            backend_concurrency=raw.get("backend_concurrency", defaults.backend_concurrency),
+            rate_limit_per_minute=raw.get("rate_limit_per_minute", defaults.rate_limit_per_minute),
+        )
+
+
+@dataclass
+class SimulatedTask:
+    """One task accepted by the simulated backend."""
+    task_id: str
+    api_key: str
+    mode: str
+    duration: int
+    created_at: float
+    started_at: float
+    finished_at: float
+    failed: bool
+    polls: int = 0
+    last_polled_at: float | None = None
+    seen_done_at: float | None = None  # first poll that reported the outcome
+
+
+class SimulatedKie(httpx.AsyncBaseTransport):
+    """In-process stand-in for the KIE.ai API, upload service and CDN.
+
+    Tasks are queued FIFO onto ``backend_concurrency`` render slots; each
+    poll reports ``waiting``, ``generating`` or the outcome according to
+    the current (virtual) time.
+    """
+
+    def __init__(self, settings: SimulationSettings, clock) -> None:
+        self.settings = settings
+        self.clock = clock
+        self.tasks: dict[str, SimulatedTask] = {}
+        self.rejected = 0  # createTask calls answered with HTTP 429
+        self._rng = random.Random(settings.seed)
+        self._slots: list[float] = [0.0] * settings.backend_concurrency  # when each render slot frees up
+        self._recent: dict[str, deque] = {}  # api key -> recent creation times
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.url.host == _CDN_HOST:
+            return httpx.Response(200, content=_FAKE_VIDEO, headers={"Content-Type": "video/mp4"})
+        if path.endswith("/jobs/createTask"):
+            return self._create(request)
+        if path.endswith("/jobs/recordInfo"):
+            return self._record_info(request)
+        if path.endswith("/file-stream-upload"):
+            url = f"https://{_CDN_HOST}/uploads/{len(self.tasks)}-{self._rng.getrandbits(32):08x}"
+            return httpx.Response(200, json={"success": True, "code": 200, "data": {"fileUrl": url}})
+        return httpx.Response(404, json={"code": 404, "message": f"Not simulated: {path}"})
+
+    def _create(self, request: httpx.Request) -> httpx.Response:
+        now = self.clock()
+        api_key = request.headers.get("Authorization", "")
+        limit = self.settings.rate_limit_per_minute
+        if limit:
+            recent = self._recent.setdefault(api_key, deque())
+            while recent and now - recent[0] >= 60:
+                recent.popleft()
+            if len(recent) >= limit:
+                self.rejected += 1
+                return httpx.Response(429, json={"code": 429, "message": "Too many requests"})
+            recent.append(now)
+
+        body = json.loads(request.content)
+        inp = body.get("input", {})
+        mode = inp.get("mode", "pro")
+        duration = int(inp.get("duration") or sum(s.get("duration", 0) for s in inp.get("multi_prompt", [])))
+
+        s = self.settings
+        ready = now + max(0.0, self._rng.gauss(s.queue_mean, s.queue_std))
+        render = duration * s.render_rate.get(mode, s.render_rate.get("pro", 20.0))
+        render *= 1 + self._rng.uniform(-s.jitter, s.jitter)
+        if self._slots:
+            slot = min(range(len(self._slots)), key=self._slots.__getitem__)
+            start = max(ready, self._slots[slot])
+            self._slots[slot] = start + render
+        else:
+            start = ready
+
+        task_id = f"sim-{len(self.tasks) + 1:05d}"
+        self.tasks[task_id] = SimulatedTask(
+            task_id=task_id,
+            api_key=api_key,
+            mode=mode,
+            duration=duration,
+            created_at=now,
+            started_at=start,
+            finished_at=start + render,
+            failed=self._rng.random() < s.failure_rate,
+        )
+        return httpx.Response(200, json={"code": 200, "data": {"taskId": task_id}})
+
+    def _record_info(self, request: httpx.Request) -> httpx.Response:
+        now = self.clock()
+        task_id = parse_qs(request.url.query.decode()).get("taskId", [""])[0]
+        task = self.tasks.get(task_id)
+        if task is None:
+            return httpx.Response(200, json={"code": 404, "message": f"Unknown task {task_id}"})
+        task.polls += 1
+        task.last_polled_at = now
+
+        data: dict = {"taskId": task_id}
+        if now < task.started_at:
+            data["state"] = "waiting"
+        elif now < task.finished_at:
+            data["state"] = "generating"
+        else:
+            if task.seen_done_at is None:
+                task.seen_done_at = now
+            if task.failed:
+                data.update(state="fail", error="Simulated generation failure")
+            else:
+                urls = [f"https://{_CDN_HOST}/{task_id}.mp4"]
+                data.update(state="success", resultJson=json.dumps({"resultUrls": urls}))
+        return httpx.Response(200, json={"code": 200, "data": data})
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """Selector that advances the loop's virtual clock instead of sleeping."""
+
+    loop: VirtualTimeLoop
+
+    def select(self, timeout: float | None = None):
+        if self.loop._executor_jobs:
+            # Real work (file I/O) is running on threads; let it finish in real time
+            return super().select(0.05 if timeout is None else min(timeout, 0.05))
+        events = super().select(0)
+        if events or timeout is None:
+            return events or super().select(None)
+        self.loop._virtual_now += max(timeout, 0.0)
+        return []
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop whose ``time()`` only advances when every task is waiting.
+
+    The clock starts at ``time.monotonic()``, so the loop-aware clocks in
+    ``kie_client.clock`` (used by the client and key pool) follow it.
+    """
+
+    def __init__(self) -> None:
+        selector = _VirtualSelector()
+        super().__init__(selector)
+        selector.loop = self
+        self._virtual_now = time.monotonic()
+        self._executor_jobs = 0
+        # A nanosecond can be below float precision at large clock values, and
+        # timers due "now" would never fire
+        self._clock_resolution = 1e-6
+
+    def time(self) -> float:
+        return self._virtual_now
+
+    def run_in_executor(self, executor, func, *args):
+        self._executor_jobs += 1
+        future = super().run_in_executor(executor, func, *args)
+
+        def _done(_: asyncio.Future) -> None:
+            self._executor_jobs -= 1
+
+        future.add_done_callback(_done)
+        return future
+
+
+def _peak_concurrency(intervals: list[tuple[float, float]]) -> int:
+    """Largest number of overlapping (start, end) intervals."""
+    events = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+    peak = current = 0
+    for _, delta in events:
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+def _report(backend: SimulatedKie, config: dict, started: float, ended: float) -> dict:
+    """Summarise the simulated run."""
+    tasks = sorted(backend.tasks.values(), key=lambda t: t.created_at)
+    failed = [t for t in tasks if t.failed and t.seen_done_at is not None]
+    credits = sum(estimate_credits(config, t.mode, t.duration) for t in tasks)
+    return {
+        "started_at": time.time() - (time.monotonic() - started),  # wall time the simulation began
+        "makespan_seconds": ended - started,
+        "tasks_created": len(tasks),
+        "tasks_failed": len(failed),
+        "tasks_unfinished": sum(1 for t in tasks if t.seen_done_at is None),
+        "rate_limited_requests": backend.rejected,
+        # A task the client gave up on stops counting at its last poll
+        "peak_tasks_in_flight": _peak_concurrency(
+            [(t.created_at, t.seen_done_at or t.last_polled_at or t.created_at) for t in tasks]
+        ),
+        "peak_tasks_rendering": _peak_concurrency([(t.started_at, t.finished_at) for t in tasks]),
+        "polls": sum(t.polls for t in tasks),
+        "credits": credits,
+        "credits_on_failed_renders": sum(estimate_credits(config, t.mode, t.duration) for t in failed),
+        "timeline": [
+            {
+                "task_id": t.task_id,
+                "mode": t.mode,
+                "duration": t.duration,
+                "submitted": t.created_at - started,
+                "started": t.started_at - started,
+                "finished": t.finished_at - started,
+                "collected": None if t.seen_done_at is None else t.seen_done_at - started,
+                "failed": t.failed and t.seen_done_at is not None,
+                "polls": t.polls,
+            }
+            for t in tasks
+        ],
+    }
+
+
+def _fmt_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s" if hours else f"{minutes}m{secs:02d}s"
+
+
+def _print_report(report: dict, scene_keys: dict[str, str]) -> None:
+    table = Table(title="Simulated timeline")
+    table.add_column("Task")
+    table.add_column("Scene")
+    table.add_column("Video", justify="right")
+    table.add_column("Submitted", justify="right")
+    table.add_column("Render", justify="right")
+    table.add_column("Collected", justify="right")
+    table.add_column("Outcome")
+    for row in report["timeline"]:
+        outcome = "[red]failed[/red]" if row["failed"] else "[green]ok[/green]"
+        if row["collected"] is None:
+            outcome = "[yellow]unfinished[/yellow]"
+        table.add_row(
+            row["task_id"],
+            scene_keys.get(row["task_id"], "?"),
+            f"{row['duration']}s {row['mode']}",
+            _fmt_duration(row["submitted"]),
+            f"{_fmt_duration(row['started'])} - {_fmt_duration(row['finished'])}",
+            "-" if row["collected"] is None else _fmt_duration(row["collected"]),
+            outcome,
+        )
+    console.print(table)
+    console.print(
+        f"[bold]Projected wall time: {_fmt_duration(report['makespan_seconds'])}[/bold]  "
+        f"({report['tasks_created']} task(s), {report['tasks_failed']} failed, "
+        f"{report['tasks_unfinished']} unfinished, {report['rate_limited_requests']} rate-limited request(s))"
+    )
+    console.print(
+        f"[bold]Peak concurrency:[/bold] {report['peak_tasks_in_flight']} task(s) in flight, "
+        f"{report['peak_tasks_rendering']} rendering at once; {report['polls']} status poll(s)"
+    )
+    console.print(
+        f"[bold]Credits:[/bold] {report['credits']:.0f} "
+        f"({report['credits_on_failed_renders']:.0f} on failed renders)"
+    )
+
+
+def simulate_shots(
+    scenario_path: str,
+    config_path: str | None = None,
+    scene_ids: list[int] | None = None,
+    schedule: str | None = None,
+    deadline: float | None = None,
+    tier: str = "final",
+) -> dict:
+    """Simulate ``generate_shots --wait`` and report the projected run.
+
+    Arguments match :func:`pipeline.generate_shots.generate_shots`. The
+    report is also written to ``simulation.json`` next to the scenario's
+    status file.
+
+    Returns:
+        The report dict (makespan, peak concurrency, credits, timeline).
+    """
+    from pipeline.generate_shots import generate_shots
+
+    config = load_config(config_path)
+    settings = SimulationSettings.from_config(config)
+    real_paths = resolve_output_paths(config, scenario_path, tier)
+
+    with tempfile.TemporaryDirectory(prefix="kling-sim-") as scratch:
+        # Mirror the output layout in scratch space, with the shared inputs copied in
+        sim_config = copy.deepcopy(config)
+        sim_config["output"]["base_dir"] = str(Path(scratch) / "output")
+        sim_config["output"]["elements_dir"] = str(Path(scratch) / "output" / "elements")
+        sim_config["storage"] = {"backend": "local"}  # simulated renders never reach shared storage
+        sim_config["providers"] = {"grok": {"enabled": False}}  # the simulated backend only models KIE
+        # Waiting costs no real time, so never give up on a slow render; the
+        # real deadline would cut the projection off at polling.max_wait_seconds
+        sim_config.setdefault("polling", {})["max_wait_seconds"] = _SIM_MAX_WAIT
+        api = sim_config.setdefault("api", {})
+        if not api.get("api_key") or api["api_key"] == "YOUR_KIE_API_KEY":
+            api["api_key"] = "simulated"
+        sim_paths = resolve_output_paths(sim_config, scenario_path, tier)
+        for name in ("elements_status_file", "poll_history_file"):
+            if real_paths[name].exists():
+                sim_paths[name].parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(real_paths[name], sim_paths[name])
+        sim_config_path = Path(scratch) / "config.yaml"
+        sim_config_path.write_text(yaml.safe_dump(sim_config, sort_keys=False), encoding="utf-8")
+
+        loop = VirtualTimeLoop()
+        backend = SimulatedKie(settings, loop.time)
+        started = loop.time()
+        try:
+            loop.run_until_complete(generate_shots(
+                scenario_path=scenario_path,
+                config_path=str(sim_config_path),
+                scene_ids=scene_ids,
+                wait=True,
+                schedule=schedule,
+                deadline=deadline,
+                tier=tier,
+                transport=backend,
+            ))
+            ended = loop.time()
+        finally:
+            loop.close()
+
+        sim_status = json.loads(sim_paths["status_file"].read_text(encoding="utf-8")) \
+            if sim_paths["status_file"].exists() else {}
+
+    scene_keys = {
+        attempt["task_id"]: key
+        for key, entry in sim_status.get("scenes", {}).items()
+        for attempt in entry.get("attempts", [])
+        if attempt.get("task_id")
+    }
+    report = _report(backend, config, started, ended)
+    for row in report["timeline"]:
+        row["scene"] = scene_keys.get(row["task_id"])
+    report["settings"] = vars(settings)
+
+    console.rule("[bold blue]Simulation Report[/bold blue]")
+    _print_report(report, scene_keys)
+    dest = real_paths["status_file"].with_name("simulation.json")
+    save_status(dest, report)
+    console.print(f"[dim]Simulation report -> {dest}[/dim]")
+    return report
@@ -0,0 +1,135 @@
+"""Status file persistence shared by pipeline stages.
+
+Status files are written atomically (temp file + rename) so an interrupted
+write never leaves a half-written JSON behind. ``StatusBatcher`` groups
+many small updates into periodic commits instead of rewriting the whole
+file after every change. ``SubmissionJournal`` logs paid submissions
+ahead of the status file, so a crash never loses a task ID.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def load_status(status_path: Path) -> dict:
+    """Load pipeline status from JSON file."""
+    if status_path.exists():
+        with open(status_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_status(status_path: Path, status: dict) -> None:
+    """Atomically save pipeline status to JSON file."""
+    status_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = status_path.with_name(status_path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, status_path)
+
+
+class StatusBatcher:
+    """Commits a status dict to disk every ``every`` updates or ``interval`` seconds.
+
+    Usage::
+
+        batcher = StatusBatcher(path, status)
+        ...mutate status...
+        batcher.mark()
+        ...
+        batcher.flush()  # always flush at the end
+    """
+
+    def __init__(self, status_path: Path, status: dict, every: int = 10, interval: float = 5.0) -> None:
+        self.status_path = status_path
+        self.status = status
+        self.every = max(1, every)
+        self.interval = interval
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def mark(self) -> None:
+        """Record one update, committing if a batch threshold is reached."""
+        self._pending += 1
+        if self._pending >= self.every or time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Commit pending updates, if any."""
+        if not self._pending:
+            return
+        save_status(self.status_path, self.status)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+
+class SubmissionJournal:
+    """Append-only write-ahead log of task submissions (JSON lines).
+
+    An ``intent`` record is synced to disk before each submission is sent
+    and a ``submitted`` (or ``failed``) record right after it returns, so a
+    process killed at any point leaves either the task ID or an unresolved
+    intent behind. :meth:`pending` lists what the status file may not know
+    about yet; :meth:`clear` drops the log once that is reconciled.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def _append(self, record: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def intent(self, key: str, fingerprint: str, provider: str, at: float) -> str:
+        """Record that ``key`` is about to be submitted; return the intent ID."""
+        intent_id = uuid.uuid4().hex
+        self._append({
+            "op": "intent", "id": intent_id, "key": key, "fingerprint": fingerprint, "provider": provider, "at": at,
+        })
+        return intent_id
+
+    def submitted(self, intent_id: str, task_id: str, api_key: str | None, at: float) -> None:
+        """Record the task ID a submission created."""
+        self._append({"op": "submitted", "id": intent_id, "task_id": task_id, "api_key": api_key, "at": at})
+
+    def failed(self, intent_id: str) -> None:
+        """Record that a submission was rejected, so no task exists for it."""
+        self._append({"op": "failed", "id": intent_id})
+
+    def pending(self) -> list[dict]:
+        """Intents that were not rejected, with ``task_id`` set once known, in order."""
+        if not self.path.exists():
+            return []
+        intents: dict[str, dict] = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning("Ignoring a torn record in %s", self.path)
+                    continue
+                op, intent_id = record.get("op"), record.get("id")
+                if op == "intent":
+                    intents[intent_id] = {**record, "task_id": None}
+                elif op == "submitted" and intent_id in intents:
+                    intents[intent_id].update(
+                        task_id=record["task_id"], api_key=record.get("api_key"), submitted_at=record.get("at"),
+                    )
+                elif op == "failed":
+                    intents.pop(intent_id, None)
+        return list(intents.values())
+
+    def clear(self) -> None:
+        """Drop the log (call after its pending entries are saved to status)."""
+        self.path.unlink(missing_ok=True)
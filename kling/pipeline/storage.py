@@ -0,0 +1,544 @@
+"""Artifact storage for element images, scene videos and assembled cuts.
+
+Pipeline code keeps addressing artifacts by their friendly local paths
+(``output/elements/Topa/Topa1.png``, ``output/<scenario>/shots/scene_3.mp4``);
+the storage backend decides where the bytes live:
+
+- ``LocalStorage`` keeps one content-addressed blob per distinct file under
+  ``output/blobs/sha256/`` and hardlinks the friendly paths to it, so a
+  re-download or an identical render takes no extra space.
+- ``S3Storage`` puts an S3-compatible bucket (AWS, MinIO, ...) behind the
+  local store. Blobs are uploaded once per digest and every friendly path
+  gets a small ref object naming its blob, so another render host can pull
+  artifacts it did not produce. The local blobs act as its cache.
+
+Writes stream: ``open_write`` yields a writer whose ``write`` hashes each
+block, writes it locally and, for S3, uploads it in multipart chunks as it
+arrives. Nothing appears at the friendly path until the write completes.
+
+Friendly paths share an inode with their blob, so they must be replaced
+(write elsewhere, then rename) rather than rewritten in place.
+
+Paths outside the output tree (e.g. an assembled cut written elsewhere)
+are written as plain files.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import hashlib
+import hmac
+import logging
+import os
+import re
+import shutil
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator
+from urllib.parse import quote
+
+import httpx
+
+from pipeline.auth import resolve_output_paths
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("local", "s3")
+
+_READ_BLOCK = 1024 * 1024
+_MIN_PART_SIZE = 5 * 1024 * 1024  # S3 minimum for every multipart part but the last
+
+
+class StorageError(RuntimeError):
+    """Raised when an artifact cannot be stored or fetched."""
+
+
+def _abs(path: str | Path) -> Path:
+    return Path(os.path.abspath(path))
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(_READ_BLOCK):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _canonical_query(params: dict[str, str]) -> str:
+    """Query string in SigV4 canonical form (sorted, strictly percent-encoded)."""
+    return "&".join(f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(params.items()))
+
+
+class ArtifactWriter:
+    """Sink yielded by ``open_write``: hashes and writes each block to a temp file."""
+
+    def __init__(self, path: Path, tmp: Path) -> None:
+        self.path = path
+        self.size = 0
+        self._tmp = tmp
+        self._file = open(tmp, "xb")
+        self._hash = hashlib.sha256()
+
+    @property
+    def digest(self) -> str:
+        return self._hash.hexdigest()
+
+    async def write(self, data: bytes) -> None:
+        await asyncio.to_thread(self._write, data)
+
+    def _write(self, data: bytes) -> None:
+        self._hash.update(data)
+        self._file.write(data)
+        self.size += len(data)
+
+
+class LocalStorage:
+    """Content-addressed blobs on local disk, with hardlinked friendly paths.
+
+    Args:
+        base_dir: Output root (``output.base_dir``).
+        elements_dir: Shared element images (``output.elements_dir``).
+        blobs_dir: Blob store (defaults to ``<base_dir>/blobs``).
+    """
+
+    backend = "local"
+
+    def __init__(self, base_dir: str | Path, elements_dir: str | Path, blobs_dir: str | Path | None = None) -> None:
+        self.base_dir = _abs(base_dir)
+        self.elements_dir = _abs(elements_dir)
+        self.blobs_dir = _abs(blobs_dir or self.base_dir / "blobs")
+
+    async def __aenter__(self) -> LocalStorage:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        pass
+
+    def key(self, path: str | Path) -> str | None:
+        """Storage key of a friendly path (None if it lies outside the output tree)."""
+        p = _abs(path)
+        for root, prefix in ((self.elements_dir, "elements/"), (self.base_dir, "")):
+            if p.is_relative_to(root) and not p.is_relative_to(self.blobs_dir):
+                return prefix + p.relative_to(root).as_posix()
+        return None
+
+    def blob_path(self, digest: str) -> Path:
+        return self.blobs_dir / "sha256" / digest[:2] / digest
+
+    @asynccontextmanager
+    async def open_write(self, path: str | Path) -> AsyncIterator[ArtifactWriter]:
+        """Write an artifact; it is committed when the block exits cleanly.
+
+        Usage::
+
+            async with storage.open_write(local_path) as out:
+                await client.download_to(url, out.write)
+        """
+        path = Path(path)
+        tmp_dir = self.blobs_dir / "tmp" if self.key(path) is not None else path.parent
+        await asyncio.to_thread(tmp_dir.mkdir, parents=True, exist_ok=True)
+        tmp = tmp_dir / f".{path.name}.{uuid.uuid4().hex[:8]}.part"
+        writer = ArtifactWriter(path, tmp)
+        try:
+            yield writer
+        except BaseException:
+            writer._file.close()
+            tmp.unlink(missing_ok=True)
+            raise
+        writer._file.close()
+        await asyncio.to_thread(self._commit, writer)
+
+    def _commit(self, writer: ArtifactWriter) -> None:
+        if self.key(writer.path) is None:
+            writer.path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(writer._tmp, writer.path)
+            return
+        blob = self.blob_path(writer.digest)
+        if blob.exists():
+            writer._tmp.unlink()  # identical content is already stored
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(writer._tmp, blob)
+        self._link(blob, writer.path)
+
+    def _link(self, blob: Path, path: Path) -> None:
+        """Point ``path`` at ``blob`` atomically (a copy across filesystems)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staged = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.link")
+        try:
+            os.link(blob, staged)
+        except OSError:
+            shutil.copyfile(blob, staged)
+        os.replace(staged, path)
+
+    async def put_file(self, path: str | Path) -> str | None:
+        """Adopt a file written in place (e.g. by ffmpeg) into the store.
+
+        Returns:
+            Its digest, or None for paths outside the output tree.
+        """
+        return await asyncio.to_thread(self._adopt, Path(path))
+
+    def _adopt(self, path: Path) -> str | None:
+        if self.key(path) is None:
+            return None
+        digest = _hash_file(path)
+        blob = self.blob_path(digest)
+        if blob.exists():
+            self._link(blob, path)
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(path, blob)
+            except OSError:
+                shutil.copyfile(path, blob)
+        return digest
+
+    async def fetch(self, path: str | Path) -> bool:
+        """Make an artifact available at its friendly path; False if it is unknown."""
+        return Path(path).exists()
+
+
+class _MultipartUpload:
+    """Streams an object to S3, buffering up to one part in memory.
+
+    A body that fits in one part is kept in memory and never starts a
+    multipart upload, so small files cost a single PUT.
+    """
+
+    def __init__(self, storage: S3Storage, key: str) -> None:
+        self.storage = storage
+        self.key = key
+        self.upload_id: str | None = None
+        self.buffer = bytearray()
+        self.parts: list[tuple[int, str]] = []  # (part number, ETag)
+
+    async def write(self, data: bytes) -> None:
+        self.buffer += data
+        if len(self.buffer) >= self.storage.part_size:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if self.upload_id is None:
+            response = await self.storage._call("POST", self.key, params={"uploads": ""})
+            match = re.search(r"<UploadId>([^<]+)</UploadId>", response.text)
+            if not match:
+                raise StorageError(f"S3 did not start a multipart upload for {self.key}: {response.text[:200]}")
+            self.upload_id = match.group(1)
+        part, self.buffer = bytes(self.buffer), bytearray()
+        number = len(self.parts) + 1
+        response = await self.storage._call(
+            "PUT", self.key, params={"partNumber": str(number), "uploadId": self.upload_id}, content=part,
+        )
+        self.parts.append((number, response.headers["etag"]))
+
+    async def finish(self) -> bool:
+        """Complete the upload; False if the body is still held in memory (no upload made)."""
+        if self.upload_id is None:
+            return False
+        if self.buffer:
+            await self._flush()
+        body = "<CompleteMultipartUpload>" + "".join(
+            f"<Part><PartNumber>{n}</PartNumber><ETag>{etag}</ETag></Part>" for n, etag in self.parts
+        ) + "</CompleteMultipartUpload>"
+        await self.storage._call("POST", self.key, params={"uploadId": self.upload_id}, content=body.encode())
+        return True
+
+    async def abort(self) -> None:
+        if self.upload_id is not None:
+            try:
+                await self.storage._call("DELETE", self.key, params={"uploadId": self.upload_id})
+            except (StorageError, httpx.HTTPError) as exc:
+                logger.warning("Could not abort multipart upload of %s: %s", self.key, exc)
+
+
+class _TeeWriter:
+    """Writes each block to the local store and the S3 upload."""
+
+    def __init__(self, local: ArtifactWriter, upload: _MultipartUpload) -> None:
+        self.local = local
+        self.upload = upload
+        self.path = local.path
+
+    @property
+    def size(self) -> int:
+        return self.local.size
+
+    async def write(self, data: bytes) -> None:
+        await asyncio.gather(self.local.write(data), self.upload.write(data))
+
+
+class S3Storage(LocalStorage):
+    """An S3-compatible bucket behind the local content-addressed store.
+
+    Objects use path-style URLs (``<endpoint>/<bucket>/<key>``), which AWS
+    and MinIO both accept, and are signed with AWS Signature Version 4.
+    Bucket layout under ``prefix``:
+
+    - ``blobs/sha256/<digest>``: artifact content, stored once.
+    - ``refs/<key>``: the digest a friendly path currently points at.
+
+    Args:
+        base_dir, elements_dir, blobs_dir: As for ``LocalStorage``.
+        endpoint: Service URL, e.g. ``https://s3.eu-west-1.amazonaws.com`` or
+            ``http://localhost:9000`` for MinIO.
+        bucket: Bucket name.
+        access_key, secret_key: Credentials.
+        prefix: Key prefix inside the bucket.
+        region: Signing region.
+        part_size: Multipart chunk size in bytes (at least 5 MiB).
+        transport: Alternative HTTP transport (tests, a local stand-in).
+    """
+
+    backend = "s3"
+
+    def __init__(
+        self,
+        base_dir: str | Path,
+        elements_dir: str | Path,
+        endpoint: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        prefix: str = "",
+        region: str = "us-east-1",
+        part_size: int = 8 * 1024 * 1024,
+        blobs_dir: str | Path | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        super().__init__(base_dir, elements_dir, blobs_dir)
+        self.endpoint = endpoint.rstrip("/")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.region = region
+        self.part_size = max(part_size, _MIN_PART_SIZE)
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._client = httpx.AsyncClient(timeout=httpx.Timeout(300.0, connect=10.0), transport=transport)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    # ------------------------------------------------------------------
+    # S3 requests
+    # ------------------------------------------------------------------
+
+    def _url_path(self, key: str) -> str:
+        return "/" + quote(f"{self.bucket}/{self.prefix}{key}", safe="/-_.~")
+
+    def _sign(self, method: str, path: str, params: dict[str, str], headers: dict[str, str]) -> dict[str, str]:
+        """Return ``headers`` plus the SigV4 Authorization, date and payload headers."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        scope = f"{amz_date[:8]}/{self.region}/s3/aws4_request"
+        headers = {
+            **headers,
+            "host": httpx.URL(self.endpoint).netloc.decode(),
+            "x-amz-date": amz_date,
+            "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
+        }
+        signed = sorted(k.lower() for k in headers)
+        lowered = {k.lower(): str(v).strip() for k, v in headers.items()}
+        query = _canonical_query(params)
+        canonical = "\n".join([
+            method, path, query,
+            "".join(f"{k}:{lowered[k]}\n" for k in signed),
+            ";".join(signed),
+            "UNSIGNED-PAYLOAD",
+        ])
+        to_sign = "\n".join([
+            "AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical.encode()).hexdigest(),
+        ])
+        key = f"AWS4{self._secret_key}".encode()
+        for part in (amz_date[:8], self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, to_sign.encode(), hashlib.sha256).hexdigest()
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self._access_key}/{scope}, "
+            f"SignedHeaders={';'.join(signed)}, Signature={signature}"
+        )
+        return headers
+
+    def _build(
+        self, method: str, key: str, params: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None, content: bytes | None = None,
+    ) -> httpx.Request:
+        params = params or {}
+        path = self._url_path(key)
+        query = _canonical_query(params)
+        url = self.endpoint + path + (f"?{query}" if query else "")
+        return self._client.build_request(
+            method, url, headers=self._sign(method, path, params, headers or {}), content=content,
+        )
+
+    async def _call(
+        self, method: str, key: str, params: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None, content: bytes | None = None, missing_ok: bool = False,
+    ) -> httpx.Response | None:
+        try:
+            response = await self._client.send(self._build(method, key, params, headers, content))
+        except httpx.HTTPError as exc:
+            raise StorageError(f"S3 {method} {key} failed: {exc}") from exc
+        if missing_ok and response.status_code == 404:
+            return None
+        # CompleteMultipartUpload and CopyObject can fail with a 200 and an error body
+        if response.status_code >= 300 or (method != "GET" and response.text.lstrip().startswith("<Error>")):
+            raise StorageError(f"S3 {method} {key} failed ({response.status_code}): {response.text[:300]}")
+        return response
+
+    async def _has_blob(self, digest: str) -> bool:
+        return await self._call("HEAD", f"blobs/sha256/{digest}", missing_ok=True) is not None
+
+    async def _publish(self, key: str, digest: str, upload: _MultipartUpload | None = None) -> None:
+        """Store the blob for ``digest`` (from a finished upload) and point ``key`` at it."""
+        blob_key = f"blobs/sha256/{digest}"
+        if upload is not None and upload.upload_id is not None:
+            if not await self._has_blob(digest):
+                source = quote(f"/{self.bucket}/{self.prefix}{upload.key}", safe="/-_.~")
+                await self._call("PUT", blob_key, headers={"x-amz-copy-source": source})
+            await self._call("DELETE", upload.key)
+        elif not await self._has_blob(digest):
+            content = bytes(upload.buffer) if upload is not None else await asyncio.to_thread(
+                self.blob_path(digest).read_bytes,
+            )
+            await self._call("PUT", blob_key, headers={"content-type": "application/octet-stream"}, content=content)
+        await self._call("PUT", f"refs/{key}", headers={"content-type": "text/plain"}, content=digest.encode())
+
+    # ------------------------------------------------------------------
+    # Storage interface
+    # ------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def open_write(self, path: str | Path) -> AsyncIterator[ArtifactWriter | _TeeWriter]:
+        key = self.key(path)
+        if key is None:
+            async with super().open_write(path) as writer:
+                yield writer
+            return
+
+        upload = _MultipartUpload(self, f"tmp/{uuid.uuid4().hex}")
+        try:
+            async with super().open_write(path) as local:
+                yield _TeeWriter(local, upload)
+                await upload.finish()
+        except BaseException:
+            await upload.abort()
+            raise
+        try:
+            await self._publish(key, local.digest, upload)
+        except StorageError:
+            await upload.abort()
+            raise
+
+    async def put_file(self, path: str | Path) -> str | None:
+        digest = await super().put_file(path)
+        key = self.key(path)
+        if digest is None or key is None:
+            return digest
+        if await self._has_blob(digest):
+            await self._publish(key, digest)
+            return digest
+
+        # Stream the blob up from disk, a part at a time
+        upload = _MultipartUpload(self, f"tmp/{uuid.uuid4().hex}")
+        try:
+            with open(self.blob_path(digest), "rb") as f:
+                while block := await asyncio.to_thread(f.read, self.part_size):
+                    await upload.write(block)
+            await upload.finish()
+            await self._publish(key, digest, upload)
+        except BaseException:
+            await upload.abort()
+            raise
+        return digest
+
+    @staticmethod
+    def _holds(path: Path, blob: Path, digest: str) -> bool:
+        """Whether ``path`` has the content ``digest`` (a link to its blob needs no hashing)."""
+        if blob.exists() and os.path.samefile(path, blob):
+            return True
+        return _hash_file(path) == digest
+
+    async def fetch(self, path: str | Path) -> bool:
+        """Make the artifact at ``path`` match its ref, pulling it from the bucket.
+
+        A local file is trusted only if it holds the digest ``refs/<key>``
+        names; another host may have published a newer version since.
+        """
+        path = Path(path)
+        key = self.key(path)
+        if key is None:
+            return path.exists()
+        ref = await self._call("GET", f"refs/{key}", missing_ok=True)
+        if ref is None:
+            return path.exists()  # never published; a local file is all there is
+        digest = ref.text.strip()
+        blob = self.blob_path(digest)
+        if path.exists():
+            if await asyncio.to_thread(self._holds, path, blob, digest):
+                return True
+            logger.info("%s is out of date with s3://%s/%s", path, self.bucket, self.prefix + key)
+        if blob.exists():
+            await asyncio.to_thread(self._link, blob, path)
+            return True
+
+        logger.info("Fetching %s from s3://%s/%s", path, self.bucket, self.prefix + key)
+        request = self._build("GET", f"blobs/sha256/{digest}")
+        try:
+            async with LocalStorage.open_write(self, path) as writer:
+                response = await self._client.send(request, stream=True)
+                try:
+                    if response.status_code != 200:
+                        raise StorageError(f"S3 GET blob {digest} for {key} failed ({response.status_code})")
+                    async for chunk in response.aiter_bytes(_READ_BLOCK):
+                        await writer.write(chunk)
+                finally:
+                    await response.aclose()
+                if writer.digest != digest:
+                    raise StorageError(f"S3 blob for {key} does not match its digest {digest}")
+        except httpx.HTTPError as exc:
+            raise StorageError(f"S3 GET blob {digest} for {key} failed: {exc}") from exc
+        return True
+
+
+def build_storage(config: dict, transport: httpx.AsyncBaseTransport | None = None) -> LocalStorage:
+    """Create the storage backend from the ``storage`` config section.
+
+    Raises:
+        ValueError: For an unknown backend or incomplete S3 settings.
+    """
+    paths = resolve_output_paths(config)
+    raw = config.get("storage", {}) or {}
+    backend = raw.get("backend", "local")
+    if backend == "local":
+        return LocalStorage(paths["base_dir"], paths["elements_dir"], paths["blobs_dir"])
+    if backend != "s3":
+        raise ValueError(f"Unknown storage backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+
+    s3 = raw.get("s3", {}) or {}
+    access_key = s3.get("access_key") or os.environ.get("AWS_ACCESS_KEY_ID", "")
+    secret_key = s3.get("secret_key") or os.environ.get("AWS_SECRET_ACCESS_KEY", "")
+    missing = [name for name, value in (
+        ("endpoint", s3.get("endpoint")), ("bucket", s3.get("bucket")),
+        ("access_key", access_key), ("secret_key", secret_key),
+    ) if not value]
+    if missing:
+        raise ValueError(f"storage.s3 is missing: {', '.join(missing)}")
+    return S3Storage(
+        paths["base_dir"], paths["elements_dir"],
+        endpoint=s3["endpoint"],
+        bucket=s3["bucket"],
+        access_key=access_key,
+        secret_key=secret_key,
+        prefix=s3.get("prefix", ""),
+        region=s3.get("region", "us-east-1"),
+        part_size=int(s3.get("part_size_mb", 8) * 1024 * 1024),
+        blobs_dir=paths["blobs_dir"],
+        transport=transport,
+    )
@@ -7,16 +7,18 @@ in video generation requests.
 
 from __future__ import annotations
 
-import asyncio
 import json
 import logging
+from concurrent.futures import Executor
 from pathlib import Path
 
+import httpx
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 
 from pipeline.auth import get_api_key, load_config, resolve_output_paths
-from pipeline.client import KieClient, KieApiError
+from pipeline.client import KieClient, KeyPool, build_key_pool
+from pipeline.optimize_elements import OptimizeSettings, optimize_elements
 from pipeline.scenario_parser import load_scenario
 
 logger = logging.getLogger(__name__)
@@ -39,18 +41,25 @@ def _save_status(status_path: Path, status: dict) -> None:
 async def upload_elements(
     scenario_path: str,
     config_path: str | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
+    key_pool: KeyPool | None = None,
+    executor: Executor | None = None,
 ) -> None:
     """Upload local element images to KIE.ai and save URLs to status.
 
     For each element defined in the scenario, finds local PNG files in
-    output/elements/{Name}/ and uploads them via the KIE file-stream-upload
-    API. Saves returned URLs to elements_status.json.
+    output/elements/{Name}/, optimises them (crop, downscale, re-encode;
+    cached by source hash) and uploads the results via the KIE
+    file-stream-upload API. Saves returned URLs to elements_status.json.
 
     Skips elements that already have URLs in the status file.
 
     Args:
         scenario_path: Path to the scenario YAML file.
         config_path: Optional override for config.yaml path.
+        transport: Alternative HTTP transport for the client (cassette recorder/replayer).
+        key_pool: Shared API key pool (defaults to one built from ``api.api_keys``).
+        executor: Worker pool for image optimisation (defaults to a pool per run).
     """
     config = load_config(config_path)
     api_key = get_api_key(config_path)
@@ -96,12 +105,21 @@ async def upload_elements(
         return
 
     total_files = sum(len(imgs) for _, imgs in to_upload)
+    settings = OptimizeSettings.from_config(config)
+    variants = await optimize_elements(
+        [img for _, imgs in to_upload for img in imgs], paths["elements_cache_dir"], settings, executor,
+    )
+
     console.print(
         f"\n[bold]Uploading {total_files} images "
         f"for {len(to_upload)} element(s)...[/bold]\n"
     )
 
-    async with KieClient(api_key=api_key, base_url=config["api"]["base_url"]) as client:
+    async with KieClient(
+        api_key=api_key, base_url=config["api"]["base_url"],
+        key_pool=key_pool or build_key_pool(config), transport=transport,
+        batch_concurrency=config["api"].get("batch_concurrency", 4),
+    ) as client:
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -111,32 +129,29 @@ async def upload_elements(
         ) as progress:
             upload_bar = progress.add_task("Uploading images...", total=total_files)
 
+            uploads: list[tuple[str, str, Path]] = []  # (element_name, view_key, image)
             for elem_name, images in to_upload:
                 if elem_name not in status["elements"]:
                     status["elements"][elem_name] = {"views": {}, "completed": False}
+                uploads.extend((elem_name, f"view_{i}", img_path) for i, img_path in enumerate(images))
 
-                for i, img_path in enumerate(images):
-                    view_key = f"view_{i}"
-                    try:
-                        file_url = await client.upload_file(img_path)
-
-                        status["elements"][elem_name]["views"][view_key] = {
-                            "status": "completed",
-                            "url": file_url,
-                            "local_path": str(img_path),
-                        }
-                        console.print(f"  [green]{elem_name}/{view_key} -> {file_url}[/green]")
-
-                    except KieApiError as exc:
-                        _save_status(status_path, status)
-                        raise RuntimeError(
-                            f"Upload failed for {elem_name}/{view_key}: {exc}"
-                        ) from exc
-
+            async for (elem_name, view_key, img_path), file_url, error in client.upload_many(
+                uploads, path=lambda item: variants[item[2]],
+            ):
+                if error is not None:
                     _save_status(status_path, status)
-                    progress.update(upload_bar, advance=1)
-
-                    await asyncio.sleep(0.3)
+                    raise RuntimeError(f"Upload failed for {elem_name}/{view_key}: {error}") from error
+
+                status["elements"][elem_name]["views"][view_key] = {
+                    "status": "completed",
+                    "url": file_url,
+                    "local_path": str(img_path),
+                    "upload_path": str(variants[img_path]),
+                    "uploaded_at": client.clock(),
+                }
+                console.print(f"  [green]{elem_name}/{view_key} -> {file_url}[/green]")
+                _save_status(status_path, status)
+                progress.update(upload_bar, advance=1)
 
         # Mark fully completed elements
         for elem_name in status["elements"]:
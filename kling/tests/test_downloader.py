@@ -0,0 +1,103 @@
+"""download_all: verification of fetched files and batched status commits."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+import yaml
+
+import pipeline.downloader
+from pipeline.auth import resolve_output_paths
+from pipeline.downloader import download_all
+from pipeline.status import save_status
+
+KLING_DIR = Path(__file__).resolve().parents[1]
+VIDEO = b"\x00\x00\x00\x18ftypmp42" + bytes(1000)
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> tuple[Path, Path, Path]:
+    config = yaml.safe_load((KLING_DIR / "config.yaml").read_text(encoding="utf-8"))
+    config["api"]["api_key"] = "test"
+    config["output"] = {"base_dir": str(tmp_path / "output"), "elements_dir": str(tmp_path / "output" / "elements")}
+    config["storage"] = {"backend": "local"}
+    config["download"] = {**config.get("download", {}), "max_attempts": 2, "commit_every": 100}
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config, sort_keys=False), encoding="utf-8")
+
+    scenario_path = tmp_path / "film.yaml"
+    scenario_path.write_text(yaml.safe_dump({
+        "scenes": [{"id": n, "multi_prompt": [{"prompt": f"Shot {n}.", "duration": 5}]} for n in (1, 2)],
+    }), encoding="utf-8")
+    status_file = resolve_output_paths(config, str(scenario_path))["status_file"]
+    save_status(status_file, {"scenes": {
+        key: {"status": "completed", "completed": True, "url": f"https://cdn.example/{key}.mp4"} for key in ("1", "2")
+    }})
+
+    async def ffprobe(path: Path) -> str | None:
+        # Stands in for ffprobe, which may not be installed here
+        return None if path.read_bytes().startswith(VIDEO[:12]) else "ffprobe failed: invalid data"
+
+    monkeypatch.setattr(pipeline.downloader, "_verify_video", ffprobe)
+    return config_path, scenario_path, status_file
+
+
+def _cdn(bodies: dict[str, bytes], lengths: dict[str, int] | None = None, hang: set[str] = frozenset()):
+    async def handle(request: httpx.Request) -> httpx.Response:
+        name = request.url.path.strip("/")
+        if name in hang:
+            await asyncio.Event().wait()
+        body = bodies[name]
+        length = (lengths or {}).get(name, len(body))
+        return httpx.Response(200, headers={"content-length": str(length)}, stream=httpx.ByteStream(body))
+
+    return httpx.MockTransport(handle)
+
+
+def _scenes(status_file: Path) -> dict:
+    return json.loads(status_file.read_text(encoding="utf-8"))["scenes"]
+
+
+def _download(config_path: Path, scenario_path: Path, transport: httpx.AsyncBaseTransport) -> None:
+    asyncio.run(download_all(str(scenario_path), str(config_path), transport=transport))
+
+
+def test_truncated_or_corrupt_downloads_are_not_recorded(project):
+    config_path, scenario_path, status_file = project
+    # Scene 1's body stops short of its Content-Length; scene 2's is not a video
+    transport = _cdn({"1.mp4": VIDEO[:500], "2.mp4": b"<html>expired</html>"}, lengths={"1.mp4": len(VIDEO)})
+    _download(config_path, scenario_path, transport)
+
+    scenes = _scenes(status_file)
+    assert "local_path" not in scenes["1"] and "local_path" not in scenes["2"]
+    shots_dir = status_file.parent / "shots"
+    assert not (shots_dir / "scene_1.mp4").exists()  # a truncated transfer never reaches its path
+
+    # Once the CDN serves the right bytes, a re-run fetches both
+    _download(config_path, scenario_path, _cdn({"1.mp4": VIDEO, "2.mp4": VIDEO}))
+    scenes = _scenes(status_file)
+    assert Path(scenes["1"]["local_path"]).read_bytes() == VIDEO
+    assert Path(scenes["2"]["local_path"]).read_bytes() == VIDEO
+
+
+def test_batched_status_is_committed_when_the_run_is_interrupted(project):
+    config_path, scenario_path, status_file = project
+    transport = _cdn({"1.mp4": VIDEO, "2.mp4": VIDEO}, hang={"2.mp4"})
+
+    async def interrupted():
+        task = asyncio.ensure_future(download_all(str(scenario_path), str(config_path), transport=transport))
+        while not any((status_file.parent / "shots").glob("scene_1.mp4")):
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(interrupted())
+    scenes = _scenes(status_file)
+    assert scenes["1"]["local_path"].endswith("scene_1.mp4")  # below commit_every, but flushed
+    assert "local_path" not in scenes["2"]
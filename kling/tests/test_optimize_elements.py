@@ -0,0 +1,78 @@
+"""Element reference image optimisation."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from pipeline.optimize_elements import OptimizeSettings, optimize_elements, optimize_image
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _image(path: Path, size: tuple[int, int], subject: tuple[int, int, int, int] | None = None) -> Path:
+    image = Image.new("RGB", size, (255, 255, 255))
+    if subject:
+        image.paste((200, 40, 40), subject)
+    image.save(path)
+    return path
+
+
+@pytest.mark.parametrize(("size", "expected"), [
+    ((3000, 1500), (1024, 512)),  # longest side to max_side
+    ((1500, 3000), (512, 1024)),
+    ((4000, 400), (3000, 300)),  # a very wide image keeps its short side at Kling's minimum
+    ((800, 600), (800, 600)),  # never upscaled
+])
+def test_downscale_keeps_the_aspect_ratio(tmp_path, size, expected):
+    source = _image(tmp_path / "src.png", size)
+    info = optimize_image(str(source), str(tmp_path / "out.jpg"), OptimizeSettings(crop_to_subject=False))
+
+    assert tuple(info["output_dims"]) == expected
+    with Image.open(tmp_path / "out.jpg") as out:
+        assert out.size == expected and out.format == "JPEG"
+
+
+def test_crop_to_subject_keeps_a_margin(tmp_path):
+    source = _image(tmp_path / "src.png", (2000, 2000), subject=(500, 700, 1500, 1300))
+    info = optimize_image(str(source), str(tmp_path / "out.webp"), OptimizeSettings(format="webp", margin=0.1))
+
+    # 1000x600 subject plus 10% each side, then scaled to fit 1024 (the short side stays >= 300)
+    assert tuple(info["source_dims"]) == (2000, 2000)
+    assert tuple(info["output_dims"]) == (1024, 614)
+    with Image.open(tmp_path / "out.webp") as out:
+        assert out.format == "WEBP"
+
+
+def test_variants_are_cached_by_content_and_settings(tmp_path):
+    sources = [_image(tmp_path / f"view{i}.png", (2000, 1000 + i)) for i in range(3)]
+    copy = tmp_path / "copy.png"
+    copy.write_bytes(sources[0].read_bytes())
+    settings = OptimizeSettings(crop_to_subject=False)
+    cache = tmp_path / "cache"
+
+    def run(images, settings):
+        with ThreadPoolExecutor(2) as pool:
+            return asyncio.run(optimize_elements(images, cache, settings, executor=pool))
+
+    first = run(sources + [copy], settings)
+    assert first[copy] == first[sources[0]]  # same bytes, same variant
+    made = {p: p.stat().st_mtime_ns for p in cache.iterdir()}
+    assert len(made) == 3
+
+    again = run(sources, settings)
+    assert again == {p: first[p] for p in sources}
+    assert {p: p.stat().st_mtime_ns for p in cache.iterdir()} == made  # nothing reprocessed
+
+    smaller = run(sources, OptimizeSettings(crop_to_subject=False, max_side=512))
+    assert set(smaller.values()).isdisjoint(made)
+
+
+def test_disabled_optimisation_uploads_the_sources(tmp_path):
+    source = _image(tmp_path / "src.png", (2000, 1000))
+    result = asyncio.run(optimize_elements([source], tmp_path / "cache", OptimizeSettings(enabled=False)))
+    assert result == {source: source}
+    assert not (tmp_path / "cache").exists()
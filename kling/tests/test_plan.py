@@ -0,0 +1,85 @@
+"""Compiled plans: versioning on input changes and per-scene validation."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+import yaml
+
+import pipeline.plan
+from pipeline.auth import load_config, resolve_output_paths
+from pipeline.client import build_multi_shot_payload
+from pipeline.generate_shots import generate_shots
+from pipeline.plan import load_plan
+
+KLING_DIR = Path(__file__).resolve().parents[1]
+
+
+def _scenario(*durations: int) -> dict:
+    return {
+        "style_prefix": "Test.",
+        "scenes": [
+            {"id": n, "multi_prompt": [{"prompt": f"Shot {n}.", "duration": d}]} for n, d in enumerate(durations, 1)
+        ],
+    }
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> tuple[Path, Path]:
+    config = yaml.safe_load((KLING_DIR / "config.yaml").read_text(encoding="utf-8"))
+    config["api"]["api_key"] = "test"
+    config["output"] = {"base_dir": str(tmp_path / "output"), "elements_dir": str(tmp_path / "output" / "elements")}
+    config["storage"] = {"backend": "local"}
+    config["providers"]["grok"]["enabled"] = False
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config, sort_keys=False), encoding="utf-8")
+    scenario_path = tmp_path / "scenario.yaml"
+    scenario_path.write_text(yaml.safe_dump(_scenario(5, 5)), encoding="utf-8")
+    return config_path, scenario_path
+
+
+def test_changed_inputs_write_a_new_plan_file(project):
+    config_path, scenario_path = project
+    plan_file = resolve_output_paths(load_config(str(config_path)), str(scenario_path))["plan_file"]
+
+    first = load_plan(str(scenario_path), str(config_path))
+    original = plan_file.read_bytes()
+
+    scenario_path.write_text(yaml.safe_dump(_scenario(5, 8)), encoding="utf-8")
+    second = load_plan(str(scenario_path), str(config_path))
+
+    assert second.fingerprint != first.fingerprint
+    assert plan_file.read_bytes() == original  # never rewritten in place
+    (versioned,) = plan_file.parent.glob("plan-*.json")
+
+    # The versioned plan is reused until the inputs change again
+    assert load_plan(str(scenario_path), str(config_path)).fingerprint == second.fingerprint
+    assert sorted(plan_file.parent.glob("plan*.json")) == sorted([plan_file, versioned])
+
+    # Going back to the original inputs picks up plan.json again
+    scenario_path.write_text(yaml.safe_dump(_scenario(5, 5)), encoding="utf-8")
+    assert load_plan(str(scenario_path), str(config_path)).fingerprint == first.fingerprint
+
+
+def test_invalid_scene_blocks_only_its_own_runs(project, monkeypatch):
+    config_path, scenario_path = project
+
+    def build(shots, *args, **kwargs):
+        if shots[0]["prompt"].endswith("Shot 2."):
+            raise ValueError("payload rejected")
+        return build_multi_shot_payload(shots, *args, **kwargs)
+
+    monkeypatch.setattr(pipeline.plan, "build_multi_shot_payload", build)
+
+    plan = load_plan(str(scenario_path), str(config_path))
+    assert [r.scene_id for r in plan.requests] == ["1"]
+    assert plan.errors == {"2": ["scene 2: payload rejected"]}
+    plan.check({"1"})
+    with pytest.raises(ValueError, match="scene 2: payload rejected"):
+        plan.check({"2"})
+
+    asyncio.run(generate_shots(str(scenario_path), str(config_path), scene_ids=[1], dry_run=True))
+    with pytest.raises(ValueError, match="scene 2: payload rejected"):
+        asyncio.run(generate_shots(str(scenario_path), str(config_path), dry_run=True))
@@ -0,0 +1,88 @@
+"""Picking the scenes and parts still to render in a large scenario."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import httpx
+import yaml
+
+from pipeline.auth import resolve_output_paths
+from pipeline.generate_shots import _index_scene_keys, generate_shots
+from pipeline.simulate import SimulatedKie, SimulationSettings, VirtualTimeLoop
+
+KLING_DIR = Path(__file__).resolve().parents[1]
+_SCENES = 120
+_LONG_SCENE = 7  # 8 shots of 3s: two multi-shot parts
+
+
+class RecordingKie(SimulatedKie):
+    """Simulated KIE that keeps the first prompt of every createTask payload."""
+
+    def __init__(self) -> None:
+        self.loop = VirtualTimeLoop()
+        super().__init__(SimulationSettings(queue_std=0.0, jitter=0.0, failure_rate=0.0), self.loop.time)
+        self.prompts: list[str] = []
+
+    def _create(self, request: httpx.Request) -> httpx.Response:
+        self.prompts.append(json.loads(request.content)["input"]["multi_prompt"][0]["prompt"])
+        return super()._create(request)
+
+
+def _project(tmp_path: Path) -> tuple[Path, Path]:
+    config = yaml.safe_load((KLING_DIR / "config.yaml").read_text(encoding="utf-8"))
+    config["api"]["api_key"] = "test"
+    config["output"] = {"base_dir": str(tmp_path / "output"), "elements_dir": str(tmp_path / "output" / "elements")}
+    config["storage"] = {"backend": "local"}
+    config["providers"]["grok"]["enabled"] = False
+    config["polling"]["max_wait_seconds"] = 3600
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config, sort_keys=False), encoding="utf-8")
+
+    scenes = []
+    for n in range(1, _SCENES + 1):
+        shots = 8 if n == _LONG_SCENE else 1
+        scenes.append({"id": n, "multi_prompt": [
+            {"prompt": f"Scene {n} shot {k}.", "duration": 3} for k in range(1, shots + 1)
+        ]})
+    scenario_path = tmp_path / "film.yaml"
+    scenario_path.write_text(yaml.safe_dump({"scenes": scenes}), encoding="utf-8")
+    return config_path, scenario_path
+
+
+def _run(config_path: Path, scenario_path: Path) -> RecordingKie:
+    backend = RecordingKie()
+    try:
+        backend.loop.run_until_complete(generate_shots(
+            scenario_path=str(scenario_path), config_path=str(config_path), wait=True, transport=backend,
+        ))
+    finally:
+        backend.loop.close()
+    return backend
+
+
+def test_scene_keys_are_grouped_by_scene():
+    keys = ["1", "10", "7_part0", "7_part1", "11_part1", "intro_partial"]
+    assert _index_scene_keys(dict.fromkeys(keys, {})) == {
+        "1": ["1"], "10": ["10"], "7": ["7_part0", "7_part1"], "11": ["11_part1"],
+        "intro_partial": ["intro_partial"],
+    }
+
+
+def test_rerun_submits_only_unfinished_scenes(tmp_path):
+    config_path, scenario_path = _project(tmp_path)
+    first = _run(config_path, scenario_path)
+    assert len(first.prompts) == _SCENES + 1  # the long scene is split in two
+
+    config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+    status_file = resolve_output_paths(config, str(scenario_path))["status_file"]
+    status = json.loads(status_file.read_text(encoding="utf-8"))
+    assert {"7_part0", "7_part1"} <= status["scenes"].keys()
+    for key in ("1", "7_part1", "100"):
+        status["scenes"][key].update(completed=False, status="failed")
+    status_file.write_text(json.dumps(status), encoding="utf-8")
+
+    rerun = _run(config_path, scenario_path)
+    # A scene with an unfinished part is rendered again as a whole
+    assert sorted(rerun.prompts) == ["Scene 1 shot 1.", "Scene 100 shot 1.", "Scene 7 shot 1.", "Scene 7 shot 6."]
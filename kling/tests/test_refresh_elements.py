@@ -0,0 +1,70 @@
+"""Re-uploading element URLs that are about to expire."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import yaml
+
+from pipeline.refresh_elements import RefreshSettings, refresh_element_urls, stale_views
+from pipeline.simulate import SimulatedKie, SimulationSettings
+
+KLING_DIR = Path(__file__).resolve().parents[1]
+_HOUR = 3600
+
+
+def test_views_expiring_within_the_margin_are_stale():
+    now = 1_000_000.0
+    settings = RefreshSettings(ttl_hours=72, margin_hours=12)
+    status = {"elements": {
+        "Topa": {"views": {
+            "fresh": {"status": "completed", "url": "u1", "uploaded_at": now - 10 * _HOUR},
+            "expiring": {"status": "completed", "url": "u2", "uploaded_at": now - 65 * _HOUR},
+            "unknown_age": {"status": "completed", "url": "u3"},
+            "failed": {"status": "failed", "uploaded_at": now - 100 * _HOUR},
+        }},
+        "Bolo": {"views": {"old": {"status": "completed", "url": "u4", "uploaded_at": now - 80 * _HOUR}}},
+    }}
+
+    assert [(name, key) for name, key, _ in stale_views(status, {"Topa"}, settings, now)] == [
+        ("Topa", "expiring"), ("Topa", "unknown_age"),
+    ]
+    assert len(stale_views(status, None, settings, now)) == 3
+    assert len(stale_views(status, {"Topa"}, settings, now, force=True)) == 3
+
+
+def test_stale_urls_are_reuploaded_and_saved(tmp_path):
+    config = yaml.safe_load((KLING_DIR / "config.yaml").read_text(encoding="utf-8"))
+    config["api"]["api_key"] = "test"
+    config["output"] = {"base_dir": str(tmp_path / "output"), "elements_dir": str(tmp_path / "output" / "elements")}
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config, sort_keys=False), encoding="utf-8")
+    scenario_path = tmp_path / "film.yaml"
+    scenario_path.write_text(yaml.safe_dump({
+        "kling_elements": [{"name": "Topa", "description": "A fox."}],
+        "scenes": [{"id": 1, "kling_elements": ["Topa"], "multi_prompt": [{"prompt": "Topa runs.", "duration": 5}]}],
+    }), encoding="utf-8")
+
+    image = tmp_path / "output" / "elements" / "Topa" / "Topa1.png"
+    image.parent.mkdir(parents=True)
+    image.write_bytes(b"png")
+    now = time.time()
+    status_file = tmp_path / "output" / "elements_status.json"
+    status_file.write_text(json.dumps({"elements": {"Topa": {"views": {
+        "1": {"status": "completed", "url": "https://old/1", "local_path": str(image), "uploaded_at": now - 70 * _HOUR},
+        "2": {"status": "completed", "url": "https://old/2", "local_path": str(image), "uploaded_at": now},
+        "3": {"status": "completed", "url": "https://old/3", "local_path": str(tmp_path / "gone.png")},
+    }}}}), encoding="utf-8")
+
+    backend = SimulatedKie(SimulationSettings(), time.time)
+    failed = asyncio.run(refresh_element_urls(str(scenario_path), str(config_path), transport=backend))
+
+    assert failed == ["Topa/3"]  # its local file is gone
+    views = json.loads(status_file.read_text(encoding="utf-8"))["elements"]["Topa"]["views"]
+    assert views["1"]["url"].startswith("https://sim.kie.invalid/uploads/")
+    assert views["1"]["uploaded_at"] >= now
+    assert views["2"]["url"] == "https://old/2"
+    assert views["3"]["url"] == "https://old/3"
@@ -0,0 +1,94 @@
+"""Disk budget eviction of the output tree."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from pipeline.retention import RetentionSettings, collect_garbage
+from pipeline.status import save_status
+
+_MB = 1024 ** 2
+_HOUR = 3600
+NOW = 2_000_000_000.0
+
+
+def _file(path: Path, age_hours: float, content: bytes | None = None) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content if content is not None else os.urandom(_MB))
+    stamp = NOW - age_hours * _HOUR
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> tuple[dict, dict[str, Path]]:
+    base = tmp_path / "output"
+    config = {"output": {"base_dir": str(base), "elements_dir": str(base / "elements")}}
+    shots = base / "film" / "shots"
+    files = {
+        # Referenced: by scene status, by plan.json, by a versioned plan, as a source image
+        "scene": _file(shots / "scene_1.mp4", 500),
+        "planned": _file(shots / "scene_2.mp4", 500),
+        "replanned": _file(shots / "scene_3.mp4", 500),
+        "source": _file(base / "elements" / "Topa" / "front.png", 500),
+        # Unreferenced, oldest first
+        "superseded": _file(shots / "scene_1_v1.mp4", 300),
+        "orphan": _file(base / "blobs" / "sha256" / "ab" / ("ab" + "0" * 62), 200),
+        "old_cut": _file(base / "other" / "final_old.mp4", 100),
+        # Unreferenced but recent
+        "fresh": _file(shots / "scene_4_retry.mp4", 1),
+        # An interrupted download
+        "partial": _file(shots / ".scene_4.mp4.1a2b3c4d.part", 2, b"half"),
+    }
+    save_status(base / "film" / "scene_status.json", {"scenes": {"1": {"local_path": str(files["scene"])}}})
+    save_status(base / "film" / "plan.json", {"requests": [{"output_path": str(files["planned"])}]})
+    (base / "film" / "plan-0123456789abcdef.json").write_text(
+        json.dumps({"requests": [{"output_path": str(files["replanned"])}]}), encoding="utf-8",
+    )
+    return config, files
+
+
+def test_eviction_is_lru_and_stops_once_under_budget(tree):
+    config, files = tree
+    # 8 MB of artifacts against a 6.5 MB budget: the two oldest unreferenced go
+    report = collect_garbage(config, RetentionSettings(budget_gb=6.5 * _MB / 1024 ** 3), now=NOW)
+
+    assert [a.paths for a in report.evicted] == [[files["superseded"]], [files["orphan"]]]
+    assert not files["superseded"].exists() and not files["orphan"].exists()
+    assert files["old_cut"].exists()
+    assert report.junk == [files["partial"]]  # older than partial_grace_hours
+
+
+def test_referenced_files_survive_any_budget(tree):
+    config, files = tree
+    report = collect_garbage(config, RetentionSettings(budget_gb=1e-9), now=NOW)
+
+    assert {a.paths[0] for a in report.evicted} == {files["superseded"], files["orphan"], files["old_cut"]}
+    for name in ("scene", "planned", "replanned", "source", "fresh"):
+        assert files[name].exists(), name
+
+
+def test_min_age_hours_protects_recent_files(tree):
+    config, files = tree
+    report = collect_garbage(config, RetentionSettings(min_age_hours=250), evict_all=True, now=NOW)
+
+    assert [a.paths for a in report.evicted] == [[files["superseded"]]]
+    assert files["orphan"].exists() and files["old_cut"].exists()
+
+
+def test_hardlinked_paths_are_one_artifact(tree):
+    config, files = tree
+    blob = files["orphan"]
+    link = blob.parents[3] / "film" / "shots" / "scene_1_v0.mp4"
+    os.link(blob, link)
+
+    report = collect_garbage(config, RetentionSettings(), evict_all=True, now=NOW)
+
+    (evicted,) = [a for a in report.evicted if blob in a.paths]
+    assert sorted(evicted.paths) == sorted([blob, link])
+    assert not link.exists()
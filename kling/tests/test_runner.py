@@ -0,0 +1,83 @@
+"""The CLI's --record/--replay plumbing."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+import pipeline.client
+from pipeline.auth import resolve_output_paths
+from pipeline.runner import cli
+from pipeline.simulate import SimulatedKie, SimulationSettings
+
+KLING_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> tuple[Path, Path]:
+    config = yaml.safe_load((KLING_DIR / "config.yaml").read_text(encoding="utf-8"))
+    config["api"]["api_key"] = "test"
+    config["output"] = {"base_dir": str(tmp_path / "output"), "elements_dir": str(tmp_path / "output" / "elements")}
+    config["storage"] = {"backend": "local"}
+    config["providers"]["grok"]["enabled"] = False
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config, sort_keys=False), encoding="utf-8")
+
+    scenario_path = tmp_path / "scenario.yaml"
+    scenario_path.write_text(yaml.safe_dump({
+        "style_prefix": "Test.",
+        "scenes": [
+            {"id": n, "multi_prompt": [{"prompt": f"Shot {n}.", "duration": 5}]} for n in (1, 2)
+        ],
+    }), encoding="utf-8")
+    return config_path, scenario_path
+
+
+def test_run_all_records_and_replays_one_cassette(project, tmp_path, monkeypatch):
+    config_path, scenario_path = project
+    recorders, replayers = [], []
+    real_recorder, real_replayer = pipeline.client.RecordingTransport, pipeline.client.ReplayTransport
+
+    def recorder(path):
+        backend = SimulatedKie(SimulationSettings(jitter=0.0, failure_rate=0.0), lambda: asyncio.get_running_loop().time())
+        recorders.append(real_recorder(path, transport=backend))
+        return recorders[-1]
+
+    def replayer(path, **kwargs):
+        replayers.append(real_replayer(path, **kwargs))
+        return replayers[-1]
+
+    monkeypatch.setattr(pipeline.client, "RecordingTransport", recorder)
+    monkeypatch.setattr(pipeline.client, "ReplayTransport", replayer)
+    config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+    status_file = resolve_output_paths(config, str(scenario_path))["status_file"]
+    cassette = tmp_path / "run.cassette.gz"
+    args = ["--config", str(config_path)]
+
+    result = CliRunner().invoke(cli, [*args, "--record", str(cassette), "run-all", "-s", str(scenario_path)])
+    assert result.exit_code == 0, result.output
+    recorded = json.loads(status_file.read_text(encoding="utf-8"))["scenes"]
+    with gzip.open(cassette, "rt", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+
+    # One recorder and one timeline for all three steps
+    assert len(recorders) == 1
+    assert recorders[0].recorded == len(lines)
+    assert sum("createTask" in line["key"] for line in lines) == 2
+
+    shutil.rmtree(tmp_path / "output")  # replay from scratch: status, journal and all
+    result = CliRunner().invoke(
+        cli, [*args, "--replay", str(cassette), "--replay-speed", "0", "run-all", "-s", str(scenario_path)],
+    )
+    assert result.exit_code == 0, result.output
+    assert len(replayers) == 1
+    assert replayers[0].served == len(lines)
+    replayed = json.loads(status_file.read_text(encoding="utf-8"))["scenes"]
+    assert {k: v["task_id"] for k, v in replayed.items()} == {k: v["task_id"] for k, v in recorded.items()}
@@ -0,0 +1,64 @@
+"""Scenario parsing and its on-disk cache."""
+
+from __future__ import annotations
+
+import json
+import pickle
+
+import pytest
+import yaml
+
+import pipeline.scenario_parser as scenario_parser
+from pipeline.scenario_parser import load_scenario
+
+SCENARIO = {
+    "style_prefix": "Test.",
+    "kling_elements": [{"name": "Topa", "description": "A baby triceratops."}],
+    "scenes": [{"id": 1, "kling_elements": ["Topa"], "multi_prompt": [{"prompt": "@Topa wakes up.", "duration": 5}]}],
+}
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(scenario_parser, "_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(scenario_parser, "_memory_cache", {})
+    return tmp_path / "cache"
+
+
+def test_scenario_is_cached_as_json_and_rebuilt(tmp_path, cache_dir):
+    path = tmp_path / "scenario.yaml"
+    path.write_text(yaml.safe_dump(SCENARIO), encoding="utf-8")
+
+    first = load_scenario(path)
+    (cache_file,) = cache_dir.iterdir()
+    assert cache_file.suffix == ".json"
+    assert json.loads(cache_file.read_text(encoding="utf-8"))["raw"] == SCENARIO
+
+    scenario_parser._memory_cache.clear()
+    second = load_scenario(path)
+    assert second == first
+    second.scenes[0].kling_elements.append("Pusha")
+    assert load_scenario(path).scenes[0].kling_elements == ["Topa"]  # every load is a fresh copy
+
+
+def test_cache_files_are_never_unpickled(tmp_path, cache_dir, monkeypatch):
+    path = tmp_path / "scenario.yaml"
+    path.write_text(yaml.safe_dump(SCENARIO), encoding="utf-8")
+    load_scenario(path)
+    (cache_file,) = cache_dir.iterdir()
+    cache_file.write_bytes(pickle.dumps({"key": [], "raw": {}}))
+    monkeypatch.setattr(pickle, "loads", lambda *a, **k: pytest.fail("cache was unpickled"))
+    monkeypatch.setattr(pickle, "load", lambda *a, **k: pytest.fail("cache was unpickled"))
+
+    scenario_parser._memory_cache.clear()
+    assert load_scenario(path).scenes[0].shots[0].prompt == "@Topa wakes up."
+
+
+def test_document_json_would_change_is_not_cached_on_disk(tmp_path, cache_dir):
+    path = tmp_path / "scenario.yaml"
+    path.write_text(yaml.safe_dump({**SCENARIO, "routing": {"providers": ["kie"], "pin": {1: "kie"}}}), encoding="utf-8")
+
+    scenario = load_scenario(path)
+    assert scenario.raw["routing"]["pin"] == {1: "kie"}
+    assert not cache_dir.exists()
+    assert load_scenario(path).raw["routing"]["pin"] == {1: "kie"}
@@ -0,0 +1,50 @@
+"""Scene submission ordering policies."""
+
+from __future__ import annotations
+
+import pytest
+
+from pipeline.scheduling import order_scene_tasks
+
+# (scene ID, part, expected seconds) in YAML order; scene 2 has two parts
+TASKS = [("1", 0, 300.0), ("2", 0, 100.0), ("2", 1, 100.0), ("3", 0, 50.0), ("4", 0, 300.0), ("5", 0, 120.0)]
+
+
+def _order(policy: str, **kwargs) -> list[tuple[str, int]]:
+    ordered = order_scene_tasks(TASKS, policy, scene_of=lambda t: t[0], estimate=lambda t: t[2], **kwargs)
+    return [(scene, part) for scene, part, _ in ordered]
+
+
+def test_yaml_keeps_the_scenario_order():
+    assert _order("yaml") == [(s, p) for s, p, _ in TASKS]
+
+
+def test_priority_runs_higher_first_and_ties_in_yaml_order():
+    assert _order("priority", priorities={"4": 2, "3": 1, "5": 1}) == [
+        ("4", 0), ("3", 0), ("5", 0), ("1", 0), ("2", 0), ("2", 1),
+    ]
+
+
+def test_sjf_budgets_a_scene_as_the_sum_of_its_parts():
+    # Scene 2 costs 200s in total, so it follows scene 5 (120s)
+    assert _order("sjf") == [("3", 0), ("5", 0), ("2", 0), ("2", 1), ("1", 0), ("4", 0)]
+
+
+def test_deadline_packs_the_most_scenes_that_fit_longest_first():
+    # On two slots, scenes 2, 5 and 3 (200, 120 and 50s) finish by 200s
+    # longest first; adding scene 1 (300s) ends at 320s, past the 300s
+    # deadline. The scenes that do not fit follow shortest first.
+    assert _order("deadline", concurrency=2, deadline=300.0) == [
+        ("2", 0), ("2", 1), ("5", 0), ("3", 0), ("1", 0), ("4", 0),
+    ]
+
+
+def test_deadline_with_nothing_that_fits_falls_back_to_shortest_first():
+    assert _order("deadline", concurrency=1, deadline=10.0) == _order("sjf")
+
+
+def test_deadline_policy_needs_a_deadline():
+    with pytest.raises(ValueError, match="requires a deadline"):
+        _order("deadline", concurrency=2)
+    with pytest.raises(ValueError, match="Unknown scheduling policy"):
+        _order("fifo")
@@ -0,0 +1,74 @@
+"""Job scheduling in the serve daemon."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+import pipeline.serve as serve
+from pipeline.serve import JobServer, ServeSettings
+
+
+async def _run_jobs(monkeypatch: pytest.MonkeyPatch, jobs: list[tuple[str, dict]]) -> list[tuple[str, str]]:
+    """Run jobs whose handlers only record when they hold elements_status.json."""
+    events: list[tuple[str, str]] = []
+
+    async def write(server: JobServer, p: dict) -> None:
+        events.append(("start", p["scenario"]))
+        await asyncio.sleep(0.01)
+        events.append(("end", p["scenario"]))
+
+    async def generate(server: JobServer, p: dict) -> None:
+        # Stands in for generate_shots' pre-submit URL refresh
+        async with server.elements_lock:
+            await write(server, p)
+
+    handlers = {kind: write for kind in serve._ELEMENT_WRITERS}
+    handlers["generate"] = generate
+    monkeypatch.setattr(serve, "_HANDLERS", {**serve._HANDLERS, **handlers})
+
+    server = JobServer("config.yaml", ServeSettings(max_jobs=8, limits={kind: 4 for kind in serve._PARAMS}))
+    try:
+        submitted = [server.submit(kind, params) for kind, params in jobs]
+        await asyncio.gather(*(job.task for job in submitted))
+        assert [job.state for job in submitted] == ["succeeded"] * len(submitted)
+    finally:
+        await server.aclose()
+    return events
+
+
+def test_element_writers_never_overlap_across_scenarios(monkeypatch):
+    events = asyncio.run(_run_jobs(monkeypatch, [
+        ("upload-elements", {"scenario": "scenario/a.yaml"}),
+        ("refresh-elements", {"scenario": "scenario/b.yaml"}),
+        ("generate", {"scenario": "scenario/c.yaml"}),
+        ("generate-elements", {"scenario": "scenario/d.yaml"}),
+        ("download", {"scenario": "scenario/e.yaml"}),
+    ]))
+
+    assert len(events) == 10
+    # Each start is immediately followed by its own end
+    assert all(events[i][0] == "start" and events[i + 1] == ("end", events[i][1]) for i in range(0, 10, 2))
+
+
+def test_generate_hands_the_server_lock_to_generate_shots(monkeypatch):
+    seen = []
+
+    async def fake_generate_shots(**kwargs):
+        seen.append(kwargs["elements_lock"])
+
+    monkeypatch.setattr(serve, "generate_shots", fake_generate_shots)
+    monkeypatch.setattr(serve, "_scene_summary", lambda *args: {})
+
+    async def main() -> asyncio.Lock:
+        server = JobServer("config.yaml", ServeSettings())
+        try:
+            job = server.submit("generate", {"scenario": "scenario/dino.yaml"})
+            await job.task
+            return server.elements_lock
+        finally:
+            await server.aclose()
+
+    lock = asyncio.run(main())
+    assert seen == [lock]
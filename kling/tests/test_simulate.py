@@ -0,0 +1,65 @@
+"""Capacity planning with --simulate."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+
+from pipeline.auth import resolve_output_paths
+from pipeline.retry import estimate_credits
+from pipeline.simulate import _peak_concurrency, simulate_shots
+
+KLING_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> tuple[Path, Path, dict]:
+    config = yaml.safe_load((KLING_DIR / "config.yaml").read_text(encoding="utf-8"))
+    config["api"]["api_key"] = "test"
+    config["output"] = {"base_dir": str(tmp_path / "output"), "elements_dir": str(tmp_path / "output" / "elements")}
+    config["generation"]["mode"] = "pro"
+    config["simulation"] = {
+        "queue_seconds": {"mean": 10, "std": 0},
+        "render_seconds_per_video_second": {"pro": 20},
+        "jitter": 0.0,
+        "failure_rate": 0.0,
+        "backend_concurrency": 2,
+    }
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config, sort_keys=False), encoding="utf-8")
+
+    scenario_path = tmp_path / "film.yaml"
+    scenario_path.write_text(yaml.safe_dump({
+        "scenes": [{"id": n, "multi_prompt": [{"prompt": f"Shot {n}.", "duration": 5}]} for n in range(1, 5)],
+    }), encoding="utf-8")
+    return config_path, scenario_path, config
+
+
+def test_peak_concurrency_counts_overlaps():
+    assert _peak_concurrency([]) == 0
+    assert _peak_concurrency([(0, 10), (5, 15), (10, 20), (12, 13)]) == 3
+
+
+def test_simulation_projects_the_run_without_touching_real_outputs(project):
+    config_path, scenario_path, config = project
+    report = simulate_shots(str(scenario_path), str(config_path))
+
+    # Four 100s renders on two backend slots, each queued 10s first
+    assert report["tasks_created"] == 4
+    assert report["tasks_failed"] == report["tasks_unfinished"] == 0
+    assert report["peak_tasks_rendering"] == 2
+    assert report["peak_tasks_in_flight"] == 4
+    assert sorted((row["started"], row["finished"]) for row in report["timeline"]) == pytest.approx(
+        [(10, 110), (10, 110), (110, 210), (110, 210)], abs=1,
+    )
+    assert 210 <= report["makespan_seconds"] < 300
+    assert report["credits"] == pytest.approx(4 * estimate_credits(config, "pro", 5))
+    assert sorted(row["scene"] for row in report["timeline"]) == ["1", "2", "3", "4"]
+
+    paths = resolve_output_paths(config, str(scenario_path))
+    assert not paths["status_file"].exists()  # the simulation ran in scratch space
+    saved = json.loads(paths["status_file"].with_name("simulation.json").read_text(encoding="utf-8"))
+    assert saved["tasks_created"] == 4
@@ -0,0 +1,234 @@
+"""S3Storage against an in-process S3 stand-in."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import re
+from pathlib import Path
+
+import httpx
+import pytest
+
+from pipeline.storage import S3Storage, StorageError
+
+_ACCESS_KEY = "AKIDTEST"
+_SECRET_KEY = "secret/test+key"
+_PART = 5 * 1024 * 1024
+
+
+class FakeS3(httpx.AsyncBaseTransport):
+    """A path-style S3 bucket in memory that rejects badly signed requests."""
+
+    def __init__(self, bucket: str = "renders") -> None:
+        self.bucket = bucket
+        self.objects: dict[str, bytes] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.log: list[tuple[str, str, str]] = []  # (method, key, query)
+
+    def _signature_ok(self, request: httpx.Request) -> bool:
+        match = re.fullmatch(
+            r"AWS4-HMAC-SHA256 Credential=([^/]+)/(\d{8})/([^/]+)/s3/aws4_request, "
+            r"SignedHeaders=([^,]+), Signature=([0-9a-f]{64})",
+            request.headers.get("authorization", ""),
+        )
+        if not match or match.group(1) != _ACCESS_KEY:
+            return False
+        _, day, region, signed, signature = match.groups()
+        path, _, query = request.url.raw_path.decode().partition("?")
+        canonical_query = "&".join(sorted(query.split("&"))) if query else ""
+        names = signed.split(";")
+        canonical = "\n".join([
+            request.method, path, canonical_query,
+            "".join(f"{name}:{request.headers[name].strip()}\n" for name in names),
+            signed,
+            request.headers["x-amz-content-sha256"],
+        ])
+        amz_date = request.headers["x-amz-date"]
+        to_sign = "\n".join([
+            "AWS4-HMAC-SHA256", amz_date, f"{day}/{region}/s3/aws4_request",
+            hashlib.sha256(canonical.encode()).hexdigest(),
+        ])
+        key = f"AWS4{_SECRET_KEY}".encode()
+        for part in (day, region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        expected = hmac.new(key, to_sign.encode(), hashlib.sha256).hexdigest()
+        return "host" in names and "x-amz-date" in names and hmac.compare_digest(signature, expected)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        if not self._signature_ok(request):
+            return httpx.Response(403, text="<Error><Code>SignatureDoesNotMatch</Code></Error>")
+        path = request.url.path  # decoded
+        bucket, _, key = path.lstrip("/").partition("/")
+        assert bucket == self.bucket
+        params = request.url.params
+        self.log.append((request.method, key, request.url.query.decode()))
+
+        if request.method == "POST" and "uploads" in params:
+            upload_id = f"upload-{len(self.uploads) + 1}"
+            self.uploads[upload_id] = {}
+            return httpx.Response(200, text=f"<InitiateMultipartUploadResult><UploadId>{upload_id}</UploadId>"
+                                            "</InitiateMultipartUploadResult>")
+        if request.method == "PUT" and "partNumber" in params:
+            self.uploads[params["uploadId"]][int(params["partNumber"])] = body
+            return httpx.Response(200, headers={"etag": f'"{hashlib.md5(body).hexdigest()}"'})
+        if request.method == "POST" and "uploadId" in params:
+            parts = self.uploads.pop(params["uploadId"])
+            listed = re.findall(r"<PartNumber>(\d+)</PartNumber><ETag>([^<]+)</ETag>", body.decode())
+            assert [int(n) for n, _ in listed] == sorted(parts)
+            assert all(etag == f'"{hashlib.md5(parts[int(n)]).hexdigest()}"' for n, etag in listed)
+            self.objects[key] = b"".join(parts[n] for n in sorted(parts))
+            return httpx.Response(200, text="<CompleteMultipartUploadResult/>")
+        if request.method == "DELETE" and "uploadId" in params:
+            self.uploads.pop(params["uploadId"], None)
+            return httpx.Response(204)
+        if request.method == "PUT" and "x-amz-copy-source" in request.headers:
+            source = request.headers["x-amz-copy-source"]
+            self.objects[key] = self.objects[httpx.URL(source).path.lstrip("/").partition("/")[2]]
+            return httpx.Response(200, text="<CopyObjectResult/>")
+        if request.method == "PUT":
+            self.objects[key] = body
+            return httpx.Response(200)
+        if request.method == "DELETE":
+            self.objects.pop(key, None)
+            return httpx.Response(204)
+        if key not in self.objects:
+            return httpx.Response(404, text="<Error><Code>NoSuchKey</Code></Error>")
+        content = self.objects[key] if request.method == "GET" else b""
+        return httpx.Response(200, content=content)
+
+    def requests(self, method: str, prefix: str = "") -> list[tuple[str, str, str]]:
+        return [entry for entry in self.log if entry[0] == method and entry[1].startswith(prefix)]
+
+
+def _storage(root: Path, s3: FakeS3) -> S3Storage:
+    return S3Storage(
+        root / "output", root / "output" / "elements",
+        endpoint="http://s3.test:9000", bucket=s3.bucket, access_key=_ACCESS_KEY, secret_key=_SECRET_KEY,
+        prefix="proj", part_size=_PART, transport=s3,
+    )
+
+
+async def _write(storage: S3Storage, path: Path, content: bytes, block: int = 1024 * 1024) -> None:
+    async with storage.open_write(path) as out:
+        for i in range(0, len(content), block):
+            await out.write(content[i:i + block])
+
+
+def test_large_write_streams_a_multipart_upload(tmp_path):
+    s3 = FakeS3()
+    content = bytes(range(256)) * (12 * 1024 * 1024 // 256)  # 12 MiB: parts of 5, 5 and 2 MiB
+    digest = hashlib.sha256(content).hexdigest()
+    path = tmp_path / "output" / "film" / "shots" / "scene_1 (take 2).mp4"
+
+    async def run():
+        async with _storage(tmp_path, s3) as storage:
+            await _write(storage, path, content)
+
+    asyncio.run(run())
+
+    assert path.read_bytes() == content
+    assert s3.objects[f"proj/blobs/sha256/{digest}"] == content
+    assert s3.objects["proj/refs/film/shots/scene_1 (take 2).mp4"] == digest.encode()
+    assert len(s3.requests("PUT", "proj/tmp/")) == 3  # the parts
+    assert not s3.uploads  # completed
+    assert not [key for key in s3.objects if key.startswith("proj/tmp/")]  # staged object copied, then deleted
+
+
+def test_small_write_is_one_put_and_identical_content_is_stored_once(tmp_path):
+    s3 = FakeS3()
+    first = tmp_path / "output" / "elements" / "Topa" / "Topa1.png"
+    second = tmp_path / "output" / "elements" / "Topa" / "Topa2.png"
+
+    async def run():
+        async with _storage(tmp_path, s3) as storage:
+            await _write(storage, first, b"png bytes")
+            second.write_bytes(b"png bytes")
+            await storage.put_file(second)
+
+    asyncio.run(run())
+
+    digest = hashlib.sha256(b"png bytes").hexdigest()
+    assert not s3.requests("POST")  # no multipart upload
+    assert [key for _, key, _ in s3.requests("PUT", "proj/blobs/")] == [f"proj/blobs/sha256/{digest}"]
+    assert s3.objects["proj/refs/elements/Topa/Topa1.png"] == s3.objects["proj/refs/elements/Topa/Topa2.png"]
+
+
+def test_failed_write_aborts_the_upload(tmp_path):
+    s3 = FakeS3()
+    path = tmp_path / "output" / "film" / "shots" / "scene_1.mp4"
+
+    async def run():
+        async with _storage(tmp_path, s3) as storage:
+            async with storage.open_write(path) as out:
+                await out.write(bytes(_PART + 1))
+                raise RuntimeError("download dropped")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    assert not path.exists()
+    assert not s3.uploads
+    assert not [key for key in s3.objects if "refs/" in key]
+
+
+def test_fetch_pulls_from_another_host_and_checks_the_digest(tmp_path):
+    s3 = FakeS3()
+    render_host, edit_host = tmp_path / "render", tmp_path / "edit"
+    key_path = Path("output") / "film" / "shots" / "scene_1.mp4"
+
+    async def run():
+        async with _storage(render_host, s3) as storage:
+            await _write(storage, render_host / key_path, b"take one")
+        async with _storage(edit_host, s3) as storage:
+            assert await storage.fetch(edit_host / key_path)
+            assert not await storage.fetch(edit_host / "output" / "film" / "shots" / "scene_9.mp4")
+
+            # A blob whose content does not match its name is rejected
+            (edit_host / key_path).unlink()
+            for blob in storage.blobs_dir.rglob("*"):
+                if blob.is_file():
+                    blob.unlink()
+            digest = hashlib.sha256(b"take one").hexdigest()
+            s3.objects[f"proj/blobs/sha256/{digest}"] = b"take 0ne"
+            with pytest.raises(StorageError, match="does not match"):
+                await storage.fetch(edit_host / key_path)
+            assert not (edit_host / key_path).exists()
+
+    asyncio.run(run())
+
+
+def test_fetch_replaces_a_stale_local_copy(tmp_path):
+    s3 = FakeS3()
+    render_host, edit_host = tmp_path / "render", tmp_path / "edit"
+    key_path = Path("output") / "film" / "shots" / "scene_1.mp4"
+
+    async def run():
+        async with _storage(edit_host, s3) as editor, _storage(render_host, s3) as renderer:
+            await _write(editor, edit_host / key_path, b"take one")
+            blob_gets = len(s3.requests("GET", "proj/blobs/"))
+            assert await editor.fetch(edit_host / key_path)  # current: kept without a download
+            assert len(s3.requests("GET", "proj/blobs/")) == blob_gets
+
+            await _write(renderer, render_host / key_path, b"take two")  # re-rendered elsewhere
+            assert await editor.fetch(edit_host / key_path)
+
+    asyncio.run(run())
+    assert (edit_host / key_path).read_bytes() == b"take two"
+
+
+def test_badly_signed_requests_are_refused(tmp_path):
+    s3 = FakeS3()
+    storage = S3Storage(
+        tmp_path / "output", tmp_path / "output" / "elements",
+        endpoint="http://s3.test:9000", bucket=s3.bucket, access_key=_ACCESS_KEY, secret_key="wrong",
+        transport=s3,
+    )
+
+    async def run():
+        async with storage:
+            await _write(storage, tmp_path / "output" / "a.mp4", b"x")
+
+    with pytest.raises(StorageError, match="403"):
+        asyncio.run(run())
@@ -0,0 +1,189 @@
+"""How generate_shots handles submission errors (HTTP, body-level, network and unexpected)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+import yaml
+
+from kie_client import ProviderRouter
+from pipeline.auth import resolve_output_paths
+from pipeline.generate_shots import generate_shots
+from pipeline.simulate import SimulatedKie, SimulationSettings, VirtualTimeLoop
+
+KLING_DIR = Path(__file__).resolve().parents[1]
+
+
+class ScriptedKie(SimulatedKie):
+    """Simulated KIE whose first createTask calls fail with the given body-level codes."""
+
+    def __init__(self, codes: list[int]) -> None:
+        self.loop = VirtualTimeLoop()
+        super().__init__(SimulationSettings(queue_std=0.0, jitter=0.0, failure_rate=0.0), self.loop.time)
+        self.codes = list(codes)
+        self.create_calls = 0
+
+    def _create(self, request: httpx.Request) -> httpx.Response:
+        self.create_calls += 1
+        if self.codes:
+            code = self.codes.pop(0)
+            return httpx.Response(200, json={"code": code, "msg": f"Simulated error {code}", "data": None})
+        return super()._create(request)
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> tuple[Path, Path]:
+    config = yaml.safe_load((KLING_DIR / "config.yaml").read_text(encoding="utf-8"))
+    config["api"]["api_key"] = "test"
+    config["output"] = {"base_dir": str(tmp_path / "output"), "elements_dir": str(tmp_path / "output" / "elements")}
+    config["storage"] = {"backend": "local"}
+    config["providers"]["grok"]["enabled"] = False
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config, sort_keys=False), encoding="utf-8")
+
+    scenario_path = tmp_path / "scenario.yaml"
+    scenario_path.write_text(yaml.safe_dump({
+        "style_prefix": "Test.",
+        "scenes": [{"id": 1, "multi_prompt": [{"prompt": "A quiet valley at dawn.", "duration": 5}]}],
+    }), encoding="utf-8")
+    return config_path, scenario_path
+
+
+def _run(project: tuple[Path, Path], backend: ScriptedKie) -> dict:
+    config_path, scenario_path = project
+    try:
+        backend.loop.run_until_complete(generate_shots(
+            scenario_path=str(scenario_path), config_path=str(config_path), wait=True, transport=backend,
+        ))
+    finally:
+        backend.loop.close()
+    config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+    status_file = resolve_output_paths(config, str(scenario_path))["status_file"]
+    return json.loads(status_file.read_text(encoding="utf-8"))["scenes"]
+
+
+@pytest.fixture
+def throttled(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    names: list[str] = []
+    original = ProviderRouter.throttled
+
+    def record(self, name: str) -> None:
+        names.append(name)
+        original(self, name)
+
+    monkeypatch.setattr(ProviderRouter, "throttled", record)
+    return names
+
+
+def test_body_level_429_throttles_kie_and_is_retried(project, throttled):
+    backend = ScriptedKie([429])
+    scenes = _run(project, backend)
+
+    assert throttled == ["kie"]
+    assert backend.create_calls == 2
+    (entry,) = scenes.values()
+    assert entry["completed"] is True
+    assert entry["attempts"][0]["status_code"] == 429
+
+
+@pytest.mark.parametrize("code", [402, 422])
+def test_body_level_client_error_is_not_retried(project, throttled, code):
+    backend = ScriptedKie([code])
+    scenes = _run(project, backend)
+
+    assert backend.create_calls == 1
+    assert throttled == []
+    (entry,) = scenes.values()
+    assert entry["status"] == "submit_failed"
+    assert [a["status_code"] for a in entry["attempts"]] == [code]
+
+
+class AcceptThenTimeout(ScriptedKie):
+    """Creates the first task, then times out before the response reaches the client."""
+
+    def _create(self, request: httpx.Request) -> httpx.Response:
+        response = super()._create(request)
+        if self.create_calls == 1:
+            raise httpx.ReadTimeout("timed out reading the response", request=request)
+        return response
+
+
+def test_timed_out_submission_is_left_unconfirmed_not_resubmitted(project):
+    backend = AcceptThenTimeout([])
+    scenes = _run(project, backend)
+
+    assert backend.create_calls == 1
+    assert len(backend.tasks) == 1  # the task KIE created and billed
+    (entry,) = scenes.values()
+    assert entry["status"] == "unconfirmed"
+    assert [a["status"] for a in entry["attempts"]] == ["unconfirmed"]
+
+    # A later run does not resubmit it either unless asked to
+    rerun = AcceptThenTimeout([])
+    _run(project, rerun)
+    assert rerun.create_calls == 0
+
+
+class RejectedBeforeSending(ScriptedKie):
+    """Refuses the first connection, so the first request is never sent."""
+
+    def _create(self, request: httpx.Request) -> httpx.Response:
+        if self.create_calls == 0:
+            self.create_calls += 1
+            raise httpx.ConnectError("connection refused", request=request)
+        return super()._create(request)
+
+
+def test_connection_refused_before_sending_is_retried(project):
+    backend = RejectedBeforeSending([])
+    scenes = _run(project, backend)
+
+    assert backend.create_calls == 2
+    assert len(backend.tasks) == 1
+    (entry,) = scenes.values()
+    assert entry["completed"] is True
+    assert [a["retryable"] for a in entry["attempts"][:1]] == [True]
+
+
+def test_invalid_request_is_not_retried(project, monkeypatch):
+    def no_provider(self, *args, **kwargs):
+        raise ValueError("No provider among kie accepts a 5s request")
+
+    monkeypatch.setattr(ProviderRouter, "choose", no_provider)
+    backend = ScriptedKie([])
+    scenes = _run(project, backend)
+
+    assert backend.create_calls == 0
+    (entry,) = scenes.values()
+    assert entry["status"] == "submit_failed"
+    assert len(entry["attempts"]) == 1
+
+
+class CrashOnSecondScene(ScriptedKie):
+    """Creates scene 1's task, then fails scene 2's submission with an unexpected error."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/jobs/createTask") and b"A stormy coast." in request.content:
+            await asyncio.sleep(1)  # scene 1 is submitted and recorded first
+            raise RuntimeError("backend crashed")
+        return await super().handle_async_request(request)
+
+
+def test_status_is_committed_when_a_parallel_submission_raises(project):
+    config_path, scenario_path = project
+    scenario = yaml.safe_load(scenario_path.read_text(encoding="utf-8"))
+    scenario["scenes"].append({"id": 2, "multi_prompt": [{"prompt": "A stormy coast.", "duration": 5}]})
+    scenario_path.write_text(yaml.safe_dump(scenario), encoding="utf-8")
+
+    with pytest.raises(RuntimeError, match="backend crashed"):
+        _run(project, CrashOnSecondScene([]))
+
+    config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+    status_file = resolve_output_paths(config, str(scenario_path))["status_file"]
+    scenes = json.loads(status_file.read_text(encoding="utf-8"))["scenes"]
+    assert scenes["1"]["status"] == "submitted"
+    assert scenes["1"]["task_id"]
@@ -0,0 +1,93 @@
+"""Draft tier and promotion of approved drafts to final renders."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+import yaml
+
+from pipeline.auth import resolve_output_paths
+from pipeline.generate_shots import generate_shots, promote_scenes
+from pipeline.simulate import SimulatedKie, SimulationSettings, VirtualTimeLoop
+
+KLING_DIR = Path(__file__).resolve().parents[1]
+
+
+class RecordingKie(SimulatedKie):
+    """Simulated KIE that keeps every createTask payload."""
+
+    def __init__(self) -> None:
+        self.loop = VirtualTimeLoop()
+        super().__init__(SimulationSettings(queue_std=0.0, jitter=0.0, failure_rate=0.0), self.loop.time)
+        self.created: list[dict] = []
+
+    def _create(self, request: httpx.Request) -> httpx.Response:
+        self.created.append(json.loads(request.content))
+        return super()._create(request)
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> tuple[Path, Path]:
+    config = yaml.safe_load((KLING_DIR / "config.yaml").read_text(encoding="utf-8"))
+    config["api"]["api_key"] = "test"
+    config["output"] = {"base_dir": str(tmp_path / "output"), "elements_dir": str(tmp_path / "output" / "elements")}
+    config["storage"] = {"backend": "local"}
+    config["providers"]["grok"]["enabled"] = False
+    config["generation"]["mode"] = "pro"
+    config["draft"] = {"mode": "std", "max_shot_duration": 3}
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config, sort_keys=False), encoding="utf-8")
+
+    scenario_path = tmp_path / "film.yaml"
+    scenario_path.write_text(yaml.safe_dump({
+        "scenes": [{"id": n, "multi_prompt": [{"prompt": f"Shot {n}.", "duration": 8}]} for n in (1, 2)],
+    }), encoding="utf-8")
+    return config_path, scenario_path
+
+
+def _run(coro_factory) -> RecordingKie:
+    backend = RecordingKie()
+    try:
+        backend.loop.run_until_complete(coro_factory(backend))
+    finally:
+        backend.loop.close()
+    return backend
+
+
+def _scenes(config_path: Path, scenario_path: Path, tier: str) -> dict:
+    config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+    status_file = resolve_output_paths(config, str(scenario_path), tier)["status_file"]
+    return json.loads(status_file.read_text(encoding="utf-8"))["scenes"] if status_file.exists() else {}
+
+
+def test_drafts_render_cheap_and_only_approved_scenes_are_promoted(project):
+    config_path, scenario_path = project
+    args = {"scenario_path": str(scenario_path), "config_path": str(config_path), "wait": True}
+
+    drafts = _run(lambda backend: generate_shots(**args, tier="draft", transport=backend))
+    assert [p["input"]["mode"] for p in drafts.created] == ["std", "std"]
+    assert [p["input"]["multi_prompt"][0]["duration"] for p in drafts.created] == [3, 3]
+    draft_scenes = _scenes(config_path, scenario_path, "draft")
+    assert all(entry["completed"] for entry in draft_scenes.values())
+    assert _scenes(config_path, scenario_path, "final") == {}  # drafts live in their own namespace
+
+    final = _run(lambda backend: promote_scenes(scene_ids=[2], transport=backend, **args))
+
+    assert [(p["input"]["mode"], p["input"]["multi_prompt"][0]["duration"]) for p in final.created] == [("pro", 8)]
+    final_scenes = _scenes(config_path, scenario_path, "final")
+    assert list(final_scenes) == ["2"] and final_scenes["2"]["completed"]
+    draft_scenes = _scenes(config_path, scenario_path, "draft")
+    assert draft_scenes["2"].get("approved") is True
+    assert "approved" not in draft_scenes["1"]
+
+
+def test_scenes_without_a_completed_draft_are_not_promoted(project):
+    config_path, scenario_path = project
+    backend = _run(lambda backend: promote_scenes(
+        str(scenario_path), [1], config_path=str(config_path), wait=True, transport=backend,
+    ))
+    assert backend.created == []
+    assert _scenes(config_path, scenario_path, "final") == {}
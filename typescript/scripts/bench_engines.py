@@ -0,0 +1,192 @@
+"""Benchmark the segments and graph video engines against each other.
+
+Renders the same quotes with both engines and reports each render's wall
+time, plus how close the graph output is to the segments output: frame
+count, duration, SSIM and PSNR. With ``--lossless`` both engines encode
+bit-exactly and the frames are compared by hash (framemd5), so any
+difference between the engines shows up as unequal frames. Run from the
+typescript directory after ``tts``::
+
+    python -m scripts.bench_engines en q001 q002 q003
+    python -m scripts.bench_engines en --runs 3 --keep out/bench
+    python -m scripts.bench_engines en q001 --lossless
+
+Outputs go to a temporary directory (or ``--keep``); status.json and the
+quotes' built videos are not touched.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from src.clip_index import ClipIndex
+from src.config import get_clips_dir, get_project_root, load_config
+from src.models import LineTimestamp, VoiceoverResult
+from src.quotes import filter_quotes, load_quotes
+from src.video import build_video
+
+console = Console()
+
+ENGINES = ("segments", "graph")
+
+
+def _load_voiceover(output_dir: Path, quote_id: str) -> VoiceoverResult | None:
+    transcript_path = output_dir / quote_id / f"{quote_id}_transcript.json"
+    if not transcript_path.exists():
+        return None
+    transcript = json.loads(transcript_path.read_text(encoding="utf-8"))
+    return VoiceoverResult(
+        quote_id=quote_id,
+        audio_path=str(output_dir / quote_id / f"{quote_id}_voice.mp3"),
+        duration=transcript["duration"],
+        lines=[
+            LineTimestamp(text=lt["text"], index=lt.get("index", i), start=lt["start"], end=lt["end"])
+            for i, lt in enumerate(transcript["lines"])
+        ],
+    )
+
+
+def _probe(path: Path) -> tuple[int, float]:
+    """Video frame count and container duration of a rendered short."""
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-count_packets",
+            "-show_entries", "stream=nb_read_packets:format=duration",
+            "-of", "json",
+            str(path),
+        ],
+        capture_output=True, text=True,
+    )
+    data = json.loads(result.stdout or "{}")
+    frames = int((data.get("streams") or [{}])[0].get("nb_read_packets", 0))
+    return frames, float(data.get("format", {}).get("duration", 0.0))
+
+
+def _frame_hashes(path: Path) -> list[str]:
+    """MD5 of every decoded video frame."""
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", str(path), "-map", "0:v", "-f", "framemd5", "-"],
+        capture_output=True, text=True,
+    )
+    return [line.rsplit(",", 1)[1].strip() for line in result.stdout.splitlines() if not line.startswith("#")]
+
+
+def _similarity(reference: Path, candidate: Path) -> tuple[float | None, float | None]:
+    """SSIM (All) and average PSNR of ``candidate`` against ``reference``, over their common frames."""
+    result = subprocess.run(
+        [
+            "ffmpeg", "-v", "info", "-nostats",
+            "-i", str(candidate), "-i", str(reference),
+            "-lavfi", "[0:v]split[a0][a1];[1:v]split[b0][b1];[a0][b0]ssim;[a1][b1]psnr",
+            "-f", "null", "-",
+        ],
+        capture_output=True, text=True,
+    )
+    ssim = re.search(r"SSIM .*All:([\d.]+)", result.stderr)
+    psnr = re.search(r"PSNR .*average:([\d.]+|inf)", result.stderr)
+    return (
+        float(ssim.group(1)) if ssim else None,
+        float(psnr.group(1)) if psnr else None,
+    )
+
+
+@click.command()
+@click.argument("lang")
+@click.argument("quote_ids", nargs=-1)
+@click.option("--config", "-c", "config_path", default="config.yaml", help="Path to config.yaml")
+@click.option("--runs", type=int, default=1, help="Renders per quote and engine; the median time is reported")
+@click.option("--keep", type=click.Path(file_okay=False), default=None, help="Keep the rendered videos here")
+@click.option("--lossless", is_flag=True, help="Encode bit-exactly and compare frames by hash")
+def main(lang: str, quote_ids: tuple[str, ...], config_path: str, runs: int, keep: str | None, lossless: bool) -> None:
+    """Render quotes with both engines and compare time and output."""
+    config = load_config(config_path)
+    lang_dir = get_project_root(config_path) / lang
+    output_dir = lang_dir / "output"
+    clips_dir = get_clips_dir(config, config_path)
+    music_path = lang_dir / "background_music.mp3"
+    if not music_path.exists():
+        music_path = None
+
+    quotes = filter_quotes(load_quotes(lang_dir), list(quote_ids) or None)
+    voiceovers = [vo for vo in (_load_voiceover(output_dir, q.id) for q in quotes) if vo is not None]
+    if not voiceovers:
+        console.print(f"[red]No quotes with TTS output in {output_dir}; run tts first[/red]")
+        sys.exit(1)
+    clips = ClipIndex(clips_dir).scan()
+
+    out_root = Path(keep) if keep else Path(tempfile.mkdtemp(prefix="bench_engines_"))
+    times: dict[tuple[str, str], float] = {}
+    outputs: dict[tuple[str, str], Path] = {}
+    console.print(
+        f"[bold]Rendering {len(voiceovers)} quote(s) x {len(ENGINES)} engines x {runs} run(s) -> {out_root}[/bold]\n"
+    )
+    for vo in voiceovers:
+        for engine in ENGINES:
+            assembly_config = {**config["assembly"], "engine": engine, "lossless": lossless}
+            path = out_root / engine / f"{vo.quote_id}.mp4"
+            samples = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                build_video(vo, clips_dir, path, assembly_config, music_path, clips=clips)
+                samples.append(time.perf_counter() - started)
+            times[vo.quote_id, engine] = statistics.median(samples)
+            outputs[vo.quote_id, engine] = path
+            console.print(f"  {vo.quote_id} ({engine}): {times[vo.quote_id, engine]:.1f}s")
+
+    table = Table(title="segments vs graph")
+    columns = ["Quote", "segments", "graph", "Speedup", "Frames", "Duration", "SSIM", "PSNR dB"]
+    if lossless:
+        columns.append("Equal frames")
+    for column in columns:
+        table.add_column(column, justify="left" if column == "Quote" else "right")
+    unequal = 0
+    for vo in voiceovers:
+        seg, graph = outputs[vo.quote_id, "segments"], outputs[vo.quote_id, "graph"]
+        seg_frames, seg_dur = _probe(seg)
+        graph_frames, graph_dur = _probe(graph)
+        ssim, psnr = _similarity(seg, graph)
+        extra = []
+        if lossless:
+            seg_hashes, graph_hashes = _frame_hashes(seg), _frame_hashes(graph)
+            equal = sum(a == b for a, b in zip(seg_hashes, graph_hashes))
+            unequal += max(len(seg_hashes), len(graph_hashes)) - equal
+            extra.append(f"{equal} / {max(len(seg_hashes), len(graph_hashes))}")
+        table.add_row(
+            vo.quote_id,
+            f"{times[vo.quote_id, 'segments']:.1f}s",
+            f"{times[vo.quote_id, 'graph']:.1f}s",
+            f"{times[vo.quote_id, 'segments'] / times[vo.quote_id, 'graph']:.2f}x",
+            f"{seg_frames} / {graph_frames}",
+            f"{seg_dur:.2f}s / {graph_dur:.2f}s",
+            f"{ssim:.4f}" if ssim is not None else "?",
+            f"{psnr:.1f}" if psnr is not None else "?",
+            *extra,
+        )
+    console.print(table)
+
+    total_seg = sum(times[vo.quote_id, "segments"] for vo in voiceovers)
+    total_graph = sum(times[vo.quote_id, "graph"] for vo in voiceovers)
+    console.print(
+        f"[bold]Total: segments {total_seg:.1f}s, graph {total_graph:.1f}s "
+        f"({total_seg / total_graph:.2f}x)[/bold]"
+    )
+    if lossless and unequal:
+        console.print(f"[red]{unequal} frame(s) differ between the engines[/red]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
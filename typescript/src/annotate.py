@@ -12,7 +12,8 @@ from pathlib import Path
 import anthropic
 import yaml
 
-from src.models import ClipTextZone
+from src.clip_index import ClipIndex
+from src.models import ClipInfo, ClipTextZone
 
 logger = logging.getLogger(__name__)
 
@@ -34,22 +35,11 @@ Return ONLY a JSON object with integer values, no explanation:
 """
 
 
-def _extract_middle_frame(clip_path: Path, output_path: Path, resolution: str = "1080x1920") -> None:
+def _extract_middle_frame(clip: ClipInfo, output_path: Path, resolution: str = "1080x1920") -> None:
     """Extract a single frame from the middle of a clip, scaled to target resolution."""
     w, h = resolution.split("x")
-    cmd = [
-        "ffprobe", "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        str(clip_path),
-    ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    try:
-        duration = float(result.stdout.strip())
-    except ValueError:
-        duration = 3.0
-
-    midpoint = duration / 2
+    clip_path = clip.path
+    midpoint = (clip.duration or 3.0) / 2
 
     cmd = [
         "ffmpeg", "-y",
@@ -121,7 +111,7 @@ def annotate_clips(
             raw = yaml.safe_load(f) or {}
         existing = raw.get("clips") or {}
 
-    clip_files = sorted(clips_dir.glob("*.mp4"))
+    clip_files = ClipIndex(clips_dir).scan()
     if not clip_files:
         logger.warning("No .mp4 files found in %s", clips_dir)
         return {}
@@ -132,7 +122,7 @@ def annotate_clips(
     with tempfile.TemporaryDirectory(prefix="annotate_") as tmpdir:
         tmp = Path(tmpdir)
         for clip in clip_files:
-            stem = clip.stem
+            stem = clip.path.stem
             if stem in existing and not force:
                 vals = existing[stem]
                 if vals:
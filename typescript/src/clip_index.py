@@ -0,0 +1,213 @@
+"""Persistent index of the clip library.
+
+Every clip in ``clips_dir`` is probed once with ffprobe for its duration,
+resolution, frame rate, codec and keyframe interval, and hashed. The
+results and the clip's clips.yaml text zone are kept in
+``<clips_dir>/clips_index.sqlite``. A scan re-probes only clips whose mtime
+or size changed, or that ffprobe could not read before, and drops deleted
+ones. Zones are re-read only when
+clips.yaml changes. Video builds, annotate and preview all read clips
+through the index, so a clip is probed once however often it is used.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+
+from src.clips import load_clip_zones
+from src.models import ClipInfo, ClipTextZone
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "clips_index.sqlite"
+
+_SCHEMA_VERSION = 1
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clips (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    duration REAL,
+    width INTEGER NOT NULL DEFAULT 0,
+    height INTEGER NOT NULL DEFAULT 0,
+    fps REAL NOT NULL DEFAULT 0,
+    codec TEXT NOT NULL DEFAULT '',
+    keyframe_interval REAL,
+    zone_x INTEGER, zone_y INTEGER, zone_w INTEGER, zone_h INTEGER
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+_PROBE_WORKERS = 4
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse_rate(rate: str) -> float:
+    num, _, den = rate.partition("/")
+    try:
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def _keyframe_interval(path: Path, duration: float | None) -> float | None:
+    """Mean seconds between video keyframes, from packet flags (nothing is decoded)."""
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags",
+            "-of", "csv=p=0",
+            str(path),
+        ],
+        capture_output=True, text=True,
+    )
+    times = []
+    for line in result.stdout.splitlines():
+        pts, _, flags = line.partition(",")
+        if "K" in flags:
+            try:
+                times.append(float(pts))
+            except ValueError:
+                continue
+    if len(times) > 1:
+        return (times[-1] - times[0]) / (len(times) - 1)
+    return duration if times else None
+
+
+def _probe(path: Path) -> ClipInfo:
+    st = path.stat()
+    info = ClipInfo(path=path, size=st.st_size, mtime_ns=st.st_mtime_ns, sha256=_sha256(path))
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "format=duration:stream=width,height,avg_frame_rate,codec_name",
+            "-of", "json",
+            str(path),
+        ],
+        capture_output=True, text=True,
+    )
+    try:
+        data = json.loads(result.stdout)
+        info.duration = float(data["format"]["duration"])
+    except (ValueError, KeyError, TypeError):
+        logger.warning("%s: ffprobe could not read the clip: %s", path.name, result.stderr.strip()[-200:])
+        return info
+    stream = (data.get("streams") or [{}])[0]
+    info.width = int(stream.get("width") or 0)
+    info.height = int(stream.get("height") or 0)
+    info.fps = _parse_rate(stream.get("avg_frame_rate", ""))
+    info.codec = stream.get("codec_name", "")
+    info.keyframe_interval = _keyframe_interval(path, info.duration)
+    logger.info("%s: indexed (%.1fs, %dx%d, %s)", path.name, info.duration, info.width, info.height, info.codec)
+    return info
+
+
+def _from_row(clips_dir: Path, row: sqlite3.Row) -> ClipInfo:
+    zone = None
+    if row["zone_x"] is not None:
+        zone = ClipTextZone(x=row["zone_x"], y=row["zone_y"], w=row["zone_w"], h=row["zone_h"])
+    return ClipInfo(
+        path=clips_dir / row["name"],
+        size=row["size"],
+        mtime_ns=row["mtime_ns"],
+        sha256=row["sha256"],
+        duration=row["duration"],
+        width=row["width"],
+        height=row["height"],
+        fps=row["fps"],
+        codec=row["codec"],
+        keyframe_interval=row["keyframe_interval"],
+        zone=zone,
+    )
+
+
+class ClipIndex:
+    """The clip index of one clips directory."""
+
+    def __init__(self, clips_dir: Path) -> None:
+        self.clips_dir = clips_dir
+        self.path = clips_dir / INDEX_NAME
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            conn.executescript("DROP TABLE IF EXISTS clips; DROP TABLE IF EXISTS meta;")
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _zones_stamp(self) -> str:
+        try:
+            st = (self.clips_dir / "clips.yaml").stat()
+        except OSError:
+            return ""
+        return f"{st.st_mtime_ns}:{st.st_size}"
+
+    def scan(self) -> list[ClipInfo]:
+        """Bring the index up to date with the clips directory; return every clip, sorted by name."""
+        files = sorted(self.clips_dir.glob("*.mp4"))
+        with closing(self._connect()) as conn:
+            known = {row["name"]: (row["mtime_ns"], row["size"], row["duration"]) for row in conn.execute(
+                "SELECT name, mtime_ns, size, duration FROM clips"
+            )}
+            stale = []
+            for path in files:
+                st = path.stat()
+                mtime_ns, size, duration = known.get(path.name, (None, None, None))
+                # A clip ffprobe could not read last time is retried, in case that was transient
+                if (mtime_ns, size) != (st.st_mtime_ns, st.st_size) or duration is None:
+                    stale.append(path)
+            removed = set(known) - {path.name for path in files}
+
+            probed: list[ClipInfo] = []
+            if stale:
+                logger.info("Indexing %d new or changed clip(s) in %s", len(stale), self.clips_dir)
+                with ThreadPoolExecutor(max_workers=_PROBE_WORKERS) as pool:
+                    probed = list(pool.map(_probe, stale))
+
+            stamp = self._zones_stamp()
+            row = conn.execute("SELECT value FROM meta WHERE key = 'clips_yaml'").fetchone()
+            zones_changed = row is None or row["value"] != stamp
+
+            with conn:
+                conn.executemany("DELETE FROM clips WHERE name = ?", [(name,) for name in removed])
+                conn.executemany(
+                    "INSERT OR REPLACE INTO clips (name, size, mtime_ns, sha256, duration, width, height,"
+                    " fps, codec, keyframe_interval) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (c.path.name, c.size, c.mtime_ns, c.sha256, c.duration, c.width, c.height,
+                         c.fps, c.codec, c.keyframe_interval)
+                        for c in probed
+                    ],
+                )
+                if probed or zones_changed:
+                    self._apply_zones(conn)
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('clips_yaml', ?)", (stamp,))
+
+            return [_from_row(self.clips_dir, row) for row in conn.execute("SELECT * FROM clips ORDER BY name")]
+
+    def _apply_zones(self, conn: sqlite3.Connection) -> None:
+        zones = load_clip_zones(self.clips_dir)
+        conn.execute("UPDATE clips SET zone_x = NULL, zone_y = NULL, zone_w = NULL, zone_h = NULL")
+        conn.executemany(
+            "UPDATE clips SET zone_x = ?, zone_y = ?, zone_w = ?, zone_h = ? WHERE name = ?",
+            [(z.x, z.y, z.w, z.h, f"{stem}.mp4") for stem, z in zones.items()],
+        )
@@ -2,19 +2,29 @@
 
 from __future__ import annotations
 
+import copy
 from pathlib import Path
 
 import yaml
 
 _DEFAULT_CONFIG = "config.yaml"
 
+# path -> ((mtime_ns, size), parsed config); the serve daemon loads it per job
+_config_cache: dict[Path, tuple[tuple[int, int], dict]] = {}
+
 
 def load_config(config_path: str | None = None) -> dict:
+    """Parse config.yaml, reusing the last parse while the file is unchanged."""
     path = Path(config_path or _DEFAULT_CONFIG)
     if not path.exists():
         raise FileNotFoundError(f"Config not found: {path}")
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _config_cache.get(path)
+    if cached is None or cached[0] != stamp:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = _config_cache[path] = (stamp, yaml.safe_load(f))
+    return copy.deepcopy(cached[1])
 
 
 def get_project_root(config_path: str | None = None) -> Path:
@@ -49,3 +49,19 @@ class VoiceoverResult:
     audio_path: str
     duration: float
     lines: list[LineTimestamp]
+
+
+@dataclass
+class ClipInfo:
+    """A clip in the library index: probed stream metadata and its text zone."""
+    path: Path
+    size: int
+    mtime_ns: int
+    sha256: str
+    duration: float | None = None  # None if ffprobe could not read it
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    codec: str = ""
+    keyframe_interval: float | None = None  # mean seconds between keyframes
+    zone: ClipTextZone | None = None  # from clips.yaml; None if the clip is not listed
@@ -7,29 +7,18 @@ import subprocess
 import tempfile
 from pathlib import Path
 
-from src.clips import load_clip_zones
-from src.models import ClipTextZone
+from src.clip_index import ClipIndex
+from src.models import ClipInfo, ClipTextZone
 
 logger = logging.getLogger(__name__)
 
 _DEFAULTS = ClipTextZone(x=40, y=400, w=1000, h=1100)
 
 
-def _extract_middle_frame(clip_path: Path, output_path: Path, resolution: str = "1080x1920") -> None:
+def _extract_middle_frame(clip: ClipInfo, output_path: Path, resolution: str = "1080x1920") -> None:
     w, h = resolution.split("x")
-    cmd = [
-        "ffprobe", "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        str(clip_path),
-    ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    try:
-        duration = float(result.stdout.strip())
-    except ValueError:
-        duration = 3.0
-
-    midpoint = duration / 2
+    clip_path = clip.path
+    midpoint = (clip.duration or 3.0) / 2
     cmd = [
         "ffmpeg", "-y",
         "-ss", f"{midpoint:.3f}",
@@ -45,11 +34,10 @@ def _extract_middle_frame(clip_path: Path, output_path: Path, resolution: str =
 
 def generate_previews(clips_dir: Path, open_folder: bool = False) -> Path:
     """Draw text zones on clip frames and save to clips/previews/."""
-    zones = load_clip_zones(clips_dir)
     previews_dir = clips_dir / "previews"
     previews_dir.mkdir(exist_ok=True)
 
-    clip_files = sorted(clips_dir.glob("*.mp4"))
+    clip_files = ClipIndex(clips_dir).scan()
     if not clip_files:
         logger.warning("No .mp4 files in %s", clips_dir)
         return previews_dir
@@ -57,8 +45,8 @@ def generate_previews(clips_dir: Path, open_folder: bool = False) -> Path:
     with tempfile.TemporaryDirectory(prefix="preview_") as tmpdir:
         tmp = Path(tmpdir)
         for clip in clip_files:
-            stem = clip.stem
-            zone = zones.get(stem, _DEFAULTS)
+            stem = clip.path.stem
+            zone = clip.zone or _DEFAULTS
 
             frame_path = tmp / f"{stem}.png"
             _extract_middle_frame(clip, frame_path)
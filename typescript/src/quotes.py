@@ -11,6 +11,7 @@ Structure:
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
 
 from src.models import Quote
@@ -64,6 +65,9 @@ def load_status(lang_dir: Path) -> dict:
 
 
 def save_status(lang_dir: Path, status: dict) -> None:
+    """Write status.json atomically, so a reader never sees a half-written file."""
     status_path = lang_dir / "status.json"
-    with open(status_path, "w", encoding="utf-8") as f:
+    partial = status_path.with_name(f"status.json.{os.getpid()}.part")
+    with open(partial, "w", encoding="utf-8") as f:
         json.dump(status, f, indent=2, ensure_ascii=False)
+    os.replace(partial, status_path)
@@ -0,0 +1,138 @@
+"""Render several quotes' videos at once, in worker processes.
+
+``python -m src video --jobs N`` builds up to N quotes concurrently. The
+clip index is scanned once in the parent and handed to every worker as it
+starts, so workers never probe or re-read the clip library. Workers only
+render: each result comes back to the parent, which is the single writer
+of status.json. Workers are spawned rather than forked, which is safe from
+the threaded serve daemon.
+
+When quotes render in parallel, each one's encodes (the ``graph`` render
+or the ``segments`` line encodes) get an equal share of the CPUs instead
+of all of them.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from src.clip_index import ClipIndex
+from src.models import ClipInfo, VoiceoverResult
+from src.video import available_cpus, build_video
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RenderJob:
+    """One quote to build: its voiceover and where the video goes."""
+    voiceover: VoiceoverResult
+    output_path: Path
+
+
+@dataclass
+class RenderResult:
+    """Outcome of one quote's build."""
+    quote_id: str
+    video_path: Path | None = None
+    error: str | None = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class _Context:
+    """What every build shares: loaded once, sent to each worker."""
+    clips_dir: Path
+    assembly_config: dict
+    music_path: Path | None
+    clips: list[ClipInfo]
+
+
+# Set in each worker process by _init_worker
+_context: _Context | None = None
+
+
+def default_jobs(assembly_config: dict) -> int:
+    """Quotes to build at once: ``assembly.jobs``, or one per ``encode_threads`` CPUs."""
+    jobs = assembly_config.get("jobs", 0)
+    if jobs:
+        return max(1, jobs)
+    return max(1, available_cpus() // max(1, assembly_config.get("encode_threads", 4)))
+
+
+def _init_worker(context: _Context, log_level: int) -> None:
+    global _context
+    logging.basicConfig(
+        level=log_level,
+        format="%(asctime)s [%(levelname)s] %(processName)s %(name)s: %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    _context = context
+
+
+def _render(job: RenderJob, context: _Context | None = None) -> RenderResult:
+    context = context or _context
+    quote_id = job.voiceover.quote_id
+    started = time.perf_counter()
+    try:
+        build_video(
+            voiceover=job.voiceover,
+            clips_dir=context.clips_dir,
+            output_path=job.output_path,
+            assembly_config=context.assembly_config,
+            music_path=context.music_path,
+            clips=context.clips,
+        )
+    except Exception as exc:
+        return RenderResult(quote_id, error=str(exc), seconds=time.perf_counter() - started)
+    return RenderResult(quote_id, video_path=job.output_path, seconds=time.perf_counter() - started)
+
+
+def render_videos(
+    render_jobs: list[RenderJob],
+    clips_dir: Path,
+    assembly_config: dict,
+    music_path: Path | None = None,
+    jobs: int = 1,
+) -> Iterator[RenderResult]:
+    """Build every job's video, yielding each result as it finishes.
+
+    With ``jobs`` of 1 the builds run one after another in this process, in
+    order. A failed build is reported in its result and never stops the rest.
+    """
+    jobs = max(1, min(jobs, len(render_jobs)))
+    context = _Context(clips_dir, assembly_config, music_path, ClipIndex(clips_dir).scan())
+    if jobs == 1:
+        for job in render_jobs:
+            yield _render(job, context)
+        return
+
+    context.assembly_config = {**assembly_config, "encode_cpus": max(1, available_cpus() // jobs)}
+    logger.info("Rendering %d quote(s) with %d worker process(es)", len(render_jobs), jobs)
+    pool = ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(context, logging.getLogger().getEffectiveLevel()),
+    )
+    with pool:
+        futures = {pool.submit(_render, job): job for job in render_jobs}
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as exc:  # the worker itself died
+                    job = futures[future]
+                    yield RenderResult(job.voiceover.quote_id, error=f"worker failed: {exc}")
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
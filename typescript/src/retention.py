@@ -0,0 +1,203 @@
+"""Disk budget and garbage collection for generated outputs.
+
+Managed files are everything under ``<lang>/output/`` and the clip
+previews in ``<clips_dir>/previews/``. A file is kept while a current quote
+still references it: the transcript, raw ElevenLabs response and voiceover
+of every quote that has a .txt file, and its built video (the
+``video_path`` in status.json). Outputs of deleted or renamed quotes,
+stale renders and previews are evicted least-recently-used first while the
+outputs exceed ``retention.budget_gb`` or the disk has less than
+``retention.min_free_gb`` free. Clips, fonts and quote files are never
+touched.
+
+Temp directories left by killed video builds (``quotes_video_*``) are
+removed once they are older than ``temp_grace_hours``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.config import get_clips_dir, get_project_root
+from src.quotes import load_quotes, load_status
+
+logger = logging.getLogger(__name__)
+
+_GB = 1024 ** 3
+_TEMP_PREFIX = "quotes_video_"
+
+
+@dataclass(frozen=True)
+class RetentionSettings:
+    """Settings from the ``retention`` config section."""
+    budget_gb: float = 0.0  # 0 = no limit
+    min_free_gb: float = 0.0  # 0 = no limit
+    min_age_hours: float = 24.0
+    temp_grace_hours: float = 6.0
+
+    @classmethod
+    def from_config(cls, config: dict) -> RetentionSettings:
+        raw = config.get("retention", {}) or {}
+        return cls(
+            budget_gb=raw.get("budget_gb", 0.0),
+            min_free_gb=raw.get("min_free_gb", 0.0),
+            min_age_hours=raw.get("min_age_hours", 24.0),
+            temp_grace_hours=raw.get("temp_grace_hours", 6.0),
+        )
+
+    @property
+    def enforced(self) -> bool:
+        return bool(self.budget_gb or self.min_free_gb)
+
+
+@dataclass
+class OutputFile:
+    """A managed file and whether a current quote references it."""
+    path: Path
+    size: int
+    last_used: float
+    referenced: bool = False
+
+
+@dataclass
+class GcReport:
+    """What a collection found and removed (or would remove, in a dry run)."""
+    usage: int
+    free: int
+    referenced: int
+    evicted: list[OutputFile] = field(default_factory=list)
+    temp_dirs: list[Path] = field(default_factory=list)
+    freed: int = 0
+    dry_run: bool = False
+
+
+def _lang_dirs(root: Path) -> list[Path]:
+    return sorted(p for p in root.iterdir() if p.is_dir() and (p / "output").is_dir())
+
+
+def referenced_paths(root: Path) -> set[Path]:
+    """Outputs that current quotes (and their status) still point at."""
+    refs: set[Path] = set()
+    for lang_dir in _lang_dirs(root):
+        output_dir = lang_dir / "output"
+        status = load_status(lang_dir)
+        for quote in load_quotes(lang_dir):
+            quote_dir = output_dir / quote.id
+            for suffix in ("_transcript.json", "_elevenlabs_raw.json", "_voice.mp3", "_clip.mp4"):
+                refs.add((quote_dir / f"{quote.id}{suffix}").resolve())
+            video_path = status.get(quote.id, {}).get("assembly", {}).get("video_path")
+            if video_path:
+                refs.add(Path(video_path).resolve())
+    return refs
+
+
+def scan(root: Path, clips_dir: Path) -> tuple[list[OutputFile], int]:
+    """List managed files; return them with their total size."""
+    refs = referenced_paths(root)
+    files: list[OutputFile] = []
+    dirs = [lang_dir / "output" for lang_dir in _lang_dirs(root)] + [clips_dir / "previews"]
+    for top in dirs:
+        for dirpath, _, filenames in os.walk(top):
+            for name in filenames:
+                path = Path(dirpath) / name
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append(OutputFile(
+                    path=path,
+                    size=st.st_size,
+                    last_used=max(st.st_atime, st.st_mtime),
+                    referenced=path.resolve() in refs,
+                ))
+    return files, sum(f.size for f in files)
+
+
+def _stale_temp_dirs(grace_hours: float, now: float) -> list[Path]:
+    tmp = Path(tempfile.gettempdir())
+    return sorted(
+        p for p in tmp.glob(f"{_TEMP_PREFIX}*")
+        if p.is_dir() and now - p.stat().st_mtime > grace_hours * 3600
+    )
+
+
+def _tree_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def collect_garbage(
+    config: dict,
+    config_path: str | None = None,
+    settings: RetentionSettings | None = None,
+    dry_run: bool = False,
+    evict_all: bool = False,
+) -> GcReport:
+    """Remove stale temp dirs, then evict LRU unreferenced outputs while over budget.
+
+    With ``evict_all`` every unreferenced output older than
+    ``min_age_hours`` is evicted, whatever the budget.
+    """
+    settings = settings or RetentionSettings.from_config(config)
+    now = time.time()
+    root = get_project_root(config_path)
+    files, usage = scan(root, get_clips_dir(config, config_path))
+    report = GcReport(
+        usage=usage,
+        free=shutil.disk_usage(root).free,
+        referenced=sum(f.size for f in files if f.referenced),
+        dry_run=dry_run,
+    )
+
+    for temp_dir in _stale_temp_dirs(settings.temp_grace_hours, now):
+        report.freed += _tree_size(temp_dir)
+        report.temp_dirs.append(temp_dir)
+        if not dry_run:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def over_budget() -> bool:
+        if evict_all:
+            return True
+        # Temp dirs live outside the project, so they only count toward free space
+        evicted = sum(f.size for f in report.evicted)
+        if settings.budget_gb and usage - evicted > settings.budget_gb * _GB:
+            return True
+        return bool(settings.min_free_gb and report.free + report.freed < settings.min_free_gb * _GB)
+
+    cutoff = now - settings.min_age_hours * 3600
+    for output in sorted((f for f in files if not f.referenced and f.last_used < cutoff), key=lambda f: f.last_used):
+        if not over_budget():
+            break
+        if not dry_run:
+            output.path.unlink(missing_ok=True)
+        report.evicted.append(output)
+        report.freed += output.size
+
+    if not dry_run:
+        # Drop the directories of quotes whose outputs are all gone
+        for lang_dir in _lang_dirs(root):
+            for quote_dir in (lang_dir / "output").iterdir():
+                if quote_dir.is_dir() and not any(quote_dir.iterdir()):
+                    quote_dir.rmdir()
+    if not evict_all and over_budget():
+        logger.warning("Still over the disk budget after evicting every unreferenced output")
+    return report
+
+
+def enforce_budget(config: dict, config_path: str | None = None) -> GcReport | None:
+    """Collect garbage before a build, if a budget is configured."""
+    settings = RetentionSettings.from_config(config)
+    if not settings.enforced:
+        return None
+    report = collect_garbage(config, config_path, settings)
+    if report.freed:
+        logger.info(
+            "Disk budget: freed %.1f MB (%d output(s), %d temp dir(s))",
+            report.freed / 1024 ** 2, len(report.evicted), len(report.temp_dirs),
+        )
+    return report
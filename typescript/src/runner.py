@@ -2,8 +2,10 @@
 
 Usage:
     python -m src tts <lang> [quote_ids...]
-    python -m src video <lang> [quote_ids...]
-    python -m src produce <lang> [quote_ids...]
+    python -m src video [--jobs N] <lang> [quote_ids...]
+    python -m src produce [--jobs N] <lang> [quote_ids...]
+    python -m src gc [--dry-run] [--budget GB] [--all]
+    python -m src serve [--host H] [--port N | --socket PATH]
 
 """
 
@@ -123,14 +125,16 @@ def cmd_tts(ctx: click.Context, lang: str, quote_ids: tuple[str, ...], force: bo
 @click.argument("lang")
 @click.argument("quote_ids", nargs=-1)
 @click.option("--force", "-f", is_flag=True, help="Rebuild even if already done")
+@click.option("--jobs", "-j", type=int, default=0, help="Quotes to render at once (default: assembly.jobs, else CPU-based)")
 @click.pass_context
-def cmd_video(ctx: click.Context, lang: str, quote_ids: tuple[str, ...], force: bool) -> None:
+def cmd_video(ctx: click.Context, lang: str, quote_ids: tuple[str, ...], force: bool, jobs: int) -> None:
     """Build final videos from clips + TTS audio."""
     import json as _json
     from src.config import load_config, get_clips_dir
     from src.quotes import load_quotes, filter_quotes, load_status, save_status
-    from src.video import build_video
+    from src.render import RenderJob, default_jobs, render_videos
     from src.models import VoiceoverResult, LineTimestamp
+    from src.retention import enforce_budget
 
     config_path = ctx.obj["config"]
     config = load_config(config_path)
@@ -147,8 +151,12 @@ def cmd_video(ctx: click.Context, lang: str, quote_ids: tuple[str, ...], force:
     if not music_path.exists():
         music_path = None
 
-    console.print(f"[bold]Building videos for {len(quotes)} quote(s) [{lang}]...[/bold]\n")
+    enforce_budget(config, config_path)
 
+    jobs = jobs or default_jobs(assembly_config)
+    console.print(f"[bold]Building videos for {len(quotes)} quote(s) [{lang}], {jobs} at a time...[/bold]\n")
+
+    render_jobs: list[RenderJob] = []
     for quote in quotes:
         q_status = status.setdefault(quote.id, {})
 
@@ -183,26 +191,27 @@ def cmd_video(ctx: click.Context, lang: str, quote_ids: tuple[str, ...], force:
         )
 
         video_path = output_dir / quote.id / f"{quote.id}_clip.mp4"
-
-        try:
-            build_video(
-                voiceover=voiceover_result,
-                clips_dir=clips_dir,
-                output_path=video_path,
-                assembly_config=assembly_config,
-                music_path=music_path,
-            )
-            q_status["assembly"] = {
+        render_jobs.append(RenderJob(voiceover_result, video_path))
+
+    # Results are applied here, in this process only, so status.json has one writer
+    failed: list[str] = []
+    for n, result in enumerate(render_videos(render_jobs, clips_dir, assembly_config, music_path, jobs), 1):
+        progress = f"[dim]({n}/{len(render_jobs)}, {result.seconds:.1f}s)[/dim]"
+        if result.ok:
+            status[result.quote_id]["assembly"] = {
                 "status": "completed",
-                "video_path": str(video_path),
+                "video_path": str(result.video_path),
             }
-            console.print(f"  [green]{quote.id}: done -> {video_path}[/green]")
-        except Exception as exc:
-            q_status["assembly"] = {"status": "failed", "error": str(exc)}
-            console.print(f"  [red]{quote.id}: failed — {exc}[/red]")
+            console.print(f"  [green]{result.quote_id}: done -> {result.video_path}[/green] {progress}")
+        else:
+            status[result.quote_id]["assembly"] = {"status": "failed", "error": result.error}
+            console.print(f"  [red]{result.quote_id}: failed — {result.error}[/red] {progress}")
+            failed.append(result.quote_id)
 
         save_status(lang_dir, status)
 
+    if failed:
+        console.print(f"\n[red]{len(failed)} of {len(render_jobs)} video(s) failed: {', '.join(failed)}[/red]")
     console.print("\n[bold]Video build complete.[/bold]")
 
 
@@ -214,14 +223,15 @@ def cmd_video(ctx: click.Context, lang: str, quote_ids: tuple[str, ...], force:
 @click.argument("lang")
 @click.argument("quote_ids", nargs=-1)
 @click.option("--force", "-f", is_flag=True, help="Regenerate even if output exists")
+@click.option("--jobs", "-j", type=int, default=0, help="Quotes to render at once (default: assembly.jobs, else CPU-based)")
 @click.pass_context
-def cmd_produce(ctx: click.Context, lang: str, quote_ids: tuple[str, ...], force: bool) -> None:
+def cmd_produce(ctx: click.Context, lang: str, quote_ids: tuple[str, ...], force: bool, jobs: int) -> None:
     """Full pipeline: tts -> video."""
     console.rule("[bold blue]Step 1: TTS[/bold blue]")
     ctx.invoke(cmd_tts, lang=lang, quote_ids=quote_ids, force=force)
 
     console.rule("[bold blue]Step 2: Video[/bold blue]")
-    ctx.invoke(cmd_video, lang=lang, quote_ids=quote_ids, force=force)
+    ctx.invoke(cmd_video, lang=lang, quote_ids=quote_ids, force=force, jobs=jobs)
 
     console.rule("[bold green]Pipeline Complete[/bold green]")
 
@@ -278,6 +288,79 @@ def cmd_clips_preview(ctx: click.Context, open_folder: bool) -> None:
     console.print(f"\n[bold green]Previews saved to {previews_dir}[/bold green]")
 
 
+# ------------------------------------------------------------------
+# gc
+# ------------------------------------------------------------------
+
+@cli.command("gc")
+@click.option("--dry-run", is_flag=True, help="Report what would be removed without deleting anything")
+@click.option("--budget", type=float, default=None, help="Size limit in GB for this run (overrides retention.budget_gb)")
+@click.option("--all", "evict_all", is_flag=True, help="Evict every unreferenced output, whatever the budget")
+@click.pass_context
+def cmd_gc(ctx: click.Context, dry_run: bool, budget: float | None, evict_all: bool) -> None:
+    """Remove outputs no current quote uses, least recently used first."""
+    import dataclasses
+    import time
+    from src.config import load_config, get_project_root
+    from src.retention import RetentionSettings, collect_garbage
+
+    config_path = ctx.obj["config"]
+    config = load_config(config_path)
+    settings = RetentionSettings.from_config(config)
+    if budget is not None:
+        settings = dataclasses.replace(settings, budget_gb=budget)
+    if not settings.enforced and not evict_all:
+        console.print("[dim]No disk budget configured (retention.budget_gb / min_free_gb); removing temp dirs only.[/dim]")
+
+    report = collect_garbage(config, config_path, settings, dry_run=dry_run, evict_all=evict_all)
+    root = get_project_root(config_path)
+
+    if report.evicted:
+        table = Table(title="Would evict" if dry_run else "Evicted")
+        table.add_column("File", style="cyan")
+        table.add_column("Size", justify="right")
+        table.add_column("Last used", justify="right")
+        for output in report.evicted:
+            table.add_row(
+                str(output.path.relative_to(root)) if output.path.is_relative_to(root) else str(output.path),
+                f"{output.size / 1024 ** 2:.1f} MB",
+                time.strftime("%Y-%m-%d %H:%M", time.localtime(output.last_used)),
+            )
+        console.print(table)
+
+    gb = 1024 ** 3
+    budget_label = f"{settings.budget_gb:g} GB" if settings.budget_gb else "no limit"
+    console.print(
+        f"Outputs: {report.usage / gb:.2f} GB (budget {budget_label}), "
+        f"{report.referenced / gb:.2f} GB referenced, {report.free / gb:.1f} GB free on disk"
+    )
+    console.print(
+        f"[bold]{'Would free' if dry_run else 'Freed'} {report.freed / 1024 ** 2:.1f} MB: "
+        f"{len(report.evicted)} output(s), {len(report.temp_dirs)} temp dir(s).[/bold]"
+    )
+
+
+# ------------------------------------------------------------------
+# serve
+# ------------------------------------------------------------------
+
+@cli.command("serve")
+@click.option("--host", default=None, help="Address to listen on (default: serve.host)")
+@click.option("--port", type=int, default=None, help="TCP port to listen on (default: serve.port)")
+@click.option("--socket", "socket_path", default=None, help="Listen on this Unix socket instead of TCP")
+@click.pass_context
+def cmd_serve(ctx: click.Context, host: str | None, port: int | None, socket_path: str | None) -> None:
+    """Run as a daemon that accepts jobs over a local HTTP/JSON API."""
+    import asyncio
+    from src.serve import serve
+
+    try:
+        asyncio.run(serve(ctx.obj["config"], host=host, port=port, socket_path=socket_path))
+    except OSError as exc:
+        console.print(f"[red]Error: {exc}[/red]")
+        sys.exit(1)
+
+
 def main() -> None:
     cli()
 
@@ -0,0 +1,479 @@
+"""Long-running job server: ``python -m src serve``.
+
+Runs the tts, video, produce and gc commands as jobs in one warm process,
+so the parsed config, the scanned clip index and the ElevenLabs connection
+are reused between them. Jobs are submitted over HTTP/JSON on a local TCP
+port or a Unix socket::
+
+    POST   /jobs                {"kind": "produce", "lang": "en", "quotes": ["q001"], "force": false, "jobs": 4}
+    GET    /jobs                every job the server remembers
+    GET    /jobs/<id>           one job: state, parameters, result or error
+    GET    /jobs/<id>/events    progress as NDJSON from ?since=<seq>, streamed until the job ends
+    DELETE /jobs/<id>           cancel a job that has not started yet
+    GET    /health
+
+Jobs run in worker threads: at most ``serve.max_jobs`` at once, at most
+``serve.limits.<kind>`` of each kind, and one at a time per language
+(they share its status.json). A running job cannot be interrupted; the
+ffmpeg work it has started always finishes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import io
+import json
+import logging
+import signal
+import stat
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from rich.console import Console
+
+from src.config import get_project_root, load_config
+from src.quotes import load_status
+
+logger = logging.getLogger(__name__)
+console = Console()
+
+_MAX_BODY = 1024 * 1024
+_FINISHED = ("succeeded", "failed", "cancelled")
+
+# The job whose command is running in this thread; its console output and
+# log records go to the job's event stream.
+_current_job: contextvars.ContextVar[Job | None] = contextvars.ContextVar("current_job", default=None)
+
+
+class JobError(ValueError):
+    """A job request the server cannot accept."""
+
+
+@dataclass(frozen=True)
+class ServeSettings:
+    """Settings from the ``serve`` config section."""
+    host: str = "127.0.0.1"
+    port: int = 8766
+    socket: str = ""  # Unix socket path; used instead of host/port when set
+    max_jobs: int = 2
+    limits: dict[str, int] = field(default_factory=dict)  # per kind, default 1
+    history: int = 200  # finished jobs kept for GET /jobs
+
+    @classmethod
+    def from_config(cls, config: dict) -> ServeSettings:
+        raw = config.get("serve", {}) or {}
+        return cls(
+            host=raw.get("host", "127.0.0.1"),
+            port=raw.get("port", 8766),
+            socket=raw.get("socket", "") or "",
+            max_jobs=max(1, raw.get("max_jobs", 2)),
+            limits=dict(raw.get("limits", {}) or {}),
+            history=raw.get("history", 200),
+        )
+
+
+@dataclass
+class Job:
+    """A submitted job and its event history (appended from its worker thread)."""
+    id: str
+    kind: str
+    params: dict
+    state: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: Any = None
+    error: str | None = None
+    events: list[dict] = field(default_factory=list)
+    task: asyncio.Task | None = field(default=None, repr=False)
+    _loop: asyncio.AbstractEventLoop = field(default_factory=asyncio.get_running_loop, repr=False)
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _partial: str = field(default="", repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.state in _FINISHED
+
+    def emit(self, kind: str, **data: Any) -> None:
+        with self._lock:
+            if kind == "state":
+                self.state = data["state"]
+            self.events.append({"seq": len(self.events), "time": round(time.time(), 3), "type": kind, **data})
+        self._loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def write(self, text: str) -> None:
+        with self._lock:
+            lines = (self._partial + text).split("\n")
+            self._partial = lines.pop()
+        for line in lines:
+            if line.strip():
+                self.emit("output", text=line.rstrip())
+
+    def finish(self, state: str, error: str | None = None) -> None:
+        self.write("\n")
+        self.finished_at = time.time()
+        self.error = error
+        self.emit("state", state=state, result=self.result, error=error)
+
+    async def follow(self, since: int = 0):
+        """Yield events from ``since`` on, then live ones until the job ends."""
+        while True:
+            changed = self._changed
+            with self._lock:
+                batch = self.events[since:]
+                done = self.done and since + len(batch) >= len(self.events)
+            for event in batch:
+                yield event
+            since += len(batch)
+            if done:
+                return
+            await changed.wait()
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "state": self.state,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+            "events": len(self.events),
+        }
+
+
+class _OutputRouter(io.TextIOBase):
+    """File for the rich consoles: output goes to the job printing it."""
+
+    def __init__(self, fallback: io.TextIOBase) -> None:
+        self._fallback = fallback
+
+    def write(self, text: str) -> int:
+        job = _current_job.get()
+        if job is None:
+            return self._fallback.write(text)
+        job.write(text)
+        return len(text)
+
+    def flush(self) -> None:
+        if _current_job.get() is None:
+            self._fallback.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+
+class _JobLogHandler(logging.Handler):
+    def emit(self, record: logging.LogRecord) -> None:
+        job = _current_job.get()
+        if job is not None:
+            job.emit("log", level=record.levelname, logger=record.name, message=record.getMessage())
+
+
+_KINDS = ("tts", "video", "produce", "gc")
+
+
+def validate_params(kind: object, params: dict) -> dict:
+    """Check a job request and fill in defaults.
+
+    Raises:
+        JobError: On an unknown kind, unknown or missing parameters, or bad values.
+    """
+    if kind not in _KINDS:
+        raise JobError(f"Unknown job kind {kind!r}; expected one of: {', '.join(_KINDS)}")
+    if kind == "gc":
+        allowed = {"dry_run": False, "budget": None, "all": False}
+    elif kind == "tts":
+        allowed = {"lang": None, "quotes": [], "force": False}
+    else:
+        allowed = {"lang": None, "quotes": [], "force": False, "jobs": 0}
+    unknown = sorted(set(params) - set(allowed))
+    if unknown:
+        raise JobError(f"Unknown parameter(s) for '{kind}': {', '.join(unknown)}")
+    result = {**allowed, **{k: v for k, v in params.items() if v is not None}}
+
+    if kind == "gc":
+        if not isinstance(result["dry_run"], bool) or not isinstance(result["all"], bool):
+            raise JobError("'dry_run' and 'all' must be booleans")
+        if result["budget"] is not None and (
+            isinstance(result["budget"], bool) or not isinstance(result["budget"], (int, float))
+        ):
+            raise JobError("'budget' must be a number of GB")
+        return result
+    if not isinstance(result["lang"], str) or not result["lang"]:
+        raise JobError(f"'{kind}' requires 'lang'")
+    if not isinstance(result["quotes"], list) or not all(isinstance(q, str) for q in result["quotes"]):
+        raise JobError("'quotes' must be a list of quote IDs")
+    if not isinstance(result["force"], bool):
+        raise JobError("'force' must be a boolean")
+    if "jobs" in result and (
+        isinstance(result["jobs"], bool) or not isinstance(result["jobs"], int) or result["jobs"] < 0
+    ):
+        raise JobError("'jobs' must be a non-negative integer (0 = default)")
+    return result
+
+
+def _command_args(config_path: str, kind: str, p: dict) -> list[str]:
+    """The CLI arguments equivalent to a job."""
+    args = ["--config", config_path, kind]
+    if kind == "gc":
+        if p["dry_run"]:
+            args.append("--dry-run")
+        if p["budget"] is not None:
+            args += ["--budget", str(p["budget"])]
+        if p["all"]:
+            args.append("--all")
+        return args
+    args += [p["lang"], *p["quotes"]]
+    if p["force"]:
+        args.append("--force")
+    if p.get("jobs"):
+        args += ["--jobs", str(p["jobs"])]
+    return args
+
+
+def _run_command(config_path: str, kind: str, p: dict) -> Any:
+    """Run the CLI command for a job in this thread; return its result summary."""
+    from src.runner import cli
+
+    try:
+        cli.main(_command_args(config_path, kind, p), prog_name="src", standalone_mode=False)
+    except SystemExit as exc:
+        if exc.code:
+            raise RuntimeError(f"'{kind}' exited with status {exc.code}; see the job's output events") from None
+    if kind in ("video", "produce"):
+        lang_dir = get_project_root(config_path) / p["lang"]
+        status = load_status(lang_dir)
+        ids = p["quotes"] or sorted(status)
+        return {qid: status.get(qid, {}).get("assembly") for qid in ids}
+    return None
+
+
+class JobServer:
+    """Job registry, scheduler and HTTP front end."""
+
+    def __init__(self, config_path: str, settings: ServeSettings) -> None:
+        self.config_path = config_path
+        self.settings = settings
+        self.jobs: dict[str, Job] = {}
+        self.started_at = time.time()
+        self._slots = asyncio.Semaphore(settings.max_jobs)
+        self._kind_slots = {kind: asyncio.Semaphore(max(1, settings.limits.get(kind, 1))) for kind in _KINDS}
+        self._lang_locks: dict[str, asyncio.Lock] = {}
+
+    def submit(self, kind: object, params: dict) -> Job:
+        params = validate_params(kind, params)
+        job = Job(id=uuid.uuid4().hex[:12], kind=kind, params=params)
+        self.jobs[job.id] = job
+        job.emit("state", state="queued")
+        job.task = asyncio.create_task(self._run(job))
+        logger.info("Job %s queued: %s %s", job.id, kind, json.dumps(params))
+        return job
+
+    def cancel(self, job: Job) -> None:
+        if job.state == "queued" and job.task is not None:
+            job.task.cancel()
+
+    async def _run(self, job: Job) -> None:
+        _current_job.set(job)
+        try:
+            async with contextlib.AsyncExitStack() as stack:
+                if job.params.get("lang"):
+                    lock = self._lang_locks.setdefault(job.params["lang"], asyncio.Lock())
+                    await stack.enter_async_context(lock)
+                await stack.enter_async_context(self._kind_slots[job.kind])
+                await stack.enter_async_context(self._slots)
+                job.started_at = time.time()
+                job.emit("state", state="running")
+                job.result = await asyncio.to_thread(_run_command, self.config_path, job.kind, job.params)
+            job.finish("succeeded")
+        except asyncio.CancelledError:
+            job.finish("cancelled")
+        except Exception as exc:
+            job.finish("failed", error=f"{type(exc).__name__}: {exc}")
+        _current_job.set(None)
+        logger.info("Job %s %s", job.id, job.state)
+        finished = [j for j in self.jobs.values() if j.done]
+        for old in finished[:max(0, len(finished) - self.settings.history)]:
+            del self.jobs[old.id]
+
+    def health(self) -> dict:
+        states = [j.state for j in self.jobs.values()]
+        return {
+            "status": "ok",
+            "uptime": round(time.time() - self.started_at, 1),
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            "max_jobs": self.settings.max_jobs,
+        }
+
+    async def aclose(self) -> None:
+        """Drop queued jobs and wait for running ones."""
+        tasks = [j.task for j in self.jobs.values() if j.task is not None and not j.task.done()]
+        for job in self.jobs.values():
+            self.cancel(job)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one request per connection."""
+        try:
+            try:
+                method, path, query, body = await _read_request(reader)
+            except (ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                await _send_json(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request"})
+                return
+            await self._dispatch(writer, method, path, query, body)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _dispatch(
+        self, writer: asyncio.StreamWriter, method: str, path: str, query: dict[str, list[str]], body: bytes,
+    ) -> None:
+        parts = [p for p in path.split("/") if p]
+        if parts == ["health"] and method == "GET":
+            await _send_json(writer, HTTPStatus.OK, self.health())
+        elif parts == ["jobs"] and method == "GET":
+            await _send_json(writer, HTTPStatus.OK, {"jobs": [j.summary() for j in self.jobs.values()]})
+        elif parts == ["jobs"] and method == "POST":
+            try:
+                request = json.loads(body or b"{}")
+                if not isinstance(request, dict):
+                    raise JobError("Expected a JSON object")
+                job = self.submit(request.pop("kind", None), request)
+            except ValueError as exc:
+                await _send_json(writer, HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+                return
+            await _send_json(writer, HTTPStatus.ACCEPTED, job.summary())
+        elif len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                await _send_json(writer, HTTPStatus.NOT_FOUND, {"error": f"No job '{parts[1]}'"})
+            elif len(parts) == 2 and method == "GET":
+                await _send_json(writer, HTTPStatus.OK, job.summary())
+            elif len(parts) == 2 and method == "DELETE":
+                if job.state == "running":
+                    await _send_json(writer, HTTPStatus.CONFLICT, {"error": "A running job cannot be cancelled"})
+                    return
+                self.cancel(job)
+                await _send_json(writer, HTTPStatus.ACCEPTED, job.summary())
+            elif parts[2:] == ["events"] and method == "GET":
+                try:
+                    since = int(query.get("since", ["0"])[0])
+                except ValueError:
+                    await _send_json(writer, HTTPStatus.BAD_REQUEST, {"error": "'since' must be an integer"})
+                    return
+                await _stream_events(writer, job, since)
+            else:
+                await _send_json(writer, HTTPStatus.NOT_FOUND, {"error": f"No route {method} {path}"})
+        else:
+            await _send_json(writer, HTTPStatus.NOT_FOUND, {"error": f"No route {method} {path}"})
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, dict[str, list[str]], bytes]:
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    method, target, _ = request_line.split(" ", 2)
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0") or 0)
+    if length > _MAX_BODY:
+        raise ValueError("Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    url = urlsplit(target)
+    return method.upper(), url.path, parse_qs(url.query), body
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: HTTPStatus, payload: object) -> None:
+    body = json.dumps(payload, default=str).encode() + b"\n"
+    writer.write(
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+
+
+async def _stream_events(writer: asyncio.StreamWriter, job: Job, since: int) -> None:
+    writer.write(
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+        b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n"
+    )
+    async for event in job.follow(since):
+        data = json.dumps(event, default=str).encode() + b"\n"
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def serve(
+    config_path: str,
+    host: str | None = None,
+    port: int | None = None,
+    socket_path: str | None = None,
+) -> None:
+    """Run the job server until SIGINT/SIGTERM."""
+    settings = ServeSettings.from_config(load_config(config_path))
+    host = host or settings.host
+    port = port or settings.port
+    socket_path = socket_path or settings.socket or None
+    server = JobServer(config_path, settings)
+
+    router = _OutputRouter(sys.stdout)
+    for name, module in list(sys.modules.items()):
+        target = getattr(module, "console", None) if name.startswith("src.") else None
+        if isinstance(target, Console):
+            target.file = router
+            target.soft_wrap = True
+    log_handler = _JobLogHandler()
+    logging.getLogger().addHandler(log_handler)
+
+    if socket_path:
+        sock = Path(socket_path)
+        if sock.exists() and stat.S_ISSOCK(sock.stat().st_mode):
+            sock.unlink()
+        listener = await asyncio.start_unix_server(server.handle, path=socket_path)
+        where = f"unix:{socket_path}"
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        where = f"http://{host}:{port}"
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    console.print(f"[bold]Serving quote jobs on {where}[/bold] (max {settings.max_jobs} at once; Ctrl+C to stop)")
+    try:
+        async with listener:
+            await stop.wait()
+    finally:
+        console.print("[yellow]Shutting down; waiting for running jobs...[/yellow]")
+        await server.aclose()
+        logging.getLogger().removeHandler(log_handler)
+        if socket_path:
+            Path(socket_path).unlink(missing_ok=True)
@@ -15,6 +15,16 @@ logger = logging.getLogger(__name__)
 
 _ELEVENLABS_BASE = "https://api.elevenlabs.io"
 
+# Shared across calls so consecutive quotes reuse the connection
+_client: httpx.Client | None = None
+
+
+def _http_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        _client = httpx.Client(timeout=60.0)
+    return _client
+
 
 def _build_line_timestamps(
     lines: list[str],
@@ -188,9 +198,8 @@ def generate_tts(
     logger.info("Calling ElevenLabs API for %s (voice=%s, model=%s)", quote.id, voice_id, model_id)
     logger.info("Text: %s", full_text)
 
-    with httpx.Client(timeout=60.0) as client:
-        response = client.post(url, headers=headers, json=body)
-        response.raise_for_status()
+    response = _http_client().post(url, headers=headers, json=body)
+    response.raise_for_status()
 
     data = response.json()
 
@@ -1,19 +1,32 @@
 """Video builder: trim clips, add text overlay, concat, mix audio.
 
 Uses FFmpeg to produce final short-form videos from clips + TTS audio.
+The default ``graph`` engine renders a short with one ffmpeg run: a single
+filter graph trims, loops, scales, crops and captions every line, concats
+them, inserts the audio pauses, mixes in music, fades out, and encodes
+once. The ``segments`` engine (``assembly.engine``) encodes one segment per
+line, then runs concat, mux and fade passes; its line encodes run in
+parallel, with the machine's cores split between them. With
+``assembly.lossless`` both engines produce the same frames (see
+tests/test_video_engines.py and ``python -m scripts.bench_engines``).
 """
 
 from __future__ import annotations
 
 import logging
+import os
 import random
 import shutil
 import subprocess
 import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
-from src.clips import load_clip_zones, get_zone_for_clip
-from src.models import ClipTextZone, VoiceoverResult
+from src.clip_index import ClipIndex
+from src.clips import get_zone_for_clip
+from src.models import ClipInfo, ClipTextZone, VoiceoverResult
 
 logger = logging.getLogger(__name__)
 
@@ -112,15 +125,11 @@ def _compute_text_positions(
     return y_positions, x_offsets
 
 
-def _get_clip_files(clips_dir: Path) -> list[Path]:
-    return sorted(clips_dir.glob("*.mp4"))
-
-
 def _select_clips(
-    available: list[Path],
+    available: list[ClipInfo],
     count: int,
     seed: str = "",
-) -> list[Path]:
+) -> list[ClipInfo]:
     if not available:
         raise ValueError("No clips available for video build")
     rng = random.Random(seed)
@@ -129,13 +138,8 @@ def _select_clips(
     return [shuffled[i % len(shuffled)] for i in range(count)]
 
 
-def _create_paused_audio(
-    audio_path: str,
-    lines: list,
-    pause_duration: float,
-    tmp: Path,
-) -> Path:
-    """Insert silence between lines in the TTS audio via FFmpeg."""
+def _pause_filters(source: str, lines: list, pause_duration: float, out: str) -> list[str]:
+    """Filter chains that cut input stream ``source`` at line starts and rejoin it, with silences, as ``[out]``."""
     parts = []
     inputs = []
 
@@ -146,7 +150,7 @@ def _create_paused_audio(
         else:
             trim = f"atrim=start={start}"
 
-        parts.append(f"[0:a]{trim},asetpts=PTS-STARTPTS[s{i}]")
+        parts.append(f"[{source}]{trim},asetpts=PTS-STARTPTS[s{i}]")
         inputs.append(f"[s{i}]")
 
         if i < len(lines) - 1:
@@ -156,7 +160,18 @@ def _create_paused_audio(
             inputs.append(f"[p{i}]")
 
     n = len(inputs)
-    parts.append(f"{''.join(inputs)}concat=n={n}:v=0:a=1[out]")
+    parts.append(f"{''.join(inputs)}concat=n={n}:v=0:a=1[{out}]")
+    return parts
+
+
+def _create_paused_audio(
+    audio_path: str,
+    lines: list,
+    pause_duration: float,
+    tmp: Path,
+) -> Path:
+    """Insert silence between lines in the TTS audio via FFmpeg."""
+    parts = _pause_filters("0:a", lines, pause_duration, "out")
 
     output = tmp / "voice_paused.mp3"
     cmd = [
@@ -176,7 +191,18 @@ def _create_paused_audio(
     return output
 
 
+# (path, mtime_ns, size) -> seconds; only rendered outputs are probed here, clips come from the index
+_duration_cache: dict[tuple[str, int, int], float] = {}
+
+
 def _get_video_duration(path: Path) -> float:
+    try:
+        st = path.stat()
+    except OSError:
+        return 6.0
+    key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+    if key in _duration_cache:
+        return _duration_cache[key]
     result = subprocess.run(
         [
             "ffprobe", "-v", "error",
@@ -187,9 +213,17 @@ def _get_video_duration(path: Path) -> float:
         capture_output=True, text=True,
     )
     try:
-        return float(result.stdout.strip())
+        duration = _duration_cache[key] = float(result.stdout.strip())
     except ValueError:
         return 6.0
+    return duration
+
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        return os.cpu_count() or 1
 
 
 def build_video(
@@ -198,44 +232,45 @@ def build_video(
     output_path: Path,
     assembly_config: dict,
     music_path: Path | None = None,
+    clips: list[ClipInfo] | None = None,
 ) -> Path:
-    """Build a final video for one quote."""
+    """Build a final video for one quote.
+
+    ``clips`` is the scanned clip index, if the caller already has it.
+    """
     tmpdir = tempfile.mkdtemp(prefix="quotes_video_")
     try:
-        return _build_video_inner(voiceover, clips_dir, output_path, assembly_config, tmpdir, music_path)
+        return _build_video_inner(
+            voiceover, clips_dir, output_path, assembly_config, tmpdir, music_path, clips,
+        )
     finally:
         shutil.rmtree(tmpdir, ignore_errors=True)
 
 
-def _build_video_inner(
+@dataclass
+class _Segment:
+    """One line of the short: a clip looped/trimmed to the line's duration, with its caption."""
+    clip: Path
+    duration: float
+    loops: int  # -stream_loop count (0 = play once)
+    vf: str  # scale, crop, fps and drawtext chain
+
+
+def _plan_segments(
     voiceover: VoiceoverResult,
     clips_dir: Path,
-    output_path: Path,
     config: dict,
-    tmpdir: str,
-    music_path: Path | None = None,
-) -> Path:
-    tmp = Path(tmpdir)
+    clips: list[ClipInfo] | None = None,
+) -> list[_Segment]:
     lines = voiceover.lines
 
-    if not lines:
-        raise ValueError(f"No lines in voiceover for {voiceover.quote_id}")
-
-    available_clips = _get_clip_files(clips_dir)
+    available_clips = clips if clips is not None else ClipIndex(clips_dir).scan()
     if not available_clips:
         raise ValueError(f"No clip .mp4 files found in {clips_dir}")
 
     selected = _select_clips(available_clips, len(lines), seed=voiceover.quote_id)
 
     line_pause = config.get("line_pause", 1.5)
-    if line_pause > 0 and len(lines) > 1:
-        paused_audio_path = _create_paused_audio(
-            voiceover.audio_path, lines, line_pause, tmp,
-        )
-        audio_for_mux = str(paused_audio_path)
-    else:
-        audio_for_mux = voiceover.audio_path
-
     font = config.get("font", "fonts/SpecialElite-Regular.ttf")
     font_size = config.get("font_size", 48)
     font_color = config.get("font_color", "white")
@@ -243,20 +278,18 @@ def _build_video_inner(
     border_color = config.get("border_color", "black")
     max_chars = config.get("max_chars_per_line", 30)
 
-    clip_zones = load_clip_zones(clips_dir)
+    clip_zones = {c.path.stem: c.zone for c in selected if c.zone is not None}
     rng = random.Random(voiceover.quote_id)
-    y_positions, x_offsets = _compute_text_positions(selected, clip_zones, rng, config)
+    y_positions, x_offsets = _compute_text_positions([c.path for c in selected], clip_zones, rng, config)
     resolution = config.get("resolution", "1080x1920")
     fps = config.get("fps", 30)
 
     width, height = resolution.split("x")
 
-    segment_files: list[Path] = []
-    concat_list = tmp / "concat.txt"
-
+    segments: list[_Segment] = []
     for i, line in enumerate(lines):
-        clip_path = selected[i]
-        clip_duration = _get_video_duration(clip_path)
+        clip_path = selected[i].path
+        clip_duration = selected[i].duration or 6.0
 
         if i < len(lines) - 1:
             line_duration = lines[i + 1].start - line.start + line_pause
@@ -268,12 +301,9 @@ def _build_video_inner(
         wrapped = _wrap_text(line.text, max_chars)
         escaped = _escape_drawtext(wrapped)
 
-        segment_path = tmp / f"seg_{i:03d}.mp4"
-
-        input_args = []
+        loops = 0
         if clip_duration < line_duration:
-            loop_count = int(line_duration / clip_duration) + 1
-            input_args = ["-stream_loop", str(loop_count)]
+            loops = int(line_duration / clip_duration) + 1
 
         filter_parts = [
             f"scale={width}:{height}:force_original_aspect_ratio=increase",
@@ -290,28 +320,201 @@ def _build_video_inner(
                 f":y={y_positions[i]}"
             ),
         ]
-        vf = ",".join(filter_parts)
+        segments.append(_Segment(clip_path, line_duration, loops, ",".join(filter_parts)))
+    return segments
+
+
+def _build_video_inner(
+    voiceover: VoiceoverResult,
+    clips_dir: Path,
+    output_path: Path,
+    config: dict,
+    tmpdir: str,
+    music_path: Path | None = None,
+    clips: list[ClipInfo] | None = None,
+) -> Path:
+    if not voiceover.lines:
+        raise ValueError(f"No lines in voiceover for {voiceover.quote_id}")
+
+    started = time.perf_counter()
+    segments = _plan_segments(voiceover, clips_dir, config, clips)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if music_path is not None and not music_path.exists():
+        music_path = None
+
+    engine = config.get("engine", "graph")
+    if engine == "graph":
+        _render_graph(voiceover, segments, output_path, config, music_path)
+    elif engine == "segments":
+        _render_segments(voiceover, segments, output_path, config, Path(tmpdir), music_path)
+    else:
+        raise ValueError(f"Unknown assembly.engine '{engine}' (expected graph or segments)")
+
+    logger.info(
+        "Built video: %s (%.1f KB) in %.1fs with the %s engine",
+        output_path, output_path.stat().st_size / 1024, time.perf_counter() - started, engine,
+    )
+    return output_path
+
+
+def _x264_args(config: dict) -> list[str]:
+    """Encoder settings shared by both engines; ``lossless`` makes every encode bit-exact."""
+    if config.get("lossless", False):
+        # Intra-only: FFmpeg's decoder is not bit-exact on lossless inter frames
+        return ["-preset", "fast", "-crf", "0", "-g", "1"]
+    return ["-preset", "fast", "-crf", "23"]
+
+
+def _graph_command(
+    voiceover: VoiceoverResult,
+    segments: list[_Segment],
+    output_path: Path,
+    config: dict,
+    music_path: Path | None = None,
+) -> list[str]:
+    """The single ffmpeg command that renders a whole short."""
+    lines = voiceover.lines
+    line_pause = config.get("line_pause", 1.5)
+    fade_dur = config.get("outro_fade", 0.5)
+
+    inputs: list[str] = []
+    parts: list[str] = []
+    for i, seg in enumerate(segments):
+        if seg.loops:
+            inputs += ["-stream_loop", str(seg.loops)]
+        inputs += ["-i", str(seg.clip)]
+        parts.append(f"[{i}:v]{seg.vf},trim=duration={seg.duration:.3f},setpts=PTS-STARTPTS,setsar=1[v{i}]")
+    n = len(segments)
+    parts.append("".join(f"[v{i}]" for i in range(n)) + f"concat=n={n}:v=1:a=0[vcat]")
+
+    inputs += ["-i", voiceover.audio_path]
+    audio_duration = voiceover.duration
+    if line_pause > 0 and len(lines) > 1:
+        logger.info("Inserting %.1fs pauses between %d lines", line_pause, len(lines))
+        parts += _pause_filters(f"{n}:a", lines, line_pause, "voice")
+        audio_duration += line_pause * (len(lines) - 1)
+    else:
+        parts.append(f"[{n}:a]anull[voice]")
+
+    if music_path is not None:
+        inputs += ["-i", str(music_path)]
+        music_vol = config.get("music_volume", 0.3)
+        parts.append(
+            f"[voice]volume=1.0[vo];[{n + 1}:a]volume={music_vol}[music];"
+            f"[vo][music]amix=inputs=2:duration=first[amix]"
+        )
+    else:
+        parts.append("[voice]anull[amix]")
+
+    # The mux used to stop at the shorter stream (-shortest)
+    duration = min(sum(seg.duration for seg in segments), audio_duration)
+    if fade_dur > 0:
+        fade_start = max(0, duration - fade_dur)
+        logger.info("Applying %.1fs fade-out at %.1fs", fade_dur, fade_start)
+        parts.append(f"[vcat]fade=t=out:st={fade_start:.3f}:d={fade_dur:.3f}[vout]")
+        parts.append(f"[amix]afade=t=out:st={fade_start:.3f}:d={fade_dur:.3f}[aout]")
+    else:
+        parts.append("[vcat]null[vout]")
+        parts.append("[amix]anull[aout]")
+
+    return [
+        "ffmpeg", "-y",
+        *inputs,
+        "-filter_complex", ";".join(parts),
+        "-map", "[vout]",
+        "-map", "[aout]",
+        "-t", f"{duration:.3f}",
+        "-c:v", "libx264",
+        *_x264_args(config),
+        "-pix_fmt", "yuv420p",
+        *(["-threads", str(config["encode_cpus"])] if config.get("encode_cpus") else []),
+        "-c:a", "aac",
+        "-b:a", "192k",
+        str(output_path),
+    ]
 
-        cmd = [
-            "ffmpeg", "-y",
-            *input_args,
-            "-i", str(clip_path),
-            "-t", f"{line_duration:.3f}",
-            "-vf", vf,
-            "-an",
-            "-c:v", "libx264",
-            "-preset", "fast",
-            "-crf", "23",
-            "-pix_fmt", "yuv420p",
-            str(segment_path),
-        ]
 
-        logger.info("Creating segment %d: %.1fs, clip=%s", i, line_duration, clip_path.name)
+def _render_graph(
+    voiceover: VoiceoverResult,
+    segments: list[_Segment],
+    output_path: Path,
+    config: dict,
+    music_path: Path | None = None,
+) -> None:
+    for i, seg in enumerate(segments):
+        logger.info("Segment %d: %.1fs, clip=%s", i, seg.duration, seg.clip.name)
+    cmd = _graph_command(voiceover, segments, output_path, config, music_path)
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg render failed: {result.stderr[-500:]}")
+
+
+def _encode_slots(count: int, config: dict) -> tuple[int, int]:
+    """Parallel line encodes and x264 threads for each, so together they fill the CPUs once."""
+    cpus = config.get("encode_cpus") or available_cpus()  # set when several quotes render at once
+    per_encode = max(1, config.get("encode_threads", 4))
+    workers = config.get("encode_workers", 0) or max(1, cpus // per_encode)
+    workers = max(1, min(workers, count))
+    return workers, max(1, cpus // workers)
+
+
+def _encode_segment(
+    i: int, seg: _Segment, segment_path: Path, threads: int, retries: int, x264_args: list[str],
+) -> Path:
+    """Encode one line's clip, retrying a failed ffmpeg run up to ``retries`` times."""
+    input_args = ["-stream_loop", str(seg.loops)] if seg.loops else []
+    cmd = [
+        "ffmpeg", "-y",
+        *input_args,
+        "-i", str(seg.clip),
+        "-t", f"{seg.duration:.3f}",
+        "-vf", seg.vf,
+        "-an",
+        "-c:v", "libx264",
+        *x264_args,
+        "-pix_fmt", "yuv420p",
+        "-threads", str(threads),
+        str(segment_path),
+    ]
+    for attempt in range(1, retries + 2):
+        logger.info("Creating segment %d: %.1fs, clip=%s", i, seg.duration, seg.clip.name)
         result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise RuntimeError(f"FFmpeg failed for segment {i}: {result.stderr[-500:]}")
+        if result.returncode == 0:
+            return segment_path
+        if attempt <= retries:
+            logger.warning("FFmpeg failed for segment %d (attempt %d), retrying", i, attempt)
+    raise RuntimeError(f"FFmpeg failed for segment {i}: {result.stderr[-500:]}")
 
-        segment_files.append(segment_path)
+
+def _render_segments(
+    voiceover: VoiceoverResult,
+    segments: list[_Segment],
+    output_path: Path,
+    config: dict,
+    tmp: Path,
+    music_path: Path | None = None,
+) -> None:
+    lines = voiceover.lines
+    line_pause = config.get("line_pause", 1.5)
+    workers, threads = _encode_slots(len(segments), config)
+    retries = config.get("encode_retries", 1)
+    concat_list = tmp / "concat.txt"
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="encode") as pool:
+        # The voice track is prepared alongside the line encodes
+        paused_audio: Future | None = None
+        if line_pause > 0 and len(lines) > 1:
+            paused_audio = pool.submit(_create_paused_audio, voiceover.audio_path, lines, line_pause, tmp)
+        encodes = [
+            pool.submit(_encode_segment, i, seg, tmp / f"seg_{i:03d}.mp4", threads, retries, _x264_args(config))
+            for i, seg in enumerate(segments)
+        ]
+        try:
+            segment_files = [f.result() for f in encodes]
+            audio_for_mux = str(paused_audio.result()) if paused_audio else voiceover.audio_path
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
 
     with open(concat_list, "w") as f:
         for seg in segment_files:
@@ -330,9 +533,7 @@ def _build_video_inner(
     if result.returncode != 0:
         raise RuntimeError(f"FFmpeg concat failed: {result.stderr[-500:]}")
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    if music_path and music_path.exists():
+    if music_path is not None:
         music_vol = config.get("music_volume", 0.3)
         cmd_mux = [
             "ffmpeg", "-y",
@@ -378,7 +579,7 @@ def _build_video_inner(
             "-i", str(pre_fade),
             "-vf", f"fade=t=out:st={fade_start:.3f}:d={fade_dur:.3f}",
             "-af", f"afade=t=out:st={fade_start:.3f}:d={fade_dur:.3f}",
-            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
+            "-c:v", "libx264", *_x264_args(config),
             "-c:a", "aac", "-b:a", "192k",
             str(output_path),
         ]
@@ -386,6 +587,3 @@ def _build_video_inner(
         result = subprocess.run(cmd_fade, capture_output=True, text=True)
         if result.returncode != 0:
             raise RuntimeError(f"FFmpeg fade failed: {result.stderr[-500:]}")
-
-    logger.info("Built video: %s (%.1f KB)", output_path, output_path.stat().st_size / 1024)
-    return output_path
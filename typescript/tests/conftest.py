@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the src package the way the CLI does, from the typescript directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
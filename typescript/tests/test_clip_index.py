@@ -0,0 +1,41 @@
+"""Incremental scans of the clip index."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+
+import src.clip_index as clip_index
+from src.clip_index import ClipIndex
+
+
+def test_unreadable_clip_is_probed_again_on_the_next_scan(tmp_path, monkeypatch):
+    (tmp_path / "sea.mp4").write_bytes(b"\x00" * 64)
+    readable = False
+    calls = []
+
+    def ffprobe(args, **kwargs):
+        calls.append(args)
+        if not readable:
+            return subprocess.CompletedProcess(args, 1, stdout="", stderr="moov atom not found")
+        if "packet=pts_time,flags" in args:
+            return subprocess.CompletedProcess(args, 0, stdout="0.0,K__\n2.0,K__\n", stderr="")
+        stream = {"width": 1080, "height": 1920, "avg_frame_rate": "30/1", "codec_name": "h264"}
+        return subprocess.CompletedProcess(args, 0, stdout=json.dumps({
+            "format": {"duration": "6.0"}, "streams": [stream],
+        }), stderr="")
+
+    monkeypatch.setattr(clip_index.subprocess, "run", ffprobe)
+    index = ClipIndex(tmp_path)
+
+    (clip,) = index.scan()
+    assert clip.duration is None
+
+    readable = True
+    (clip,) = index.scan()
+    assert clip.duration == 6.0
+    assert (clip.width, clip.height, clip.keyframe_interval) == (1080, 1920, 2.0)
+
+    probes = len(calls)
+    index.scan()
+    assert len(calls) == probes  # indexed clips are not probed again
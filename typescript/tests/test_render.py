@@ -0,0 +1,76 @@
+"""Rendering several quotes at once with render_videos (needs ffmpeg and ffprobe)."""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from src.models import LineTimestamp, VoiceoverResult
+from src.render import RenderJob, render_videos
+
+pytestmark = pytest.mark.skipif(
+    not (shutil.which("ffmpeg") and shutil.which("ffprobe")), reason="needs ffmpeg and ffprobe",
+)
+
+FONT = Path(__file__).resolve().parents[1] / "fonts" / "SpecialElite-Regular.ttf"
+CONFIG = {
+    "font": str(FONT),
+    "font_size": 24,
+    "resolution": "360x640",
+    "fps": 30,
+    "text_y_min": 100,
+    "text_y_max": 500,
+    "text_y_step": 50,
+    "line_pause": 0.5,
+    "outro_fade": 0.5,
+    "lossless": True,
+}
+
+
+def _ffmpeg(*args: str) -> None:
+    subprocess.run(["ffmpeg", "-v", "error", "-y", *args], check=True)
+
+
+def _frame_hashes(path: Path) -> list[str]:
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", str(path), "-map", "0:v", "-f", "framemd5", "-"],
+        capture_output=True, text=True, check=True,
+    )
+    return [line.rsplit(",", 1)[1].strip() for line in result.stdout.splitlines() if not line.startswith("#")]
+
+
+def _job(quote_id: str, audio: Path, output_dir: Path) -> RenderJob:
+    voiceover = VoiceoverResult(quote_id=quote_id, audio_path=str(audio), duration=3.0, lines=[
+        LineTimestamp(text=f"{quote_id} opens", index=0, start=0.0, end=1.4),
+        LineTimestamp(text=f"{quote_id} closes", index=1, start=1.5, end=3.0),
+    ])
+    return RenderJob(voiceover, output_dir / quote_id / f"{quote_id}_clip.mp4")
+
+
+def test_parallel_render_matches_serial_and_reports_failures(tmp_path):
+    clips = tmp_path / "clips"
+    clips.mkdir()
+    _ffmpeg("-f", "lavfi", "-i", "testsrc2=size=480x854:rate=30:duration=2", "-pix_fmt", "yuv420p", str(clips / "a.mp4"))
+    _ffmpeg("-f", "lavfi", "-i", "testsrc=size=640x360:rate=30:duration=2", "-pix_fmt", "yuv420p", str(clips / "b.mp4"))
+    voice = tmp_path / "voice.mp3"
+    _ffmpeg("-f", "lavfi", "-i", "sine=frequency=440:duration=3", str(voice))
+
+    def jobs(output_dir: Path) -> list[RenderJob]:
+        return [
+            _job("q1", voice, output_dir),
+            _job("q2", tmp_path / "missing.mp3", output_dir),  # its render fails
+            _job("q3", voice, output_dir),
+        ]
+
+    serial = {r.quote_id: r for r in render_videos(jobs(tmp_path / "serial"), clips, CONFIG, jobs=1)}
+    parallel = {r.quote_id: r for r in render_videos(jobs(tmp_path / "parallel"), clips, CONFIG, jobs=3)}
+
+    assert parallel.keys() == serial.keys() == {"q1", "q2", "q3"}
+    assert not parallel["q2"].ok and parallel["q2"].error
+    for quote_id in ("q1", "q3"):
+        assert parallel[quote_id].ok
+        assert parallel[quote_id].video_path == tmp_path / "parallel" / quote_id / f"{quote_id}_clip.mp4"
+        assert _frame_hashes(parallel[quote_id].video_path) == _frame_hashes(serial[quote_id].video_path)
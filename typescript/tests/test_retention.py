@@ -0,0 +1,93 @@
+"""Disk budget eviction of generated outputs."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+import src.retention as retention
+from src.retention import RetentionSettings, collect_garbage
+
+_MB = 1024 ** 2
+_HOUR = 3600
+
+
+def _file(path: Path, age_hours: float) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(bytes(_MB))
+    stamp = time.time() - age_hours * _HOUR
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> dict[str, Path]:
+    monkeypatch.setattr(retention.tempfile, "gettempdir", lambda: str(tmp_path / "tmp"))
+    lang = tmp_path / "en"
+    lang.mkdir()
+    (lang / "q1.txt").write_text("Stay hungry.\nStay foolish.\n", encoding="utf-8")
+    out = lang / "output"
+    files = {
+        # Referenced by the current quote q1, however old
+        "voice": _file(out / "q1" / "q1_voice.mp3", 500),
+        "video": _file(out / "q1" / "q1_final.mp4", 400),
+        # Unreferenced, oldest first: a deleted quote, a stale render, a preview
+        "deleted": _file(out / "q0" / "q0_voice.mp3", 300),
+        "stale": _file(out / "q1" / "q1_old_render.mp4", 200),
+        "preview": _file(tmp_path / "clips" / "previews" / "sea.jpg", 100),
+        # Unreferenced but too recent to evict
+        "fresh": _file(out / "q1" / "q1_retry.mp4", 1),
+    }
+    (lang / "status.json").write_text(
+        json.dumps({"q1": {"assembly": {"video_path": str(files["video"])}}}), encoding="utf-8",
+    )
+    return files
+
+
+def _collect(tmp_path: Path, **kwargs) -> retention.GcReport:
+    config = {"clips_dir": "clips"}
+    return collect_garbage(config, str(tmp_path / "config.yaml"), **kwargs)
+
+
+def test_eviction_stops_once_under_budget(tmp_path, project):
+    # 6 MB of outputs against a 4.5 MB budget: the two oldest unreferenced files go
+    report = _collect(tmp_path, settings=RetentionSettings(budget_gb=4.5 * _MB / 1024 ** 3))
+
+    assert [f.path for f in report.evicted] == [project["deleted"], project["stale"]]
+    assert not project["deleted"].exists() and not project["stale"].exists()
+    assert project["preview"].exists()
+    assert not (project["deleted"].parent).exists()  # the emptied quote directory is dropped
+    assert report.referenced == 2 * _MB
+
+
+def test_referenced_and_recent_outputs_survive_any_budget(tmp_path, project):
+    report = _collect(tmp_path, settings=RetentionSettings(budget_gb=1e-9))
+
+    assert {f.path for f in report.evicted} == {project["deleted"], project["stale"], project["preview"]}
+    for name in ("voice", "video", "fresh"):
+        assert project[name].exists()
+
+
+def test_min_age_hours_protects_recent_outputs(tmp_path, project):
+    report = _collect(tmp_path, settings=RetentionSettings(min_age_hours=250), evict_all=True)
+
+    assert [f.path for f in report.evicted] == [project["deleted"]]
+    assert project["stale"].exists()
+
+
+def test_stale_build_temp_dirs_are_removed(tmp_path, project):
+    old = tmp_path / "tmp" / "quotes_video_old"
+    recent = tmp_path / "tmp" / "quotes_video_recent"
+    for path, age in ((old, 10), (recent, 1)):
+        _file(path / "part.mp4", age)
+        os.utime(path, (time.time() - age * _HOUR,) * 2)
+
+    report = _collect(tmp_path, settings=RetentionSettings())
+
+    assert report.temp_dirs == [old]
+    assert not old.exists() and recent.exists()
+    assert not report.evicted  # no budget: outputs stay
@@ -0,0 +1,46 @@
+"""Sizing and retries of the segments engine's parallel line encodes."""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from src import video
+from src.video import _encode_segment, _encode_slots, _Segment
+
+SEGMENT = _Segment(clip=Path("clip.mp4"), duration=2.0, loops=0, vf="null")
+
+
+def test_encode_slots_split_the_cpus():
+    assert _encode_slots(10, {"encode_cpus": 8, "encode_threads": 2}) == (4, 2)
+    assert _encode_slots(2, {"encode_cpus": 8, "encode_threads": 2}) == (2, 4)  # fewer lines, more threads each
+    assert _encode_slots(10, {"encode_cpus": 2, "encode_threads": 4}) == (1, 2)
+    assert _encode_slots(10, {"encode_cpus": 8, "encode_workers": 3}) == (3, 2)
+
+
+def _scripted_ffmpeg(monkeypatch: pytest.MonkeyPatch, returncodes: list[int]) -> list[list[str]]:
+    calls: list[list[str]] = []
+
+    def run(cmd, *args, **kwargs):
+        calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, returncodes.pop(0), stdout="", stderr="encoder crashed")
+
+    monkeypatch.setattr(video.subprocess, "run", run)
+    return calls
+
+
+def test_failed_encode_is_retried(monkeypatch, tmp_path):
+    calls = _scripted_ffmpeg(monkeypatch, [1, 0])
+    out = tmp_path / "seg_000.mp4"
+    assert _encode_segment(0, SEGMENT, out, 2, 1, []) == out
+    assert len(calls) == 2
+    assert calls[0][calls[0].index("-threads") + 1] == "2"
+
+
+def test_encode_gives_up_after_its_retries(monkeypatch, tmp_path):
+    calls = _scripted_ffmpeg(monkeypatch, [1, 1, 1])
+    with pytest.raises(RuntimeError, match="segment 3: encoder crashed"):
+        _encode_segment(3, SEGMENT, tmp_path / "seg_003.mp4", 1, 1, [])
+    assert len(calls) == 2
@@ -0,0 +1,105 @@
+"""The graph and segments engines render the same frames (needs ffmpeg and ffprobe)."""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.clip_index import ClipIndex
+from src.models import LineTimestamp, VoiceoverResult
+from src import video
+from src.video import build_video
+
+pytestmark = pytest.mark.skipif(
+    not (shutil.which("ffmpeg") and shutil.which("ffprobe")), reason="needs ffmpeg and ffprobe",
+)
+
+FONT = Path(__file__).resolve().parents[1] / "fonts" / "SpecialElite-Regular.ttf"
+CONFIG = {
+    "font": str(FONT),
+    "font_size": 24,
+    "resolution": "360x640",
+    "fps": 30,
+    "text_y_min": 100,
+    "text_y_max": 500,
+    "text_y_step": 50,
+    "line_pause": 1.5,
+    "outro_fade": 0.5,
+    "lossless": True,
+}
+
+
+def _ffmpeg(*args: str) -> None:
+    subprocess.run(["ffmpeg", "-v", "error", "-y", *args], check=True)
+
+
+@pytest.fixture(scope="module")
+def media(tmp_path_factory) -> Path:
+    """Clips of mixed size, frame rate and length (some loop), a voice track and music."""
+    root = tmp_path_factory.mktemp("media")
+    clips = root / "clips"
+    clips.mkdir()
+    _ffmpeg("-f", "lavfi", "-i", "testsrc2=size=480x854:rate=25:duration=1.7", "-pix_fmt", "yuv420p", str(clips / "a.mp4"))
+    _ffmpeg("-f", "lavfi", "-i", "mandelbrot=size=720x720:rate=30", "-t", "4", "-pix_fmt", "yuv420p", str(clips / "b.mp4"))
+    _ffmpeg("-f", "lavfi", "-i", "testsrc=size=640x360:rate=24:duration=3", "-pix_fmt", "yuv420p", str(clips / "c.mp4"))
+    _ffmpeg("-f", "lavfi", "-i", "sine=frequency=440:duration=7", str(root / "voice.mp3"))
+    _ffmpeg("-f", "lavfi", "-i", "sine=frequency=220:duration=20", str(root / "music.mp3"))
+    return root
+
+
+def _voiceover(media: Path) -> VoiceoverResult:
+    return VoiceoverResult(quote_id="q1", audio_path=str(media / "voice.mp3"), duration=7.0, lines=[
+        LineTimestamp(text="First line of the quote", index=0, start=0.0, end=2.0),
+        LineTimestamp(text="The second line, a bit longer than the first", index=1, start=2.3, end=4.4),
+        LineTimestamp(text="Last", index=2, start=4.6, end=7.0),
+    ])
+
+
+def _frame_hashes(path: Path) -> list[str]:
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", str(path), "-map", "0:v", "-f", "framemd5", "-"],
+        capture_output=True, text=True, check=True,
+    )
+    return [line.rsplit(",", 1)[1].strip() for line in result.stdout.splitlines() if not line.startswith("#")]
+
+
+@pytest.mark.parametrize("line_pause, music", [(1.5, False), (0.7, True), (0, False)])
+def test_graph_engine_renders_the_same_frames_as_segments(media, tmp_path, line_pause, music):
+    clips = ClipIndex(media / "clips").scan()
+    config = {**CONFIG, "line_pause": line_pause}
+    music_path = media / "music.mp3" if music else None
+
+    hashes = {}
+    for engine in ("segments", "graph"):
+        output = tmp_path / f"{engine}.mp4"
+        build_video(_voiceover(media), media / "clips", output, {**config, "engine": engine}, music_path, clips=clips)
+        hashes[engine] = _frame_hashes(output)
+
+    expected_frames = round((7.0 + line_pause * 2) * CONFIG["fps"])
+    assert len(hashes["segments"]) == expected_frames
+    assert hashes["graph"] == hashes["segments"]
+
+
+def test_segments_engine_encodes_lines_in_parallel(media, tmp_path, monkeypatch):
+    clips = ClipIndex(media / "clips").scan()
+    config = {**CONFIG, "engine": "segments"}
+    serial = tmp_path / "serial.mp4"
+    build_video(_voiceover(media), media / "clips", serial, {**config, "encode_workers": 1}, clips=clips)
+
+    # Every line encode must be running before any of them may finish
+    started = threading.Barrier(3, timeout=30)
+    run = subprocess.run
+
+    def encode_together(cmd, *args, **kwargs):
+        if "libx264" in cmd and any(Path(arg).name.startswith("seg_") for arg in cmd):
+            started.wait()
+        return run(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(video.subprocess, "run", encode_together)
+    parallel = tmp_path / "parallel.mp4"
+    build_video(_voiceover(media), media / "clips", parallel, {**config, "encode_workers": 3}, clips=clips)
+    assert _frame_hashes(parallel) == _frame_hashes(serial)